@@ -0,0 +1,107 @@
+"""
+벤치마크 공용: 측정 + 머신별 기준값(JSON) 저장/비교
+
+- measure(): 준비 호출 후 호출 1회씩 perf_counter_ns로 재서 중앙값/p95/최소 (µs), 느린 항목은 시간 제한
+- 기준값: benchmarks/baselines/<머신 이름>.<스위트>.json (머신마다 따로, 다른 머신 결과와 비교하지 않음)
+- 회귀: 현재 중앙값 > 기준 중앙값 x (1 + threshold)
+"""
+import json
+import platform
+import re
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+
+import numpy as np
+
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+DEFAULT_THRESHOLD = 0.25   # 기준보다 25% 이상 느려지면 회귀
+MAX_CASE_TIME = 3.0        # 항목당 최대 측정 시간 (초)
+
+
+def measure(fn, repeat=30, warmup=3, max_time=MAX_CASE_TIME, min_samples=5):
+    """fn() 호출 시간 측정 (느린 항목은 max_time초가 지나면 min_samples개 이상에서 멈춤)
+
+    Returns:
+        {'median_us', 'p95_us', 'min_us', 'samples'}
+    """
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeat, dtype=np.float64)
+    deadline = perf_counter_ns() + int(max_time * 1e9)
+    count = 0
+    while count < repeat:
+        start = perf_counter_ns()
+        fn()
+        end = perf_counter_ns()
+        samples[count] = end - start
+        count += 1
+        if count >= min_samples and end > deadline:
+            break
+    samples = samples[:count] / 1000
+    return {
+        'median_us': float(np.median(samples)),
+        'p95_us': float(np.percentile(samples, 95)),
+        'min_us': float(samples.min()),
+        'samples': count,
+    }
+
+
+def machine_id():
+    """기준값 파일 이름용 머신 식별자 (호스트 이름 + CPU 아키텍처)"""
+    name = f"{platform.node() or 'unknown'}-{platform.machine() or 'cpu'}"
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', name)
+
+
+def baseline_path(suite, machine=None, directory=BASELINE_DIR):
+    return Path(directory) / f"{machine or machine_id()}.{suite}.json"
+
+
+def load_baseline(path):
+    """기준값 로드 (없으면 None)"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results):
+    """기준값 저장 (환경 정보 포함)"""
+    import cv2
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        'machine': path.name.split('.')[0],
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """기준값 대비 회귀 목록 [(이름, 기준 µs, 현재 µs, 배율)] (기준에 없는 항목은 건너뜀)"""
+    regressions = []
+    for name, result in results.items():
+        base = (baseline or {}).get(name)
+        if not base:
+            continue
+        ratio = result['median_us'] / base['median_us']
+        if ratio > 1 + threshold:
+            regressions.append((name, base['median_us'], result['median_us'], ratio))
+    return regressions
+
+
+def print_report(results, baseline=None):
+    """결과 표 출력 (기준값이 있으면 배율도)"""
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        line = f"  {name:<{width}}  {result['median_us']:>10.1f} µs  (p95 {result['p95_us']:.1f})"
+        base = (baseline or {}).get(name)
+        if base:
+            line += f"  x{result['median_us'] / base['median_us']:.2f}"
+        print(line)
@@ -0,0 +1,242 @@
+"""
+관측 → 행동 종단 지연 벤치마크
+합성 화면 + 기록용 입력으로 실제 루프 전체(캡처 → 전처리 → 프레임 스택 → model.predict → 키 입력)를 헤드리스 실행
+
+- 환경: MLRealtimeEnv 그대로 (위험 감지/보상 포함), 캡처와 입력만 SyntheticCapture / RecordingInput으로 교체
+- 정책: 학습 스크립트와 같은 PPO CnnPolicy (features_dim=512, net_arch=[512, 512]), 학습 없이 초기 가중치
+- 종단 지연: 관측의 마지막 프레임 캡처 시작 → 그 관측으로 고른 행동의 첫 키 누름 (키를 누르지 않는 행동은 제외)
+- 보고: 종단 지연 p50/p95/p99, predict 지연, 단계별(info['timing']) p50, 초당 스텝, 스레드별 CPU 사용률 (Linux /proc)
+- 조합: 캡처 해상도 x 관측 크기 x 프레임 스택 x frame_skip x torch 스레드 수
+- 캡처 해상도는 ROI 설정(configs/roi_settings.json)과 위험 감지 템플릿이 들어가는 크기여야 함 (실제 화면 기준 1080p 이상)
+- 기본은 실제 시계 (키 홀드/대기 포함 실제 속도), --virtual-clock이면 대기 없이 계산 비용만
+
+사용법:
+    python benchmarks/e2e_latency.py --frame-sizes 84 128 --frame-skips 1 4 --threads 1 4
+    python benchmarks/e2e_latency.py --virtual-clock --steps 500 --output logs/e2e.json
+"""
+import argparse
+from contextlib import redirect_stdout
+import io
+import itertools
+import json
+import os
+from pathlib import Path
+import sys
+import threading
+from time import perf_counter_ns
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import torch
+from stable_baselines3 import PPO
+
+from benchmarks.hotpath import RESOLUTIONS
+from src.rl_env_ml import MLRealtimeEnv
+from src.utils.clock import RealClock, VirtualClock
+from src.utils.instrumentation import TimingAggregator
+
+
+class SyntheticCapture:
+    """합성 화면 캡처 (미리 만든 노이즈 프레임을 돌아가며 반환)"""
+
+    def __init__(self, width, height, n_frames=4, seed=0):
+        rng = np.random.default_rng(seed)
+        self.frames = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(n_frames)]
+        self.monitor = {'left': 0, 'top': 0, 'width': width, 'height': height}
+        self.index = 0
+        self.last_grab_ns = 0
+
+    def grab(self):
+        self.last_grab_ns = perf_counter_ns()
+        self.index = (self.index + 1) % len(self.frames)
+        return self.frames[self.index].copy()
+
+    def close(self):
+        pass
+
+
+class RecordingInput:
+    """키 입력 기록 (실제 입력 없음, mark() 이후 첫 키 누름 시각만 보관)"""
+
+    def __init__(self):
+        self.first_press_ns = None
+        self.presses = 0
+
+    def mark(self):
+        self.first_press_ns = None
+
+    def press(self, key):
+        if self.first_press_ns is None:
+            self.first_press_ns = perf_counter_ns()
+        self.presses += 1
+
+    def release(self, key):
+        pass
+
+    def click(self, x, y):
+        pass
+
+    def release_all(self, keys):
+        pass
+
+
+def thread_cpu_times():
+    """{네이티브 스레드 id: (이름, CPU 초)} (Linux /proc, 없으면 빈 딕셔너리)"""
+    task_dir = Path("/proc/self/task")
+    if not task_dir.exists():
+        return {}
+    tick = os.sysconf('SC_CLK_TCK')
+    names = {t.native_id: t.name for t in threading.enumerate()}
+    result = {}
+    for task in task_dir.iterdir():
+        try:
+            stat = (task / "stat").read_text()
+            comm = (task / "comm").read_text().strip()
+        except OSError:  # 그 사이 종료된 스레드
+            continue
+        fields = stat.rsplit(')', 1)[1].split()  # 3번 필드(state)부터
+        tid = int(task.name)
+        result[tid] = (names.get(tid, f"{comm}:{tid}"), (int(fields[11]) + int(fields[12])) / tick)
+    return result
+
+
+def cpu_usage(before, after, wall):
+    """스레드별 CPU 사용률 {이름: %} (사용률 높은 순, 0.5% 미만 제외)"""
+    usage = {}
+    for tid, (name, seconds) in after.items():
+        delta = seconds - before.get(tid, (name, 0.0))[1]
+        percent = delta / wall * 100
+        if percent >= 0.5:
+            usage[name] = round(percent, 1)
+    return dict(sorted(usage.items(), key=lambda item: -item[1]))
+
+
+def percentiles_ms(samples_ns):
+    if not samples_ns:
+        return {'count': 0}
+    ms = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    return {
+        'count': len(ms),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+    }
+
+
+def build_model(env, seed=None):
+    """학습 스크립트(train_ml.py)와 같은 정책 구조 (seed를 주면 초기 가중치/행동 샘플링 재현)"""
+    policy_kwargs = dict(
+        features_extractor_kwargs=dict(features_dim=512),
+        net_arch=[512, 512]
+    )
+    return PPO("CnnPolicy", env, policy_kwargs=policy_kwargs, device="cpu", verbose=0, seed=seed)
+
+
+def run_config(capture_size, frame_size, frame_stack, frame_skip, threads, steps=200, warmup=10,
+               virtual_clock=False, seed=0):
+    """조합 하나 실행 (seed로 합성 화면/정책 가중치/행동 샘플링 고정 → 같은 조합은 같은 행동 순서)
+
+    Returns:
+        {'config', 'e2e', 'predict', 'stages', 'steps_per_sec', 'cpu'}
+    """
+    torch.set_num_threads(threads)
+    capture = SyntheticCapture(*capture_size, seed=seed)
+    keys = RecordingInput()
+    with redirect_stdout(io.StringIO()):  # 환경 이벤트 출력 제외
+        env = MLRealtimeEnv(frame_width=frame_size, frame_height=frame_size, frame_stack=frame_stack,
+                            frame_skip=frame_skip, capture=capture, input_backend=keys,
+                            clock=VirtualClock() if virtual_clock else RealClock())
+        model = build_model(env, seed=seed)
+        obs, _ = env.reset(seed=seed)
+
+        e2e, predict = [], []
+        aggregator = TimingAggregator()
+        before = started = None
+        for i in range(warmup + steps):
+            if i == warmup:
+                before, started = thread_cpu_times(), perf_counter_ns()
+                e2e.clear()
+                predict.clear()
+                aggregator = TimingAggregator()
+            frame_ns = capture.last_grab_ns
+            predict_start = perf_counter_ns()
+            action, _ = model.predict(obs, deterministic=False)
+            predict.append(perf_counter_ns() - predict_start)
+
+            keys.mark()
+            obs, _, terminated, truncated, info = env.step(int(action))
+            if keys.first_press_ns is not None:
+                e2e.append(keys.first_press_ns - frame_ns)
+            aggregator.add_infos([info])
+            if terminated or truncated:
+                obs, _ = env.reset()
+        wall = (perf_counter_ns() - started) / 1e9
+        cpu = cpu_usage(before, thread_cpu_times(), wall)
+        env.close()
+
+    return {
+        'config': {'capture': f"{capture_size[0]}x{capture_size[1]}", 'frame_size': frame_size,
+                   'frame_stack': frame_stack, 'frame_skip': frame_skip, 'threads': threads,
+                   'virtual_clock': virtual_clock},
+        'e2e': percentiles_ms(e2e),
+        'predict': percentiles_ms(predict),
+        'stages': {stage: round(hist.summary()['p50_ms'], 3)
+                   for stage, hist in aggregator.histograms.items() if hist.count},
+        'steps_per_sec': steps / wall,
+        'cpu': cpu,
+    }
+
+
+def parse_size(spec):
+    """'1080p' / '1920x1080' → (너비, 높이)"""
+    if spec in RESOLUTIONS:
+        return RESOLUTIONS[spec]
+    width, height = spec.lower().split('x')
+    return int(width), int(height)
+
+
+def print_result(result):
+    c, e2e, predict = result['config'], result['e2e'], result['predict']
+    print(f"\n📐 캡처 {c['capture']} | 관측 {c['frame_size']} | 스택 {c['frame_stack']} | "
+          f"skip {c['frame_skip']} | torch 스레드 {c['threads']}")
+    if e2e['count']:
+        print(f"   종단 지연: p50 {e2e['p50_ms']:.1f} / p95 {e2e['p95_ms']:.1f} / p99 {e2e['p99_ms']:.1f} ms "
+              f"({e2e['count']}회)")
+    print(f"   predict:   p50 {predict['p50_ms']:.2f} / p95 {predict['p95_ms']:.2f} ms")
+    print(f"   초당 스텝: {result['steps_per_sec']:.1f}")
+    print(f"   단계 p50 (ms): {', '.join(f'{k} {v}' for k, v in result['stages'].items())}")
+    print(f"   CPU (%): {', '.join(f'{k} {v}' for k, v in result['cpu'].items()) or '측정 불가 (/proc 없음)'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="관측 → 행동 종단 지연 벤치마크")
+    parser.add_argument("--capture-sizes", nargs="+", default=["1080p"], help="캡처 해상도 (1080p / 1440p / WxH)")
+    parser.add_argument("--frame-sizes", nargs="+", type=int, default=[84, 128], help="관측 프레임 크기 (정사각형)")
+    parser.add_argument("--frame-stacks", nargs="+", type=int, default=[4], help="프레임 스택 수")
+    parser.add_argument("--frame-skips", nargs="+", type=int, default=[1, 4], help="frame_skip")
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, torch.get_num_threads()], help="torch 스레드 수")
+    parser.add_argument("--steps", type=int, default=200, help="조합당 측정 스텝")
+    parser.add_argument("--warmup", type=int, default=10, help="조합당 준비 스텝")
+    parser.add_argument("--virtual-clock", action="store_true", help="키 홀드/대기 없이 계산 비용만 측정")
+    parser.add_argument("--output", type=str, default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    results = []
+    grid = itertools.product([parse_size(s) for s in args.capture_sizes], args.frame_sizes,
+                             args.frame_stacks, args.frame_skips, sorted(set(args.threads)))
+    for capture_size, frame_size, frame_stack, frame_skip, threads in grid:
+        result = run_config(capture_size, frame_size, frame_stack, frame_skip, threads,
+                            steps=args.steps, warmup=args.warmup, virtual_clock=args.virtual_clock)
+        print_result(result)
+        results.append(result)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
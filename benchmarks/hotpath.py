@@ -0,0 +1,133 @@
+"""
+핫 패스 마이크로벤치마크
+스텝마다 실행되는 환경 메서드와 설정/패턴 로드 시간을 합성 1080p/1440p 프레임으로 측정하고 머신별 기준값과 비교
+
+- 프레임/입력: 헤드리스 시뮬레이터(SimMLEnv) 화면을 실제 해상도로 렌더링, 키 입력은 시뮬레이터로 (디스플레이/키보드 불필요)
+- 측정: _preprocess_frame, _get_observation, _calculate_reward, _detect_exp_gain, _check_danger_monster(템플릿 매칭),
+  load_config(캐시/캐시 없음), load_game_config, 패턴 로드(.pat / .json)
+- 기준값: benchmarks/baselines/<머신>.hotpath.json, 기준보다 threshold 이상 느리면 종료 코드 1
+
+사용법:
+    python benchmarks/hotpath.py --save-baseline     # 현재 머신 기준값 저장
+    python benchmarks/hotpath.py                     # 기준값과 비교
+"""
+import argparse
+from contextlib import redirect_stdout
+import io
+from pathlib import Path
+import sys
+import tempfile
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from benchmarks.baseline import (DEFAULT_THRESHOLD, MAX_CASE_TIME, baseline_path, compare, load_baseline, measure,
+                                 print_report, save_baseline)
+from src.pattern_format import load_pattern, save_pattern
+from src.sim_game import SimMLEnv
+import src.utils.config_loader as config_loader
+
+
+SUITE = "hotpath"
+RESOLUTIONS = {'1080p': (1920, 1080), '1440p': (2560, 1440)}
+PATTERN_EVENTS = 20000
+
+
+def env_cases(size):
+    """해상도별 환경 메서드 측정 대상 {이름: 함수}"""
+    env = SimMLEnv(seed=0, screen_size=size)
+    env.reset(seed=0)
+    frame = env.capture.grab()
+    env.last_frame = frame.copy()
+    env.danger_check_interval = 0  # 간격 제한 없이 매번 템플릿 매칭
+    env.danger_slice = None  # 실제 게임 기본 설정처럼 화면 전체 매칭 (시뮬레이터는 배너 ROI만 매칭)
+    return {
+        'preprocess_frame': lambda: env._preprocess_frame(frame),
+        'get_observation': env._get_observation,
+        'calculate_reward': lambda: env._calculate_reward(0, frame),
+        'detect_exp_gain': lambda: env._detect_exp_gain(frame),
+        'check_danger_monster': lambda: env._check_danger_monster(frame),
+    }
+
+
+def config_cases():
+    def cold():
+        config_loader._CACHE.clear()
+        return config_loader.load_config(game="ML")
+
+    return {
+        'load_config': lambda: config_loader.load_config(game="ML"),
+        'load_config_cold': cold,
+        'load_game_config': lambda: config_loader.load_game_config(game="ML"),
+    }
+
+
+def pattern_cases(directory, n_events=PATTERN_EVENTS):
+    """합성 패턴(.pat / .json) 로드 측정 대상"""
+    rng = np.random.default_rng(0)
+    keys = ['left', 'right', 'up', 'down', 'alt', 'ctrl', 'shift', 'z']
+    times = np.cumsum(rng.uniform(0.01, 0.2, n_events))
+    pattern = [{'time': float(t), 'key': keys[i // 2 % len(keys)], 'type': ('down', 'up')[i % 2]}
+               for i, t in enumerate(times)]
+    metadata = {'name': 'bench', 'duration': float(times[-1]), 'total_actions': n_events}
+    save_pattern(Path(directory) / "bench.pat", metadata, pattern)
+    save_pattern(Path(directory) / "bench.json", metadata, pattern)
+
+    def load_pat():
+        loaded = load_pattern(Path(directory) / "bench.pat")
+        np.asarray(loaded.events['time']).sum()  # 메모리 맵은 실제로 읽어야 비용이 드러남
+        return loaded
+
+    return {
+        'load_pat': load_pat,
+        'load_json': lambda: load_pattern(Path(directory) / "bench.json"),
+    }
+
+
+def run(resolutions=tuple(RESOLUTIONS), repeat=30, pattern_events=PATTERN_EVENTS, max_time=MAX_CASE_TIME):
+    """전체 측정 → {'<그룹>/<항목>': measure() 결과}"""
+    results = {}
+    # 보상/위험 감지의 이벤트 출력은 측정에서 제외
+    with redirect_stdout(io.StringIO()), tempfile.TemporaryDirectory() as tmp:
+        groups = [(name, env_cases(RESOLUTIONS[name])) for name in resolutions]
+        groups += [('config', config_cases()), ('pattern', pattern_cases(tmp, pattern_events))]
+        for group, cases in groups:
+            for name, fn in cases.items():
+                results[f"{group}/{name}"] = measure(fn, repeat=repeat, max_time=max_time)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="핫 패스 마이크로벤치마크")
+    parser.add_argument("--resolutions", nargs="+", default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument("--repeat", type=int, default=30, help="항목당 측정 횟수")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀 판정 배율 (0.25 = 25%% 느려짐)")
+    parser.add_argument("--machine", type=str, default=None, help="기준값 머신 이름 (기본: 호스트-아키텍처)")
+    parser.add_argument("--save-baseline", action="store_true", help="결과를 이 머신 기준값으로 저장")
+    args = parser.parse_args()
+
+    path = baseline_path(SUITE, args.machine)
+    baseline = load_baseline(path)
+    print(f"⏱️  핫 패스 벤치마크 ({', '.join(args.resolutions)}, {args.repeat}회)")
+    results = run(args.resolutions, args.repeat)
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        save_baseline(path, results)
+        print(f"💾 기준값 저장: {path}")
+        return 0
+    if baseline is None:
+        print(f"ℹ️  기준값 없음: {path} (--save-baseline으로 저장)")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, base_us, current_us, ratio in regressions:
+        print(f"❌ 회귀: {name} {base_us:.1f} → {current_us:.1f} µs (x{ratio:.2f})")
+    if not regressions:
+        print(f"✅ 회귀 없음 (기준 +{args.threshold:.0%} 이내)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
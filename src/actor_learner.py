@@ -0,0 +1,310 @@
+"""
+액터-러너 분리 학습
+PPO 업데이트 중에도 게임 플레이가 멈추지 않도록 수집과 학습을 별도 프로세스로 분리
+
+- 액터 프로세스: 최신 정책 스냅샷으로 계속 플레이하며 전이(transition)를 큐로 전송
+- 러너 프로세스(메인): 큐에서 n_steps개를 모아 PPO 업데이트 → 새 가중치 배포
+- 정책 지연(policy lag) = 러너 정책 버전 - 전이를 만든 정책 버전
+    * max_policy_lag 초과 전이는 버림 (큐 앞쪽부터 버리므로 궤적이 끊기지 않음)
+    * 큐가 가득 차 버린 전이 다음 전이는 episode_start=True로 보냄 (GAE가 빈 구간을 건너 부트스트랩하지 않도록)
+    * 남은 전이는 액터가 실제 사용한 행동 확률(log_prob)을 그대로 사용
+      → PPO 비율 π_θ/π_behavior 가 중요도 보정 역할, clip_range로 상한
+    * 가치(value)는 러너의 현재 정책으로 다시 계산해 GAE 계산
+"""
+import functools
+import multiprocessing as mp
+import queue
+import time
+
+import gymnasium as gym
+import numpy as np
+import torch
+
+
+def make_game_env(game, **env_kwargs):
+    """게임 이름으로 실시간 환경 생성 (액터 프로세스에서 호출, pickle 가능)"""
+    from src.env_registry import GAME_ENVS
+    return GAME_ENVS[game](**env_kwargs)
+
+
+def game_env_factory(game, **env_kwargs):
+    """액터 프로세스로 넘길 환경 생성 함수"""
+    return functools.partial(make_game_env, game, **env_kwargs)
+
+
+class SpaceOnlyEnv(gym.Env):
+    """러너 쪽 PPO 생성용 환경 (관측/행동 공간만 제공, 실제 게임 없음)"""
+
+    def __init__(self, observation_space, action_space):
+        super().__init__()
+        self.observation_space = observation_space
+        self.action_space = action_space
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        return np.zeros(self.observation_space.shape, dtype=self.observation_space.dtype), {}
+
+    def step(self, action):
+        raise RuntimeError("SpaceOnlyEnv는 step을 지원하지 않습니다 (액터 프로세스가 플레이)")
+
+
+def _actor_main(env_factory, policy_class, policy_kwargs, transition_queue, weight_queue,
+                stop_event, stats, torch_threads):
+    """액터 프로세스 본체
+
+    Args:
+        env_factory: 환경 생성 함수
+        policy_class / policy_kwargs: 러너 PPO와 같은 정책 구조
+        transition_queue: 전이 전송 큐
+        weight_queue: (버전, state_dict) 수신 큐
+        stop_event: 종료 신호
+        stats: 공유 카운터 {'steps', 'dropped'}
+        torch_threads: 추론 스레드 수
+    """
+    torch.set_num_threads(torch_threads)
+    env = env_factory()
+    policy = policy_class(env.observation_space, env.action_space, lambda _: 0.0, **policy_kwargs)
+    policy.set_training_mode(False)
+
+    # 첫 가중치 수신까지 대기
+    version, state_dict = weight_queue.get()
+    policy.load_state_dict(state_dict)
+
+    try:
+        obs, _ = env.reset()
+        episode_start = True
+
+        while not stop_event.is_set():
+            # 새 가중치가 있으면 교체 (논블로킹)
+            try:
+                while True:
+                    version, state_dict = weight_queue.get_nowait()
+                    policy.load_state_dict(state_dict)
+            except queue.Empty:
+                pass
+
+            with torch.no_grad():
+                obs_tensor, _ = policy.obs_to_tensor(obs)
+                action, _, log_prob = policy(obs_tensor)
+            action = int(action.item())
+
+            next_obs, reward, terminated, truncated, _ = env.step(action)
+            done = terminated or truncated
+
+            transition = (obs, action, float(reward), done, episode_start, float(log_prob.item()), version)
+            try:
+                transition_queue.put_nowait(transition)
+                dropped = False
+            except queue.Full:
+                # 러너가 밀려도 게임은 멈추지 않음 (전이만 버림)
+                dropped = True
+                with stats['dropped'].get_lock():
+                    stats['dropped'].value += 1
+
+            with stats['steps'].get_lock():
+                stats['steps'].value += 1
+
+            # 버린 전이 뒤는 궤적이 끊긴 것이므로 새 궤적 시작으로 표시
+            episode_start = done or dropped
+            obs = env.reset()[0] if done else next_obs
+    finally:
+        env.close()
+        # 러너가 더 이상 읽지 않아도 프로세스가 종료되도록
+        transition_queue.cancel_join_thread()
+
+
+class ActorLearnerTrainer:
+    """PPO 모델을 액터-러너 구조로 학습"""
+
+    def __init__(self, model, env_factory, max_policy_lag=2, queue_size=8192, actor_torch_threads=1):
+        """
+        Args:
+            model: PPO 모델 (env는 SpaceOnlyEnv, n_envs=1)
+            env_factory: 액터 프로세스에서 실제 게임 환경을 만드는 함수 (pickle 가능)
+            max_policy_lag: 허용하는 최대 정책 지연 (업데이트 횟수)
+            queue_size: 전이 큐 크기 (가득 차면 액터가 전이를 버림)
+            actor_torch_threads: 액터 추론 스레드 수
+        """
+        if model.n_envs != 1:
+            raise ValueError("액터-러너 학습은 n_envs=1 모델만 지원합니다")
+
+        self.model = model
+        self.env_factory = env_factory
+        self.max_policy_lag = max_policy_lag
+        self.actor_torch_threads = actor_torch_threads
+
+        ctx = mp.get_context("spawn")
+        self._ctx = ctx
+        self.transition_queue = ctx.Queue(maxsize=queue_size)
+        self.weight_queue = ctx.Queue(maxsize=1)
+        self.stop_event = ctx.Event()
+        self.stats = {'steps': ctx.Value('l', 0), 'dropped': ctx.Value('l', 0)}
+        self.actor = None
+
+        self.policy_version = 0
+        self._pending = None  # 다음 롤아웃 첫 전이 (부트스트랩용으로 미리 꺼낸 것)
+        self.lag_history = []
+        self.stale_dropped = 0
+
+    def _publish_weights(self):
+        """현재 정책 가중치를 액터에 배포 (이전 미수신 가중치는 교체)"""
+        state_dict = {k: v.detach().cpu().clone() for k, v in self.model.policy.state_dict().items()}
+        try:
+            self.weight_queue.get_nowait()
+        except queue.Empty:
+            pass
+        self.weight_queue.put((self.policy_version, state_dict))
+
+    def start(self):
+        """액터 프로세스 시작"""
+        self._publish_weights()
+        self.actor = self._ctx.Process(
+            target=_actor_main,
+            args=(self.env_factory, self.model.policy_class, self.model.policy_kwargs,
+                  self.transition_queue, self.weight_queue, self.stop_event, self.stats,
+                  self.actor_torch_threads),
+            daemon=True,
+        )
+        self.actor.start()
+        print(f"🎮 액터 프로세스 시작 (pid={self.actor.pid})")
+
+    def _next_transition(self, timeout=1.0):
+        """큐에서 다음 전이 (정책 지연 한도 초과 전이는 버림)"""
+        while True:
+            if self._pending is not None:
+                transition, self._pending = self._pending, None
+            else:
+                transition = self.transition_queue.get(timeout=timeout)
+            lag = self.policy_version - transition[6]
+            if lag <= self.max_policy_lag:
+                return transition, lag
+            self.stale_dropped += 1
+
+    def collect_rollout(self):
+        """n_steps개 전이로 롤아웃 버퍼 채우기 + GAE 계산
+
+        Returns:
+            이번 롤아웃 전이들의 정책 지연 배열
+        """
+        model = self.model
+        buffer = model.rollout_buffer
+        buffer.reset()
+        lags = []
+
+        while not buffer.full:
+            if not self.actor.is_alive():
+                raise RuntimeError("액터 프로세스가 종료되었습니다")
+            try:
+                (obs, action, reward, done, episode_start, log_prob, _), lag = self._next_transition()
+            except queue.Empty:
+                continue
+
+            with torch.no_grad():
+                obs_tensor, _ = model.policy.obs_to_tensor(obs)
+                value = model.policy.predict_values(obs_tensor)
+
+            buffer.add(
+                obs[None],
+                np.array([[action]]),
+                np.array([reward], dtype=np.float32),
+                np.array([episode_start]),
+                value,
+                torch.tensor([log_prob]),
+            )
+            lags.append(lag)
+
+        # 부트스트랩: 다음 전이의 관측으로 마지막 가치 계산 (다음 롤아웃에서 재사용)
+        while self._pending is None:
+            try:
+                self._pending, _ = self._next_transition()
+            except queue.Empty:
+                if not self.actor.is_alive():
+                    raise RuntimeError("액터 프로세스가 종료되었습니다")
+
+        # 다음 전이가 새 궤적 시작이면 (에피소드 종료 또는 큐 폐기로 끊김) 부트스트랩하지 않음
+        with torch.no_grad():
+            next_obs_tensor, _ = model.policy.obs_to_tensor(self._pending[0])
+            last_values = model.policy.predict_values(next_obs_tensor)
+        buffer.compute_returns_and_advantage(last_values=last_values, dones=np.array([self._pending[4]]))
+
+        return np.array(lags)
+
+    def learn(self, total_timesteps, callback=None, tb_log_name="PPO_actor_learner", should_stop=None):
+        """학습 루프
+
+        Args:
+            total_timesteps: 총 학습 전이 수
+            callback: 업데이트마다 호출 (trainer 인자), False 반환 시 중지
+            should_stop: 롤아웃 수집 중 확인할 중지 조건 (예: ESC)
+        """
+        from stable_baselines3.common.utils import configure_logger
+
+        model = self.model
+        model.set_logger(configure_logger(model.verbose, model.tensorboard_log, tb_log_name, True))
+
+        if self.actor is None:
+            self.start()
+
+        try:
+            while model.num_timesteps < total_timesteps:
+                if should_stop is not None and should_stop():
+                    print("\n⏹️  중지 요청 - 학습 종료")
+                    break
+
+                rollout_start = time.time()
+                lags = self.collect_rollout()
+                model.num_timesteps += len(lags)
+                self.lag_history.append(lags)
+
+                # PPO 업데이트 (액터는 계속 플레이 중)
+                model._current_progress_remaining = 1.0 - model.num_timesteps / total_timesteps
+                update_start = time.time()
+                model.train()
+                update_time = time.time() - update_start
+
+                self.policy_version += 1
+                self._publish_weights()
+
+                self._log_stats(lags, time.time() - rollout_start, update_time)
+
+                if callback is not None and callback(self) is False:
+                    break
+        finally:
+            self.stop()
+
+    def _log_stats(self, lags, rollout_time, update_time):
+        """정책 지연/처리량 통계 기록 (TensorBoard + 콘솔)"""
+        logger = self.model.logger
+        logger.record("actor_learner/policy_version", self.policy_version)
+        logger.record("actor_learner/policy_lag_mean", float(lags.mean()))
+        logger.record("actor_learner/policy_lag_max", int(lags.max()))
+        logger.record("actor_learner/stale_dropped", self.stale_dropped)
+        logger.record("actor_learner/queue_dropped", self.stats['dropped'].value)
+        logger.record("actor_learner/actor_steps", self.stats['steps'].value)
+        logger.record("actor_learner/update_time", update_time)
+        logger.record("time/total_timesteps", self.model.num_timesteps)
+        logger.dump(step=self.model.num_timesteps)
+
+        print(f"🔄 정책 v{self.policy_version} 배포 | 지연 평균 {lags.mean():.2f} / 최대 {lags.max()} | "
+              f"폐기(지연 {self.stale_dropped}, 큐 {self.stats['dropped'].value}) | "
+              f"업데이트 {update_time:.1f}초 / 롤아웃 {rollout_time:.1f}초")
+
+    def lag_summary(self):
+        """전체 학습 동안의 정책 지연 분포"""
+        if not self.lag_history:
+            return {}
+        lags = np.concatenate(self.lag_history)
+        summary = {'mean': float(lags.mean()), 'max': int(lags.max()),
+                   'stale_dropped': self.stale_dropped, 'queue_dropped': self.stats['dropped'].value}
+        for lag in range(self.max_policy_lag + 1):
+            summary[f'lag_{lag}'] = float(np.mean(lags == lag))
+        return summary
+
+    def stop(self):
+        """액터 종료 (액터가 env.close()로 키를 모두 해제)"""
+        self.stop_event.set()
+        if self.actor is not None:
+            self.actor.join(timeout=10)
+            if self.actor.is_alive():
+                self.actor.terminate()
+            self.actor = None
@@ -0,0 +1,244 @@
+"""
+행동 복제(behavior cloning) 데이터셋 + 사전학습
+패턴 녹화(키 타임라인 + 화면 프레임)를 (프레임 스택, 행동) 쌍으로 변환해 CnnPolicy 사전학습
+
+- 키 → 행동 번호: 환경의 ACTION_BINDINGS + 게임 키 설정 (학습 때와 같은 키 매핑)
+- 프레임 i의 라벨 = 프레임 시각 t 이후 window초 (t, t + window] 동안 사람이 한 행동
+    1) 창 안에서 처음 눌린 스킬/공격/버프 키 (순간 행동 우선)
+    2) 창 중간 시점에 누르고 있던 이동 키 (가장 최근에 누른 것)
+    3) 창 안에서 눌린 이동 키
+    4) 없으면 idle (0)
+- 관측 = 프레임 i까지의 frame_stack장 (녹화 시작 부분은 첫 프레임 반복, 환경 reset과 같음)
+"""
+from pathlib import Path
+
+import cv2
+import numpy as np
+import torch
+
+from src.frame_recorder import load_frames
+from src.pattern_format import load_pattern
+from src.utils.config_loader import load_game_config
+
+
+def game_env_class(game):
+    from src.env_registry import GAME_ENVS
+    return GAME_ENVS[game]
+
+
+def key_action_map(game, keybindings=None):
+    """실제 키 이름 → (행동 번호, 이동 여부)"""
+    env_class = game_env_class(game)
+    if keybindings is None:
+        keybindings = load_game_config(game=game).keybindings
+    mapping = {}
+    for action, key in env_class.action_keys(keybindings).items():
+        binding = env_class.ACTION_BINDINGS[action][0]
+        mapping[key.lower()] = (action, binding.startswith('move_'))
+    return mapping
+
+
+def label_frames(pattern, timestamps, key_map, window=0.4):
+    """프레임 시각마다 다음 window초 동안의 행동 번호
+
+    Args:
+        pattern: 패턴 이벤트 리스트 [{'time', 'key', 'type'}, ...]
+        timestamps: 프레임 시각 (녹화 시작 후 초)
+        key_map: key_action_map() 결과
+        window: 라벨 창 길이 (초, 환경 한 스텝 길이 정도)
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    events = sorted(
+        (e for e in pattern if e['key'].lower() in key_map),
+        key=lambda e: e['time']
+    )
+
+    downs = [(e['time'], *key_map[e['key'].lower()]) for e in events if e['type'] == 'down']
+    momentary = np.array([(t, a) for t, a, is_move in downs if not is_move], dtype=np.float64).reshape(-1, 2)
+    moves = np.array([(t, a) for t, a, is_move in downs if is_move], dtype=np.float64).reshape(-1, 2)
+
+    labels = np.zeros(len(timestamps), dtype=np.int64)
+
+    # 3) 창 안에서 처음 눌린 이동 키
+    if len(moves):
+        first = np.searchsorted(moves[:, 0], timestamps, side='right')
+        in_window = (first < len(moves)) & (moves[np.minimum(first, len(moves) - 1), 0] <= timestamps + window)
+        labels[in_window] = moves[first[in_window], 1]
+
+    # 2) 창 중간 시점에 누르고 있던 이동 키 (이벤트 순서대로 재생)
+    held = {}
+    event_idx = 0
+    for i, mid in enumerate(timestamps + window / 2):
+        while event_idx < len(events) and events[event_idx]['time'] <= mid:
+            event = events[event_idx]
+            action, is_move = key_map[event['key'].lower()]
+            if is_move:
+                if event['type'] == 'down':
+                    held[action] = event['time']
+                else:
+                    held.pop(action, None)
+            event_idx += 1
+        if held:
+            labels[i] = max(held, key=held.get)
+
+    # 1) 창 안에서 처음 눌린 순간 행동
+    if len(momentary):
+        first = np.searchsorted(momentary[:, 0], timestamps, side='right')
+        in_window = (first < len(momentary)) & (momentary[np.minimum(first, len(momentary) - 1), 0] <= timestamps + window)
+        labels[in_window] = momentary[first[in_window], 1]
+
+    return labels
+
+
+class DemonstrationDataset:
+    """녹화 세션들을 이어붙인 (프레임 스택 인덱스, 행동) 데이터셋
+
+    프레임은 한 번씩만 저장하고 스택은 인덱스로 구성 (메모리 절약)
+    """
+
+    def __init__(self, pattern_paths, game, frame_stack=4, frame_size=(84, 84), window=0.4, keybindings=None):
+        """
+        Args:
+            pattern_paths: 프레임과 함께 녹화된 패턴 경로들 (.pat 또는 .json)
+            game: 'ML' 또는 'MP' (행동 공간/키 매핑)
+            frame_stack: 관측 프레임 수 (환경과 같게)
+            frame_size: (width, height) 관측 크기
+            window: 라벨 창 길이 (초)
+        """
+        self.game = game
+        self.frame_stack = frame_stack
+        self.frame_size = frame_size
+        self.key_map = key_action_map(game, keybindings)
+
+        frames_list, stacks_list, labels_list, session_list = [], [], [], []
+        offset = 0
+        for session_id, path in enumerate(pattern_paths):
+            data = load_pattern(path).to_dict()
+            loaded = load_frames(path, data['metadata'])
+            if loaded is None:
+                print(f"⚠️  프레임 없는 패턴 건너뜀: {Path(path).name}")
+                continue
+            frames, timestamps = loaded
+            if frames.shape[1:] != (frame_size[1], frame_size[0]):
+                frames = np.stack([cv2.resize(f, frame_size) for f in frames])
+
+            # 라벨 창이 녹화 끝을 넘는 프레임은 제외
+            usable = timestamps + window <= timestamps[-1]
+            labels = label_frames(data['pattern'], timestamps, self.key_map, window)
+
+            idx = np.arange(len(frames))
+            stacks = np.maximum(idx[:, None] + np.arange(-frame_stack + 1, 1), 0) + offset
+
+            frames_list.append(frames)
+            stacks_list.append(stacks[usable])
+            labels_list.append(labels[usable])
+            session_list.append(np.full(int(usable.sum()), session_id))
+            offset += len(frames)
+            print(f"📼 {Path(path).name}: 프레임 {len(frames)}장, 샘플 {int(usable.sum())}개")
+
+        if not frames_list:
+            raise ValueError("프레임이 녹화된 패턴이 없습니다 (녹화 시 --frames 사용)")
+
+        self.frames = np.concatenate(frames_list)
+        self.stacks = np.concatenate(stacks_list)
+        self.labels = np.concatenate(labels_list)
+        self.sessions = np.concatenate(session_list)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def observations(self, indices):
+        """샘플 인덱스 → (batch, frame_stack, H, W) uint8"""
+        return self.frames[self.stacks[indices]]
+
+    def action_counts(self, n_actions):
+        return np.bincount(self.labels, minlength=n_actions)
+
+    def split(self, val_fraction=0.1):
+        """세션마다 마지막 val_fraction 구간을 검증용으로 분리 (시간 순서 유지)"""
+        train, val = [], []
+        for session_id in np.unique(self.sessions):
+            idx = np.flatnonzero(self.sessions == session_id)
+            cut = int(len(idx) * (1 - val_fraction))
+            train.append(idx[:cut])
+            val.append(idx[cut:])
+        return np.concatenate(train), np.concatenate(val)
+
+
+def class_weights(counts, max_weight=10.0):
+    """행동 빈도 역수 가중치 (idle 등 많은 행동 쏠림 완화)"""
+    counts = np.asarray(counts, dtype=np.float64)
+    weights = np.where(counts > 0, counts.sum() / (len(counts) * np.maximum(counts, 1)), 0.0)
+    return np.minimum(weights, max_weight).astype(np.float32)
+
+
+def pretrain_policy(policy, dataset, epochs=10, batch_size=64, learning_rate=1e-4, ent_coef=0.01,
+                    weights=None, val_fraction=0.1, seed=0):
+    """정책을 사람 행동에 맞게 지도학습 (음의 로그 우도 최소화)
+
+    Args:
+        policy: SB3 ActorCriticPolicy (PPO CnnPolicy)
+        dataset: DemonstrationDataset
+        weights: 행동별 손실 가중치 (None이면 균등)
+        ent_coef: 엔트로피 보너스 (정책이 지나치게 확정적이 되지 않도록)
+
+    Returns:
+        에폭별 {'epoch', 'loss', 'train_acc', 'val_acc'} 리스트
+    """
+    rng = np.random.default_rng(seed)
+    device = policy.device
+    optimizer = torch.optim.Adam(policy.parameters(), lr=learning_rate)
+    weight_tensor = None if weights is None else torch.as_tensor(weights, device=device)
+
+    train_idx, val_idx = dataset.split(val_fraction)
+    history = []
+
+    for epoch in range(1, epochs + 1):
+        policy.set_training_mode(True)
+        rng.shuffle(train_idx)
+        losses, correct = [], 0
+        for start in range(0, len(train_idx), batch_size):
+            batch = train_idx[start:start + batch_size]
+            obs = torch.as_tensor(dataset.observations(batch), device=device)
+            actions = torch.as_tensor(dataset.labels[batch], device=device)
+
+            distribution = policy.get_distribution(obs)
+            log_prob = distribution.log_prob(actions)
+            nll = -log_prob if weight_tensor is None else -log_prob * weight_tensor[actions]
+            loss = nll.mean() - ent_coef * distribution.entropy().mean()
+
+            optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(policy.parameters(), 0.5)
+            optimizer.step()
+
+            losses.append(loss.item())
+            correct += (distribution.distribution.probs.argmax(dim=1) == actions).sum().item()
+
+        record = {
+            'epoch': epoch,
+            'loss': float(np.mean(losses)),
+            'train_acc': correct / max(len(train_idx), 1),
+            'val_acc': evaluate_policy_accuracy(policy, dataset, val_idx, batch_size),
+        }
+        history.append(record)
+        print(f"📚 에폭 {epoch}/{epochs} | 손실 {record['loss']:.4f} | "
+              f"정확도 학습 {record['train_acc']:.3f} / 검증 {record['val_acc']:.3f}")
+
+    policy.set_training_mode(False)
+    return history
+
+
+def evaluate_policy_accuracy(policy, dataset, indices, batch_size=256):
+    """정책의 최빈 행동이 사람 행동과 일치하는 비율"""
+    if len(indices) == 0:
+        return 0.0
+    policy.set_training_mode(False)
+    correct = 0
+    with torch.no_grad():
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start:start + batch_size]
+            obs = torch.as_tensor(dataset.observations(batch), device=policy.device)
+            predicted = policy.get_distribution(obs).distribution.probs.argmax(dim=1).cpu().numpy()
+            correct += int((predicted == dataset.labels[batch]).sum())
+    return correct / len(indices)
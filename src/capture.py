@@ -0,0 +1,140 @@
+"""
+화면 캡처 소스
+환경이 mss를 직접 다루지 않고 캡처 소스 객체를 통해 프레임을 받도록 분리
+
+- ScreenCapture: 모니터/영역 하나를 캡처 (기존 동작)
+- SharedScreenCapture: 여러 게임 창을 한 번의 grab으로 캡처 후 영역별로 분배
+  (mss 인스턴스는 사용하는 스레드에서 생성해야 하므로 grab하는 스레드마다 따로 만듦)
+- RegionCapture: SharedScreenCapture의 한 영역 (서브 환경 하나에 할당)
+"""
+import threading
+
+import cv2
+import mss
+import numpy as np
+
+
+def region_from_spec(spec):
+    """설정값을 mss 영역 딕셔너리로 변환
+
+    Args:
+        spec: {'left', 'top', 'width', 'height'} 또는 {'x', 'y', 'w', 'h'}
+    """
+    if 'left' in spec:
+        return {'left': int(spec['left']), 'top': int(spec['top']),
+                'width': int(spec['width']), 'height': int(spec['height'])}
+    return {'left': int(spec['x']), 'top': int(spec['y']),
+            'width': int(spec['w']), 'height': int(spec['h'])}
+
+
+class ScreenCapture:
+    """단일 모니터/영역 캡처 (BGR 프레임 반환)"""
+
+    def __init__(self, monitor=None):
+        """
+        Args:
+            monitor: mss 영역 딕셔너리 (None이면 주 모니터 전체)
+        """
+        self.sct = mss.mss()
+        self.monitor = monitor if monitor is not None else self.sct.monitors[1]
+
+    def grab(self):
+        """화면 캡처 (BGRA → BGR)"""
+        return cv2.cvtColor(self.grab_bgra(), cv2.COLOR_BGRA2BGR)
+
+    def grab_bgra(self):
+        """화면 캡처 (mss 원본 BGRA, 색 변환 전)"""
+        return np.array(self.sct.grab(self.monitor))
+
+    def close(self):
+        self.sct.close()
+
+
+class SharedScreenCapture:
+    """여러 영역을 감싸는 영역을 한 번에 캡처하고 영역별 슬라이스 제공
+
+    각 서브 환경은 자기 영역의 프레임을 요청한다. 이미 현재 캡처를 받아간
+    환경이 다시 요청하면 그때 새로 캡처하므로, 환경들이 같은 속도로 스텝하면
+    스텝당 grab은 한 번이고 환경 하나가 늦어져도 교착되지 않는다.
+    """
+
+    def __init__(self, regions):
+        """
+        Args:
+            regions: mss 영역 딕셔너리 리스트 (클라이언트당 하나)
+        """
+        if not regions:
+            raise ValueError("캡처 영역이 비어 있습니다")
+
+        self.regions = [region_from_spec(r) for r in regions]
+
+        left = min(r['left'] for r in self.regions)
+        top = min(r['top'] for r in self.regions)
+        right = max(r['left'] + r['width'] for r in self.regions)
+        bottom = max(r['top'] + r['height'] for r in self.regions)
+        self.monitor = {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
+
+        # 전체 캡처 기준 각 영역의 오프셋
+        self._slices = [
+            (slice(r['top'] - top, r['top'] - top + r['height']),
+             slice(r['left'] - left, r['left'] - left + r['width']))
+            for r in self.regions
+        ]
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._instances = []  # 스레드별 mss 인스턴스 (close()에서 모두 닫음)
+        self._frame = None
+        self._consumed = [True] * len(self.regions)
+        self.grab_count = 0
+
+    @property
+    def sct(self):
+        """호출 스레드의 mss 인스턴스 (처음 캡처하는 스레드에서 생성)"""
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = self._local.sct = mss.mss()
+            self._instances.append(sct)
+        return sct
+
+    def _refresh(self):
+        """전체 영역 캡처 (lock 보유 상태에서 호출)"""
+        screenshot = self.sct.grab(self.monitor)
+        self._frame = cv2.cvtColor(np.array(screenshot), cv2.COLOR_BGRA2BGR)
+        self._consumed = [False] * len(self.regions)
+        self.grab_count += 1
+
+    def grab_region(self, index):
+        """index번 영역의 최신 프레임 반환 (읽기 전용 뷰)"""
+        with self._lock:
+            if self._frame is None or self._consumed[index]:
+                self._refresh()
+            self._consumed[index] = True
+            frame = self._frame
+        rows, cols = self._slices[index]
+        return frame[rows, cols]
+
+    def view(self, index):
+        """서브 환경에 넘길 영역 캡처 객체"""
+        return RegionCapture(self, index)
+
+    def close(self):
+        for sct in self._instances:
+            sct.close()
+        self._instances.clear()
+
+
+class RegionCapture:
+    """SharedScreenCapture의 한 영역 (ScreenCapture와 같은 인터페이스)"""
+
+    def __init__(self, shared, index):
+        self.shared = shared
+        self.index = index
+        self.monitor = shared.regions[index]
+
+    def grab(self):
+        return self.shared.grab_region(self.index)
+
+    def close(self):
+        # 공유 캡처는 VecEnv가 닫음
+        pass
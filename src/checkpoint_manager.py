@@ -0,0 +1,230 @@
+"""
+비동기 체크포인트 저장
+학습 스레드에서는 정책/옵티마이저 state_dict를 메모리(CPU)로 복사만 하고
+압축/디스크 쓰기는 백그라운드 스레드에서 처리 (저장 중 게임 플레이가 멈추지 않음)
+
+- 저장 위치: models/realtime/<GAME>/checkpoints/<prefix>_<steps>_steps.pt.gz
+- 원자적 쓰기: 임시 파일에 쓴 뒤 os.replace (중간에 죽어도 깨진 체크포인트 없음)
+- 보관 정책: 최근 keep_last개 + 평가 보상 최고 keep_best개, 나머지는 삭제
+- <prefix>_manifest.json: 체크포인트 목록/최신/최고 → 재개 시 zip 없이 바로 로드
+"""
+import gzip
+import io
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import torch
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+def _to_cpu(obj):
+    """state_dict(중첩 dict/list 포함)의 텐서를 CPU 복사본으로"""
+    if torch.is_tensor(obj):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {k: _to_cpu(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_cpu(v) for v in obj)
+    return obj
+
+
+class CheckpointManager:
+    """state_dict 스냅샷 + 백그라운드 저장 + 보관 정책 + manifest"""
+
+    def __init__(self, checkpoint_dir, name_prefix, keep_last=5, keep_best=1, compress_level=1):
+        """
+        Args:
+            checkpoint_dir: 저장 디렉토리 (models/realtime/<GAME>/checkpoints)
+            name_prefix: 파일 이름 접두사 (예: ML_ppo_realtime)
+            keep_last: 보관할 최근 체크포인트 수
+            keep_best: 보관할 평가 보상 최고 체크포인트 수
+            compress_level: gzip 압축 레벨 (1 = 빠름)
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.name_prefix = name_prefix
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.compress_level = compress_level
+
+        # 같은 디렉토리를 쓰는 다른 알고리즘(PPO/DQN)과 manifest 분리
+        self.manifest_path = self.checkpoint_dir / f"{name_prefix}_manifest.json"
+        self.entries = self._load_manifest()
+
+        self.snapshot_times = []  # 학습 스레드에서 걸린 시간 (초)
+        self.write_times = []     # 백그라운드 쓰기 시간 (초)
+        self._jobs = queue.Queue()
+        self._thread = threading.Thread(target=self._writer_loop, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def _load_manifest(self):
+        if not self.manifest_path.exists():
+            return []
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        # 파일이 지워진 항목은 무시
+        return [e for e in manifest.get('checkpoints', []) if (self.checkpoint_dir / e['file']).exists()]
+
+    def snapshot(self, model):
+        """모델 상태를 CPU 메모리로 복사 (학습 스레드에서 호출, 압축/쓰기 없음)"""
+        start = time.perf_counter()
+        state = {
+            'policy': _to_cpu(model.policy.state_dict()),
+            'optimizer': _to_cpu(model.policy.optimizer.state_dict()),
+            'num_timesteps': int(model.num_timesteps),
+            'algo': type(model).__name__,
+        }
+        self.snapshot_times.append(time.perf_counter() - start)
+        return state
+
+    def save_async(self, model, eval_reward=None, tag=None):
+        """스냅샷 후 백그라운드 저장 예약
+
+        Args:
+            eval_reward: 평가 보상 (최고 체크포인트 보관 기준, None이면 최근 보관만)
+            tag: 파일 이름 꼬리표 (예: 'final')
+        """
+        state = self.snapshot(model)
+        suffix = tag or f"{state['num_timesteps']}_steps"
+        filename = f"{self.name_prefix}_{suffix}.pt.gz"
+        self._jobs.put((self._write_checkpoint, (state, filename, eval_reward, tag)))
+        return self.checkpoint_dir / filename
+
+    def save_model_async(self, model, path):
+        """SB3 zip 저장을 백그라운드에서 수행 (학습이 끝나 모델이 더 바뀌지 않을 때만 사용)"""
+        self._jobs.put((model.save, (str(path),)))
+
+    def _writer_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                return
+            func, args = job
+            start = time.perf_counter()
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"❌ 체크포인트 저장 실패: {e}")
+            self.write_times.append(time.perf_counter() - start)
+            self._jobs.task_done()
+
+    def _write_checkpoint(self, state, filename, eval_reward, tag):
+        path = self.checkpoint_dir / filename
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp_path, 'wb', compresslevel=self.compress_level) as f:
+            torch.save(state, f)
+        os.replace(tmp_path, path)
+
+        self.entries = [e for e in self.entries if e['file'] != filename]
+        self.entries.append({
+            'file': filename,
+            'timesteps': state['num_timesteps'],
+            'eval_reward': None if eval_reward is None else float(eval_reward),
+            'tag': tag,
+            'saved_at': time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        self._apply_retention()
+        self._write_manifest()
+
+    def _apply_retention(self):
+        """최근 keep_last개 + 평가 보상 최고 keep_best개 + 태그(final 등) 보관"""
+        by_time = sorted(self.entries, key=lambda e: e['timesteps'])
+        keep = {e['file'] for e in by_time[-self.keep_last:]}
+        if self.keep_best > 0:
+            rated = sorted((e for e in self.entries if e['eval_reward'] is not None), key=lambda e: e['eval_reward'])
+            keep.update(e['file'] for e in rated[-self.keep_best:])
+        keep.update(e['file'] for e in self.entries if e['tag'])
+
+        for entry in self.entries:
+            if entry['file'] not in keep:
+                try:
+                    (self.checkpoint_dir / entry['file']).unlink()
+                except FileNotFoundError:
+                    pass
+        self.entries = [e for e in by_time if e['file'] in keep]
+
+    def _write_manifest(self):
+        best = self.best_entry()
+        latest = self.latest_entry()
+        manifest = {
+            'name_prefix': self.name_prefix,
+            'latest': latest['file'] if latest else None,
+            'best': best['file'] if best else None,
+            'checkpoints': self.entries,
+        }
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def latest_entry(self):
+        return max(self.entries, key=lambda e: e['timesteps']) if self.entries else None
+
+    def best_entry(self):
+        rated = [e for e in self.entries if e['eval_reward'] is not None]
+        return max(rated, key=lambda e: e['eval_reward']) if rated else None
+
+    def load_state(self, entry):
+        with gzip.open(self.checkpoint_dir / entry['file'], 'rb') as f:
+            return torch.load(io.BytesIO(f.read()), map_location="cpu", weights_only=False)
+
+    def restore(self, model, entry=None):
+        """체크포인트(기본: 최신)를 같은 구조의 모델에 로드
+
+        Returns:
+            로드한 manifest 항목 (체크포인트가 없으면 None)
+        """
+        entry = entry or self.latest_entry()
+        if entry is None:
+            return None
+        state = self.load_state(entry)
+        model.policy.load_state_dict(state['policy'])
+        model.policy.optimizer.load_state_dict(state['optimizer'])
+        model.num_timesteps = state['num_timesteps']
+        return entry
+
+    def wait(self):
+        """예약된 저장이 모두 끝날 때까지 대기"""
+        self._jobs.join()
+
+    def close(self):
+        """남은 저장 완료 후 저장 스레드 종료"""
+        self._jobs.put(None)
+        self._thread.join()
+
+
+class AsyncCheckpointCallback(BaseCallback):
+    """CheckpointCallback 대체 (스냅샷만 학습 스레드, 저장은 백그라운드)"""
+
+    def __init__(self, manager, save_freq, reward_fn=None, verbose=0):
+        """
+        Args:
+            manager: CheckpointManager
+            save_freq: 저장 주기 (콜백 호출 수 = 환경 스텝, CheckpointCallback과 같음)
+            reward_fn: 현재 평가 보상을 반환하는 함수 (예: 최근 에피소드 평균, 없으면 None 반환)
+        """
+        super().__init__(verbose)
+        self.manager = manager
+        self.save_freq = save_freq
+        self.reward_fn = reward_fn
+
+    def _on_step(self):
+        if self.n_calls % self.save_freq == 0:
+            eval_reward = self.reward_fn() if self.reward_fn is not None else None
+            path = self.manager.save_async(self.model, eval_reward=eval_reward)
+            if self.verbose >= 1:
+                print(f"💾 체크포인트 예약: {path.name} (스냅샷 {self.manager.snapshot_times[-1] * 1000:.1f}ms)")
+        return True
+
+
+def recent_mean_reward(episode_rewards, window=10):
+    """최근 window 에피소드 평균 보상 (에피소드가 없으면 None)"""
+    if not episode_rewards:
+        return None
+    recent = episode_rewards[-window:]
+    return sum(recent) / len(recent)
@@ -0,0 +1,12 @@
+"""
+게임 이름 → 실시간 환경 클래스
+학습/재생/행동 복제/액터 스크립트가 공통으로 참조 (멀티 클라이언트 VecEnv와 무관하게 가져올 수 있도록 분리)
+"""
+from src.rl_env_ml import MLRealtimeEnv
+from src.rl_env_mp import MPRealtimeEnv
+
+
+GAME_ENVS = {
+    'ML': MLRealtimeEnv,
+    'MP': MPRealtimeEnv,
+}
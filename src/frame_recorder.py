@@ -0,0 +1,205 @@
+"""
+패턴 녹화용 화면 프레임 녹화기
+키 입력 녹화와 같은 시작 시각 기준으로 일정 주기마다 화면을 캡처해 저장
+
+- 환경 관측과 같은 전처리 (그레이스케일 + 84x84 리사이즈) 후 uint8로 보관
+- 저장: 녹화하면서 패턴 파일 옆에 바로 기록 (메모리에 모아 두지 않음)
+    <패턴 파일>_frames.npy        (N, H, W) uint8
+    <패턴 파일>_frames_times.npy  (N,) 초
+  flush_interval초마다 헤더의 개수 갱신 + fsync → 중간에 끊겨도 마지막 flush까지는 np.load(mmap_mode='r')로 읽힘
+- 타임스탬프는 패턴 JSON의 'time'과 같은 기준 (녹화 시작 후 경과 초)
+  → 행동 복제(behavior cloning) 데이터셋에서 키 타임라인과 정렬
+- 예전 형식 <패턴 파일>_frames.npz도 그대로 읽음
+"""
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+NPY_HEADER_SIZE = 128  # 고정 헤더 크기 (개수를 다시 써도 데이터 위치가 그대로)
+
+
+def frame_stream_paths(pattern_path):
+    """패턴 파일 → (프레임 .npy, 타임스탬프 .npy) 경로"""
+    pattern_path = Path(pattern_path)
+    return (pattern_path.with_name(f"{pattern_path.stem}_frames.npy"),
+            pattern_path.with_name(f"{pattern_path.stem}_frames_times.npy"))
+
+
+class _NpyAppender:
+    """행을 이어 붙이는 .npy 파일 (헤더 예약 영역에 개수만 다시 씀)"""
+
+    def __init__(self, path, dtype, row_shape=()):
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.count = 0
+        self._file = open(self.path, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        header = repr({'descr': np.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                       'shape': (self.count, *self.row_shape)}).encode('latin1')
+        magic = np.lib.format.magic(1, 0)
+        room = NPY_HEADER_SIZE - len(magic) - 2
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(magic + struct.pack('<H', room) + header.ljust(room - 1) + b'\n')
+        self._file.seek(max(position, NPY_HEADER_SIZE))
+
+    def append(self, row):
+        self._file.write(np.ascontiguousarray(row, dtype=self.dtype).tobytes())
+        self.count += 1
+
+    def flush(self):
+        """데이터 → 헤더 개수 순서로 기록 후 fsync (헤더 개수는 항상 기록된 행 수 이하)"""
+        self._file.flush()
+        self._write_header()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class FrameRecorder:
+    """백그라운드 스레드에서 고정 주기로 화면 캡처 (프레임은 바로 파일에 추가)"""
+
+    def __init__(self, fps=10, frame_width=84, frame_height=84, monitor=None, flush_interval=1.0):
+        """
+        Args:
+            fps: 초당 캡처 수
+            frame_width / frame_height: 저장 프레임 크기 (환경 관측과 같게)
+            monitor: 캡처 영역 (None이면 주 모니터 전체)
+            flush_interval: 헤더 개수 갱신 + 디스크 동기화 주기 (초)
+        """
+        self.fps = fps
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.monitor = monitor
+        self.flush_interval = flush_interval
+
+        self.count = 0
+        self.missed = 0  # 캡처가 늦어 건너뛴 주기 수
+        self._frames = None
+        self._times = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.start_time = None
+
+    def start(self, start_time, pattern_path):
+        """녹화 시작
+
+        Args:
+            start_time: 키 녹화 시작 시각 (time.time() 기준)
+            pattern_path: 패턴 파일 경로 (프레임 파일은 그 옆에 생성)
+        """
+        frames_path, times_path = frame_stream_paths(pattern_path)
+        self._frames = _NpyAppender(frames_path, np.uint8, (self.frame_height, self.frame_width))
+        self._times = _NpyAppender(times_path, np.float64)
+        self.count = 0
+        self.missed = 0
+        self.start_time = start_time
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """녹화 중지 (캡처 스레드 종료 대기)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _preprocess(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, (self.frame_width, self.frame_height))
+
+    def _loop(self):
+        # mss 인스턴스는 사용하는 스레드에서 생성해야 함
+        from src.capture import ScreenCapture
+        capture = ScreenCapture(self.monitor)
+        interval = 1.0 / self.fps
+        next_time = time.time()
+        last_flush = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                frame = capture.grab()
+                self._times.append(time.time() - self.start_time)
+                self._frames.append(self._preprocess(frame))
+                self.count += 1
+                if time.monotonic() - last_flush >= self.flush_interval:
+                    self._frames.flush()
+                    self._times.flush()
+                    last_flush = time.monotonic()
+
+                # 절대 시각 기준 다음 캡처 (밀린 주기는 건너뜀)
+                next_time += interval
+                now = time.time()
+                if now > next_time:
+                    skipped = int((now - next_time) / interval) + 1
+                    self.missed += skipped
+                    next_time += skipped * interval
+                self._stop.wait(max(0.0, next_time - time.time()))
+        finally:
+            capture.close()
+
+    def __len__(self):
+        return self.count
+
+    def save(self, pattern_path):
+        """프레임 파일 마무리 (stop() 후 호출, 프레임이 없으면 파일 삭제)
+
+        Returns:
+            패턴 메타데이터에 넣을 정보 딕셔너리 (프레임이 없으면 None)
+        """
+        if self._frames is None:
+            return None
+        streams, self._frames, self._times = (self._frames, self._times), None, None
+        for stream in streams:
+            stream.close()
+        if not self.count:
+            for stream in streams:
+                stream.path.unlink()
+            return None
+        return {
+            'file': streams[0].path.name,
+            'times_file': streams[1].path.name,
+            'fps': self.fps,
+            'count': self.count,
+            'width': self.frame_width,
+            'height': self.frame_height,
+            'missed': self.missed,
+        }
+
+
+def load_frames(pattern_path, metadata):
+    """패턴에 딸린 프레임 로드 → (frames, timestamps) 또는 None
+
+    프레임은 메모리 맵 (.npy), 메타데이터에 프레임 정보가 없으면 (녹화 중 끊긴 패턴) 스트림 파일을 찾아 읽음
+    """
+    info = metadata.get('frames')
+    if info:
+        frames_path = Path(pattern_path).with_name(info['file'])
+        times_path = Path(pattern_path).with_name(info['times_file']) if 'times_file' in info else None
+    else:
+        frames_path, times_path = frame_stream_paths(pattern_path)
+    if not frames_path.exists():
+        return None
+    if frames_path.suffix == '.npz':
+        with np.load(frames_path) as data:
+            return data['frames'], data['timestamps']
+    if times_path is None or not times_path.exists():
+        return None
+    frames = np.load(frames_path, mmap_mode='r')
+    timestamps = np.load(times_path)
+    count = min(len(frames), len(timestamps))  # 마지막 flush 시점이 두 파일에서 다를 수 있음
+    if not count:
+        return None
+    return frames[:count], timestamps[:count]
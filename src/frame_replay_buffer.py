@@ -0,0 +1,182 @@
+"""
+프레임 단위 uint8 리플레이 버퍼 (오프폴리시 DQN/QR-DQN용)
+관측 스택(frame_stack x H x W)을 통째로 저장하지 않고 프레임을 한 번씩만 저장
+
+- 프레임 링: 절대 프레임 번호 % 용량 위치에 84x84 uint8 프레임 저장
+- 전이: obs / next_obs 스택의 마지막 프레임 번호만 저장 → 샘플링 시 인덱스로 스택 재구성
+- 에피소드 첫 전이에서만 obs 스택 전체를 넣고, 이후에는 next_obs의 새 프레임만 추가
+- SB3의 기본 ReplayBuffer 대비 (obs + next_obs 스택 = 8프레임/전이)
+    * frames_per_step=1 (StepFrameStack 사용) → 1프레임/전이 (1M 전이 ≈ 7GB)
+    * frames_per_step=4 (환경 기본 서브 스텝 스택) → 4프레임/전이
+"""
+from collections import deque
+
+import gymnasium as gym
+import numpy as np
+from stable_baselines3.common.buffers import BaseBuffer
+from stable_baselines3.common.type_aliases import ReplayBufferSamples
+
+
+MAX_RESAMPLE = 32  # 무효 전이 다시 뽑기 최대 횟수
+
+
+class StepFrameStack(gym.Wrapper):
+    """스텝 단위 프레임 스택 (Atari 관례)
+
+    실시간 환경은 서브 스텝(frame_skip)마다 프레임을 쌓으므로 frame_skip >= frame_stack이면
+    연속된 두 관측이 프레임을 하나도 공유하지 않는다. 이 래퍼는 스텝마다 마지막 프레임 하나만
+    스택에 넣어 연속 관측이 frame_stack - 1개 프레임을 공유하도록 만든다.
+    (FrameStackReplayBuffer(frames_per_step=1)과 함께 사용)
+    """
+
+    def __init__(self, env):
+        super().__init__(env)
+        self.frame_stack = env.observation_space.shape[0]
+        self.frames = deque(maxlen=self.frame_stack)
+
+    def _observation(self):
+        return np.array(self.frames, dtype=np.uint8)
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        self.frames.clear()
+        for _ in range(self.frame_stack):
+            self.frames.append(obs[-1])
+        return self._observation(), info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.frames.append(obs[-1])
+        return self._observation(), reward, terminated, truncated, info
+
+
+class FrameStackReplayBuffer(BaseBuffer):
+    """프레임을 한 번만 저장하고 스택은 인덱스로 재구성하는 리플레이 버퍼
+
+    SB3 오프폴리시 알고리즘의 replay_buffer_class로 사용:
+        DQN(..., replay_buffer_class=FrameStackReplayBuffer,
+            replay_buffer_kwargs=dict(frames_per_step=1))
+    """
+
+    def __init__(self, buffer_size, observation_space, action_space, device="auto", n_envs=1,
+                 optimize_memory_usage=False, handle_timeout_termination=True, frames_per_step=1):
+        """
+        Args:
+            buffer_size: 최대 전이 수
+            observation_space: (frame_stack, H, W) uint8 관측 공간
+            frames_per_step: 스텝마다 새로 들어오는 프레임 수
+                (StepFrameStack 사용 시 1, 환경 기본 스택이면 min(frame_skip, frame_stack))
+            optimize_memory_usage: 무시 (항상 프레임 단위로 저장)
+        """
+        super().__init__(buffer_size, observation_space, action_space, device, n_envs=n_envs)
+        if n_envs != 1:
+            raise ValueError("FrameStackReplayBuffer는 n_envs=1만 지원합니다")
+        if len(self.obs_shape) != 3 or observation_space.dtype != np.uint8:
+            raise ValueError(f"(frame_stack, H, W) uint8 관측만 지원합니다: {self.obs_shape}")
+
+        self.frame_stack = self.obs_shape[0]
+        self.frames_per_step = min(frames_per_step, self.frame_stack)
+        self.handle_timeout_termination = handle_timeout_termination
+
+        # 에피소드 시작마다 (frame_stack - frames_per_step)개 프레임이 추가로 들어가므로 여유분 확보
+        self.frame_capacity = buffer_size * self.frames_per_step + 4 * self.frame_stack
+        self.frames = np.zeros((self.frame_capacity, *self.obs_shape[1:]), dtype=np.uint8)
+        self.frame_count = 0  # 지금까지 넣은 프레임 수 (절대 번호)
+
+        # 전이: 스택 마지막 프레임의 절대 번호
+        self.obs_end = np.zeros(buffer_size, dtype=np.int64)
+        self.next_end = np.zeros(buffer_size, dtype=np.int64)
+        self.actions = np.zeros(buffer_size, dtype=np.int64)
+        self.rewards = np.zeros(buffer_size, dtype=np.float32)
+        self.dones = np.zeros(buffer_size, dtype=np.float32)
+        self.timeouts = np.zeros(buffer_size, dtype=np.float32)
+
+        self._episode_start = True
+        self._stack_offsets = np.arange(-self.frame_stack + 1, 1, dtype=np.int64)
+
+        total = self.frames.nbytes + sum(a.nbytes for a in (
+            self.obs_end, self.next_end, self.actions, self.rewards, self.dones, self.timeouts))
+        print(f"💾 리플레이 버퍼: {buffer_size:,} 전이, 프레임 {self.frame_capacity:,}개 ({total / 1e9:.2f} GB)")
+
+    def _push_frames(self, frames):
+        """프레임 추가 → 마지막 프레임의 절대 번호 반환"""
+        n = len(frames)
+        idx = (self.frame_count + np.arange(n)) % self.frame_capacity
+        self.frames[idx] = frames
+        self.frame_count += n
+        return self.frame_count - 1
+
+    def add(self, obs, next_obs, action, reward, done, infos):
+        obs = np.asarray(obs)[0]
+        next_obs = np.asarray(next_obs)[0]
+
+        if self._episode_start:
+            obs_end = self._push_frames(obs)
+        else:
+            obs_end = self.frame_count - 1
+        next_end = self._push_frames(next_obs[-self.frames_per_step:])
+
+        self.obs_end[self.pos] = obs_end
+        self.next_end[self.pos] = next_end
+        self.actions[self.pos] = int(np.asarray(action).reshape(-1)[0])
+        self.rewards[self.pos] = float(np.asarray(reward).reshape(-1)[0])
+        self.dones[self.pos] = float(np.asarray(done).reshape(-1)[0])
+        if self.handle_timeout_termination:
+            self.timeouts[self.pos] = float(infos[0].get("TimeLimit.truncated", False))
+
+        # 종료 후 다음 add의 obs는 리셋 관측 (next_obs와 이어지지 않음)
+        self._episode_start = bool(self.dones[self.pos])
+
+        self.pos += 1
+        if self.pos == self.buffer_size:
+            self.full = True
+            self.pos = 0
+
+    def reset(self):
+        super().reset()
+        self.frame_count = 0
+        self._episode_start = True
+
+    def _valid(self, batch_inds):
+        """스택의 가장 오래된 프레임이 아직 링에 남아있는 전이인지"""
+        oldest = self.obs_end[batch_inds] - self.frame_stack + 1
+        return oldest >= self.frame_count - self.frame_capacity
+
+    def sample(self, batch_size, env=None):
+        upper_bound = self.buffer_size if self.full else self.pos
+        batch_inds = np.random.randint(0, upper_bound, size=batch_size)
+
+        # 프레임 링에서 밀려난 전이는 다시 뽑기 (에피소드가 매우 짧을 때만 발생)
+        invalid = ~self._valid(batch_inds)
+        for _ in range(MAX_RESAMPLE):
+            if not invalid.any():
+                break
+            batch_inds[invalid] = np.random.randint(0, upper_bound, size=int(invalid.sum()))
+            invalid = ~self._valid(batch_inds)
+        else:
+            # 무효 전이가 대부분이면 유효한 전이 중에서 직접 뽑기
+            valid_inds = np.flatnonzero(self._valid(np.arange(upper_bound)))
+            if len(valid_inds) == 0:
+                raise RuntimeError(
+                    f"샘플링할 수 있는 전이가 없습니다: 모든 전이의 프레임이 링에서 밀려남 "
+                    f"(프레임 {self.frame_count:,}개 기록, 용량 {self.frame_capacity:,}) - "
+                    f"frames_per_step({self.frames_per_step})이 실제 스텝당 프레임 수와 맞는지 확인하세요")
+            batch_inds[invalid] = np.random.choice(valid_inds, size=int(invalid.sum()))
+
+        return self._get_samples(batch_inds, env=env)
+
+    def _stacks(self, ends):
+        """마지막 프레임 번호들 → (batch, frame_stack, H, W) 스택"""
+        idx = (ends[:, None] + self._stack_offsets) % self.frame_capacity
+        return self.frames[idx]
+
+    def _get_samples(self, batch_inds, env=None):
+        data = (
+            self._normalize_obs(self._stacks(self.obs_end[batch_inds]), env),
+            self.actions[batch_inds].reshape(-1, 1),
+            self._normalize_obs(self._stacks(self.next_end[batch_inds]), env),
+            # 시간 제한에 의한 종료는 done으로 취급하지 않음 (부트스트랩 유지)
+            (self.dones[batch_inds] * (1 - self.timeouts[batch_inds])).reshape(-1, 1),
+            self._normalize_reward(self.rewards[batch_inds].reshape(-1, 1), env),
+        )
+        return ReplayBufferSamples(*tuple(map(self.to_torch, data)))
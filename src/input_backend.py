@@ -0,0 +1,171 @@
+"""
+키보드/마우스 입력 백엔드
+환경이 keyboard/pyautogui를 직접 호출하지 않고 입력 대상 객체를 통해 입력
+
+- KeyboardInput: 전역 키보드 입력 (포커스된 창, 기존 동작)
+- WindowInput: 특정 게임 창(hwnd)에 메시지로 입력 (여러 클라이언트 동시 제어)
+- TracedInput: 다른 입력 대상을 감싸 키 누름/뗌/클릭을 타임라인에 기록 (추적 중일 때만 사용)
+"""
+from src.utils.tracing import trace_instant
+
+
+class KeyboardInput:
+    """전역 키보드/마우스 입력 (keyboard + pyautogui)"""
+
+    def __init__(self, region=None):
+        """
+        Args:
+            region: 캡처 영역 (클릭 좌표를 화면 좌표로 변환할 때 사용, None이면 프레임 좌표 = 화면 좌표)
+        """
+        import keyboard
+        self._keyboard = keyboard
+        self.region = region
+
+    def press(self, key):
+        self._keyboard.press(key)
+
+    def release(self, key):
+        self._keyboard.release(key)
+
+    def click(self, x, y):
+        """프레임 좌표(캡처 영역 기준) 클릭"""
+        import pyautogui
+        if self.region is not None:
+            x, y = x + self.region['left'], y + self.region['top']
+        pyautogui.click(x, y)
+
+    def release_all(self, keys):
+        for key in keys:
+            try:
+                self.release(key)
+            except Exception:
+                pass
+
+
+# keyboard 키 이름 → Windows 가상 키 코드
+_VK_CODES = {
+    'left': 0x25, 'up': 0x26, 'right': 0x27, 'down': 0x28,
+    'shift': 0x10, 'ctrl': 0x11, 'alt': 0x12, 'space': 0x20,
+    'enter': 0x0D, 'esc': 0x1B, 'tab': 0x09,
+    'home': 0x24, 'end': 0x23, 'insert': 0x2D, 'delete': 0x2E,
+    'page up': 0x21, 'page down': 0x22,
+    '-': 0xBD, '=': 0xBB,
+}
+_VK_CODES.update({f'f{i}': 0x70 + i - 1 for i in range(1, 13)})
+
+# 확장 키 (lParam 24번 비트)
+_EXTENDED_KEYS = {'left', 'up', 'right', 'down', 'home', 'end', 'insert', 'delete', 'page up', 'page down'}
+
+
+def _vk_code(key):
+    """키 이름을 가상 키 코드로 변환"""
+    name = key.lower()
+    if name in _VK_CODES:
+        return _VK_CODES[name]
+    if len(name) == 1 and name.isalnum():
+        return ord(name.upper())
+    raise ValueError(f"지원하지 않는 키: {key}")
+
+
+class WindowInput:
+    """특정 창에 PostMessage로 키/클릭 전달 (창이 포커스가 없어도 동작)"""
+
+    def __init__(self, hwnd, region=None):
+        """
+        Args:
+            hwnd: 대상 창 핸들
+            region: 창 캡처 영역 (클릭 좌표를 화면 좌표로 변환할 때 사용)
+        """
+        import win32api
+        import win32con
+        import win32gui
+        self._api = win32api
+        self._con = win32con
+        self._gui = win32gui
+        self.hwnd = hwnd
+        self.region = region
+
+    def _lparam(self, key, up):
+        vk = _vk_code(key)
+        scan = self._api.MapVirtualKey(vk, 0)
+        lparam = 1 | (scan << 16)
+        if key.lower() in _EXTENDED_KEYS:
+            lparam |= 1 << 24
+        if up:
+            lparam |= (1 << 30) | (1 << 31)
+        return vk, lparam
+
+    def press(self, key):
+        vk, lparam = self._lparam(key, up=False)
+        msg = self._con.WM_SYSKEYDOWN if key.lower() == 'alt' else self._con.WM_KEYDOWN
+        self._api.PostMessage(self.hwnd, msg, vk, lparam)
+
+    def release(self, key):
+        vk, lparam = self._lparam(key, up=True)
+        msg = self._con.WM_SYSKEYUP if key.lower() == 'alt' else self._con.WM_KEYUP
+        self._api.PostMessage(self.hwnd, msg, vk, lparam)
+
+    def click(self, x, y):
+        """프레임 좌표(캡처 영역 기준) 클릭"""
+        if self.region is not None:
+            x, y = x + self.region['left'], y + self.region['top']
+        cx, cy = self._gui.ScreenToClient(self.hwnd, (int(x), int(y)))
+        pos = self._api.MAKELONG(cx, cy)
+        self._api.PostMessage(self.hwnd, self._con.WM_LBUTTONDOWN, self._con.MK_LBUTTON, pos)
+        self._api.PostMessage(self.hwnd, self._con.WM_LBUTTONUP, 0, pos)
+
+    def release_all(self, keys):
+        for key in keys:
+            try:
+                self.release(key)
+            except Exception:
+                pass
+
+
+class TracedInput:
+    """입력 대상 래퍼 (키 이벤트를 타임라인 순간 이벤트로 기록)"""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def press(self, key):
+        trace_instant('key_down', 'input', {'key': key})
+        self.inner.press(key)
+
+    def release(self, key):
+        trace_instant('key_up', 'input', {'key': key})
+        self.inner.release(key)
+
+    def click(self, x, y):
+        trace_instant('click', 'input', {'x': int(x), 'y': int(y)})
+        self.inner.click(x, y)
+
+    def release_all(self, keys):
+        trace_instant('release_all', 'input')
+        self.inner.release_all(keys)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+def find_window(title):
+    """창 제목(부분 일치)으로 창 핸들과 화면 영역 찾기
+
+    Returns:
+        (hwnd, {'left', 'top', 'width', 'height'}) 또는 None
+    """
+    import win32gui
+
+    found = []
+
+    def callback(hwnd, _):
+        if win32gui.IsWindowVisible(hwnd) and title in win32gui.GetWindowText(hwnd):
+            found.append(hwnd)
+
+    win32gui.EnumWindows(callback, None)
+    if not found:
+        return None
+
+    hwnd = found[0]
+    left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+    return hwnd, {'left': left, 'top': top, 'width': right - left, 'height': bottom - top}
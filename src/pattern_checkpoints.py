@@ -0,0 +1,178 @@
+"""
+패턴 시각 체크포인트
+녹화 프레임에서 일정 간격마다 작은 화면 지문(fingerprint)을 만들어 두고, 재생 중 실제 화면과 비교해 경로 이탈 감지
+
+- 지문: 전처리 프레임(그레이스케일 84x84)의 ROI → size x size 평균 축소 → 평균 0, 길이 1 벡터 (밝기 변화에 둔감)
+- 거리: 1 - 정규화 상관 (0 = 같음, 단색 화면(로딩/암전)은 상관 0 → 어떤 체크포인트와도 불일치)
+- 실제 화면 캡처 + 지문 계산은 백그라운드 스레드(LiveFingerprint)가 하고, 재생 루프는 최신 지문과 내적만 계산
+  → 체크 1회 수 µs (재생 타이밍에 영향 없음)
+- 저장: <패턴 파일>_checkpoints.npz (times: (K,) 초, fingerprints: (K, size*size) float32)
+
+사용법:
+    checkpoints = CheckpointSet.build(frames, timestamps, interval=5.0)
+    info = checkpoints.save(pattern_path)        # 메타데이터 'checkpoints'에 넣을 정보
+    checkpoints = load_checkpoints(pattern_path, metadata)
+    target = checkpoints.verify(k, live_fingerprint)   # k 그대로 / 다른 체크포인트(이동) / None(일시정지)
+"""
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.frame_recorder import load_frames
+
+
+CHECKPOINT_INTERVAL = 5.0   # 체크포인트 간격 (녹화 시각 기준 초)
+FINGERPRINT_SIZE = 12       # 지문 한 변 픽셀 수 (12x12 = 144차원)
+MATCH_THRESHOLD = 0.2       # 이 거리 이하면 같은 장면
+FULL_ROI = (0.0, 0.0, 1.0, 1.0)  # (x, y, w, h) 프레임 대비 비율
+
+
+def fingerprint(frame, roi=FULL_ROI, size=FINGERPRINT_SIZE):
+    """프레임 → 지문 벡터
+
+    Args:
+        frame: 그레이스케일 (H, W) 또는 BGR (H, W, 3) uint8
+        roi: (x, y, w, h) 프레임 대비 비율
+        size: 지문 한 변 크기
+    """
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    h, w = frame.shape
+    x0, y0 = int(roi[0] * w), int(roi[1] * h)
+    x1, y1 = max(x0 + 1, int((roi[0] + roi[2]) * w)), max(y0 + 1, int((roi[1] + roi[3]) * h))
+    small = cv2.resize(frame[y0:y1, x0:x1], (size, size), interpolation=cv2.INTER_AREA)
+    vector = small.astype(np.float32).ravel()
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 1e-6 else vector
+
+
+class CheckpointSet:
+    """패턴 체크포인트 (녹화 시각 + 지문)"""
+
+    def __init__(self, times, fingerprints, roi=FULL_ROI, size=FINGERPRINT_SIZE, threshold=MATCH_THRESHOLD):
+        """
+        Args:
+            times: (K,) 체크포인트 시각 (패턴 시각 기준 초, 오름차순)
+            fingerprints: (K, size*size) 지문
+            roi / size: 지문 설정 (재생 중 실제 화면도 같은 설정으로 계산)
+            threshold: 일치 판정 거리
+        """
+        self.times = np.asarray(times, dtype=np.float64)
+        self.fingerprints = np.ascontiguousarray(fingerprints, dtype=np.float32)
+        self.roi = tuple(roi)
+        self.size = size
+        self.threshold = threshold
+
+    @classmethod
+    def build(cls, frames, timestamps, interval=CHECKPOINT_INTERVAL, roi=FULL_ROI, size=FINGERPRINT_SIZE):
+        """녹화 프레임에서 interval초마다 하나씩 체크포인트 생성 (선택된 프레임만 지문 계산)"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) == 0:
+            return cls(np.zeros(0), np.zeros((0, size * size)), roi, size)
+        targets = np.arange(0.0, timestamps[-1] + 1e-9, interval)
+        indices = np.unique(np.minimum(np.searchsorted(timestamps, targets), len(timestamps) - 1))
+        prints = np.stack([fingerprint(frames[i], roi, size) for i in indices])
+        return cls(timestamps[indices], prints, roi, size)
+
+    def __len__(self):
+        return len(self.times)
+
+    def distances(self, live):
+        """실제 화면 지문 → 모든 체크포인트까지 거리 (K,)"""
+        return 1.0 - self.fingerprints @ live
+
+    def verify(self, index, live):
+        """index번 체크포인트 검증
+
+        Returns:
+            index (일치) / 가장 잘 맞는 다른 체크포인트 번호 (이동) / None (아무것도 안 맞음 → 일시정지)
+        """
+        distances = self.distances(live)
+        if distances[index] <= self.threshold:
+            return index
+        best = int(np.argmin(distances))
+        return best if distances[best] <= self.threshold else None
+
+    def save(self, pattern_path):
+        """패턴 파일 옆에 저장
+
+        Returns:
+            패턴 메타데이터 'checkpoints'에 넣을 정보 (체크포인트가 없으면 None)
+        """
+        if not len(self):
+            return None
+        pattern_path = Path(pattern_path)
+        path = pattern_path.with_name(f"{pattern_path.stem}_checkpoints.npz")
+        np.savez_compressed(path, times=self.times, fingerprints=self.fingerprints)
+        return {'file': path.name, 'count': len(self), 'roi': list(self.roi),
+                'size': self.size, 'threshold': self.threshold}
+
+
+def load_checkpoints(pattern_path, metadata):
+    """패턴에 딸린 체크포인트 로드 (없으면 None)
+
+    녹화 중 끊긴 패턴(메타데이터에 프레임/체크포인트 정보 없음)은 남아 있는 프레임 파일에서 다시 만듦
+    """
+    info = metadata.get('checkpoints')
+    if not info:
+        if metadata.get('frames'):
+            return None
+        loaded = load_frames(pattern_path, metadata)
+        return CheckpointSet.build(*loaded) if loaded is not None else None
+    path = Path(pattern_path).with_name(info['file'])
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        return CheckpointSet(data['times'], data['fingerprints'], info['roi'], info['size'], info['threshold'])
+
+
+class LiveFingerprint:
+    """백그라운드 스레드에서 화면을 캡처해 최신 지문 유지 (재생 루프는 latest만 읽음)"""
+
+    def __init__(self, checkpoints, fps=10, frame_width=84, frame_height=84, monitor=None):
+        """
+        Args:
+            checkpoints: CheckpointSet (지문 설정)
+            fps: 초당 캡처 수
+            frame_width / frame_height: 녹화 프레임과 같은 전처리 크기
+            monitor: 캡처 영역 (None이면 주 모니터 전체)
+        """
+        self.roi = checkpoints.roi
+        self.size = checkpoints.size
+        self.fps = fps
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+        self.monitor = monitor
+        self.latest = None  # 최신 지문 (통째로 교체되므로 읽을 때 잠금 불필요)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="checkpoint-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self):
+        # mss 인스턴스는 사용하는 스레드에서 생성해야 함
+        from src.capture import ScreenCapture
+        capture = ScreenCapture(self.monitor)
+        interval = 1.0 / self.fps
+        try:
+            while not self._stop.is_set():
+                started = time.perf_counter()
+                gray = cv2.cvtColor(capture.grab(), cv2.COLOR_BGR2GRAY)
+                frame = cv2.resize(gray, (self.frame_width, self.frame_height))
+                self.latest = fingerprint(frame, self.roi, self.size)
+                self._stop.wait(max(0.0, interval - (time.perf_counter() - started)))
+        finally:
+            capture.close()
@@ -0,0 +1,295 @@
+"""
+바이너리 패턴 파일 포맷 (.pat)
+키 이벤트를 열 단위 NumPy 구조체 배열로 저장하고 재생 시 메모리 맵으로 읽음
+
+파일 구조:
+    MAGIC (8바이트) | 헤더 길이 (uint32 LE) | 헤더 JSON (UTF-8, 16바이트 정렬 패딩) | 이벤트 배열
+    헤더 JSON: {'version', 'metadata', 'keys', 'types'}
+    이벤트: (time <f8, key <u2 = keys 인덱스, type u1 = types 인덱스)
+
+- 이벤트 수는 파일 크기로 계산 (헤더에 개수 없음, 녹화 중 끊긴 파일도 그대로 읽힘)
+- PatternStreamWriter: 녹화 중 이벤트를 백그라운드 스레드가 파일 끝에 바로 추가 (헤더는 예약 영역에 덮어씀,
+  넘치면 예약 영역을 두 배로 늘리고 이벤트를 뒤로 옮김)
+- JSON 패턴 ↔ 바이너리 변환은 무손실 (메타데이터 그대로, 시각 float64 그대로)
+- load_pattern()은 확장자로 두 포맷 모두 읽음 (기존 JSON 패턴도 그대로 재생/학습 가능)
+"""
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+MAGIC = b'MYPAT\x00\x00\x01'
+FORMAT_VERSION = 1
+HEADER_ALIGN = 16
+EVENT_DTYPE = np.dtype([('time', '<f8'), ('key', '<u2'), ('type', 'u1')])
+EVENT_TYPES = ('down', 'up')
+PATTERN_SUFFIXES = ('.pat', '.json')
+STREAM_HEADER_SIZE = 8192  # 스트리밍 기록 시 헤더 예약 초기 크기 (MAGIC/길이 포함, 이벤트는 이 위치부터)
+
+
+class PatternFile:
+    """패턴 (메타데이터 + 키 테이블 + 이벤트 배열)"""
+
+    def __init__(self, metadata, keys, events, types=EVENT_TYPES):
+        """
+        Args:
+            metadata: 패턴 메타데이터 (녹화기가 쓰는 'metadata' 딕셔너리)
+            keys: 키 이름 테이블 (events['key']가 가리키는 인덱스)
+            events: EVENT_DTYPE 구조체 배열 (메모리 맵 가능)
+            types: 이벤트 종류 테이블
+        """
+        self.metadata = metadata
+        self.keys = list(keys)
+        self.types = list(types)
+        self.events = events
+
+    @classmethod
+    def from_events(cls, metadata, pattern):
+        """이벤트 딕셔너리 리스트 [{'time', 'key', 'type'}, ...] → 패턴"""
+        keys = {}
+        events = np.empty(len(pattern), dtype=EVENT_DTYPE)
+        for i, event in enumerate(pattern):
+            if set(event) != {'time', 'key', 'type'}:
+                raise ValueError(f"바이너리로 저장할 수 없는 이벤트 항목: {sorted(event)}")
+            events[i] = (event['time'], keys.setdefault(event['key'], len(keys)),
+                         EVENT_TYPES.index(event['type']))
+        return cls(metadata, keys, events)
+
+    @classmethod
+    def open(cls, path):
+        """바이너리 패턴 열기 (이벤트는 메모리 맵, 파일 전체를 읽지 않음)"""
+        path = Path(path)
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"바이너리 패턴 파일이 아닙니다: {path}")
+            (header_len,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_len).decode('utf-8'))
+        if header['version'] > FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 패턴 버전: {header['version']}")
+
+        offset = len(MAGIC) + 4 + header_len
+        count = (path.stat().st_size - offset) // EVENT_DTYPE.itemsize
+        if count > 0:
+            events = np.memmap(path, dtype=EVENT_DTYPE, mode='r', offset=offset, shape=(count,))
+        else:
+            events = np.zeros(0, dtype=EVENT_DTYPE)
+        return cls(header['metadata'], header['keys'], events, header['types'])
+
+    def save(self, path):
+        """바이너리 패턴 저장"""
+        header = json.dumps({
+            'version': FORMAT_VERSION,
+            'metadata': self.metadata,
+            'keys': self.keys,
+            'types': self.types,
+        }, ensure_ascii=False).encode('utf-8')
+        # 이벤트 배열이 정렬된 위치에서 시작하도록 공백 패딩 (JSON 파싱에 영향 없음)
+        header += b' ' * (-(len(MAGIC) + 4 + len(header)) % HEADER_ALIGN)
+
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            f.write(np.ascontiguousarray(self.events, dtype=EVENT_DTYPE).tobytes())
+
+    def __len__(self):
+        return len(self.events)
+
+    def iter_events(self, chunk_size=4096):
+        """(time, key, type) 순회 (chunk_size개씩 메모리 맵에서 읽음)"""
+        keys, types = self.keys, self.types
+        for start in range(0, len(self.events), chunk_size):
+            chunk = np.array(self.events[start:start + chunk_size])
+            for t, key, event_type in zip(chunk['time'].tolist(), chunk['key'].tolist(), chunk['type'].tolist()):
+                yield t, keys[key], types[event_type]
+
+    def to_dict(self):
+        """JSON 패턴 형식 {'metadata', 'pattern'}"""
+        return {
+            'metadata': self.metadata,
+            'pattern': [{'time': t, 'key': key, 'type': event_type}
+                        for t, key, event_type in self.iter_events()],
+        }
+
+
+def load_pattern(path):
+    """패턴 파일 로드 (.pat 메모리 맵 / .json 파싱)"""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"패턴 파일 없음: {path}")
+    if path.suffix == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return PatternFile.from_events(data['metadata'], data['pattern'])
+    return PatternFile.open(path)
+
+
+def save_pattern(path, metadata, pattern):
+    """녹화 결과 저장 (확장자로 포맷 결정, 기본 .pat)"""
+    path = Path(path)
+    if path.suffix == '.json':
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': metadata, 'pattern': pattern}, f, indent=2, ensure_ascii=False)
+    else:
+        PatternFile.from_events(metadata, pattern).save(path)
+
+
+def convert_pattern(src, dst=None):
+    """JSON ↔ 바이너리 변환 (dst 없으면 확장자만 바꿈)
+
+    Returns:
+        저장한 경로
+    """
+    src = Path(src)
+    if dst is None:
+        dst = src.with_suffix('.pat' if src.suffix == '.json' else '.json')
+    pattern = load_pattern(src)
+    if Path(dst).suffix == '.json':
+        data = pattern.to_dict()
+        save_pattern(dst, data['metadata'], data['pattern'])
+    else:
+        pattern.save(dst)
+    return Path(dst)
+
+
+class PatternStreamWriter:
+    """녹화용 스트리밍 기록기 (.pat)
+
+    키보드 훅 스레드는 큐에 넣기만 하고, 백그라운드 스레드가 모아서 고정 크기 레코드로 파일 끝에 추가
+    - 새 키가 나오면 헤더(키 테이블)를 먼저 갱신 후 레코드 기록 → 중간에 죽어도 읽을 수 있는 파일
+    - fsync_interval초마다 헤더 메타데이터(길이/행동 수) 갱신 + fsync
+    - 헤더가 예약 영역보다 커지면 (긴 키 이름이 많거나 메타데이터가 큼) 예약 영역을 늘려 다시 기록
+    """
+
+    def __init__(self, path, metadata, fsync_interval=1.0):
+        """
+        Args:
+            path: 저장 경로 (.pat)
+            metadata: 시작 메타데이터 (name, recorded_at 등, 길이/행동 수/사용 키는 자동 갱신)
+            fsync_interval: 디스크 동기화 주기 (초)
+        """
+        self.path = Path(path)
+        self.metadata = dict(metadata, duration=0, total_actions=0, keys_used=[])
+        self.fsync_interval = fsync_interval
+
+        # 기록 스레드가 갱신 (다른 스레드는 읽기만)
+        self.keys = []
+        self.count = 0
+        self.last_time = 0.0
+        self.down_counts = {}
+        self._key_ids = {}
+
+        self._queue = queue.SimpleQueue()
+        self._file = open(self.path, 'w+b')
+        self.header_size = STREAM_HEADER_SIZE
+        self._file.seek(self.header_size)
+        self._write_header()
+        self._thread = threading.Thread(target=self._run, name="pattern-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, event_time, key, event_type):
+        """이벤트 추가 (호출 스레드는 큐에 넣기만 함)"""
+        self._queue.put((event_time, key, event_type))
+
+    def _header_bytes(self):
+        return json.dumps({
+            'version': FORMAT_VERSION,
+            'metadata': self.metadata,
+            'keys': self.keys,
+            'types': list(EVENT_TYPES),
+        }, ensure_ascii=False).encode('utf-8')
+
+    def _write_header(self):
+        """예약 영역에 헤더 덮어쓰기 (남는 곳은 공백, 넘치면 예약 영역부터 늘림)"""
+        header = self._header_bytes()
+        if len(header) > self.header_size - len(MAGIC) - 4:
+            self._grow_header(len(header))
+        room = self.header_size - len(MAGIC) - 4
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(MAGIC + struct.pack('<I', room) + header + b' ' * (room - len(header)))
+        self._file.seek(position)
+
+    def _grow_header(self, header_len):
+        """예약 영역을 header_len이 들어갈 때까지 두 배씩 늘리고 기록된 이벤트를 뒤로 옮김"""
+        size = self.header_size
+        while header_len > size - len(MAGIC) - 4:
+            size *= 2
+        print(f"⚠️  패턴 헤더가 예약 영역보다 큼: {self.header_size} → {size}바이트로 늘려 이벤트 다시 기록")
+        self._file.seek(self.header_size)
+        events = self._file.read()
+        self._file.seek(size)
+        self._file.write(events)
+        self.header_size = size
+
+    def _sync(self):
+        self.metadata['duration'] = round(self.last_time, 2)
+        self.metadata['total_actions'] = self.count
+        self.metadata['keys_used'] = list(self.keys)
+        self._write_header()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _append(self, batch):
+        rows = np.empty(len(batch), dtype=EVENT_DTYPE)
+        new_key = False
+        for i, (event_time, key, event_type) in enumerate(batch):
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = self._key_ids[key] = len(self.keys)
+                self.keys.append(key)
+                new_key = True
+            rows[i] = (event_time, key_id, EVENT_TYPES.index(event_type))
+            if event_type == 'down':
+                self.down_counts[key] = self.down_counts.get(key, 0) + 1
+
+        # 키 테이블이 레코드보다 먼저 디스크에 있어야 중간에 끊겨도 해석 가능
+        if new_key:
+            self._sync()
+        self._file.write(rows.tobytes())
+        self.count += len(batch)
+        self.last_time = batch[-1][0]
+
+    def _run(self):
+        """백그라운드 기록 루프 (쌓인 이벤트를 한 번에 기록)"""
+        last_sync = time.monotonic()
+        done = False
+        while not done:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+                while item is not None:
+                    batch.append(item)
+                    item = self._queue.get_nowait()
+                done = True
+            except queue.Empty:
+                pass
+            if batch:
+                self._append(batch)
+            if done or time.monotonic() - last_sync >= self.fsync_interval:
+                self._sync()
+                last_sync = time.monotonic()
+
+    def close(self, metadata=None):
+        """남은 이벤트를 모두 기록하고 최종 메타데이터로 헤더 갱신
+
+        Args:
+            metadata: 추가할 메타데이터 (예: 프레임 정보)
+
+        Returns:
+            최종 메타데이터
+        """
+        self._queue.put(None)
+        self._thread.join()
+        self.metadata.update(metadata or {})
+        self._write_header()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        return self.metadata
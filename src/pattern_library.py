@@ -0,0 +1,222 @@
+"""
+패턴 라이브러리 인덱스 (SQLite)
+패턴 파일의 메타데이터를 한 곳에 모아 두고 파일을 열지 않고 검색/선택
+
+- 인덱스 파일: <패턴 폴더>/pattern_library.sqlite
+- refresh(): 폴더를 stat만 해서 (크기, 수정 시각)이 바뀐 파일만 다시 읽음, 사라진 파일은 삭제
+- 내용 해시(SHA-1)가 같으면 이름이 바뀌어도 태그 유지
+- 검색: 최신, 태그, 길이 범위, 사용 키 (모두 AND)
+
+사용법:
+    with PatternLibrary("datasets/mp_patterns") as library:
+        entry = library.latest(tag="사냥", keys=["ctrl"], min_duration=60)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from src.pattern_format import PATTERN_SUFFIXES, load_pattern
+
+
+INDEX_NAME = "pattern_library.sqlite"
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patterns (
+    path TEXT PRIMARY KEY,
+    name TEXT,
+    format TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha1 TEXT,
+    recorded_at TEXT,
+    duration REAL,
+    total_actions INTEGER,
+    has_frames INTEGER,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS pattern_keys (
+    path TEXT,
+    key TEXT,
+    downs INTEGER,
+    PRIMARY KEY (path, key)
+);
+CREATE TABLE IF NOT EXISTS tags (
+    sha1 TEXT,
+    tag TEXT,
+    PRIMARY KEY (sha1, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_patterns_duration ON patterns(duration);
+CREATE INDEX IF NOT EXISTS idx_pattern_keys_key ON pattern_keys(key);
+"""
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def key_histogram(pattern):
+    """키별 누름 횟수 (배열 연산)"""
+    events = pattern.events
+    down = pattern.types.index('down')
+    counts = np.bincount(np.asarray(events['key'])[np.asarray(events['type']) == down],
+                         minlength=len(pattern.keys))
+    return {key: int(count) for key, count in zip(pattern.keys, counts) if count}
+
+
+class PatternLibrary:
+    """패턴 폴더 인덱스"""
+
+    def __init__(self, pattern_dir="datasets/mp_patterns", refresh=True):
+        """
+        Args:
+            pattern_dir: 패턴 파일 폴더
+            refresh: 열 때 바뀐 파일 반영 (False면 인덱스만 사용)
+        """
+        self.pattern_dir = Path(pattern_dir)
+        self.pattern_dir.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.pattern_dir / INDEX_NAME))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+        self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if refresh:
+            self.refresh()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def refresh(self):
+        """폴더 변경 사항 반영
+
+        Returns:
+            dict(added, updated, removed, unchanged)
+        """
+        indexed = {row['path']: (row['size'], row['mtime_ns'])
+                   for row in self.db.execute("SELECT path, size, mtime_ns FROM patterns")}
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+
+        seen = set()
+        with os.scandir(self.pattern_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or Path(entry.name).suffix not in PATTERN_SUFFIXES:
+                    continue
+                seen.add(entry.name)
+                st = entry.stat()
+                if indexed.get(entry.name) == (st.st_size, st.st_mtime_ns):
+                    stats['unchanged'] += 1
+                    continue
+                try:
+                    self._index_file(entry.name, st)
+                except (ValueError, KeyError, json.JSONDecodeError) as e:
+                    print(f"⚠️  패턴 인덱스 건너뜀: {entry.name} ({e})")
+                    continue
+                stats['updated' if entry.name in indexed else 'added'] += 1
+
+        for path in set(indexed) - seen:
+            self.db.execute("DELETE FROM patterns WHERE path = ?", (path,))
+            self.db.execute("DELETE FROM pattern_keys WHERE path = ?", (path,))
+            stats['removed'] += 1
+
+        # 어떤 파일도 가리키지 않는 태그 정리 (이름만 바뀐 파일은 해시가 같아 유지됨)
+        self.db.execute("DELETE FROM tags WHERE sha1 NOT IN (SELECT sha1 FROM patterns)")
+        self.db.commit()
+        return stats
+
+    def _index_file(self, name, st):
+        path = self.pattern_dir / name
+        pattern = load_pattern(path)
+        metadata = pattern.metadata
+        histogram = key_histogram(pattern)
+
+        sha1 = _file_sha1(path)
+
+        # 내용이 바뀐 파일은 기존 태그를 새 해시로 옮김
+        old = self.db.execute("SELECT sha1 FROM patterns WHERE path = ?", (name,)).fetchone()
+        if old is not None and old['sha1'] != sha1:
+            self.db.execute("INSERT OR IGNORE INTO tags SELECT ?, tag FROM tags WHERE sha1 = ?", (sha1, old['sha1']))
+
+        self.db.execute("DELETE FROM pattern_keys WHERE path = ?", (name,))
+        self.db.execute(
+            "INSERT OR REPLACE INTO patterns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (name, metadata.get('name', path.stem), path.suffix.lstrip('.'), st.st_size, st.st_mtime_ns,
+             sha1, metadata.get('recorded_at'),
+             float(metadata.get('duration', pattern.events['time'][-1] if len(pattern) else 0.0)),
+             int(metadata.get('total_actions', len(pattern))), int('frames' in metadata),
+             json.dumps(metadata, ensure_ascii=False)))
+        self.db.executemany("INSERT INTO pattern_keys VALUES (?, ?, ?)",
+                            [(name, key, count) for key, count in histogram.items()])
+
+    def tag(self, path, *tags):
+        """패턴에 태그 추가 (파일 내용 기준이라 이름을 바꿔도 유지)"""
+        row = self.db.execute("SELECT sha1 FROM patterns WHERE path = ?", (Path(path).name,)).fetchone()
+        if row is None:
+            raise KeyError(f"인덱스에 없는 패턴: {path}")
+        self.db.executemany("INSERT OR IGNORE INTO tags VALUES (?, ?)", [(row['sha1'], t) for t in tags])
+        self.db.commit()
+
+    def query(self, tag=None, min_duration=None, max_duration=None, keys=None, limit=None):
+        """조건에 맞는 패턴 (최신순)
+
+        Args:
+            tag: 태그
+            min_duration / max_duration: 길이 범위 (초)
+            keys: 모두 사용한 패턴만 (키 이름 리스트)
+            limit: 최대 개수
+
+        Returns:
+            dict 리스트 (path, name, duration, total_actions, recorded_at, keys, tags, metadata 등)
+        """
+        where, params = [], []
+        if tag is not None:
+            where.append("sha1 IN (SELECT sha1 FROM tags WHERE tag = ?)")
+            params.append(tag)
+        if min_duration is not None:
+            where.append("duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            where.append("duration <= ?")
+            params.append(max_duration)
+        if keys:
+            keys = sorted(set(keys))
+            where.append(f"path IN (SELECT path FROM pattern_keys WHERE key IN ({','.join('?' * len(keys))}) "
+                         "GROUP BY path HAVING COUNT(*) = ?)")
+            params += keys + [len(keys)]
+
+        sql = "SELECT * FROM patterns"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY mtime_ns DESC, path"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [self._entry(row) for row in self.db.execute(sql, params)]
+
+    def latest(self, **filters):
+        """조건에 맞는 가장 최근 패턴 (없으면 None)"""
+        entries = self.query(limit=1, **filters)
+        return entries[0] if entries else None
+
+    def _entry(self, row):
+        entry = dict(row)
+        entry['path'] = self.pattern_dir / row['path']
+        entry['has_frames'] = bool(row['has_frames'])
+        entry['metadata'] = json.loads(row['metadata'])
+        entry['keys'] = {r['key']: r['downs'] for r in self.db.execute(
+            "SELECT key, downs FROM pattern_keys WHERE path = ? ORDER BY downs DESC, key", (row['path'],))}
+        entry['tags'] = [r['tag'] for r in self.db.execute(
+            "SELECT tag FROM tags WHERE sha1 = ? ORDER BY tag", (row['sha1'],))]
+        return entry
@@ -3,30 +3,57 @@ MP 게임 패턴 재현 엔진
 녹화된 패턴을 휴먼라이크하게 변형하여 재생
 
 핵심 기능:
-- 타이밍 랜덤화 (±10~20%)
-- 행동 순서 변형 (5% 확률)
-- 불필요한 행동 삽입 (자연스러움)
+- 절대 시각 재생 (녹화 시각 기준 마감 시각에 맞춰 실행 → 반복해도 지연이 누적되지 않음)
+- 타이밍 랜덤화 (마감 시각 주변 ±10~20%, 이웃 이벤트와 순서는 유지)
+- 행동 건너뛰기 (3% 확률)
+- 불필요한 행동 삽입 (5% 확률, 자연스러움)
+- 변형은 반복마다 재생 전에 스케줄로 미리 계산 (src/pattern_schedule.py, 다음 반복분은 재생 중 백그라운드 계산)
+- 시각 체크포인트 (src/pattern_checkpoints.py, 녹화 시 프레임을 함께 저장한 패턴만):
+  체크포인트 시각마다 실제 화면과 비교 → 다른 체크포인트와 맞으면 그 위치로 이동, 아무것도 안 맞으면 일시정지
 """
-import json
-import time
+from concurrent.futures import ThreadPoolExecutor
 import keyboard
-import random
 from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.pattern_checkpoints import LiveFingerprint, load_checkpoints
+from src.pattern_format import load_pattern
+from src.pattern_library import PatternLibrary
+from src.pattern_schedule import KIND_NOISE, NOISE_PROB, SKIP_PROB, compile_schedule
+from src.utils.clock import RealClock
+
+
+PAUSE_TIMEOUT = 10.0  # 체크포인트 불일치 시 화면 복구를 기다리는 최대 시간 (초)
+PAUSE_POLL = 0.1      # 일시정지 중 화면 확인 주기 (초)
 
 
 class HumanlikePatternPlayer:
     """휴먼라이크 패턴 재생 엔진"""
     
-    def __init__(self, pattern_file, humanlike_level=0.15):
+    def __init__(self, pattern_file, humanlike_level=0.15, clock=None, seed=None, visual_sync=True):
         """
         Args:
-            pattern_file: 패턴 JSON 파일 경로
+            pattern_file: 패턴 파일 경로 (.pat 또는 .json)
             humanlike_level: 휴먼라이크 변형 강도 (0.0~1.0, 기본 0.15 = 15% 변형)
+            clock: 딜레이/키 홀드 시계 (None이면 RealClock, VirtualClock이면 대기 없이 재생)
+            seed: 변형 난수 시드 (같은 시드면 반복별 스케줄을 그대로 재현, None이면 매번 다름)
+            visual_sync: 시각 체크포인트가 있으면 화면과 비교해 재동기화
         """
         self.pattern_file = Path(pattern_file)
         self.humanlike_level = humanlike_level
-        self.pattern_data = None
+        self.clock = clock if clock is not None else RealClock()
+        self.seed = seed
+        self.skip_prob = SKIP_PROB
+        self.noise_prob = NOISE_PROB
+        self._rng = np.random.default_rng(seed)
+        self.visual_sync = visual_sync
+        self.pattern = None
         self.metadata = None
+        self.checkpoints = None
+        self.live_view = None  # 최신 화면 지문 제공자 (.latest), 재생 시 LiveFingerprint로 시작
         
         self._load_pattern()
         
@@ -34,51 +61,20 @@ class HumanlikePatternPlayer:
         print(f"⏱️  원본 길이: {self.metadata['duration']}초")
         print(f"🎯 총 행동: {self.metadata['total_actions']}개")
         print(f"🎭 휴먼라이크 레벨: {humanlike_level * 100:.0f}%")
+        if self.checkpoints is not None:
+            print(f"👁️  시각 체크포인트: {len(self.checkpoints)}개")
     
     def _load_pattern(self):
-        """패턴 파일 로드"""
-        if not self.pattern_file.exists():
-            raise FileNotFoundError(f"패턴 파일 없음: {self.pattern_file}")
-        
-        with open(self.pattern_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        self.metadata = data['metadata']
-        self.pattern_data = data['pattern']
-    
-    def _apply_timing_variation(self, original_delay):
-        """타이밍에 랜덤 변형 추가"""
-        if original_delay < 0.05:  # 너무 짧은 딜레이는 그대로
-            return original_delay
-        
-        # ±humanlike_level 범위로 변형
-        variation = random.uniform(-self.humanlike_level, self.humanlike_level)
-        new_delay = original_delay * (1 + variation)
-        
-        # 최소값 보장 (너무 빠르면 부자연스러움)
-        return max(0.01, new_delay)
-    
-    def _should_insert_noise(self):
-        """불필요한 행동 삽입 여부 (5% 확률)"""
-        return random.random() < 0.05
-    
-    def _insert_noise_action(self):
-        """불필요한 행동 삽입 (사람처럼)"""
-        noise_actions = [
-            ('left', 0.05),   # 살짝 왼쪽
-            ('right', 0.05),  # 살짝 오른쪽
-            ('space', 0.05),  # 점프
-        ]
-        
-        action, duration = random.choice(noise_actions)
-        keyboard.press(action)
-        time.sleep(duration)
-        keyboard.release(action)
-        print(f"   🎭 노이즈: {action} (자연스러움)")
+        """패턴 파일 로드 (.pat은 메모리 맵이라 재생하면서 조금씩 읽음)"""
+        self.pattern = load_pattern(self.pattern_file)
+        self.metadata = self.pattern.metadata
+        if self.visual_sync:
+            self.checkpoints = load_checkpoints(self.pattern_file, self.metadata)
     
-    def _should_skip_action(self):
-        """행동 건너뛰기 여부 (3% 확률, 사람 실수)"""
-        return random.random() < 0.03
+    def compile_schedule(self, loop_index=0):
+        """loop_index번째 반복의 재생 스케줄 (건너뛰기/노이즈/시각 흔들림 미리 결정)"""
+        return compile_schedule(self.pattern, self.humanlike_level, self.seed, loop_index,
+                                skip_prob=self.skip_prob, noise_prob=self.noise_prob)
     
     def play_pattern(self, loop=False):
         """패턴 재생"""
@@ -94,10 +90,19 @@ class HumanlikePatternPlayer:
         print("\n⏰ 3초 후 재생 시작...")
         for i in range(3, 0, -1):
             print(f"   {i}...")
-            time.sleep(1)
+            self.clock.sleep(1)
         
         print("\n▶️  재생 중...\n")
         
+        # 다음 반복 스케줄은 현재 반복 재생 중에 미리 계산
+        prefetch = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pattern-schedule")
+        next_schedule = prefetch.submit(self.compile_schedule, 0)
+        
+        # 체크포인트용 화면 지문은 백그라운드에서 계속 갱신
+        own_view = self.checkpoints is not None and self.live_view is None
+        if own_view:
+            self.live_view = LiveFingerprint(self.checkpoints)
+            self.live_view.start()
         try:
             iteration = 0
             while True:
@@ -105,15 +110,26 @@ class HumanlikePatternPlayer:
                 if loop:
                     print(f"\n🔄 반복 {iteration}회 시작...")
                 
-                self._play_once()
+                schedule = next_schedule.result()
+                if loop:
+                    next_schedule = prefetch.submit(self.compile_schedule, iteration)
+                if schedule.skipped or schedule.noise:
+                    print(f"   🎭 건너뛰기 {schedule.skipped}개, 노이즈 {schedule.noise}개 (사람처럼)")
+                
+                timing = self._play_once(schedule)
+                if timing['events']:
+                    print(format_timing(timing))
+                if 'sync' in timing:
+                    sync = timing['sync']
+                    print(f"👁️  체크 {sync['checks']}회, 이동 {sync['seeks']}회, 일시정지 {sync['pauses']}회")
                 
                 if not loop:
                     break
                 
                 # 반복 사이 대기 (5~10초 랜덤)
-                wait_time = random.uniform(5, 10)
+                wait_time = self._rng.uniform(5, 10)
                 print(f"\n⏸️  {wait_time:.1f}초 대기 중...")
-                time.sleep(wait_time)
+                self.clock.sleep(wait_time)
                 
                 # ESC로 중지 확인
                 if keyboard.is_pressed('esc'):
@@ -123,47 +139,112 @@ class HumanlikePatternPlayer:
         except KeyboardInterrupt:
             print("\n⏹️  Ctrl+C 감지 - 재생 중지")
         finally:
+            prefetch.shutdown(wait=False, cancel_futures=True)
+            if own_view:
+                self.live_view.stop()
+                self.live_view = None
             self._release_all_keys()
             print("\n✅ 재생 완료!")
     
-    def _play_once(self):
-        """패턴 1회 재생"""
-        last_time = 0
+    def _play_once(self, schedule=None):
+        """패턴 1회 재생
+
+        각 이벤트는 시작 시각 + 스케줄 시각의 절대 마감 시각에 실행
+        (출력/ESC 확인에 걸린 시간이 다음 이벤트로 밀리지 않음, 변형은 스케줄에 이미 반영)
+        체크포인트 시각을 지나면 최신 화면 지문과 비교 → 이탈 시 누른 키를 떼고 맞는 체크포인트 시각부터 다시 재생
+
+        Args:
+            schedule: compile_schedule() 결과 (None이면 지금 계산)
+
+        Returns:
+            마감 시각 대비 실행 오차 통계 (timing_report, 체크포인트 사용 시 'sync' 포함)
+        """
+        if schedule is None:
+            schedule = self.compile_schedule()
+        checkpoints = self.checkpoints if self.live_view is not None else None
+        errors = []
+        held = set()
+        sync = {'checks': 0, 'seeks': 0, 'pauses': 0}
+        next_check = 0
+        start = self.clock.perf_counter()
         
-        for i, action in enumerate(self.pattern_data):
+        events = schedule.iter_events()
+        while True:
+            event = next(events, None)
+            if event is None:
+                break
+            event_time, key, action_type, kind = event
+            
             # ESC로 중지
             if keyboard.is_pressed('esc'):
                 print("\n⏹️  ESC 감지 - 재생 중지")
                 break
             
-            # 딜레이 계산 및 적용
-            delay = action['time'] - last_time
-            if delay > 0:
-                varied_delay = self._apply_timing_variation(delay)
-                time.sleep(varied_delay)
+            # 이번 이벤트 전에 지난 체크포인트 검증 (여러 개 지났으면 마지막 것만)
+            if checkpoints is not None and next_check < len(checkpoints) \
+                    and event_time >= checkpoints.times[next_check]:
+                index = int(np.searchsorted(checkpoints.times, event_time, side='right')) - 1
+                next_check = index + 1
+                self.clock.sleep_until(start + checkpoints.times[index])
+                target = self._check_checkpoint(index, sync)
+                if target != index:
+                    for held_key in held:
+                        keyboard.release(held_key)
+                    held.clear()
+                    if target is None:
+                        sync['pauses'] += 1
+                        target = self._wait_for_checkpoint(index)
+                    else:
+                        sync['seeks'] += 1
+                        print(f"\n🔀 체크포인트 {index} 이탈 → {target}번 ({checkpoints.times[target]:.1f}초)으로 이동")
+                    seek_time = checkpoints.times[target]
+                    events = schedule.iter_events(schedule.index_at(seek_time))
+                    start = self.clock.perf_counter() - seek_time
+                    next_check = target + 1
+                    continue
             
-            # 가끔 행동 건너뛰기 (실수)
-            if self._should_skip_action():
-                print(f"   🎭 건너뛰기: {action['key']} (사람 실수)")
-                last_time = action['time']
-                continue
+            # 마감 시각까지 대기
+            deadline = start + event_time
+            self.clock.sleep_until(deadline)
+            if kind != KIND_NOISE:
+                errors.append(self.clock.perf_counter() - deadline)
             
             # 행동 실행
-            key = action['key']
-            action_type = action['type']
-            
             if action_type == 'down':
                 keyboard.press(key)
-                # print(f"⬇️  [{action['time']:.2f}s] {key} 눌림")
-            elif action_type == 'up':
+                held.add(key)
+            else:
                 keyboard.release(key)
-                # print(f"⬆️  [{action['time']:.2f}s] {key} 뗌")
-            
-            # 가끔 불필요한 행동 삽입
-            if self._should_insert_noise():
-                self._insert_noise_action()
-            
-            last_time = action['time']
+                held.discard(key)
+        
+        timing = timing_report(errors)
+        if checkpoints is not None:
+            timing['sync'] = sync
+        return timing
+    
+    def _check_checkpoint(self, index, sync):
+        """index번 체크포인트를 최신 화면 지문으로 검증 (지문 아직 없으면 통과)"""
+        live = self.live_view.latest
+        if live is None:
+            return index
+        sync['checks'] += 1
+        return self.checkpoints.verify(index, live)
+    
+    def _wait_for_checkpoint(self, index):
+        """화면이 어떤 체크포인트와도 안 맞을 때 일시정지 (맞는 체크포인트 번호, 시간 초과면 index)"""
+        print(f"\n⏸️  체크포인트 {index} 불일치 - 화면 복구 대기 (최대 {PAUSE_TIMEOUT:.0f}초)...")
+        deadline = self.clock.perf_counter() + PAUSE_TIMEOUT
+        while self.clock.perf_counter() < deadline:
+            self.clock.sleep(PAUSE_POLL)
+            if keyboard.is_pressed('esc'):
+                break
+            live = self.live_view.latest
+            target = None if live is None else self.checkpoints.verify(index, live)
+            if target is not None:
+                print(f"▶️  체크포인트 {target}번 ({self.checkpoints.times[target]:.1f}초)에서 재개")
+                return target
+        print(f"⚠️  화면 복구 안 됨 - 체크포인트 {index}번부터 계속")
+        return index
     
     def _release_all_keys(self):
         """모든 키 해제"""
@@ -181,14 +262,79 @@ class HumanlikePatternPlayer:
                 pass
 
 
-def load_latest_pattern():
-    """가장 최근 패턴 파일 로드"""
-    pattern_dir = Path("datasets/mp_patterns")
-    if not pattern_dir.exists():
+def timing_report(errors):
+    """마감 시각 대비 실행 오차(초) → 백분위 통계 (ms)"""
+    errors = np.asarray(errors, dtype=np.float64) * 1000
+    if len(errors) == 0:
+        return {'events': 0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    p50, p95, p99 = np.percentile(errors, [50, 95, 99])
+    return {'events': len(errors), 'p50_ms': float(p50), 'p95_ms': float(p95),
+            'p99_ms': float(p99), 'max_ms': float(errors.max())}
+
+
+def format_timing(timing):
+    """timing_report 결과 한 줄 출력용"""
+    return (f"⏱️  타이밍 오차: p50 {timing['p50_ms']:.2f}ms, p95 {timing['p95_ms']:.2f}ms, "
+            f"p99 {timing['p99_ms']:.2f}ms, 최대 {timing['max_ms']:.2f}ms ({timing['events']}개)")
+
+
+def play_event_stream(events, clock=None, report_every=1000, max_events=None):
+    """(time, key, type) 스트림 재생 (합성기처럼 끝없는 스트림, ESC로 중지)
+
+    반복 재생과 달리 반복 사이 대기가 없음, report_every개마다 타이밍 오차 출력
+
+    Args:
+        events: 시각 오름차순 이벤트 이터레이터 (time = 재생 시작 후 초)
+        clock: 시계 (None이면 RealClock)
+        max_events: 최대 이벤트 수 (None이면 스트림이 끝나거나 ESC까지)
+
+    Returns:
+        재생한 이벤트 수
+    """
+    clock = clock if clock is not None else RealClock()
+    errors = []
+    held = set()
+    played = 0
+    start = clock.perf_counter()
+    try:
+        for event_time, key, action_type in events:
+            if max_events is not None and played >= max_events:
+                break
+            if keyboard.is_pressed('esc'):
+                print("\n⏹️  ESC 감지 - 재생 중지")
+                break
+            
+            deadline = start + event_time
+            clock.sleep_until(deadline)
+            errors.append(clock.perf_counter() - deadline)
+            
+            if action_type == 'down':
+                keyboard.press(key)
+                held.add(key)
+            else:
+                keyboard.release(key)
+                held.discard(key)
+            played += 1
+            
+            if len(errors) >= report_every:
+                print(format_timing(timing_report(errors)))
+                errors.clear()
+    except KeyboardInterrupt:
+        print("\n⏹️  Ctrl+C 감지 - 재생 중지")
+    finally:
+        # 누르고 있던 키 해제
+        for key in held:
+            keyboard.release(key)
+    return played
+
+
+def load_latest_pattern(**filters):
+    """가장 최근 패턴 파일 경로 (패턴 라이브러리 인덱스 조회, filters는 PatternLibrary.query 조건)"""
+    if not Path("datasets/mp_patterns").exists():
         return None
-    
-    pattern_files = sorted(pattern_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-    return pattern_files[0] if pattern_files else None
+    with PatternLibrary("datasets/mp_patterns") as library:
+        entry = library.latest(**filters)
+    return entry['path'] if entry else None
 
 
 if __name__ == "__main__":
@@ -199,6 +345,8 @@ if __name__ == "__main__":
     parser.add_argument("--pattern", "-p", help="패턴 파일 경로 (지정 안하면 최신 파일)")
     parser.add_argument("--humanlike", "-h", type=float, default=0.15, help="휴먼라이크 레벨 (0.0~1.0)")
     parser.add_argument("--loop", "-l", action="store_true", help="반복 재생")
+    parser.add_argument("--seed", type=int, help="변형 난수 시드 (같은 시드 = 같은 재생)")
+    parser.add_argument("--no-visual-sync", action="store_true", help="시각 체크포인트 무시 (기존처럼 그대로 재생)")
     args = parser.parse_args()
     
     # 패턴 파일 결정
@@ -214,5 +362,6 @@ if __name__ == "__main__":
             exit(1)
     
     # 재생
-    player = HumanlikePatternPlayer(pattern_file, humanlike_level=args.humanlike)
+    player = HumanlikePatternPlayer(pattern_file, humanlike_level=args.humanlike, seed=args.seed,
+                                    visual_sync=not args.no_visual_sync)
     player.play_pattern(loop=args.loop)
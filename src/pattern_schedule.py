@@ -0,0 +1,120 @@
+"""
+휴먼라이크 재생 스케줄 사전 컴파일
+패턴 1회 재생분의 변형(시각 흔들림, 건너뛰기, 노이즈 행동)을 재생 전에 배열 연산으로 한 번에 결정
+
+- 재생 루프는 스케줄 순서대로 마감 시각에 키만 누르고 뗌 (루프 안에서 random 호출/추가 sleep 없음)
+- 노이즈 행동은 누름/뗌 두 이벤트로 타임라인에 병합 (재생을 막지 않음)
+- 시드 + 반복 번호로 난수를 만들어 같은 시드면 같은 스케줄 (백그라운드에서 미리 만들어도 결과 동일)
+
+사용법:
+    schedule = compile_schedule(pattern, humanlike_level=0.15, seed=42, loop_index=0)
+    for deadline, key, event_type, kind in schedule.iter_events(): ...
+"""
+import numpy as np
+
+from src.pattern_format import EVENT_TYPES
+
+
+SCHEDULE_DTYPE = np.dtype([('time', '<f8'), ('key', '<u2'), ('type', 'u1'), ('kind', 'u1')])
+KIND_PATTERN = 0
+KIND_NOISE = 1
+
+# 변형 기본값 (기존 재생기와 동일)
+MIN_JITTER_GAP = 0.05   # 이웃 이벤트 간격이 이보다 짧으면 시각 그대로
+SKIP_PROB = 0.03        # 행동 건너뛰기 (사람 실수)
+NOISE_PROB = 0.05       # 실행한 행동 뒤 불필요한 행동 삽입
+NOISE_ACTIONS = (
+    ('left', 0.05),   # 살짝 왼쪽
+    ('right', 0.05),  # 살짝 오른쪽
+    ('space', 0.05),  # 점프
+)
+
+
+class Schedule:
+    """패턴 1회 재생 스케줄 (시각순 정렬된 이벤트 배열)"""
+
+    def __init__(self, events, keys, skipped, noise):
+        """
+        Args:
+            events: SCHEDULE_DTYPE 배열 (time = 재생 시작 후 초)
+            keys: 키 이름 테이블
+            skipped / noise: 건너뛴 이벤트 수 / 삽입한 노이즈 행동 수
+        """
+        self.events = events
+        self.keys = keys
+        self.skipped = skipped
+        self.noise = noise
+
+    def __len__(self):
+        return len(self.events)
+
+    def iter_events(self, start=0):
+        """(time, key, type, kind) 순회 (start번째 이벤트부터)"""
+        keys = self.keys
+        events = self.events[start:]
+        for t, key, event_type, kind in zip(events['time'].tolist(), events['key'].tolist(),
+                                            events['type'].tolist(), events['kind'].tolist()):
+            yield t, keys[key], EVENT_TYPES[event_type], kind
+
+    def index_at(self, t):
+        """시각 t 이후 첫 이벤트 번호 (체크포인트로 이동할 때 재생 재개 위치)"""
+        return int(np.searchsorted(self.events['time'], t, side='left'))
+
+
+def loop_rng(seed, loop_index):
+    """반복 번호별 난수 생성기 (seed None이면 매번 다름)"""
+    if seed is None:
+        return np.random.default_rng()
+    return np.random.default_rng([seed, loop_index])
+
+
+def compile_schedule(pattern, humanlike_level=0.15, seed=None, loop_index=0,
+                     skip_prob=SKIP_PROB, noise_prob=NOISE_PROB):
+    """패턴 → 변형이 적용된 1회 재생 스케줄
+
+    Args:
+        pattern: PatternFile
+        humanlike_level: 변형 강도 (이웃 간격 대비 시각 흔들림 비율)
+        seed / loop_index: 난수 시드 / 반복 번호
+        skip_prob / noise_prob: 건너뛰기 / 노이즈 삽입 확률
+    """
+    rng = loop_rng(seed, loop_index)
+    times = np.asarray(pattern.events['time'], dtype=np.float64)
+    n = len(times)
+
+    # 1. 시각 흔들림: 이웃 간격의 ±level/2 이내 → 순서 유지
+    gap_prev = np.diff(times, prepend=0.0)
+    gap_next = np.append(np.diff(times), np.inf)
+    gap = np.minimum(gap_prev, gap_next)
+    bound = np.where(gap < MIN_JITTER_GAP, 0.0, min(humanlike_level, 1.0) * gap / 2)
+    jittered = times + rng.uniform(-1.0, 1.0, n) * bound
+
+    # 2. 건너뛰기 / 노이즈 (실행한 이벤트 뒤에만)
+    keep = rng.random(n) >= skip_prob
+    noisy = keep & (rng.random(n) < noise_prob)
+    noise_choice = rng.integers(len(NOISE_ACTIONS), size=int(noisy.sum()))
+
+    keys = list(pattern.keys)
+    key_ids = {key: i for i, key in enumerate(keys)}
+    noise_key = np.array([key_ids.setdefault(key, len(key_ids)) for key, _ in NOISE_ACTIONS], dtype=np.uint16)
+    keys = list(key_ids)
+    noise_duration = np.array([duration for _, duration in NOISE_ACTIONS])
+
+    main = np.empty(int(keep.sum()), dtype=SCHEDULE_DTYPE)
+    main['time'] = jittered[keep]
+    main['key'] = np.asarray(pattern.events['key'])[keep]
+    main['type'] = np.asarray(pattern.events['type'])[keep]
+    main['kind'] = KIND_PATTERN
+
+    noise = np.empty(2 * len(noise_choice), dtype=SCHEDULE_DTYPE)
+    noise['time'][0::2] = jittered[noisy]
+    noise['time'][1::2] = jittered[noisy] + noise_duration[noise_choice]
+    noise['key'][0::2] = noise['key'][1::2] = noise_key[noise_choice]
+    noise['type'][0::2] = EVENT_TYPES.index('down')
+    noise['type'][1::2] = EVENT_TYPES.index('up')
+    noise['kind'] = KIND_NOISE
+
+    # 같은 시각이면 원래 이벤트가 먼저 (안정 정렬)
+    events = np.concatenate([main, noise])
+    events = events[np.argsort(events['time'], kind='stable')]
+    return Schedule(events, keys, skipped=int(n - keep.sum()), noise=len(noise_choice))
@@ -0,0 +1,167 @@
+"""
+n-gram 패턴 합성기
+녹화된 패턴들에서 키 순서(n-gram)와 타이밍 분포를 배워 끝없이 이어지는 새 키 이벤트 스트림 생성
+
+- 단위: 키 누름 1회 = (키, 누른 시각, 누른 시간) (누름/뗌 짝이 맞아 키가 눌린 채로 남지 않음)
+- 다음 키: 직전 n-1개 키 문맥의 빈도로 샘플링 (처음 보는 문맥은 짧은 문맥으로 후퇴)
+- 간격: (이전 키, 다음 키) 쌍의 실제 누름 간격 표본 (없으면 다음 키 → 전체 표본)
+- 누른 시간: 키별 실제 표본
+- 생성은 지연 방식 (문맥 n-1개 + 아직 안 뗀 키만 기억 → 메모리 고정), 반복 사이 대기 없음
+
+사용법:
+    synth = PatternSynthesizer.fit([load_pattern(p) for p in paths], order=3)
+    for event_time, key, event_type in synth.stream(seed=0): ...
+"""
+from collections import defaultdict, deque
+import heapq
+
+import numpy as np
+
+
+MAX_SAMPLES = 512   # 분포당 보관할 최대 표본 수 (저수지 샘플링)
+MAX_GAP = 3.0       # 이보다 긴 누름 간격은 녹화 중 쉬는 시간으로 보고 제외 (초)
+REPRESS_GAP = 0.01  # 아직 누르고 있는 키를 다시 누를 때 뗀 뒤 최소 간격 (초)
+
+
+def pattern_presses(pattern):
+    """패턴 → 누름 목록 [(누른 시각, 키, 누른 시간)] (누른 시각 순)"""
+    presses = []
+    open_downs = {}
+    for event_time, key, event_type in pattern.iter_events():
+        if event_type == 'down':
+            open_downs.setdefault(key, event_time)
+        elif key in open_downs:
+            start = open_downs.pop(key)
+            presses.append((start, key, event_time - start))
+    presses.sort(key=lambda p: p[0])
+    return presses
+
+
+class _Reservoir:
+    """고정 크기 표본 (저수지 샘플링)"""
+
+    def __init__(self, rng, size=MAX_SAMPLES):
+        self.rng = rng
+        self.size = size
+        self.values = []
+        self.seen = 0
+
+    def add(self, value):
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            j = self.rng.integers(self.seen)
+            if j < self.size:
+                self.values[j] = value
+
+
+class PatternSynthesizer:
+    """n-gram 키 순서 + 실측 타이밍 분포 합성기"""
+
+    def __init__(self, keys, ngrams, gaps, holds, order):
+        """
+        Args:
+            keys: 키 이름 테이블
+            ngrams: {문맥 튜플(키 인덱스): (다음 키 인덱스 배열, 누적 확률 배열)} (빈 문맥 = 전체 빈도)
+            gaps: {(이전 키, 다음 키) / (None, 다음 키) / (None, None): 간격 표본 배열}
+            holds: {키 / None: 누른 시간 표본 배열}
+            order: n-gram 차수
+        """
+        self.keys = keys
+        self.ngrams = ngrams
+        self.gaps = gaps
+        self.holds = holds
+        self.order = order
+
+    @classmethod
+    def fit(cls, patterns, order=3, max_gap=MAX_GAP, seed=0):
+        """패턴들에서 n-gram/타이밍 분포 학습
+
+        Args:
+            patterns: PatternFile 목록
+            order: n-gram 차수 (2 = 직전 키 1개 문맥)
+            max_gap: 학습에 쓸 최대 누름 간격 (초)
+            seed: 표본 선택 시드
+        """
+        rng = np.random.default_rng(seed)
+        key_ids = {}
+        counts = defaultdict(lambda: defaultdict(int))
+        gaps = defaultdict(lambda: _Reservoir(rng))
+        holds = defaultdict(lambda: _Reservoir(rng))
+
+        for pattern in patterns:
+            presses = pattern_presses(pattern)
+            history = deque(maxlen=order - 1)
+            prev = None
+            for start, key, hold in presses:
+                k = key_ids.setdefault(key, len(key_ids))
+                for n in range(len(history) + 1):
+                    counts[tuple(history)[len(history) - n:]][k] += 1
+                holds[k].add(hold)
+                holds[None].add(hold)
+                if prev is not None and start - prev[0] <= max_gap:
+                    gap = start - prev[0]
+                    gaps[(prev[1], k)].add(gap)
+                    gaps[(None, k)].add(gap)
+                    gaps[(None, None)].add(gap)
+                history.append(k)
+                prev = (start, k)
+
+        if not key_ids:
+            raise ValueError("학습할 키 누름이 없습니다")
+
+        ngrams = {}
+        for context, nexts in counts.items():
+            next_keys = np.fromiter(nexts.keys(), dtype=np.int64)
+            freq = np.fromiter(nexts.values(), dtype=np.float64)
+            ngrams[context] = (next_keys, np.cumsum(freq) / freq.sum())
+        return cls(list(key_ids), ngrams,
+                   {k: np.asarray(r.values) for k, r in gaps.items()},
+                   {k: np.asarray(r.values) for k, r in holds.items()},
+                   order)
+
+    def _next_key(self, context, rng):
+        """문맥 → 다음 키 (처음 보는 문맥은 앞에서부터 줄여 후퇴)"""
+        for n in range(len(context), -1, -1):
+            table = self.ngrams.get(context[len(context) - n:])
+            if table is not None:
+                next_keys, cdf = table
+                return int(next_keys[min(np.searchsorted(cdf, rng.random(), side='right'), len(cdf) - 1)])
+        raise KeyError("n-gram 테이블이 비었습니다")
+
+    def _sample(self, table, candidates, rng, default):
+        for key in candidates:
+            values = table.get(key)
+            if values is not None and len(values):
+                return float(values[rng.integers(len(values))])
+        return default
+
+    def stream(self, seed=None, start_time=0.0):
+        """끝없는 (time, key, type) 스트림 (time은 시작 후 초, 오름차순)"""
+        rng = np.random.default_rng(seed)
+        context = deque(maxlen=self.order - 1)
+        pending = []    # (뗄 시각, 키 인덱스) 힙 = 아직 누르고 있는 키
+        held = {}       # 키 인덱스 → 뗄 시각
+        prev = None
+        t = start_time
+
+        while True:
+            k = self._next_key(tuple(context), rng)
+            if prev is not None:
+                t += self._sample(self.gaps, [(prev, k), (None, k), (None, None)], rng, 0.1)
+            if k in held:  # 아직 누르고 있으면 뗀 뒤에 다시 누름
+                t = max(t, held[k] + REPRESS_GAP)
+
+            while pending and pending[0][0] <= t:
+                release_time, r = heapq.heappop(pending)
+                del held[r]
+                yield release_time, self.keys[r], 'up'
+
+            hold = self._sample(self.holds, [k, None], rng, 0.05)
+            heapq.heappush(pending, (t + hold, k))
+            held[k] = t + hold
+            yield t, self.keys[k], 'down'
+
+            context.append(k)
+            prev = k
@@ -0,0 +1,324 @@
+"""
+녹화 세션 재생 환경
+실제 게임 화면(BGR 원본)과 행동을 녹화해 두고, 같은 환경 코드
+(_execute_action → _capture_frame → _check_danger_monster → _calculate_reward → _preprocess_frame)를
+캡처 소스/입력 대상/시계만 바꿔 다시 실행 → 보상 코드 변경의 정확도 차이와 처리 속도를 실제 화면으로 측정
+
+- 녹화: SessionRecorder 래퍼 (train_ml/train_mp --record-session) → datasets/replays/<GAME>_<시각>/
+    frames/000000.png ...  무손실 PNG (HSV/템플릿 매칭 결과가 원본과 같도록, 백그라운드 스레드 인코딩)
+    events.jsonl           reset / grab(캡처 시각) / step(행동, 보상, 서브 스텝 보상 항목) 순서 기록
+    meta.json              게임, 환경 설정, 녹화 당시 ROI
+- 재생: ReplayCapture(녹화 프레임 순서대로) + ReplayInput(키 입력은 기록만) + VirtualClock(녹화 시각 재현)
+- replay_session(): 녹화 보상 vs 재계산 보상 + 단계별 소요 시간 (환경 StageTimer, tools/replay_session.py)
+
+재생 중 코드 변경으로 캡처 횟수가 달라지면(예: 회피 동작이 새로 발생) 이후 프레임이 어긋나므로
+ReplayExhausted 또는 불일치 스텝으로 보고된다.
+"""
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import gymnasium as gym
+import numpy as np
+
+from src.env_registry import GAME_ENVS
+from src.utils.clock import VirtualClock, clock_of
+
+
+class ReplayExhausted(RuntimeError):
+    """녹화된 프레임을 모두 사용함 (재생 코드가 녹화보다 많이 캡처)"""
+
+
+def step_reward_terms(base, steps_before):
+    """이번 스텝에서 실제로 실행된 서브 스텝의 보상 기록
+
+    reward_terms_history는 frame_skip개를 유지하므로 에피소드 끝에서 스텝이 일찍 끝나면
+    이전 스텝의 서브 스텝이 남아 있음 → 이번 스텝에 늘어난 step_count만큼 뒤에서 자름
+    """
+    history = list(getattr(base, 'reward_terms_history', ()))
+    ran = base.step_count - steps_before
+    return history[-ran:] if ran > 0 else []
+
+
+# ---------------------------------------------------------------- 녹화
+
+class SessionWriter:
+    """원본 프레임 + 이벤트 기록기 (PNG 인코딩/쓰기는 백그라운드 스레드)"""
+
+    def __init__(self, root, game, meta, queue_size=256):
+        """
+        Args:
+            root: 세션 디렉토리들을 만들 상위 경로
+            game: 게임 이름
+            meta: meta.json에 같이 저장할 환경 설정
+            queue_size: 인코딩 대기 프레임 수 (가득 차면 캡처 스레드가 대기)
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.session_dir = Path(root) / f"{game}_{timestamp}"
+        self.frames_dir = self.session_dir / "frames"
+        self.frames_dir.mkdir(parents=True, exist_ok=True)
+
+        meta = dict(meta, game=game, created_at=timestamp)
+        with open(self.session_dir / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+        self._events = open(self.session_dir / "events.jsonl", 'w', encoding='utf-8')
+        self._frame_count = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._writer_loop, name="replay-writer", daemon=True)
+        self._thread.start()
+
+    def _writer_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            index, frame = job
+            cv2.imwrite(str(self.frames_dir / f"{index:06d}.png"), frame, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+
+    def _event(self, **event):
+        self._events.write(json.dumps(event) + "\n")
+
+    def add_frame(self, frame, timestamp):
+        index = self._frame_count
+        self._frame_count += 1
+        self._event(type='grab', frame=index, time=timestamp)
+        self._queue.put((index, frame.copy()))
+
+    def add_reset(self):
+        self._event(type='reset')
+
+    def add_step(self, action, reward, frame_infos):
+        self._event(type='step', action=int(action), reward=float(reward),
+                    terms=[info['terms'] for info in frame_infos])
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._events.close()
+        print(f"💾 재생 세션 저장 완료: {self.session_dir} ({self._frame_count} 프레임)")
+
+
+class RecordingCapture:
+    """캡처 소스를 감싸 캡처한 프레임을 그대로 녹화"""
+
+    def __init__(self, capture, writer, clock):
+        self.capture = capture
+        self.writer = writer
+        self.clock = clock
+        self.monitor = capture.monitor
+
+    def grab(self):
+        frame = self.capture.grab()
+        self.writer.add_frame(frame, self.clock.time())
+        return frame
+
+    def close(self):
+        self.capture.close()
+
+
+class SessionRecorder(gym.Wrapper):
+    """원본 화면 + 행동을 재생 세션으로 녹화하는 래퍼 (BaseRealtimeEnv 자식 클래스 전용)"""
+
+    def __init__(self, env, root="datasets/replays"):
+        super().__init__(env)
+        base = env.unwrapped
+        meta = {
+            'env_class': type(base).__name__,
+            'frame_width': base.frame_width,
+            'frame_height': base.frame_height,
+            'frame_stack': base.frame_stack,
+            'frame_skip': base.frame_skip,
+            'max_episode_steps': base.max_episode_steps,
+            'roi_settings': base.roi_settings,
+            'keybindings': base.keybindings.as_dict(),
+        }
+        self.writer = SessionWriter(root, base.game, meta)
+        base.capture = RecordingCapture(base.capture, self.writer, clock_of(base))
+
+    def reset(self, seed=None, options=None):
+        self.writer.add_reset()
+        return self.env.reset(seed=seed, options=options)
+
+    def step(self, action):
+        steps_before = self.env.unwrapped.step_count
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.writer.add_step(action, reward, step_reward_terms(self.env.unwrapped, steps_before))
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        try:
+            self.env.close()
+        finally:
+            self.writer.close()
+
+
+# ---------------------------------------------------------------- 재생
+
+def load_session(session_dir):
+    """세션 디렉토리 → (meta, 캡처 목록 [(프레임 번호, 시각)], 에피소드 목록 [{'actions', 'rewards', 'terms'}])"""
+    session_dir = Path(session_dir)
+    with open(session_dir / "meta.json", 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    grabs, episodes = [], []
+    with open(session_dir / "events.jsonl", 'r', encoding='utf-8') as f:
+        for line in f:
+            event = json.loads(line)
+            if event['type'] == 'grab':
+                grabs.append((event['frame'], event['time']))
+            elif event['type'] == 'reset':
+                episodes.append({'actions': [], 'rewards': [], 'terms': []})
+            elif event['type'] == 'step' and episodes:
+                episodes[-1]['actions'].append(event['action'])
+                episodes[-1]['rewards'].append(event['reward'])
+                episodes[-1]['terms'].append(event['terms'])
+    return meta, grabs, [e for e in episodes if e['actions']]
+
+
+class ReplayCapture:
+    """녹화 프레임을 캡처 순서대로 반환 (캡처 시 시계를 녹화 시각으로 맞춤)"""
+
+    def __init__(self, frames_dir, grabs, clock, preload=False):
+        """
+        Args:
+            frames_dir: PNG 프레임 디렉토리
+            grabs: [(프레임 번호, 녹화 시각)]
+            clock: 재생 환경의 VirtualClock
+            preload: 프레임을 미리 디코딩 (보상 코드 처리 속도만 측정할 때)
+        """
+        self.frames_dir = Path(frames_dir)
+        self.grabs = grabs
+        self.clock = clock
+        self.position = 0
+        self._cache = {index: self._load(index) for index, _ in grabs} if preload else None
+
+        first = self._cache[grabs[0][0]] if preload else self._load(grabs[0][0])
+        h, w = first.shape[:2]
+        self.monitor = {'left': 0, 'top': 0, 'width': w, 'height': h}
+
+    def _load(self, index):
+        frame = cv2.imread(str(self.frames_dir / f"{index:06d}.png"), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise FileNotFoundError(f"녹화 프레임 없음: {index:06d}.png")
+        return frame
+
+    def grab(self):
+        if self.position >= len(self.grabs):
+            raise ReplayExhausted(f"녹화 프레임 {len(self.grabs)}개를 모두 사용했습니다")
+        index, timestamp = self.grabs[self.position]
+        self.position += 1
+        self.clock.advance_to(timestamp)
+        return self._cache[index] if self._cache is not None else self._load(index)
+
+    def close(self):
+        pass
+
+
+class ReplayInput:
+    """입력 대상 대체 (게임에 보내지 않고 기록만)"""
+
+    def __init__(self):
+        self.events = []
+
+    def press(self, key):
+        self.events.append(('press', key))
+
+    def release(self, key):
+        self.events.append(('release', key))
+
+    def click(self, x, y):
+        self.events.append(('click', (x, y)))
+
+    def release_all(self, keys):
+        pass
+
+
+def make_replay_env(session_dir, env_class=None, preload=False):
+    """녹화 세션을 재생하는 환경 생성
+
+    Args:
+        env_class: 재생할 환경 클래스 (None이면 녹화 당시 게임의 기본 환경, 수정한 보상 코드 비교용으로 교체 가능)
+
+    Returns:
+        (env, episodes)
+    """
+    meta, grabs, episodes = load_session(session_dir)
+    if not grabs:
+        raise ValueError(f"녹화 프레임이 없습니다: {session_dir}")
+    env_class = env_class or GAME_ENVS[meta['game']]
+
+    clock = VirtualClock(start=grabs[0][1])
+    capture = ReplayCapture(Path(session_dir) / "frames", grabs, clock, preload=preload)
+    env = env_class(
+        frame_width=meta['frame_width'],
+        frame_height=meta['frame_height'],
+        frame_stack=meta['frame_stack'],
+        frame_skip=meta['frame_skip'],
+        capture=capture,
+        input_backend=ReplayInput(),
+        clock=clock,
+    )
+    # 현재 configs가 아니라 녹화 당시 설정으로 보상 계산 (에피소드 길이도 같아야 서브 스텝 수가 맞음)
+    env.max_episode_steps = meta.get('max_episode_steps', env.max_episode_steps)
+    env.set_roi_settings(meta.get('roi_settings'))
+    env.bind_keys(meta.get('keybindings') or env.keybindings)
+    return env, episodes
+
+
+def replay_session(session_dir, env_class=None, preload=False, atol=1e-6):
+    """녹화 세션을 환경 코드로 다시 실행하고 녹화 보상과 비교
+
+    Returns:
+        보고서 dict (스텝별 보상, 불일치, 보상 항목 합계, 처리 속도, 단계별 시간 = env.timing.summary())
+    """
+    env, episodes = make_replay_env(session_dir, env_class, preload=preload)
+    env.timing.summary(reset=True)  # 재생 구간만 집계
+    recorded, replayed = [], []
+    term_totals = dict.fromkeys(getattr(env, 'REWARD_TERMS', ()), 0.0)
+    exhausted = False
+
+    start = time.perf_counter()
+    try:
+        for episode in episodes:
+            env.reset()
+            for action, reward in zip(episode['actions'], episode['rewards']):
+                steps_before = env.step_count
+                _, new_reward, _, _, _ = env.step(action)
+                recorded.append(reward)
+                replayed.append(float(new_reward))
+                for info in step_reward_terms(env, steps_before):
+                    for name, value in info['terms'].items():
+                        term_totals[name] = term_totals.get(name, 0.0) + value
+    except ReplayExhausted:
+        exhausted = True
+    elapsed = time.perf_counter() - start
+
+    recorded = np.asarray(recorded, dtype=np.float64)
+    replayed = np.asarray(replayed, dtype=np.float64)
+    diff = replayed - recorded
+    mismatched = np.flatnonzero(np.abs(diff) > atol)
+    return {
+        'session': str(session_dir),
+        'env_class': type(env).__name__,
+        'episodes': len(episodes),
+        'steps': len(replayed),
+        'exhausted': exhausted,
+        'recorded_total': float(recorded.sum()),
+        'replayed_total': float(replayed.sum()),
+        'mean_abs_diff': float(np.abs(diff).mean()) if len(diff) else 0.0,
+        'mismatched_steps': mismatched.tolist(),
+        'term_totals': term_totals,
+        'wall_s': elapsed,
+        'steps_per_s': len(replayed) / elapsed if elapsed > 0 else 0.0,
+        'stages': env.timing.summary(),
+        'inputs': len(env.input.events),
+        'frames_used': env.capture.position,
+        'frames_recorded': len(env.capture.grabs),
+        'recorded_rewards': recorded.tolist(),
+        'replayed_rewards': replayed.tolist(),
+    }
@@ -0,0 +1,215 @@
+"""
+오프라인 보상 리라벨링
+기록된 전이 로그(src/transition_store.py)의 보상 항목을 새 보상 계수로 다시 계산해 제자리에 덮어쓰기
+
+- 서브 스텝(프레임)별 원시 신호(화면 변화량, 경험치 픽셀)와 행동만으로 보상을 재구성
+- 스텝 루프 없이 세션 전체를 NumPy 배열 연산으로 한 번에 계산
+  * 벽 충돌 연속 횟수: max(0, c + x) 누적 = 누적합 - 누적 최솟값 (에피소드별)
+  * 단조로움: 같은 행동 연속 길이 (에피소드별)
+  * 콤보: (이전 행동, 현재 행동) 쌍 규칙 (앞 규칙 우선 = 환경 코드의 elif 순서)
+- 기본 계수는 설정의 보상 계수(GameConfig.reward = DEFAULT_REWARD_COEFFS + configs/<GAME>.yaml reward 섹션)
+  → 실시간 환경/배치 시뮬레이터와 같은 값
+
+사용법:
+    coeffs = load_reward_coeffs("ML", "configs/reward_ML_v2.yaml")
+    relabel_session("datasets/transitions/ML_20250101_120000", coeffs)
+"""
+import copy
+from datetime import datetime
+from pathlib import Path
+import time
+
+import numpy as np
+import yaml
+
+from src.transition_store import TransitionSession, write_json_atomic
+from src.utils.config_loader import deep_merge, load_game_config
+
+
+def config_reward_coeffs(game):
+    """실시간 환경과 같은 보상 계수 (설정 reward 섹션 반영, 수정해도 되는 일반 dict 복사본)"""
+    return copy.deepcopy(dict(load_game_config(game=game).reward))
+
+
+def load_reward_coeffs(game, path=None):
+    """설정 보상 계수 + YAML 오버레이 (바꾸고 싶은 항목만 적으면 됨)"""
+    coeffs = config_reward_coeffs(game)
+    if path is None:
+        return coeffs
+    with open(path, 'r', encoding='utf-8') as f:
+        overlay = yaml.safe_load(f) or {}
+    return deep_merge(coeffs, overlay)
+
+
+def _segment_positions(episode_start):
+    """에피소드 내 위치 (에피소드 첫 서브 스텝 = 0)"""
+    idx = np.arange(len(episode_start))
+    start = np.maximum.accumulate(np.where(episode_start, idx, 0))
+    return idx - start
+
+
+def _stuck_counts(stuck, episode_start):
+    """c = max(0, c ± 1) 누적 (에피소드 시작 시 0) 을 루프 없이 계산
+
+    c_t = S_t - min(0, min_{s<=t} S_s), S = 에피소드 내 누적합
+    """
+    n = len(stuck)
+    s = np.cumsum(np.where(stuck, 1, -1))
+    episode_id = np.cumsum(episode_start) - 1
+    base = np.concatenate([[0], s[:-1]])[episode_start][episode_id]  # 에피소드 직전 누적합
+    s_rel = s - base
+    # 에피소드마다 큰 값을 빼서 누적 최솟값이 에피소드 경계에서 새로 시작되게 함
+    offset = episode_id * (2 * n + 2)
+    running_min = np.minimum.accumulate(s_rel - offset) + offset
+    return s_rel - np.minimum(running_min, 0)
+
+
+def compute_reward_terms(actions, change_score, exp_pixels, episode_start, coeffs):
+    """서브 스텝 배열 → 보상 항목별 배열
+
+    Args:
+        actions: 서브 스텝별 행동 (N,)
+        change_score: 직전 프레임 대비 화면 변화량 (N,)
+        exp_pixels: 경험치 바 노란 픽셀 수 (N,, -1 = 측정 안 함)
+        episode_start: 에피소드 첫 서브 스텝 여부 (N,)
+        coeffs: 보상 계수 (DEFAULT_REWARD_COEFFS 형식)
+
+    Returns:
+        {항목 이름: (N,) float64}
+    """
+    actions = np.asarray(actions, dtype=np.int64)
+    change = np.asarray(change_score, dtype=np.float64)
+    exp_pixels = np.asarray(exp_pixels, dtype=np.int64)
+    episode_start = np.asarray(episode_start, dtype=bool).copy()
+    n = len(actions)
+    if n:
+        episode_start[0] = True
+    pos = _segment_positions(episode_start)
+    terms = {}
+
+    # 1. 경험치 (에피소드 첫 서브 스텝은 이전 값 없음)
+    c = coeffs['exp']
+    prev_exp = np.concatenate([[-1], exp_pixels[:-1]])
+    valid = (pos > 0) & (prev_exp >= 0) & (exp_pixels >= 0)
+    diff = np.where(valid, exp_pixels - prev_exp, 0)
+    terms['exp'] = np.select([diff > c['large_pixels'], diff > c['small_pixels']],
+                             [c['large'], c['small']], 0.0)
+
+    # 2. 화면 변화 기반
+    c = coeffs['stuck']
+    stuck = np.isin(actions, c['actions']) & (change < c['threshold'])
+    counts = _stuck_counts(stuck, episode_start) if n else np.zeros(0, dtype=np.int64)
+    terms['stuck'] = np.where(stuck, c['penalty'], 0.0)
+    terms['stuck'] += np.where(stuck & (counts > c['repeat_after']), c['repeat_penalty'], 0.0)
+
+    for name in ('hit', 'teleport'):
+        c = coeffs[name]
+        hit = np.isin(actions, c['actions']) & (change > c['threshold'])
+        terms[name] = np.where(hit, c['bonus'], 0.0)
+
+    c = coeffs['static']
+    static = (change < c['threshold']) & ~np.isin(actions, c['exempt_actions'])
+    terms['static'] = np.where(static, c['penalty'], 0.0)
+
+    # 3. 행동 시퀀스 (행동 이력 2개 이상부터)
+    prev_action = np.concatenate([[-1], actions[:-1]])
+    has_history = pos >= 2
+    combo = np.zeros(n)
+    matched = ~has_history
+    for rule in coeffs['combo']:
+        hit = ~matched & np.isin(prev_action, rule['prev']) & np.isin(actions, rule['next'])
+        combo[hit] = rule['bonus']
+        matched |= hit
+    terms['combo'] = combo
+
+    # 최근 window개 이력이 모두 현재 행동과 같으면 페널티
+    c = coeffs['monotony']
+    idx = np.arange(n)
+    run_begin = episode_start | (actions != prev_action)
+    run_length = idx - np.maximum.accumulate(np.where(run_begin, idx, 0))  # 현재 제외 연속 횟수
+    monotone = has_history & (run_length >= np.minimum(pos, c['window']))
+    terms['monotony'] = np.where(monotone, c['penalty'], 0.0)
+
+    # 4. 행동별 기본 보상
+    table = np.zeros(max([int(a) for a in coeffs['action']] + [int(actions.max(initial=0))]) + 1)
+    for action, value in coeffs['action'].items():
+        table[int(action)] = value
+    terms['action'] = table[actions]
+
+    return terms
+
+
+def session_substeps(session):
+    """세션 → 서브 스텝 배열 (리셋 프레임 제외)
+
+    Returns:
+        dict(frame_index, step, actions, change_score, exp_pixels, episode_start)
+    """
+    if session.meta['frame_skip'] > session.frame_stack:
+        raise ValueError("frame_skip > frame_stack 세션은 서브 스텝 프레임이 일부만 저장되어 리라벨링 불가")
+    info = session.frame_info
+    frame_index = np.flatnonzero(info['step'] >= 0)
+    step = info['step'][frame_index]
+    steps = session.steps[step]
+    return {
+        'frame_index': frame_index,
+        'step': step,
+        'actions': steps['action'],
+        'change_score': info['change_score'][frame_index],
+        'exp_pixels': info['exp_pixels'][frame_index],
+        # 리셋 프레임 바로 다음 프레임 = 에피소드 첫 서브 스텝
+        'episode_start': frame_index == steps['episode_frame_start'] + 1,
+    }
+
+
+def relabel_session(session_dir, coeffs=None, dry_run=False):
+    """세션 하나의 보상을 새 계수로 다시 계산해 덮어쓰기
+
+    Args:
+        session_dir: 전이 로그 세션 디렉토리
+        coeffs: 보상 계수 (None이면 세션 게임의 설정 보상 계수)
+        dry_run: True면 계산만 하고 저장 안 함
+
+    Returns:
+        dict(steps, old_total, new_total, term_totals, seconds)
+    """
+    start = time.perf_counter()
+    session = TransitionSession(session_dir)
+    if not session.meta.get('closed', False):
+        raise ValueError(f"기록 중인 세션은 리라벨링할 수 없습니다: {session_dir}")
+    if coeffs is None:
+        coeffs = config_reward_coeffs(session.meta['game'])
+
+    sub = session_substeps(session)
+    terms = compute_reward_terms(sub['actions'], sub['change_score'], sub['exp_pixels'],
+                                 sub['episode_start'], coeffs)
+    frame_reward = np.sum(list(terms.values()), axis=0) if terms else np.zeros(len(sub['step']))
+    step_reward = np.bincount(sub['step'], weights=frame_reward, minlength=session.num_steps)
+
+    report = {
+        'steps': session.num_steps,
+        'old_total': float(session.steps['reward'].sum()),
+        'new_total': float(step_reward.sum()),
+        'term_totals': {name: float(values.sum()) for name, values in terms.items()},
+    }
+
+    if not dry_run:
+        frame_columns = {'reward': np.zeros(session.num_frames, dtype=np.float32)}
+        frame_columns['reward'][sub['frame_index']] = frame_reward
+        for name in session.meta['reward_terms']:
+            column = np.zeros(session.num_frames, dtype=np.float32)
+            column[sub['frame_index']] = terms.get(name, 0.0)
+            frame_columns[f'term_{name}'] = column
+        session.update_table('frame_info', frame_columns)
+        session.update_table('steps', {'reward': step_reward.astype(np.float32)})
+
+        session.meta.setdefault('relabels', []).append({
+            'at': datetime.now().strftime("%Y%m%d_%H%M%S"),
+            'coeffs': coeffs,
+            'old_total': report['old_total'],
+            'new_total': report['new_total'],
+        })
+        write_json_atomic(session.path / 'meta.json', session.meta)
+
+    report['seconds'] = time.perf_counter() - start
+    return report
@@ -6,24 +6,119 @@ import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
 import cv2
-import mss
-import time
 from collections import deque
-import keyboard
 from pathlib import Path
 import sys
-import json
+import threading
+from time import perf_counter_ns
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from src.utils.config_loader import load_config
+from src.utils.config_loader import Keybindings, load_game_config
+from src.utils.config_watcher import ConfigWatcher
+from src.capture import ScreenCapture
+from src.input_backend import KeyboardInput, TracedInput
+from src.utils.clock import RealClock
+from src.utils.instrumentation import ENV_STAGES, StageTimer
+from src.utils.tracing import get_tracer
 
 
-class BaseRealtimeEnv(gym.Env):
+# 경험치 바 노란색 HSV 범위 (보상 감지)
+EXP_YELLOW_LOW = np.array([20, 100, 100])
+EXP_YELLOW_HIGH = np.array([30, 255, 255])
+
+
+class SubstepLoopMixin:
+    """실시간 환경 공통 step() 루프 (frame_skip 서브 스텝)
+
+    PipelinedRealtimeEnv도 _observe_substep / _finish_step을 그대로 재사용 (행동 실행만 액추에이터 스레드로)
+    필요한 속성: frame_skip, clock, timing, frame_buffer, step_count, episode_reward, max_episode_steps
+    """
+    
+    SUBSTEP_SLEEP = 0.01  # 행동 후 캡처 전 대기 (초)
+    
+    def step(self, action):
+        """행동 실행 및 보상 계산"""
+        step_start = perf_counter_ns()
+        self._apply_pending_config()
+        total_reward = 0.0
+        done = False
+        timing = self.timing
+        
+        for _ in range(self.frame_skip):
+            with timing.span('action'):
+                self._execute_action(action)
+            with timing.span('sleep'):
+                self.clock.sleep(self.SUBSTEP_SLEEP)
+            
+            step_reward, done = self._observe_substep(action)
+            total_reward += step_reward
+            if done:
+                break
+        
+        return self._finish_step(step_start, total_reward, done)
+    
+    def _observe_substep(self, action):
+        """서브 스텝 관측: 캡처 → 위험 감지 → 보상 → 프레임 버퍼 → 종료 판정
+
+        Args:
+            action: 보상 계산 기준 행동 (캡처 시점에 실행 중인 행동)
+        Returns:
+            (보상, 에피소드 종료 여부)
+        """
+        timing = self.timing
+        current_frame = self._capture_frame()
+        
+        # WARNING 몬스터 감지 (지원하는 환경만, 기본은 아무것도 안 함)
+        with timing.span('danger'):
+            self._check_danger_monster(current_frame)
+        
+        with timing.span('reward'):
+            reward = self._calculate_reward(action, current_frame)
+        
+        # 프레임 버퍼 업데이트
+        self.frame_buffer.append(self._preprocess_frame(current_frame))
+        self.last_frame = current_frame.copy()
+        
+        self.step_count += 1
+        return reward, self.step_count >= self.max_episode_steps
+    
+    def _finish_step(self, step_start, total_reward, done):
+        """스텝 마무리 (관측 + 단계별 시간 info['timing'], 스텝 누적 시간은 여기서 초기화)"""
+        self.episode_reward += total_reward
+        observation = self._get_observation()
+        self.timing.add('step', perf_counter_ns() - step_start, step_start)
+        info = {'step': self.step_count, 'episode_reward': self.episode_reward, 'timing': self.timing.end_step()}
+        return observation, total_reward, done, False, info
+    
+    def _apply_pending_config(self):
+        """스텝 경계 설정 적용 (핫 리로드 지원 환경에서 오버라이드)"""
+    
+    def _check_danger_monster(self, frame):
+        """위험 감지 (지원 환경에서 오버라이드)"""
+
+
+class BaseRealtimeEnv(SubstepLoopMixin, gym.Env):
     """실시간 게임 플레이 환경 베이스 클래스"""
     
     metadata = {'render.modes': ['human']}
     
-    def __init__(self, game, frame_width=84, frame_height=84, frame_stack=4, frame_skip=4):
+    # 보상 항목 (자식 클래스의 _calculate_reward가 항목별로 기록)
+    REWARD_TERMS = ('exp', 'stuck', 'hit', 'teleport', 'static', 'combo', 'monotony', 'action')
+    
+    # 환경이 사용하지 않는 설정 섹션 (봇/캡처/로거가 시작할 때만 읽음 → 핫 리로드 시 알림만)
+    RESTART_SECTIONS = ('timers', 'screen', 'yolo', 'action', 'logging')
+    
+    # 행동 번호 → (keybindings 항목, 기본 키) (자식 클래스에서 정의, 키 없는 행동은 생략)
+    ACTION_BINDINGS = {}
+    
+    def __init__(self, game, frame_width=84, frame_height=84, frame_stack=4, frame_skip=4,
+                 capture=None, input_backend=None, clock=None):
+        """
+        Args:
+            capture: 캡처 소스 (None이면 주 모니터 전체 ScreenCapture)
+            input_backend: 입력 대상 (None이면 전역 KeyboardInput)
+            clock: 키 홀드/쿨타임/대기에 쓰는 시계 (None이면 RealClock, 재생/시뮬레이션은 VirtualClock)
+        """
         super().__init__()
         
         self.game = game
@@ -32,17 +127,23 @@ class BaseRealtimeEnv(gym.Env):
         self.frame_stack = frame_stack
         self.frame_skip = frame_skip
         
-        # 설정 로드
-        self.config = load_config(game=game)
-        self.keybindings = self.config.get('keybindings', {})
+        # 설정 로드 (검증된 GameConfig, 파일이 안 바뀌었으면 캐시된 객체)
+        self.config = load_game_config(game=game)
+        self.bind_keys(self.config.keybindings)
+        self.config_watcher = None  # watch_config()로 켜면 스텝 경계에서 바뀐 설정 적용
+        self._config_version = 0
         
         # 행동/관측 공간은 자식 클래스에서 정의
         self.action_space = None
         self.observation_space = None
         
-        # 화면 캡처
-        self.sct = mss.mss()
-        self.monitor = self.sct.monitors[1]
+        # 화면 캡처 / 입력 대상 (멀티 클라이언트 시 창마다 다르게 주입)
+        self.capture = capture if capture is not None else ScreenCapture()
+        self.monitor = self.capture.monitor
+        self.input = input_backend if input_backend is not None else KeyboardInput()
+        if get_tracer() is not None:  # 추적 중이면 키 입력도 타임라인에 기록
+            self.input = TracedInput(self.input)
+        self.clock = clock if clock is not None else RealClock()
         
         # 프레임 버퍼
         self.frame_buffer = deque(maxlen=frame_stack)
@@ -51,26 +152,109 @@ class BaseRealtimeEnv(gym.Env):
         self.last_frame = None
         self.step_count = 0
         self.episode_reward = 0
+        self.max_episode_steps = 1000  # 서브 스텝 수
+        
+        # 키 입력과 긴급 회피(클릭)를 겹치지 않게 (파이프라인 액추에이터 스레드와 공유)
+        self.action_lock = threading.Lock()
         
         # 행동 이력
         self.action_history = deque(maxlen=10)
         self.last_action = None
         self.last_action_time = 0
         
-        # ROI 설정 로드
-        self.roi_settings = self._load_roi_settings()
+        # 보상 계수 (설정 reward 섹션 반영, 배치 시뮬레이터/리라벨링과 같은 형식)
+        self.reward_coeffs = self.config.reward
+        
+        # 서브 스텝별 보상 항목 기록 (전이 로그/리라벨링용)
+        self.reward_terms = dict.fromkeys(self.REWARD_TERMS, 0.0)
+        self.reward_terms_history = deque(maxlen=frame_skip)
+        
+        # 단계별 지연 시간 (스텝마다 info['timing']에 ms로 기록, 항상 켜 둠)
+        self.timing = StageTimer(ENV_STAGES)
+        
+        # ROI 설정 (configs/roi_settings.json, 설정 로더가 검증)
+        self.set_roi_settings(self.config.roi_settings())
         
         print(f"✅ {game} 환경 베이스 초기화 완료")
         if self.roi_settings:
             print(f"📍 ROI 설정 로드: {list(self.roi_settings.keys())}")
     
-    def _load_roi_settings(self):
-        """ROI 설정 로드"""
-        config_path = Path("configs/roi_settings.json")
-        if config_path.exists():
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        return None
+    @classmethod
+    def action_keys(cls, keybindings):
+        """행동 번호 → 실제 키 (키 설정 적용)"""
+        return {action: keybindings.get(name, default) for action, (name, default) in cls.ACTION_BINDINGS.items()}
+    
+    def bind_keys(self, keybindings):
+        """키 설정 적용 (행동 → 키, 방향 → 키 표를 여기서 한 번만 계산, 스텝마다 조회 안 함)
+
+        Args:
+            keybindings: Keybindings 또는 dict (세션 메타데이터)
+        """
+        if not isinstance(keybindings, Keybindings):
+            keybindings = Keybindings.from_dict(keybindings)
+        self.keybindings = keybindings
+        self.action_map = self.action_keys(keybindings)
+        self.move_keys = {direction: keybindings.get(f'move_{direction}', direction) for direction in ('left', 'right')}
+    
+    def set_roi_settings(self, roi_settings):
+        """ROI 적용 (경험치 바 슬라이스처럼 ROI에 딸린 값도 여기서 한 번만 계산)
+
+        Args:
+            roi_settings: {이름: {'x', 'y', 'w', 'h'}} 또는 None
+        """
+        self.roi_settings = roi_settings
+        self.exp_slice = self._roi_slice('exp_bar')
+        self.danger_slice = self._roi_slice('warning')  # 없으면 위험 감지는 화면 전체
+        self.last_exp_pixels = None  # 영역이 바뀌면 이전 픽셀 수와 비교할 수 없음
+    
+    def _roi_slice(self, name):
+        """ROI 이름 → 프레임 슬라이스 (설정에 없으면 None)"""
+        roi = (self.roi_settings or {}).get(name)
+        return (slice(roi['y'], roi['y'] + roi['h']), slice(roi['x'], roi['x'] + roi['w'])) if roi else None
+    
+    def watch_config(self, watcher=None, interval=1.0):
+        """설정 핫 리로드 켜기 (파일이 바뀌면 다음 step() 시작 때 적용, 학습 중단 없음)
+
+        Args:
+            watcher: 공유할 ConfigWatcher (None이면 새로 만듦, 멀티 클라이언트는 하나를 공유)
+            interval: 파일 확인 주기 (초)
+        """
+        if watcher is None:
+            watcher = ConfigWatcher(self.game, interval=interval)
+        self.config_watcher = watcher
+        self._config_version = watcher.state[0]
+        return watcher
+    
+    def _apply_pending_config(self):
+        """스텝 경계: 감시기에 새 설정이 있으면 적용 (없으면 튜플 하나 비교)"""
+        if self.config_watcher is None:
+            return
+        version, config = self.config_watcher.state
+        if version != self._config_version:
+            self._config_version = version
+            self.apply_config(config)
+    
+    def apply_config(self, config):
+        """설정 교체 (바뀐 항목에 딸린 값만 다시 계산)
+
+        Returns:
+            바뀐 항목 이름 목록 (RESTART_SECTIONS 항목은 알림만 하고 적용하지 않음)
+        """
+        old, self.config = self.config, config
+        changed = [name for name in ('keybindings', 'reward', 'roi') + self.RESTART_SECTIONS
+                   if getattr(config, name) != getattr(old, name)]
+        if 'keybindings' in changed:
+            self.bind_keys(config.keybindings)
+        if 'reward' in changed:
+            self.reward_coeffs = config.reward
+        if 'roi' in changed:
+            self.set_roi_settings(config.roi_settings())
+        applied = [name for name in changed if name not in self.RESTART_SECTIONS]
+        restart = [name for name in changed if name in self.RESTART_SECTIONS]
+        print(f"🔄 설정 다시 적용: {', '.join(applied) or '변경 없음'}")
+        if restart:
+            print(f"⚠️  다시 시작해야 적용되는 설정 (이 환경은 사용하지 않음): {', '.join(restart)}")
+        return changed
     
     def _load_template(self, path):
         """템플릿 이미지 로드"""
@@ -83,8 +267,9 @@ class BaseRealtimeEnv(gym.Env):
     
     def _preprocess_frame(self, frame):
         """프레임 전처리 (그레이스케일 + 리사이즈)"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        resized = cv2.resize(gray, (self.frame_width, self.frame_height))
+        with self.timing.span('preprocess'):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            resized = cv2.resize(gray, (self.frame_width, self.frame_height))
         return resized
     
     def _get_observation(self):
@@ -92,11 +277,14 @@ class BaseRealtimeEnv(gym.Env):
         return np.array(self.frame_buffer, dtype=np.uint8)
     
     def _capture_frame(self):
-        """화면 캡처 및 전처리"""
-        screenshot = self.sct.grab(self.monitor)
-        frame = np.array(screenshot)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-        return frame
+        """화면 캡처 (BGR, 화면 캡처는 grab과 BGRA 변환 시간을 따로 측정)"""
+        if not isinstance(self.capture, ScreenCapture):
+            with self.timing.span('capture'):
+                return self.capture.grab()
+        with self.timing.span('capture'):
+            raw = self.capture.grab_bgra()
+        with self.timing.span('convert'):
+            return cv2.cvtColor(raw, cv2.COLOR_BGRA2BGR)
     
     def reset(self, seed=None, options=None):
         """환경 초기화 (자식 클래스에서 오버라이드)"""
@@ -115,16 +303,13 @@ class BaseRealtimeEnv(gym.Env):
             self.frame_buffer.append(processed)
         
         self.last_frame = frame.copy()
+        self.timing.end_step()  # 초기 캡처 시간은 첫 스텝에 넣지 않음
         
         observation = self._get_observation()
         info = {}
         
         return observation, info
     
-    def step(self, action):
-        """행동 실행 (자식 클래스에서 오버라이드)"""
-        raise NotImplementedError("step() must be implemented by subclass")
-    
     def _execute_action(self, action):
         """행동 실행 (자식 클래스에서 오버라이드)"""
         raise NotImplementedError("_execute_action() must be implemented by subclass")
@@ -133,13 +318,29 @@ class BaseRealtimeEnv(gym.Env):
         """보상 계산 (자식 클래스에서 오버라이드)"""
         raise NotImplementedError("_calculate_reward() must be implemented by subclass")
     
+    def _record_reward_terms(self, terms, change_score):
+        """서브 스텝 보상 항목 + 원시 신호 기록"""
+        self.reward_terms = terms
+        self.reward_terms_history.append({
+            'terms': terms,
+            'change_score': float(change_score),
+            'exp_pixels': -1 if getattr(self, 'last_exp_pixels', None) is None else int(self.last_exp_pixels),
+            'timestamp': self.clock.time(),
+        })
+    
+    def buff_cooldown_state(self):
+        """버프 행동별 남은 쿨타임 (초, 행동 번호 오름차순)"""
+        cooldowns = getattr(self, 'buff_cooldowns', None)
+        if not cooldowns:
+            return np.zeros(0, dtype=np.float32)
+        now = self.clock.time()
+        return np.array([
+            max(0.0, cooldowns[a] - (now - self.last_buff_time[a])) for a in sorted(cooldowns)
+        ], dtype=np.float32)
+    
     def close(self):
         """환경 종료"""
-        self.sct.close()
+        self.capture.close()
         # 모든 키 해제
         common_keys = ['left', 'right', 'up', 'down', 'a', 'v', 'd', 'shift', 'alt', 'home']
-        for key in common_keys:
-            try:
-                keyboard.release(key)
-            except:
-                pass
+        self.input.release_all(common_keys)
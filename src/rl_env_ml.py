@@ -5,24 +5,38 @@ ML 게임 전용 실시간 강화학습 환경
 from gymnasium import spaces
 import numpy as np
 import cv2
-import time
-import keyboard
-import pyautogui
 from pathlib import Path
 
-from src.rl_env_base import BaseRealtimeEnv
+from src.rl_env_base import EXP_YELLOW_HIGH, EXP_YELLOW_LOW, BaseRealtimeEnv
+from src.utils.tracing import trace_span
 
 
 class MLRealtimeEnv(BaseRealtimeEnv):
     """ML 게임 실시간 환경 (비숍)"""
     
-    def __init__(self, frame_width=84, frame_height=84, frame_stack=4, frame_skip=4):
+    # 행동 번호 → (keybindings 항목, 기본 키)
+    ACTION_BINDINGS = {
+        1: ('move_left', 'left'),
+        2: ('move_right', 'right'),
+        3: ('teleport', 'v'),
+        4: ('attack', 'a'),
+        5: ('buff_holy', 'd'),
+        6: ('buff_bless', 'shift'),
+        7: ('buff_invin', 'alt'),
+        10: ('summon_dragon', 'home'),
+    }
+    
+    def __init__(self, frame_width=84, frame_height=84, frame_stack=4, frame_skip=4,
+                 capture=None, input_backend=None, clock=None):
         super().__init__(
             game="ML",
             frame_width=frame_width,
             frame_height=frame_height,
             frame_stack=frame_stack,
-            frame_skip=frame_skip
+            frame_skip=frame_skip,
+            capture=capture,
+            input_backend=input_backend,
+            clock=clock
         )
         
         # ML 전용 행동 공간: 11개
@@ -81,64 +95,18 @@ class MLRealtimeEnv(BaseRealtimeEnv):
         
         return obs, info
     
-    def step(self, action):
-        """행동 실행 및 보상 계산"""
-        total_reward = 0.0
-        done = False
-        
-        for _ in range(self.frame_skip):
-            self._execute_action(action)
-            time.sleep(0.01)
-            
-            current_frame = self._capture_frame()
-            
-            # WARNING 몬스터 감지
-            self._check_danger_monster(current_frame)
-            
-            # 보상 누적
-            step_reward = self._calculate_reward(action, current_frame)
-            total_reward += step_reward
-            
-            # 프레임 버퍼 업데이트
-            processed = self._preprocess_frame(current_frame)
-            self.frame_buffer.append(processed)
-            self.last_frame = current_frame.copy()
-            
-            # 종료 조건
-            self.step_count += 1
-            if self.step_count >= 1000:
-                done = True
-                break
-        
-        self.episode_reward += total_reward
-        observation = self._get_observation()
-        info = {'step': self.step_count, 'episode_reward': self.episode_reward}
-        
-        return observation, total_reward, done, False, info
-    
     def _execute_action(self, action):
         """ML 전용 행동 실행 (비숍 스킬)"""
         # 위 방향키 차단 (포탈 방지)
         if action == 8:
             return
         
-        action_map = {
-            0: None,
-            1: self.keybindings.get('move_left', 'left'),
-            2: self.keybindings.get('move_right', 'right'),
-            3: self.keybindings.get('teleport', 'v'),
-            4: self.keybindings.get('attack', 'a'),
-            5: self.keybindings.get('buff_holy', 'd'),
-            6: self.keybindings.get('buff_bless', 'shift'),
-            7: self.keybindings.get('buff_invin', 'alt'),
-            8: None,  # 위 방향키 비활성화
-            9: None,  # 아래 방향키 비활성화
-            10: self.keybindings.get('summon_dragon', 'home')
-        }
+        # 0(idle), 8/9(위/아래 방향키 비활성화)는 키 없음
+        action_map = self.action_map
         
         # 버프 쿨타임 체크
         if action in [5, 6, 7, 10]:
-            current_time = time.time()
+            current_time = self.clock.time()
             if current_time - self.last_buff_time[action] < self.buff_cooldowns[action]:
                 return
             self.last_buff_time[action] = current_time
@@ -146,20 +114,20 @@ class MLRealtimeEnv(BaseRealtimeEnv):
         key = action_map.get(action)
         if key:
             if action == 4:  # 공격
-                keyboard.press(key)
-                time.sleep(0.3)
-                keyboard.release(key)
+                self.input.press(key)
+                self.clock.sleep(0.3)
+                self.input.release(key)
             elif action == 3:  # 텔레포트 (방향키 + V)
-                direction_key = self.keybindings.get(f'move_{self.last_move_direction}', self.last_move_direction)
-                keyboard.press(direction_key)
-                keyboard.press(key)
-                time.sleep(0.1)
-                keyboard.release(key)
-                keyboard.release(direction_key)
+                direction_key = self.move_keys[self.last_move_direction]
+                self.input.press(direction_key)
+                self.input.press(key)
+                self.clock.sleep(0.1)
+                self.input.release(key)
+                self.input.release(direction_key)
             elif action in [1, 2]:  # 좌우 이동
-                keyboard.press(key)
-                time.sleep(0.05)
-                keyboard.release(key)
+                self.input.press(key)
+                self.clock.sleep(0.05)
+                self.input.release(key)
                 
                 # 방향 기억
                 if action == 1:
@@ -167,116 +135,109 @@ class MLRealtimeEnv(BaseRealtimeEnv):
                 elif action == 2:
                     self.last_move_direction = 'right'
             else:  # 버프
-                keyboard.press(key)
-                time.sleep(0.05)
-                keyboard.release(key)
+                self.input.press(key)
+                self.clock.sleep(0.05)
+                self.input.release(key)
     
     def _calculate_reward(self, action, current_frame):
-        """ML 전용 보상 계산 (비숍 사냥 패턴)"""
-        reward = 0.0
+        """ML 전용 보상 계산 (비숍 사냥 패턴)
+
+        항목별 보상은 self.reward_terms에 기록 (합계 = 반환값)
+        """
+        terms = dict.fromkeys(self.REWARD_TERMS, 0.0)
+        coeffs = self.reward_coeffs
         
         # 1. 경험치 획득 (최우선!)
         exp_reward = self._detect_exp_gain(current_frame)
         if exp_reward > 0:
-            reward += exp_reward
+            terms['exp'] += exp_reward
             print(f"🎉 몬스터 처치! +{exp_reward}")
         
         # 2. 화면 변화 감지
         change_score = 0.0
         if self.last_frame is not None:
-            diff = cv2.absdiff(current_frame, self.last_frame)
-            change_score = np.mean(diff) / 255.0
+            # 평균 절대 차이 (L1 합 / 원소 수, 차이 배열을 따로 만들지 않음)
+            change_score = cv2.norm(current_frame, self.last_frame, cv2.NORM_L1) / current_frame.size / 255.0
             
             # 벽 충돌 감지 (강한 페널티)
-            if action in [1, 2, 3] and change_score < 0.03:
+            c = coeffs['stuck']
+            if action in c['actions'] and change_score < c['threshold']:
                 self.stuck_count += 1
-                reward -= 0.8
-                if self.stuck_count > 2:
-                    reward -= 1.2
+                terms['stuck'] += c['penalty']
+                if self.stuck_count > c['repeat_after']:
+                    terms['stuck'] += c['repeat_penalty']
                 print(f"🧱 벽 충돌 감지! (연속 {self.stuck_count}회)")
             else:
                 self.stuck_count = max(0, self.stuck_count - 1)
             
             # 공격 중 타격 이펙트
-            if action == 4 and change_score > 0.1:
-                reward += 0.4
+            c = coeffs['hit']
+            if action in c['actions'] and change_score > c['threshold']:
+                terms['hit'] += c['bonus']
             
             # 텔포 후 이동 성공
-            if action == 3 and change_score > 0.2:
-                reward += 0.3
+            c = coeffs['teleport']
+            if action in c['actions'] and change_score > c['threshold']:
+                terms['teleport'] += c['bonus']
             
             # 정적 화면 페널티
-            if change_score < 0.05 and action != 4:
-                reward -= 0.1
+            c = coeffs['static']
+            if change_score < c['threshold'] and action not in c['exempt_actions']:
+                terms['static'] += c['penalty']
         
-        # 3. 행동 시퀀스 보상 (비숍 콤보)
+        # 3. 행동 시퀀스 보상 (비숍 콤보: 텔포→공격, 이동→공격, 공격→이동/텔포 중 앞 규칙 하나만)
         if len(self.action_history) >= 2:
             prev_action = self.action_history[-1]
             
-            # 텔포→공격 콤보 (핵심!)
-            if prev_action == 3 and action == 4:
-                reward += 0.8
-                print("⚡ 텔포→공격 콤보!")
-            
-            # 이동→공격
-            elif prev_action in [1, 2] and action == 4:
-                reward += 0.3
-            
-            # 공격→이동/텔포
-            elif prev_action == 4 and action in [1, 2, 3]:
-                reward += 0.2
+            for rule in coeffs['combo']:
+                if prev_action in rule['prev'] and action in rule['next']:
+                    terms['combo'] += rule['bonus']
+                    if prev_action in coeffs['teleport']['actions']:
+                        print("⚡ 텔포→공격 콤보!")
+                    break
             
             # 단조로움 페널티
-            recent_actions = list(self.action_history)[-5:]
+            c = coeffs['monotony']
+            recent_actions = list(self.action_history)[-c['window']:]
             if len(set(recent_actions)) == 1 and action == recent_actions[0]:
-                reward -= 0.15
+                terms['monotony'] += c['penalty']
         
-        # 4. 행동별 기본 보상
-        if action == 4:  # 공격
-            reward += 0.6
-        elif action == 3:  # 텔포
-            reward += 0.2
-        elif action in [1, 2]:  # 이동
-            reward += 0.08
-        elif action == 0:  # idle
-            reward -= 0.3
+        # 4. 행동별 기본 보상 (공격 > 텔포 > 이동, idle 페널티)
+        terms['action'] += coeffs['action'].get(action, 0.0)
         
         # 행동 이력 업데이트
         self.action_history.append(action)
         self.last_action = action
-        self.last_action_time = time.time()
+        self.last_action_time = self.clock.time()
         
-        return reward
+        self._record_reward_terms(terms, change_score)
+        return sum(terms.values())
     
     def _detect_exp_gain(self, frame):
         """경험치 획득 감지 (노란색 바 증가)"""
-        if not self.roi_settings or 'exp_bar' not in self.roi_settings:
+        if self.exp_slice is None:
             return 0.0
         
-        roi = self.roi_settings['exp_bar']
-        x, y, w, h = roi['x'], roi['y'], roi['w'], roi['h']
-        
-        exp_roi = frame[y:y+h, x:x+w]
+        exp_roi = frame[self.exp_slice]
         hsv_roi = cv2.cvtColor(exp_roi, cv2.COLOR_BGR2HSV)
-        lower_yellow = np.array([20, 100, 100])
-        upper_yellow = np.array([30, 255, 255])
-        mask = cv2.inRange(hsv_roi, lower_yellow, upper_yellow)
+        mask = cv2.inRange(hsv_roi, EXP_YELLOW_LOW, EXP_YELLOW_HIGH)
         yellow_pixels = np.sum(mask > 0)
         
         reward = 0.0
         if self.last_exp_pixels is not None:
+            c = self.reward_coeffs['exp']
             pixel_diff = yellow_pixels - self.last_exp_pixels
-            if pixel_diff > 10:
-                reward = 2.0
-            elif pixel_diff > 5:
-                reward = 0.5
+            if pixel_diff > c['large_pixels']:
+                reward = c['large']
+            elif pixel_diff > c['small_pixels']:
+                reward = c['small']
         
         self.last_exp_pixels = yellow_pixels
         return reward
     
     def _check_danger_monster(self, frame):
         """WARNING 몬스터 감지"""
-        current_time = time.time()
+        current_time = self.clock.time()
         
         if current_time - self.last_danger_check < self.danger_check_interval:
             return
@@ -286,7 +247,14 @@ class MLRealtimeEnv(BaseRealtimeEnv):
         if self.danger_monster_template is None:
             return
         
-        result = cv2.matchTemplate(frame, self.danger_monster_template, cv2.TM_CCOEFF_NORMED)
+        # WARNING 배너 ROI가 있으면 그 영역만 매칭 (템플릿보다 작으면 화면 전체)
+        region = frame
+        if self.danger_slice is not None:
+            region = frame[self.danger_slice]
+            if region.shape[0] < self.danger_monster_template.shape[0] or \
+                    region.shape[1] < self.danger_monster_template.shape[1]:
+                region = frame
+        result = cv2.matchTemplate(region, self.danger_monster_template, cv2.TM_CCOEFF_NORMED)
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
         
         if max_val > 0.7:
@@ -295,7 +263,9 @@ class MLRealtimeEnv(BaseRealtimeEnv):
             
             if self.danger_detection_count >= 2:
                 print(f"🚨 WARNING 몬스터 확정! 회피 시작...")
-                self._emergency_escape(frame)
+                # 파이프라인 액추에이터가 키를 누르고 있는 동안에는 클릭하지 않음
+                with self.action_lock, trace_span('emergency_escape'):
+                    self._emergency_escape(frame)
                 self.danger_detection_count = 0
         else:
             if self.danger_detection_count > 0:
@@ -319,8 +289,8 @@ class MLRealtimeEnv(BaseRealtimeEnv):
                 npc_y = max_loc[1] + npc_h // 2
                 
                 print(f"📍 NPC 클릭 (x={npc_x}, y={npc_y})")
-                pyautogui.click(npc_x, npc_y)
-                time.sleep(0.5)
+                self.input.click(npc_x, npc_y)
+                self.clock.sleep(0.5)
                 
                 # 대화창 수락
                 new_frame = self._capture_frame()
@@ -335,8 +305,8 @@ class MLRealtimeEnv(BaseRealtimeEnv):
                         dialog_y = max_loc2[1] + dialog_h // 2
                         
                         print(f"📍 수락 버튼 클릭 (x={dialog_x}, y={dialog_y})")
-                        pyautogui.click(dialog_x, dialog_y)
-                        time.sleep(0.5)
+                        self.input.click(dialog_x, dialog_y)
+                        self.clock.sleep(0.5)
                         print("✅ 위협 회피 완료!")
         
         except Exception as e:
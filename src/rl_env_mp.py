@@ -5,23 +5,36 @@ MP 게임 전용 실시간 강화학습 환경
 from gymnasium import spaces
 import numpy as np
 import cv2
-import time
-import keyboard
 from pathlib import Path
 
-from src.rl_env_base import BaseRealtimeEnv
+from src.rl_env_base import EXP_YELLOW_HIGH, EXP_YELLOW_LOW, BaseRealtimeEnv
 
 
 class MPRealtimeEnv(BaseRealtimeEnv):
     """MP 게임 실시간 환경"""
     
-    def __init__(self, frame_width=84, frame_height=84, frame_stack=4, frame_skip=4):
+    # 행동 번호 → (keybindings 항목, 기본 키)
+    ACTION_BINDINGS = {
+        1: ('move_left', 'left'),
+        2: ('move_right', 'right'),
+        3: ('move_up', 'up'),
+        4: ('move_down', 'down'),
+        5: ('attack', 'ctrl'),      # MP 기본 공격
+        6: ('skill_key', 'a'),      # 주력 스킬
+        7: ('jump', 'alt'),         # 점프
+    }
+    
+    def __init__(self, frame_width=84, frame_height=84, frame_stack=4, frame_skip=4,
+                 capture=None, input_backend=None, clock=None):
         super().__init__(
             game="MP",
             frame_width=frame_width,
             frame_height=frame_height,
             frame_stack=frame_stack,
-            frame_skip=frame_skip
+            frame_skip=frame_skip,
+            capture=capture,
+            input_backend=input_backend,
+            clock=clock
         )
         
         # MP 전용 행동 공간 (기본 8개로 시작)
@@ -55,69 +68,28 @@ class MPRealtimeEnv(BaseRealtimeEnv):
         
         return obs, info
     
-    def step(self, action):
-        """행동 실행 및 보상 계산"""
-        total_reward = 0.0
-        done = False
-        
-        for _ in range(self.frame_skip):
-            self._execute_action(action)
-            time.sleep(0.01)
-            
-            current_frame = self._capture_frame()
-            
-            # 보상 누적
-            step_reward = self._calculate_reward(action, current_frame)
-            total_reward += step_reward
-            
-            # 프레임 버퍼 업데이트
-            processed = self._preprocess_frame(current_frame)
-            self.frame_buffer.append(processed)
-            self.last_frame = current_frame.copy()
-            
-            # 종료 조건
-            self.step_count += 1
-            if self.step_count >= 1000:
-                done = True
-                break
-        
-        self.episode_reward += total_reward
-        observation = self._get_observation()
-        info = {'step': self.step_count, 'episode_reward': self.episode_reward}
-        
-        return observation, total_reward, done, False, info
-    
     def _execute_action(self, action):
         """MP 전용 행동 실행"""
-        action_map = {
-            0: None,  # idle
-            1: self.keybindings.get('move_left', 'left'),
-            2: self.keybindings.get('move_right', 'right'),
-            3: self.keybindings.get('move_up', 'up'),
-            4: self.keybindings.get('move_down', 'down'),
-            5: self.keybindings.get('attack', 'ctrl'),  # MP 기본 공격
-            6: self.keybindings.get('skill_key', 'a'),   # 주력 스킬
-            7: self.keybindings.get('jump', 'alt')       # 점프
-        }
+        action_map = self.action_map  # 0(idle)은 키 없음
         
         key = action_map.get(action)
         if key:
             if action == 5:  # 공격
-                keyboard.press(key)
-                time.sleep(0.2)
-                keyboard.release(key)
+                self.input.press(key)
+                self.clock.sleep(0.2)
+                self.input.release(key)
             elif action == 6:  # 스킬
-                keyboard.press(key)
-                time.sleep(0.15)
-                keyboard.release(key)
+                self.input.press(key)
+                self.clock.sleep(0.15)
+                self.input.release(key)
             elif action == 7:  # 점프
-                keyboard.press(key)
-                time.sleep(0.1)
-                keyboard.release(key)
+                self.input.press(key)
+                self.clock.sleep(0.1)
+                self.input.release(key)
             elif action in [1, 2, 3, 4]:  # 이동
-                keyboard.press(key)
-                time.sleep(0.05)
-                keyboard.release(key)
+                self.input.press(key)
+                self.clock.sleep(0.05)
+                self.input.release(key)
                 
                 # 좌우 방향 기억
                 if action == 1:
@@ -126,94 +98,94 @@ class MPRealtimeEnv(BaseRealtimeEnv):
                     self.last_move_direction = 'right'
     
     def _calculate_reward(self, action, current_frame):
-        """MP 전용 보상 계산"""
-        reward = 0.0
+        """MP 전용 보상 계산
+
+        항목별 보상은 self.reward_terms에 기록 (합계 = 반환값)
+        """
+        terms = dict.fromkeys(self.REWARD_TERMS, 0.0)
+        coeffs = self.reward_coeffs
         
         # 1. 경험치 획득 (최우선!)
         exp_reward = self._detect_exp_gain(current_frame)
         if exp_reward > 0:
-            reward += exp_reward
+            terms['exp'] += exp_reward
             print(f"🎉 몬스터 처치! +{exp_reward}")
         
         # 2. 화면 변화 감지
         change_score = 0.0
         if self.last_frame is not None:
-            diff = cv2.absdiff(current_frame, self.last_frame)
-            change_score = np.mean(diff) / 255.0
+            # 평균 절대 차이 (L1 합 / 원소 수, 차이 배열을 따로 만들지 않음)
+            change_score = cv2.norm(current_frame, self.last_frame, cv2.NORM_L1) / current_frame.size / 255.0
             
             # 벽 충돌 감지
-            if action in [1, 2] and change_score < 0.03:
+            c = coeffs['stuck']
+            if action in c['actions'] and change_score < c['threshold']:
                 self.stuck_count += 1
-                reward -= 0.5
-                if self.stuck_count > 3:
-                    reward -= 0.8
+                terms['stuck'] += c['penalty']
+                if self.stuck_count > c['repeat_after']:
+                    terms['stuck'] += c['repeat_penalty']
             else:
                 self.stuck_count = max(0, self.stuck_count - 1)
             
             # 공격/스킬 중 타격 이펙트
-            if action in [5, 6] and change_score > 0.1:
-                reward += 0.3
+            c = coeffs['hit']
+            if action in c['actions'] and change_score > c['threshold']:
+                terms['hit'] += c['bonus']
+            
+            # 이동 성공 (MP 기본값은 해당 행동 없음)
+            c = coeffs['teleport']
+            if action in c['actions'] and change_score > c['threshold']:
+                terms['teleport'] += c['bonus']
             
             # 정적 화면 페널티
-            if change_score < 0.05 and action not in [5, 6]:
-                reward -= 0.08
+            c = coeffs['static']
+            if change_score < c['threshold'] and action not in c['exempt_actions']:
+                terms['static'] += c['penalty']
         
-        # 3. 행동 시퀀스 보상
+        # 3. 행동 시퀀스 보상 (이동→공격/스킬, 공격→이동 중 앞 규칙 하나만)
         if len(self.action_history) >= 2:
             prev_action = self.action_history[-1]
             
-            # 이동→공격/스킬 (좋은 패턴)
-            if prev_action in [1, 2] and action in [5, 6]:
-                reward += 0.4
-            
-            # 공격→이동 (다음 몬스터)
-            elif prev_action in [5, 6] and action in [1, 2]:
-                reward += 0.2
+            for rule in coeffs['combo']:
+                if prev_action in rule['prev'] and action in rule['next']:
+                    terms['combo'] += rule['bonus']
+                    break
             
             # 단조로움 페널티
-            recent_actions = list(self.action_history)[-5:]
+            c = coeffs['monotony']
+            recent_actions = list(self.action_history)[-c['window']:]
             if len(set(recent_actions)) == 1 and action == recent_actions[0]:
-                reward -= 0.12
-        
-        # 4. 행동별 기본 보상
-        if action in [5, 6]:  # 공격/스킬
-            reward += 0.5
-        elif action in [1, 2]:  # 좌우 이동
-            reward += 0.1
-        elif action == 7:  # 점프
-            reward += 0.05
-        elif action == 0:  # idle
-            reward -= 0.25
+                terms['monotony'] += c['penalty']
+        
+        # 4. 행동별 기본 보상 (공격/스킬 > 이동 > 점프, idle 페널티)
+        terms['action'] += coeffs['action'].get(action, 0.0)
         
         # 행동 이력 업데이트
         self.action_history.append(action)
         self.last_action = action
-        self.last_action_time = time.time()
+        self.last_action_time = self.clock.time()
         
-        return reward
+        self._record_reward_terms(terms, change_score)
+        return sum(terms.values())
     
     def _detect_exp_gain(self, frame):
         """경험치 획득 감지 (노란색 바 증가)"""
-        if not self.roi_settings or 'exp_bar' not in self.roi_settings:
+        if self.exp_slice is None:
             return 0.0
         
-        roi = self.roi_settings['exp_bar']
-        x, y, w, h = roi['x'], roi['y'], roi['w'], roi['h']
-        
-        exp_roi = frame[y:y+h, x:x+w]
+        exp_roi = frame[self.exp_slice]
         hsv_roi = cv2.cvtColor(exp_roi, cv2.COLOR_BGR2HSV)
-        lower_yellow = np.array([20, 100, 100])
-        upper_yellow = np.array([30, 255, 255])
-        mask = cv2.inRange(hsv_roi, lower_yellow, upper_yellow)
+        mask = cv2.inRange(hsv_roi, EXP_YELLOW_LOW, EXP_YELLOW_HIGH)
         yellow_pixels = np.sum(mask > 0)
         
         reward = 0.0
         if self.last_exp_pixels is not None:
+            c = self.reward_coeffs['exp']
             pixel_diff = yellow_pixels - self.last_exp_pixels
-            if pixel_diff > 10:
-                reward = 2.0
-            elif pixel_diff > 5:
-                reward = 0.5
+            if pixel_diff > c['large_pixels']:
+                reward = c['large']
+            elif pixel_diff > c['small_pixels']:
+                reward = c['small']
         
         self.last_exp_pixels = yellow_pixels
         return reward
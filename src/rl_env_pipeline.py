@@ -0,0 +1,155 @@
+"""
+파이프라인 실시간 환경 래퍼
+행동 입력(키 홀드)과 화면 캡처/전처리/정책 추론을 겹쳐서 실행
+
+기존 step():  [행동 홀드] → [캡처] → [보상] → [전처리] → (반환 후) [추론] → 다음 step
+파이프라인:   [행동 t 홀드 ··········]
+              [캡처 → 보상 → 전처리] → (반환 후) [추론 t+1] → [행동 t+1 대기열]
+
+- 행동은 별도 액추에이터 스레드에서 실행 (키 입력 전용)
+- 캡처/보상 계산은 호출 스레드에서 실행 (mss는 생성한 스레드에서 사용)
+- action_delay: 관측 시점에 아직 실행 중일 수 있는 행동 수
+    0 → 기존과 동일 (행동 완료 후 캡처)
+    1 → 행동 t 실행 중에 관측 t+1 캡처 (1스텝 행동 지연)
+- 보상은 캡처 시점에 실제로 실행 중이던 행동 기준으로 계산
+- 액추에이터의 행동 실행과 메인 스레드의 긴급 회피(클릭)는 env.action_lock으로 직렬화
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter_ns
+
+import gymnasium as gym
+
+from src.utils.clock import clock_of
+
+
+class PipelinedRealtimeEnv(gym.Wrapper):
+    """행동 실행과 관측 캡처를 겹쳐 실행하는 래퍼
+
+    RealtimeGameEnv, BaseRealtimeEnv 자식 클래스(ML/MP)에 적용 가능.
+    래핑된 환경의 _execute_action과 서브 스텝 루프(SubstepLoopMixin의
+    _observe_substep / _finish_step)를 그대로 재사용한다.
+    """
+
+    def __init__(self, env, action_delay=1, frame_interval=0.01, max_episode_steps=None):
+        """
+        Args:
+            env: 실시간 환경 (RealtimeGameEnv, MLRealtimeEnv, MPRealtimeEnv)
+            action_delay: 관측 캡처 시 실행 중으로 허용하는 행동 수 (0 = 동기 실행)
+            frame_interval: 서브 프레임 캡처 간격 (초, 기존 step의 time.sleep(0.01))
+            max_episode_steps: 에피소드 최대 (서브) 스텝 수 (None이면 환경 설정 그대로)
+        """
+        super().__init__(env)
+        if action_delay < 0:
+            raise ValueError(f"action_delay는 0 이상이어야 합니다: {action_delay}")
+
+        self.action_delay = action_delay
+        self.frame_interval = frame_interval
+        if max_episode_steps is not None:
+            env.unwrapped.max_episode_steps = max_episode_steps
+        self.clock = clock_of(env)  # 래핑된 환경과 같은 시계 (가상 시계면 대기 없이 진행)
+
+        # 액추에이터 스레드 (키 입력은 항상 순서대로 실행)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="actuator")
+        self._pending = deque()  # (action, future)
+
+        # 현재 게임에 적용 중인 행동 (보상 계산 기준)
+        self.applied_action = 0
+        self._last_step_time = None
+
+        print(f"⚡ 파이프라인 래퍼 활성화 (action_delay={action_delay})")
+
+    def _dispatch(self, action):
+        """행동을 액추에이터 스레드에 예약 (frame_skip만큼 반복 실행)"""
+        base = self.env.unwrapped
+
+        def run():
+            for _ in range(base.frame_skip):
+                # 긴급 회피(메인 스레드 클릭)와 겹치지 않도록 잠금
+                with base.action_lock, base.timing.span('action'):
+                    base._execute_action(action)
+
+        self._pending.append((action, self._executor.submit(run)))
+
+    def _wait_pending(self, max_pending):
+        """실행 중인 행동이 max_pending개 이하가 될 때까지 대기
+
+        Returns:
+            대기한 시간 (초)
+        """
+        start = self.clock.perf_counter()
+        while len(self._pending) > max_pending:
+            _, future = self._pending.popleft()
+            future.result()  # 액추에이터 예외는 여기서 전파
+        return self.clock.perf_counter() - start
+
+    def reset(self, seed=None, options=None):
+        """남은 행동을 모두 끝낸 뒤 환경 초기화"""
+        self._wait_pending(0)
+        self.applied_action = 0
+        self._last_step_time = None
+        return self.env.reset(seed=seed, options=options)
+
+    def _running_action(self, latest):
+        """지금 액추에이터에서 실행 중인 행동 (아직 안 끝난 가장 오래된 행동, 모두 끝났으면 latest)"""
+        for action, future in self._pending:
+            if not future.done():
+                return action
+        return latest
+
+    def step(self, action):
+        """행동 예약 → (행동 실행 중) 캡처/보상/전처리 → 관측 반환
+
+        서브 스텝 관측/스텝 마무리는 환경의 _observe_substep / _finish_step을 그대로 사용
+        (설정 핫 리로드, 단계별 시간 info['timing'] 포함)
+        """
+        base = self.env.unwrapped
+        step_start = perf_counter_ns()
+        base._apply_pending_config()
+        action = int(action)
+
+        # 1. 행동 예약 후, 허용 지연을 넘는 이전 행동만 완료 대기
+        self._dispatch(action)
+        dispatch_wait = self._wait_pending(self.action_delay)
+
+        # 2. 행동이 실행되는 동안 서브 프레임 캡처
+        total_reward = 0.0
+        done = False
+
+        for _ in range(base.frame_skip):
+            with base.timing.span('sleep'):
+                self.clock.sleep(self.frame_interval)
+
+            # 보상은 캡처 시점에 실제로 실행 중인 행동 기준 (action_delay >= 2면 이전 행동일 수 있음)
+            self.applied_action = self._running_action(action)
+            step_reward, done = base._observe_substep(self.applied_action)
+            total_reward += step_reward
+            if done:
+                break
+
+        # 에피소드 종료 시에는 마지막 행동까지 마무리
+        if done:
+            self._wait_pending(0)
+
+        now = self.clock.perf_counter()
+        control_period = now - self._last_step_time if self._last_step_time else 0.0
+        self._last_step_time = now
+
+        observation, total_reward, done, truncated, info = base._finish_step(step_start, total_reward, done)
+        info.update({
+            'action_delay': self.action_delay,
+            'applied_action': self.applied_action,
+            'inflight_actions': [a for a, f in self._pending if not f.done()],
+            'dispatch_wait': dispatch_wait,
+            'control_period': control_period,
+        })
+
+        return observation, total_reward, done, truncated, info
+
+    def close(self):
+        """남은 행동 마무리 후 액추에이터 종료"""
+        try:
+            self._wait_pending(0)
+        finally:
+            self._executor.shutdown(wait=True)
+            self.env.close()
@@ -7,7 +7,6 @@ from gymnasium import spaces
 import numpy as np
 import cv2
 import mss
-import time
 from collections import deque
 import keyboard
 import win32gui
@@ -16,17 +15,25 @@ from pathlib import Path
 import sys
 import json
 import pyautogui
+import threading
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from src.utils.config_loader import load_config
+from src.utils.clock import RealClock
+from src.utils.instrumentation import ENV_STAGES, StageTimer
+from src.rl_env_base import SubstepLoopMixin
 
 
-class RealtimeGameEnv(gym.Env):
+class RealtimeGameEnv(SubstepLoopMixin, gym.Env):
     """실시간 게임 플레이 환경"""
     
     metadata = {'render.modes': ['human']}
     
-    def __init__(self, game="ML", frame_width=84, frame_height=84, frame_stack=4, frame_skip=4):
+    def __init__(self, game="ML", frame_width=84, frame_height=84, frame_stack=4, frame_skip=4, clock=None):
+        """
+        Args:
+            clock: 키 홀드/쿨타임/대기에 쓰는 시계 (None이면 RealClock)
+        """
         super().__init__()
         
         self.game = game
@@ -34,6 +41,7 @@ class RealtimeGameEnv(gym.Env):
         self.frame_height = frame_height
         self.frame_stack = frame_stack
         self.frame_skip = frame_skip
+        self.clock = clock if clock is not None else RealClock()
         
         # 설정 로드
         self.config = load_config(game=game)
@@ -60,6 +68,9 @@ class RealtimeGameEnv(gym.Env):
         self.last_frame = None
         self.step_count = 0
         self.episode_reward = 0
+        self.max_episode_steps = 1000
+        self.timing = StageTimer(ENV_STAGES)  # step()은 SubstepLoopMixin 공통 루프
+        self.action_lock = threading.Lock()  # 키 입력 / 긴급 회피 클릭 직렬화
         
         # 버프 쿨타임
         self.buff_cooldowns = {5: 120, 6: 180, 7: 300, 10: 150}
@@ -136,9 +147,7 @@ class RealtimeGameEnv(gym.Env):
         self.last_move_direction = 'right'  # 에피소드마다 초기화
         
         # 초기 프레임 캡처
-        screenshot = self.sct.grab(self.monitor)
-        frame = np.array(screenshot)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        frame = self._capture_frame()
         processed = self._preprocess_frame(frame)
         
         self.frame_buffer.clear()
@@ -152,47 +161,12 @@ class RealtimeGameEnv(gym.Env):
         
         return observation, info
     
-    def step(self, action):
-        """행동 실행 및 보상 계산"""
-        # 1. 행동 실행 (프레임 스킵 적용)
-        total_reward = 0.0
-        done = False
-        
-        for _ in range(self.frame_skip):
-            self._execute_action(action)
-            
-            # 2. 대기 시간 대폭 단축 (0.1 -> 0.01)
-            time.sleep(0.01)
-            
-            # 3. 프레임 캡처 및 보상 계산
-            screenshot = self.sct.grab(self.monitor)
-            current_frame = np.array(screenshot)
-            current_frame = cv2.cvtColor(current_frame, cv2.COLOR_BGRA2BGR)
-            
-            # 🚨 안전장치 2: 위험 몬스터 감지 (스킵 중에도 체크)
-            self._check_danger_monster(current_frame)
-            
-            # 보상 누적
-            step_reward = self._calculate_reward(action, current_frame)
-            total_reward += step_reward
-            
-            # 프레임 버퍼 업데이트 (매 스텝마다)
-            processed = self._preprocess_frame(current_frame)
-            self.frame_buffer.append(processed)
-            self.last_frame = current_frame.copy()
-            
-            # 종료 조건 체크
-            self.step_count += 1
-            if self.step_count >= 1000:
-                done = True
-                break
-        
-        self.episode_reward += total_reward
-        
-        observation = self._get_observation()
-        info = {'step': self.step_count, 'episode_reward': self.episode_reward}
-        
-        return observation, total_reward, done, False, info
+    def _capture_frame(self):
+        """화면 캡처 (BGRA → BGR)"""
+        screenshot = self.sct.grab(self.monitor)
+        frame = np.array(screenshot)
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+        return frame
     
     def _preprocess_frame(self, frame):
         """프레임 전처리"""
@@ -226,7 +200,7 @@ class RealtimeGameEnv(gym.Env):
         
         # 버프 쿨타임 체크
         if action in [5, 6, 7, 10]:
-            current_time = time.time()
+            current_time = self.clock.time()
             if current_time - self.last_buff_time[action] < self.buff_cooldowns[action]:
                 return
             self.last_buff_time[action] = current_time
@@ -235,7 +209,7 @@ class RealtimeGameEnv(gym.Env):
         if key:
             if action == 4:  # 공격은 길게
                 keyboard.press(key)
-                time.sleep(0.3)
+                self.clock.sleep(0.3)
                 keyboard.release(key)
             elif action == 3:  # 텔레포트는 방향키와 함께!
                 # 마지막 이동 방향 기억 (없으면 랜덤)
@@ -247,13 +221,13 @@ class RealtimeGameEnv(gym.Env):
                 # 방향키 + V 동시 입력
                 keyboard.press(direction_key)
                 keyboard.press(key)
-                time.sleep(0.1)
+                self.clock.sleep(0.1)
                 keyboard.release(key)
                 keyboard.release(direction_key)
                 
             elif action in [1, 2]:  # 좌우 이동만 (위/아래 비활성화)
                 keyboard.press(key)
-                time.sleep(0.05)
+                self.clock.sleep(0.05)
                 keyboard.release(key)
                 
                 # 좌우 이동 시 방향 기억
@@ -264,7 +238,7 @@ class RealtimeGameEnv(gym.Env):
                     
             else:  # 버프는 탭
                 keyboard.press(key)
-                time.sleep(0.05)
+                self.clock.sleep(0.05)
                 keyboard.release(key)
     
     def _calculate_reward(self, action, current_frame):
@@ -340,7 +314,7 @@ class RealtimeGameEnv(gym.Env):
         # 행동 이력 업데이트
         self.action_history.append(action)
         self.last_action = action
-        self.last_action_time = time.time()
+        self.last_action_time = self.clock.time()
         
         return reward
     
@@ -376,7 +350,7 @@ class RealtimeGameEnv(gym.Env):
     
     def _check_danger_monster(self, frame):
         """위험 몬스터 감지 및 긴급 귀환"""
-        current_time = time.time()
+        current_time = self.clock.time()
         
         # 1초마다 체크 (CPU 부하 방지)
         if current_time - self.last_danger_check < self.danger_check_interval:
@@ -407,7 +381,8 @@ class RealtimeGameEnv(gym.Env):
             # 연속 2회 감지 시에만 회피 행동 (오탐지 방지)
             if self.danger_detection_count >= 2:
                 print(f"🚨 WARNING 몬스터 확정! 회피 시작...")
-                self._emergency_escape(frame)
+                with self.action_lock:
+                    self._emergency_escape(frame)
                 self.danger_detection_count = 0  # 카운터 리셋
         else:
             # 감지되지 않으면 카운터 리셋
@@ -435,12 +410,10 @@ class RealtimeGameEnv(gym.Env):
                 
                 print(f"📍 NPC 클릭 (x={npc_x}, y={npc_y}, 일치도={max_val:.2f})")
                 pyautogui.click(npc_x, npc_y)
-                time.sleep(0.5)
+                self.clock.sleep(0.5)
                 
                 # 2단계: 대화창 확인 후 수락 버튼 클릭
-                screenshot = self.sct.grab(self.monitor)
-                new_frame = np.array(screenshot)
-                new_frame = cv2.cvtColor(new_frame, cv2.COLOR_BGRA2BGR)
+                new_frame = self._capture_frame()
                 
                 if self.dialog_template is not None:
                     result2 = cv2.matchTemplate(new_frame, self.dialog_template, cv2.TM_CCOEFF_NORMED)
@@ -454,7 +427,7 @@ class RealtimeGameEnv(gym.Env):
                         
                         print(f"📍 수락 버튼 클릭 (x={dialog_x}, y={dialog_y}, 일치도={max_val2:.2f})")
                         pyautogui.click(dialog_x, dialog_y)
-                        time.sleep(0.5)
+                        self.clock.sleep(0.5)
                         
                         print("✅ 위협 회피 완료! 학습 계속...")
                     else:
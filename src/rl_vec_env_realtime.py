@@ -0,0 +1,134 @@
+"""
+멀티 클라이언트 실시간 VecEnv
+여러 게임 클라이언트(창)를 동시에 플레이하며 경험 수집
+
+- 클라이언트마다 캡처 영역 + 입력 대상(창 핸들) 분리
+- 스텝마다 모든 창을 감싸는 영역을 한 번 캡처 → 영역별 슬라이스를 서브 환경에 분배
+- 서브 환경 step()은 스레드 풀에서 병렬 실행 (키 홀드 대기 시간이 겹침)
+- SB3에는 하나의 VecEnv로 노출 (PPO(n_envs=N))
+"""
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from src.capture import SharedScreenCapture, region_from_spec
+from src.env_registry import GAME_ENVS
+from src.input_backend import KeyboardInput, WindowInput, find_window
+
+
+class MultiClientRealtimeVecEnv(DummyVecEnv):
+    """서브 환경을 병렬 스레드로 스텝하는 VecEnv
+
+    DummyVecEnv와 API/자동 리셋 동작은 같고, step/reset만 병렬로 실행한다.
+    """
+
+    def __init__(self, env_fns, shared_capture=None):
+        """
+        Args:
+            env_fns: 서브 환경 생성 함수 리스트
+            shared_capture: 서브 환경들이 공유하는 SharedScreenCapture (close 시 함께 종료)
+        """
+        super().__init__(env_fns)
+        self.shared_capture = shared_capture
+        self._pool = ThreadPoolExecutor(max_workers=self.num_envs, thread_name_prefix="client")
+
+    def _step_one(self, env_idx):
+        env = self.envs[env_idx]
+        obs, reward, terminated, truncated, info = env.step(self.actions[env_idx])
+        reset_info = None
+        if terminated or truncated:
+            info["terminal_observation"] = obs
+            obs, reset_info = env.reset()
+        return obs, reward, terminated, truncated, info, reset_info
+
+    def step_wait(self):
+        results = list(self._pool.map(self._step_one, range(self.num_envs)))
+
+        for env_idx, (obs, reward, terminated, truncated, info, reset_info) in enumerate(results):
+            self.buf_rews[env_idx] = reward
+            self.buf_dones[env_idx] = terminated or truncated
+            info["TimeLimit.truncated"] = truncated and not terminated
+            self.buf_infos[env_idx] = info
+            if reset_info is not None:
+                self.reset_infos[env_idx] = reset_info
+            self._save_obs(env_idx, obs)
+
+        return (self._obs_from_buf(), np.copy(self.buf_rews), np.copy(self.buf_dones), deepcopy(self.buf_infos))
+
+    def reset(self):
+        def reset_one(env_idx):
+            maybe_options = {"options": self._options[env_idx]} if self._options[env_idx] else {}
+            return self.envs[env_idx].reset(seed=self._seeds[env_idx], **maybe_options)
+
+        results = list(self._pool.map(reset_one, range(self.num_envs)))
+        for env_idx, (obs, reset_info) in enumerate(results):
+            self.reset_infos[env_idx] = reset_info
+            self._save_obs(env_idx, obs)
+
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs_from_buf()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        super().close()
+        if self.shared_capture is not None:
+            self.shared_capture.close()
+
+
+def resolve_clients(client_specs):
+    """설정의 clients 항목을 (캡처 영역, 입력 대상) 리스트로 변환
+
+    clients 항목 예시 (configs/<GAME>.yaml):
+        clients:
+          - window: "MapleStory"            # 창 제목 (영역/입력 대상 자동)
+          - region: {left: 1920, top: 0, width: 1366, height: 768}
+            window: "MapleStory (2)"
+    """
+    regions = []
+    inputs = []
+    for i, spec in enumerate(client_specs):
+        hwnd = None
+        region = spec.get('region')
+        if spec.get('window'):
+            found = find_window(spec['window'])
+            if found is None:
+                raise RuntimeError(f"게임 창을 찾을 수 없습니다: {spec['window']} (클라이언트 {i})")
+            hwnd, window_region = found
+            region = region or window_region
+        if region is None:
+            raise ValueError(f"클라이언트 {i}: 'window' 또는 'region'이 필요합니다")
+
+        region = region_from_spec(region)
+        regions.append(region)
+        inputs.append(WindowInput(hwnd, region) if hwnd is not None else None)
+
+    # 창 핸들이 없는 클라이언트는 전역 키보드 입력 (최대 1개만 의미 있음, 클릭은 영역 오프셋만큼 옮김)
+    if sum(inp is None for inp in inputs) > 1:
+        raise ValueError("창 핸들 없이 전역 키보드를 쓰는 클라이언트는 하나만 가능합니다")
+    inputs = [inp if inp is not None else KeyboardInput(region) for inp, region in zip(inputs, regions)]
+
+    return regions, inputs
+
+
+def make_multi_client_vec_env(game, client_specs, **env_kwargs):
+    """게임 클라이언트 N개를 묶은 VecEnv 생성
+
+    Args:
+        game: 'ML' 또는 'MP'
+        client_specs: 클라이언트 설정 리스트 (resolve_clients 참고)
+        env_kwargs: 서브 환경 생성 인자 (frame_width, frame_skip 등)
+    """
+    env_class = GAME_ENVS[game]
+    regions, inputs = resolve_clients(client_specs)
+    shared = SharedScreenCapture(regions)
+
+    def make_env(index):
+        def _init():
+            return env_class(capture=shared.view(index), input_backend=inputs[index], **env_kwargs)
+        return _init
+
+    print(f"🖥️  멀티 클라이언트: {len(regions)}개 (캡처 영역 {shared.monitor})")
+    return MultiClientRealtimeVecEnv([make_env(i) for i in range(len(regions))], shared_capture=shared)
@@ -0,0 +1,525 @@
+"""
+헤드리스 2D 사냥 시뮬레이터
+실제 게임 없이 ML/MP 실시간 환경과 같은 관측/행동 공간으로 학습 코드를 돌리기 위한 가상 게임
+
+- 가로 스크롤 사냥터: 발판, 좌우 벽, 몬스터(처치 시 경험치), 카메라가 캐릭터를 따라 이동
+- HUD: configs/roi_settings.json의 exp_bar ROI 위치에 노란 경험치 바 (화면 크기에 맞게 축소)
+- 위험 이벤트: assets/의 WARNING 배너 + NPC 표시 → NPC 클릭 시 대화창 → 대화창 클릭 시 회피
+  (배너 위치를 'warning' ROI로 넘겨 위험 감지는 그 영역만 템플릿 매칭)
+- 입력/캡처는 SimInput/SimCapture로 주입 → 환경 코드(보상, 위험 감지, 회피)는 그대로 사용
+- 환경의 키 홀드/대기는 VirtualClock(src/utils/clock.py)으로 가상 시간만 진행 → 실제 대기 없이 CPU 속도로 진행
+- 같은 seed면 같은 맵/몬스터/이벤트 (결정적)
+"""
+import cv2
+import numpy as np
+
+from src.rl_env_ml import MLRealtimeEnv
+from src.rl_env_mp import MPRealtimeEnv
+from src.utils.clock import VirtualClock
+
+
+# 기준 해상도 (ROI/템플릿이 만들어진 실제 게임 화면)
+REFERENCE_SIZE = (1920, 1080)
+DEFAULT_EXP_ROI = {'x': 1186, 'y': 991, 'w': 191, 'h': 25}
+
+WARNING_ROI_MARGIN = 4  # 위험 감지 ROI = 배너 위치 + 여백 (픽셀)
+
+# 키 설정 항목 → 시뮬레이터 동작
+BINDING_ROLES = {
+    'move_left': 'left',
+    'move_right': 'right',
+    'move_up': 'up',
+    'move_down': 'down',
+    'attack': 'attack',
+    'skill_key': 'skill',
+    'teleport': 'teleport',
+    'jump': 'jump',
+}
+
+# 색상 (BGR)
+COLOR_PLATFORM = (40, 80, 120)
+COLOR_PLAYER = (200, 120, 40)
+COLOR_MONSTER = (40, 40, 200)
+COLOR_EXP = (0, 210, 255)       # HSV 색상 약 25 (환경의 노란색 범위 20~30)
+COLOR_EXP_EMPTY = (50, 50, 50)
+
+
+def load_scaled_template(path, scale):
+    """템플릿 이미지를 시뮬레이터 화면 배율로 축소 (환경/월드가 같은 함수를 사용해야 정확히 일치)"""
+    template = cv2.imread(str(path))
+    if template is None:
+        return None
+    if scale == 1.0:
+        return template
+    h, w = template.shape[:2]
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(template, size, interpolation=cv2.INTER_AREA)
+
+
+def scale_roi(roi, scale):
+    return {k: max(1, int(round(v * scale))) for k, v in roi.items()}
+
+
+class SimWorld:
+    """가상 사냥터 상태 + 물리 + 렌더링"""
+
+    def __init__(self, screen_size=(320, 180), exp_roi=None, key_roles=None, seed=None,
+                 map_screens=3, n_monsters=8, templates=None, physics_dt=1 / 30,
+                 first_warning=(20, 60), warning_interval=(60, 120)):
+        """
+        Args:
+            screen_size: 렌더링 화면 크기 (width, height)
+            exp_roi: 경험치 바 영역 (화면 좌표, {'x','y','w','h'})
+            key_roles: 실제 키 이름(소문자) → 동작 ('left', 'attack', 'teleport', ...)
+            map_screens: 맵 가로 길이 (화면 너비 배수)
+            templates: {'warning', 'npc', 'dialog'} BGR 이미지 (없으면 해당 요소 생략)
+            physics_dt: 물리 적분 간격 (가상 초)
+            first_warning / warning_interval: 위험 이벤트 발생 시각 범위 (가상 초)
+        """
+        self.width, self.height = screen_size
+        self.scale = self.width / REFERENCE_SIZE[0]
+        self.exp_roi = exp_roi or scale_roi(DEFAULT_EXP_ROI, self.scale)
+        self.key_roles = key_roles or {}
+        self.map_width = self.width * map_screens
+        self.n_monsters = n_monsters
+        self.templates = templates or {}
+        self.physics_dt = physics_dt
+        self.first_warning = first_warning
+        self.warning_interval = warning_interval
+
+        # 크기/속도 (화면 너비 기준 비율)
+        self.player_size = (max(2, self.width // 64), max(4, self.height // 14))
+        self.monster_size = (max(2, self.width // 50), max(3, self.height // 20))
+        self.move_speed = 0.12 * self.width       # 초당 픽셀
+        self.monster_speed = 0.03 * self.width
+        self.teleport_distance = 0.15 * self.width
+        self.attack_range = 0.12 * self.width
+        self.skill_range = 0.2 * self.width
+        self.jump_speed = 1.6 * self.height
+        self.gravity = 4.0 * self.height
+        self.exp_per_kill = 0.05                  # 바 전체 대비 (처치당 exp_bar 너비 5%)
+
+        self.time = 0.0
+        self.seed(seed)
+        self.reset()
+
+    def seed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    # ---------------------------------------------------------------- 상태
+
+    def reset(self):
+        """새 맵 생성 (seed 기준 결정적)"""
+        rng = self.rng
+        h = self.height
+        self.time = 0.0
+
+        # 배경: 카메라 이동이 화면 변화로 나타나도록 크기 다양한 블록 패턴
+        self.background = self._make_background()
+
+        # 발판: 바닥 + 공중 발판 3개 (x0, x1, y)
+        ground_y = int(h * 0.85)
+        platforms = [(0, self.map_width, ground_y)]
+        for i in range(3):
+            x0 = int(rng.uniform(0.1, 0.8) * self.map_width)
+            length = int(rng.uniform(0.3, 0.6) * self.width)
+            y = int(ground_y - (i + 1) * h * 0.18)
+            platforms.append((x0, min(x0 + length, self.map_width - 1), y))
+        self.platforms = np.array(platforms, dtype=np.int64)
+        self._platform_list = self.platforms.tolist()  # 캐릭터 판정용 (스칼라 비교가 작은 배열 연산보다 빠름)
+
+        self.wall_left = int(0.02 * self.map_width)
+        self.wall_right = int(0.98 * self.map_width)
+
+        # 캐릭터
+        self.player_x = float(self.wall_left + self.width * 0.3)
+        self.player_y = float(ground_y)  # 발 위치
+        self.player_vy = 0.0
+        self.on_ground = True
+        self.facing = 1
+        self.held = set()
+
+        # 몬스터 (발판 위를 좌우로 이동)
+        self.monster_platform = rng.integers(0, len(self.platforms), self.n_monsters)
+        self.monster_x = np.array([self._random_x_on(p) for p in self.monster_platform], dtype=np.float64)
+        self.monster_dir = rng.choice([-1.0, 1.0], self.n_monsters)
+        self.monster_alive = np.ones(self.n_monsters, dtype=bool)
+        self.monster_respawn = np.zeros(self.n_monsters)
+        self._update_monster_bounds()
+
+        # 경험치 / 위험 이벤트
+        self.exp = 0.0
+        self.kills = 0
+        self.escapes = 0
+        self.deaths = 0
+        self.warning_active = False
+        self.dialog_open = False
+        self.next_warning = self.rng.uniform(*self.first_warning)
+        self.warning_deadline = 0.0
+
+    def _make_background(self):
+        rng = self.rng
+        bg = np.empty((self.height, self.map_width, 3), dtype=np.uint8)
+        bg[:] = (120, 110, 100)
+        x = 0
+        while x < self.map_width:
+            w = int(rng.integers(self.width // 40 + 2, self.width // 8 + 3))
+            top = int(rng.uniform(0.2, 0.7) * self.height)
+            shade = int(rng.integers(60, 200))
+            bg[top:, x:x + w] = (shade, shade, int(shade * 0.9))
+            x += w
+        return bg
+
+    def _random_x_on(self, platform_idx):
+        x0, x1, _ = self.platforms[platform_idx]
+        x0 = max(x0, self.wall_left)
+        x1 = min(x1, self.wall_right)
+        return self.rng.uniform(x0, x1)
+
+    # ---------------------------------------------------------------- 입력
+
+    def _role(self, key):
+        return self.key_roles.get(key.lower())
+
+    def press(self, key):
+        role = self._role(key)
+        if role is None or key.lower() in self.held:
+            return
+        self.held.add(key.lower())
+
+        if role == 'left':
+            self.facing = -1
+        elif role == 'right':
+            self.facing = 1
+        elif role == 'attack':
+            self._attack(self.attack_range)
+        elif role == 'skill':
+            self._attack(self.skill_range)
+        elif role == 'teleport':
+            self.player_x = float(np.clip(self.player_x + self.facing * self.teleport_distance,
+                                          self.wall_left, self.wall_right))
+            self.on_ground = False  # 발판 밖이면 떨어짐
+        elif role == 'jump' and self.on_ground:
+            self.player_vy = -self.jump_speed
+            self.on_ground = False
+
+    def release(self, key):
+        self.held.discard(key.lower())
+
+    def click(self, x, y):
+        """화면 좌표 클릭 (NPC → 대화창 → 회피)"""
+        if not self.warning_active:
+            return
+        if self.dialog_open:
+            rect = self._dialog_rect()
+            if rect is not None and self._inside(x, y, rect):
+                self._escape()
+        else:
+            rect = self._npc_rect()
+            if rect is not None and self._inside(x, y, rect):
+                self.dialog_open = True
+
+    @staticmethod
+    def _inside(x, y, rect):
+        x0, y0, w, h = rect
+        return x0 <= x < x0 + w and y0 <= y < y0 + h
+
+    def _attack(self, attack_range):
+        """바라보는 방향 attack_range 안, 같은 높이 근처의 몬스터 처치"""
+        dx = (self.monster_x - self.player_x) * self.facing
+        monster_y = self.platforms[self.monster_platform, 2]
+        in_range = (self.monster_alive & (dx >= -self.monster_size[0]) & (dx <= attack_range)
+                    & (np.abs(monster_y - self.player_y) <= self.player_size[1] * 1.5))
+        n_killed = int(in_range.sum())
+        if n_killed:
+            self.monster_alive[in_range] = False
+            self.monster_respawn[in_range] = self.time + self.rng.uniform(5, 8, n_killed)
+            self._update_monster_bounds()
+            self.kills += n_killed
+            self.exp += self.exp_per_kill * n_killed
+            if self.exp >= 1.0:  # 레벨업 → 바 초기화
+                self.exp -= 1.0
+
+    def _escape(self):
+        self.warning_active = False
+        self.dialog_open = False
+        self.escapes += 1
+        self.player_x = float(self.wall_left + self.width * 0.3)
+        self.player_y = float(self.platforms[0, 2])
+        self.player_vy = 0.0
+        self.on_ground = True
+        self.next_warning = self.time + self.rng.uniform(*self.warning_interval)
+
+    # ---------------------------------------------------------------- 물리
+
+    def advance(self, seconds):
+        """가상 시간 진행 (physics_dt 간격으로 적분)"""
+        remaining = seconds
+        while remaining > 1e-9:
+            dt = min(self.physics_dt, remaining)
+            self._physics_step(dt)
+            remaining -= dt
+
+    def _physics_step(self, dt):
+        self.time += dt
+        roles = {self.key_roles.get(k) for k in self.held}
+
+        # 좌우 이동 (벽에서 멈춤)
+        direction = ('right' in roles) - ('left' in roles)
+        if direction:
+            self.player_x = float(min(max(self.player_x + direction * self.move_speed * dt, self.wall_left),
+                                      self.wall_right))
+
+        # 중력 + 발판 착지 (떨어지는 중에 발판을 지나면 착지)
+        if not self.on_ground or not self._platform_under(self.player_y):
+            self.on_ground = False
+            previous_y = self.player_y
+            self.player_vy += self.gravity * dt
+            self.player_y += self.player_vy * dt
+            if self.player_vy > 0:
+                landing = self._landing_platform(previous_y, self.player_y)
+                if landing is not None:
+                    self.player_y = float(landing)
+                    self.player_vy = 0.0
+                    self.on_ground = True
+
+        # 몬스터 이동 (발판 끝에서 방향 전환)
+        low, high = self.monster_low, self.monster_high
+        self.monster_x += self.monster_dir * self.monster_speed * dt
+        turn = (self.monster_x < low) | (self.monster_x > high)
+        self.monster_dir[turn] *= -1
+        np.minimum(np.maximum(self.monster_x, low, out=self.monster_x), high, out=self.monster_x)
+
+        # 몬스터 리스폰 (가장 이른 리스폰 시각이 지났을 때만 확인)
+        if self.time >= self.next_respawn:
+            respawn = ~self.monster_alive & (self.monster_respawn <= self.time)
+            for i in np.flatnonzero(respawn):
+                self.monster_platform[i] = self.rng.integers(0, len(self.platforms))
+                self.monster_x[i] = self._random_x_on(self.monster_platform[i])
+            self.monster_alive |= respawn
+            self._update_monster_bounds()
+
+        # 위험 이벤트 (제한 시간 안에 회피하지 못하면 사망: 경험치 손실 + 시작 위치)
+        if not self.warning_active and self.time >= self.next_warning:
+            self.warning_active = True
+            self.warning_deadline = self.time + 20.0
+        elif self.warning_active and self.time >= self.warning_deadline:
+            self.deaths += 1
+            self.exp = max(0.0, self.exp - 0.1)
+            self._escape()
+            self.escapes -= 1
+
+    def _update_monster_bounds(self):
+        """몬스터별 이동 범위 (발판 양 끝, 벽 안쪽)와 다음 리스폰 시각 - 처치/리스폰 때만 다시 계산"""
+        plat = self.platforms[self.monster_platform]
+        self.monster_low = np.maximum(plat[:, 0], self.wall_left).astype(np.float64)
+        self.monster_high = np.minimum(plat[:, 1], self.wall_right).astype(np.float64)
+        dead = ~self.monster_alive
+        self.next_respawn = float(self.monster_respawn[dead].min()) if dead.any() else np.inf
+
+    def _platform_under(self, y):
+        x = self.player_x
+        return any(x0 <= x <= x1 and abs(py - y) < 0.5 for x0, x1, py in self._platform_list)
+
+    def _landing_platform(self, y_from, y_to):
+        x = self.player_x
+        hits = [py for x0, x1, py in self._platform_list if x0 <= x <= x1 and y_from <= py <= y_to]
+        return min(hits) if hits else None
+
+    # ---------------------------------------------------------------- 렌더링
+
+    def camera_x(self):
+        return int(np.clip(self.player_x - self.width / 2, 0, self.map_width - self.width))
+
+    def _npc_rect(self):
+        npc = self.templates.get('npc')
+        if npc is None:
+            return None
+        h, w = npc.shape[:2]
+        return (int(self.width * 0.05), int(self.height * 0.85) - h, w, h)
+
+    def _dialog_rect(self):
+        dialog = self.templates.get('dialog')
+        if dialog is None:
+            return None
+        h, w = dialog.shape[:2]
+        return ((self.width - w) // 2, (self.height - h) // 2, w, h)
+
+    def warning_rect(self, margin=0):
+        """WARNING 배너 위치 (x, y, w, h), margin만큼 넓힌 영역 (화면 안으로 자름)"""
+        warning = self.templates.get('warning')
+        if warning is None:
+            return None
+        h, w = warning.shape[:2]
+        x, y = (self.width - w) // 2, int(self.height * 0.1)
+        x0, y0 = max(x - margin, 0), max(y - margin, 0)
+        x1, y1 = min(x + w + margin, self.width), min(y + h + margin, self.height)
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def _paste(self, frame, image, rect):
+        x, y, w, h = rect
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x1 > x0 and y1 > y0:
+            frame[y0:y1, x0:x1] = image[y0 - y:y1 - y, x0 - x:x1 - x]
+
+    def render(self):
+        """현재 화면 (BGR, height x width x 3)"""
+        cam = self.camera_x()
+        frame = self.background[:, cam:cam + self.width].copy()
+        thickness = max(1, self.height // 90)
+
+        for x0, x1, y in self.platforms:
+            sx0, sx1 = max(x0 - cam, 0), min(x1 - cam, self.width)
+            if sx1 > sx0:
+                frame[y:y + thickness, sx0:sx1] = COLOR_PLATFORM
+
+        mw, mh = self.monster_size
+        monster_y = self.platforms[self.monster_platform, 2]
+        for x, y in zip(self.monster_x[self.monster_alive], monster_y[self.monster_alive]):
+            sx = int(x) - cam - mw // 2
+            if -mw < sx < self.width:
+                frame[max(int(y) - mh, 0):int(y), max(sx, 0):max(sx + mw, 0)] = COLOR_MONSTER
+
+        pw, ph = self.player_size
+        sx = int(self.player_x) - cam - pw // 2
+        py = int(min(self.player_y, self.height))
+        frame[max(py - ph, 0):py, max(sx, 0):max(sx + pw, 0)] = COLOR_PLAYER
+
+        # 위험 이벤트 (WARNING 배너 + NPC, 클릭 후 대화창)
+        if self.warning_active:
+            if self.templates.get('warning') is not None:
+                self._paste(frame, self.templates['warning'], self.warning_rect())
+            npc_rect = self._npc_rect()
+            if npc_rect is not None:
+                self._paste(frame, self.templates['npc'], npc_rect)
+            if self.dialog_open and self._dialog_rect() is not None:
+                self._paste(frame, self.templates['dialog'], self._dialog_rect())
+
+        # 경험치 바 (HUD, 카메라와 무관)
+        roi = self.exp_roi
+        x, y, w, h = roi['x'], roi['y'], roi['w'], roi['h']
+        frame[y:y + h, x:x + w] = COLOR_EXP_EMPTY
+        filled = int(round(self.exp * w))
+        frame[y:y + h, x:x + filled] = COLOR_EXP
+
+        return frame
+
+
+class SimCapture:
+    """시뮬레이터 화면 캡처 (ScreenCapture와 같은 인터페이스)"""
+
+    def __init__(self, world):
+        self.world = world
+        self.monitor = {'left': 0, 'top': 0, 'width': world.width, 'height': world.height}
+
+    def grab(self):
+        return self.world.render()
+
+    def close(self):
+        pass
+
+
+class SimInput:
+    """시뮬레이터 입력 (KeyboardInput과 같은 인터페이스)"""
+
+    def __init__(self, world):
+        self.world = world
+
+    def press(self, key):
+        self.world.press(key)
+
+    def release(self, key):
+        self.world.release(key)
+
+    def click(self, x, y):
+        self.world.click(x, y)
+
+    def release_all(self, keys):
+        for key in keys:
+            self.world.release(key)
+
+
+class SimEnvMixin:
+    """실시간 환경을 시뮬레이터에 연결 (캡처/입력/시간 교체)
+
+    환경 코드(행동, 보상, 위험 감지, 회피)는 그대로 실행되고
+    clock.sleep은 실제 대기 대신 가상 시간만 진행한다 (VirtualClock → world.advance).
+    """
+
+    def _init_sim(self, env_class, seed, screen_size, env_kwargs):
+        scale = screen_size[0] / REFERENCE_SIZE[0]
+        self.world = SimWorld(screen_size=screen_size, seed=seed, templates={
+            'warning': load_scaled_template("assets/WARNING.png", scale),
+            'npc': load_scaled_template("assets/IFWARNINGappearClick.png", scale),
+            'dialog': load_scaled_template("assets/IFWARNINGappearClick_2.png", scale),
+        })
+        self._seed = seed
+        self._sim_scale = scale
+        env_class.__init__(self, capture=SimCapture(self.world), input_backend=SimInput(self.world),
+                           clock=VirtualClock(on_advance=self.world.advance), **env_kwargs)
+        self.world.seed(seed)
+        self.world.reset()
+
+        # 위험 감지 템플릿도 같은 배율 (ML)
+        if hasattr(self, 'danger_monster_template'):
+            self.danger_monster_template = self.world.templates['warning']
+            self.npc_template = self.world.templates['npc']
+            self.dialog_template = self.world.templates['dialog']
+
+    def bind_keys(self, keybindings):
+        super().bind_keys(keybindings)
+        # 키 설정 → 시뮬레이터 동작
+        self.world.key_roles = {
+            key.lower(): BINDING_ROLES.get(self.ACTION_BINDINGS[action][0], 'buff')
+            for action, key in self.action_map.items()
+        }
+
+    def set_roi_settings(self, roi_settings):
+        # 실제 게임 ROI를 시뮬레이터 화면 배율로
+        roi = (roi_settings or {}).get('exp_bar', DEFAULT_EXP_ROI)
+        scaled = {'exp_bar': scale_roi(roi, self._sim_scale)}
+        # 위험 감지는 배너가 나타나는 자리만 매칭 (화면 전체 템플릿 매칭이 시뮬레이터 스텝 비용의 대부분)
+        warning = self.world.warning_rect(margin=WARNING_ROI_MARGIN)
+        if warning is not None:
+            scaled['warning'] = dict(zip(('x', 'y', 'w', 'h'), warning))
+        super().set_roi_settings(scaled)
+        self.world.exp_roi = self.roi_settings['exp_bar']
+
+    def reset(self, seed=None, options=None):
+        # 실제 게임처럼 에피소드가 끝나도 월드는 계속 진행 (seed를 주면 새 맵으로 재시작)
+        if seed is not None:
+            self.world.seed(seed)
+            self.world.reset()
+        return super().reset(seed=seed, options=options)
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = super().step(action)
+        info['sim'] = {
+            'time': self.world.time,
+            'kills': self.world.kills,
+            'exp': self.world.exp,
+            'escapes': self.world.escapes,
+            'deaths': self.world.deaths,
+        }
+        return obs, reward, terminated, truncated, info
+
+
+class SimMLEnv(SimEnvMixin, MLRealtimeEnv):
+    """ML 환경 + 시뮬레이터 (행동 11개, 관측 동일)"""
+
+    def __init__(self, seed=None, screen_size=(320, 180), **env_kwargs):
+        self._init_sim(MLRealtimeEnv, seed, screen_size, env_kwargs)
+
+
+class SimMPEnv(SimEnvMixin, MPRealtimeEnv):
+    """MP 환경 + 시뮬레이터 (행동 8개, 관측 동일)"""
+
+    def __init__(self, seed=None, screen_size=(320, 180), **env_kwargs):
+        self._init_sim(MPRealtimeEnv, seed, screen_size, env_kwargs)
+
+
+SIM_ENVS = {
+    'ML': SimMLEnv,
+    'MP': SimMPEnv,
+}
@@ -0,0 +1,499 @@
+"""
+배치 시뮬레이터 VecEnv
+sim_game.py의 사냥터 N개를 환경별 객체 없이 NumPy 배열(환경 축 = 0번 축)로 한꺼번에 진행
+
+- 상태: 캐릭터 위치/속도, 발판, 몬스터(위치/방향/생존/리스폰), 경험치를 (N,) / (N, M) 배열로 보관
+- 물리/공격/리스폰/경험치/보상/84x84 렌더링 모두 배열 연산 (환경별 파이썬 루프 없음)
+- 관측/행동 공간은 ML/MP 실시간 환경과 동일 → 같은 CnnPolicy로 학습 후 실제 게임에 그대로 사용
+- 보상은 ML/MP 환경의 항목별 보상 규칙을 상태 기반으로 계산 (화면 변화 → 캐릭터 이동/처치 여부)
+- 위험 이벤트(WARNING/NPC 클릭 회피)는 정책 행동이 아니므로 생략 (회피 로직 검증은 SimMLEnv 사용)
+- 실제 게임처럼 에피소드가 끝나도 월드는 계속 진행 (reset()/seed() 때만 새 맵)
+
+SB3 VecEnv로 바로 사용:
+    env = VecMonitor(BatchedSimVecEnv("ML", num_envs=256, seed=0))
+    model = PPO("CnnPolicy", env, n_steps=128, batch_size=2048)
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from src.rl_env_ml import MLRealtimeEnv
+from src.rl_env_mp import MPRealtimeEnv
+from src.sim_game import BINDING_ROLES, DEFAULT_EXP_ROI, REFERENCE_SIZE
+from src.utils.config_loader import load_game_config
+
+
+# 동작 번호 (sim_game.BINDING_ROLES의 값 → 정수)
+ROLE_IDS = {'idle': 0, 'left': 1, 'right': 2, 'up': 3, 'down': 4,
+            'attack': 5, 'skill': 6, 'teleport': 7, 'jump': 8, 'buff': 9}
+
+# 그레이스케일 색상 (sim_game.py BGR 색상의 cv2 그레이 변환값)
+GRAY_SKY = 108
+GRAY_PLATFORM = 87
+GRAY_PLAYER = 117
+GRAY_MONSTER = 64
+GRAY_EXP = 199
+GRAY_EXP_EMPTY = 50
+
+# 게임별 규칙 (ML/MP 환경의 _execute_action 키 홀드 시간, 보상 계수는 환경과 같은 GameConfig.reward)
+GAME_RULES = {
+    'ML': {
+        'env_class': MLRealtimeEnv,
+        'n_actions': 11,
+        'hold': {1: 0.05, 2: 0.05, 3: 0.1, 4: 0.3, 5: 0.05, 6: 0.05, 7: 0.05, 10: 0.05},
+        'blocked_actions': (8,),        # 위 방향키 차단 (포탈 방지)
+    },
+    'MP': {
+        'env_class': MPRealtimeEnv,
+        'n_actions': 8,
+        'hold': {1: 0.05, 2: 0.05, 3: 0.05, 4: 0.05, 5: 0.2, 6: 0.15, 7: 0.1},
+        'blocked_actions': (),
+    },
+}
+
+SUB_STEP_DELAY = 0.01  # 환경 step()의 서브 스텝 사이 대기
+
+
+def compile_rules(game, coeffs=None):
+    """게임 규칙 + 보상 계수 → 행동 번호로 인덱싱하는 배열
+
+    Args:
+        coeffs: 보상 계수 (None이면 설정의 GameConfig.reward, 실시간 환경/리라벨링과 같은 형식)
+    """
+    rules = GAME_RULES[game]
+    coeffs = coeffs if coeffs is not None else load_game_config(game=game).reward
+    env_class = rules['env_class']
+    n_actions = rules['n_actions']
+
+    roles = np.zeros(n_actions, dtype=np.int64)
+    for action, (binding, _) in env_class.ACTION_BINDINGS.items():
+        if action not in rules['blocked_actions']:
+            roles[action] = ROLE_IDS[BINDING_ROLES.get(binding, 'buff')]
+
+    def table(values):
+        array = np.zeros(n_actions, dtype=np.float32)
+        for action, value in values.items():
+            array[int(action)] = value
+        return array
+
+    def mask(actions):
+        array = np.zeros(n_actions, dtype=bool)
+        array[list(actions)] = True
+        return array
+
+    # 콤보 규칙 목록 → (이전 행동, 행동) 표 (환경처럼 앞 규칙 우선)
+    combo = np.zeros((n_actions, n_actions), dtype=np.float32)
+    matched = np.zeros((n_actions, n_actions), dtype=bool)
+    for rule in coeffs['combo']:
+        hit = mask(rule['prev'])[:, None] & mask(rule['next'])[None, :] & ~matched
+        combo[hit] = rule['bonus']
+        matched |= hit
+
+    hold = table(rules['hold'])
+    hold[roles == ROLE_IDS['idle']] = 0.0
+
+    stuck = coeffs['stuck']
+    return {
+        'n_actions': n_actions,
+        'roles': roles,
+        'hold': hold,
+        'exp': coeffs['exp']['large'],  # 처치 1회 = 경험치 바가 large_pixels 넘게 증가
+        'action': table(coeffs['action']),
+        'combo': combo,
+        'stuck_actions': mask(stuck['actions']),
+        'stuck': (stuck['penalty'], stuck['repeat_penalty'], stuck['repeat_after']),
+        'hit_actions': mask(coeffs['hit']['actions']),
+        'hit': coeffs['hit']['bonus'],
+        'teleport_actions': mask(coeffs['teleport']['actions']),
+        'teleport': coeffs['teleport']['bonus'],
+        'static_exempt': mask(coeffs['static']['exempt_actions']),
+        'static': coeffs['static']['penalty'],
+        'monotony_window': coeffs['monotony']['window'],
+        'monotony': coeffs['monotony']['penalty'],
+    }
+
+
+class BatchedSimVecEnv(VecEnv):
+    """N개 사냥터를 배열 연산으로 동시에 진행하는 VecEnv"""
+
+    render_mode = None
+
+    def __init__(self, game="ML", num_envs=64, frame_width=84, frame_height=84, frame_stack=4,
+                 frame_skip=4, max_steps=1000, n_monsters=8, map_screens=3, seed=None,
+                 physics_dt=1 / 30, reward_coeffs=None):
+        """
+        Args:
+            game: 'ML' 또는 'MP' (행동 공간/보상 규칙)
+            num_envs: 동시에 진행할 월드 수
+            frame_width/frame_height/frame_stack/frame_skip: 실시간 환경과 같은 의미
+            max_steps: 에피소드 길이 (서브 스텝 수, 실시간 환경의 1000과 동일)
+            n_monsters: 월드당 몬스터 수
+            map_screens: 맵 가로 길이 (화면 너비 배수)
+            seed: 난수 시드 (같은 시드 + 같은 행동 → 같은 결과)
+            physics_dt: 물리 적분 간격 (가상 초)
+            reward_coeffs: 보상 계수 (None이면 설정의 보상 계수 = 실시간 환경과 같은 값)
+        """
+        self.game = game
+        self.rules = compile_rules(game, reward_coeffs)
+        self.width, self.height = frame_width, frame_height
+        self.frame_stack = frame_stack
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.n_monsters = n_monsters
+        self.map_width = frame_width * map_screens
+        self.physics_dt = physics_dt
+        self.n_platforms = 4
+
+        # sim_game.SimWorld와 같은 화면 비율 기준 크기/속도 (관측 해상도 픽셀 단위)
+        w, h = self.width, self.height
+        self.player_size = (max(2, w // 40), max(4, h // 14))
+        self.monster_size = (max(2, w // 40), max(3, h // 20))
+        self.move_speed = 0.12 * w
+        self.monster_speed = 0.03 * w
+        self.teleport_distance = 0.15 * w
+        self.attack_range = 0.12 * w
+        self.skill_range = 0.2 * w
+        self.jump_speed = 1.6 * h
+        self.gravity = 4.0 * h
+        self.exp_per_kill = 0.05
+        self.ground_y = int(h * 0.85)
+        self.wall_left = int(0.02 * self.map_width)
+        self.wall_right = int(0.98 * self.map_width)
+
+        # 경험치 바 HUD (기준 해상도 ROI → 관측 해상도)
+        sx, sy = w / REFERENCE_SIZE[0], h / REFERENCE_SIZE[1]
+        self.exp_roi = (int(DEFAULT_EXP_ROI['x'] * sx), int(DEFAULT_EXP_ROI['y'] * sy),
+                        max(2, int(round(DEFAULT_EXP_ROI['w'] * sx))), max(1, int(round(DEFAULT_EXP_ROI['h'] * sy))))
+
+        observation_space = spaces.Box(low=0, high=255, shape=(frame_stack, frame_height, frame_width), dtype=np.uint8)
+        action_space = spaces.Discrete(self.rules['n_actions'])
+        super().__init__(num_envs, observation_space, action_space)
+
+        self._arange = np.arange(num_envs)
+        self._rng = np.random.default_rng(seed)
+        self._actions = np.zeros(num_envs, dtype=np.int64)
+        self._allocate()
+        self._reset_worlds(self._arange)
+
+    # ---------------------------------------------------------------- 상태
+
+    def _allocate(self):
+        n, m, p = self.num_envs, self.n_monsters, self.n_platforms
+        self.time = np.zeros(n)
+        self.background = np.zeros((n, self.height, self.map_width), dtype=np.uint8)
+        # 카메라 위치별 화면 너비 창 (복사 없는 뷰, [env, :, cam]으로 화면 단위 복사)
+        self._background_windows = sliding_window_view(self.background, self.width, axis=2)
+        self.platforms = np.zeros((n, p, 3), dtype=np.int64)   # (x0, x1, y)
+
+        self.player_x = np.zeros(n)
+        self.player_y = np.zeros(n)
+        self.player_vy = np.zeros(n)
+        self.on_ground = np.ones(n, dtype=bool)
+        self.facing = np.ones(n, dtype=np.int64)
+
+        self.monster_x = np.zeros((n, m))
+        self.monster_y = np.zeros((n, m))
+        self.monster_low = np.zeros((n, m))
+        self.monster_high = np.zeros((n, m))
+        self.monster_dir = np.ones((n, m))
+        self.monster_alive = np.ones((n, m), dtype=bool)
+        self.monster_respawn = np.zeros((n, m))
+
+        self.exp = np.zeros(n)
+        self.kills = np.zeros(n, dtype=np.int64)
+
+        # 에피소드 상태 (환경의 step_count, action_history, stuck_count)
+        self.step_count = np.zeros(n, dtype=np.int64)
+        self.episode_reward = np.zeros(n)
+        self.episode_kills = np.zeros(n, dtype=np.int64)
+        self.history = np.full((n, self.rules['monotony_window']), -1, dtype=np.int64)
+        self.history_len = np.zeros(n, dtype=np.int64)
+        self.stuck_count = np.zeros(n, dtype=np.int64)
+        self.obs = np.zeros((n, self.frame_stack, self.height, self.width), dtype=np.uint8)
+
+    def _reset_worlds(self, idx):
+        """idx 월드를 새 맵으로 (배경, 발판, 캐릭터, 몬스터, 경험치)"""
+        rng = self._rng
+        k = len(idx)
+        w, h, mw = self.width, self.height, self.map_width
+
+        # 배경: 폭/높이/밝기가 다른 블록 (카메라 이동이 화면 변화로 나타나도록)
+        min_w, max_w = w // 40 + 2, w // 8 + 3
+        n_blocks = mw // min_w + 1
+        widths = rng.integers(min_w, max_w, (k, n_blocks))
+        starts = np.cumsum(widths, axis=1) - widths
+        tops = (rng.uniform(0.2, 0.7, (k, n_blocks)) * h).astype(np.int64)
+        shades = rng.integers(60, 200, (k, n_blocks))
+        block = np.count_nonzero(np.arange(mw)[None, None, :] >= starts[:, :, None], axis=1) - 1
+        top_col = np.take_along_axis(tops, block, axis=1)
+        shade_col = np.take_along_axis(shades, block, axis=1)
+        rows = np.arange(h)[None, :, None]
+        self.background[idx] = np.where(rows >= top_col[:, None, :], shade_col[:, None, :], GRAY_SKY)
+
+        # 발판: 바닥 + 공중 발판 3개
+        platforms = np.zeros((k, self.n_platforms, 3), dtype=np.int64)
+        platforms[:, 0] = (0, mw, self.ground_y)
+        x0 = (rng.uniform(0.1, 0.8, (k, self.n_platforms - 1)) * mw).astype(np.int64)
+        length = (rng.uniform(0.3, 0.6, (k, self.n_platforms - 1)) * w).astype(np.int64)
+        platforms[:, 1:, 0] = x0
+        platforms[:, 1:, 1] = np.minimum(x0 + length, mw - 1)
+        platforms[:, 1:, 2] = (self.ground_y - np.arange(1, self.n_platforms) * h * 0.18).astype(np.int64)
+        self.platforms[idx] = platforms
+
+        self.time[idx] = 0.0
+        self._reset_player(idx)
+        self.monster_alive[idx] = False
+        self.monster_respawn[idx] = 0.0
+        self._respawn_monsters(idx)
+        self.monster_dir[idx] = rng.choice([-1.0, 1.0], (k, self.n_monsters))
+        self.exp[idx] = 0.0
+        self.kills[idx] = 0
+        self._reset_episodes(idx)
+
+    def _reset_player(self, idx):
+        self.player_x[idx] = self.wall_left + self.width * 0.3
+        self.player_y[idx] = self.ground_y
+        self.player_vy[idx] = 0.0
+        self.on_ground[idx] = True
+        self.facing[idx] = 1
+
+    def _reset_episodes(self, idx):
+        """에피소드 카운터만 초기화 (월드는 그대로) + 현재 화면으로 프레임 스택 채우기"""
+        self.step_count[idx] = 0
+        self.episode_reward[idx] = 0.0
+        self.episode_kills[idx] = 0
+        self.history[idx] = -1
+        self.history_len[idx] = 0
+        self.stuck_count[idx] = 0
+        self.obs[idx] = self._render()[idx, None]
+
+    def _respawn_monsters(self, idx):
+        """idx 월드에서 리스폰 시각이 지난 몬스터를 임의 발판 위에 다시 배치"""
+        respawn = ~self.monster_alive[idx] & (self.monster_respawn[idx] <= self.time[idx, None])
+        if not respawn.any():
+            return
+        rng = self._rng
+        shape = respawn.shape
+        platform = rng.integers(0, self.n_platforms, shape)
+        plat = np.take_along_axis(self.platforms[idx], platform[..., None], axis=1)  # (k, M, 3)
+        low = np.maximum(plat[..., 0], self.wall_left)
+        high = np.minimum(plat[..., 1], self.wall_right)
+        x = low + rng.random(shape) * (high - low)
+
+        for name, value in (('monster_x', x), ('monster_y', plat[..., 2]),
+                            ('monster_low', low), ('monster_high', high)):
+            array = getattr(self, name)
+            array[idx] = np.where(respawn, value, array[idx])
+        self.monster_alive[idx] |= respawn
+
+    # ---------------------------------------------------------------- 진행
+
+    def _attack(self, attack_range):
+        """바라보는 방향 attack_range 안, 같은 높이 근처의 몬스터 처치 (range가 0인 월드는 공격 안 함)
+
+        Returns:
+            월드별 처치 수
+        """
+        dx = (self.monster_x - self.player_x[:, None]) * self.facing[:, None]
+        hit = (self.monster_alive & (attack_range[:, None] > 0)
+               & (dx >= -self.monster_size[0]) & (dx <= attack_range[:, None])
+               & (np.abs(self.monster_y - self.player_y[:, None]) <= self.player_size[1] * 1.5))
+        killed = np.count_nonzero(hit, axis=1)
+        if killed.any():
+            self.monster_alive &= ~hit
+            self.monster_respawn = np.where(hit, self.time[:, None] + self._rng.uniform(5, 8, hit.shape),
+                                            self.monster_respawn)
+            self.kills += killed
+            self.exp += self.exp_per_kill * killed
+            self.exp = np.where(self.exp >= 1.0, self.exp - 1.0, self.exp)  # 레벨업 → 바 초기화
+        return killed
+
+    def _advance(self, duration, hold, move_dir):
+        """duration초 진행, 처음 hold초 동안 move_dir 방향 이동 (physics_dt 간격 적분)"""
+        remaining = duration.copy()
+        hold_left = hold * (move_dir != 0)
+        x0, x1, py = self.platforms[..., 0], self.platforms[..., 1], self.platforms[..., 2]
+
+        while True:
+            dt = np.minimum(self.physics_dt, remaining)
+            if not dt.any():
+                break
+            remaining -= dt
+            self.time += dt
+
+            # 좌우 이동 (벽에서 멈춤)
+            move_dt = np.minimum(dt, hold_left)
+            hold_left -= move_dt
+            self.player_x = np.clip(self.player_x + move_dir * self.move_speed * move_dt,
+                                    self.wall_left, self.wall_right)
+
+            # 중력 + 발판 착지
+            over = (x0 <= self.player_x[:, None]) & (self.player_x[:, None] <= x1)
+            standing = (over & (np.abs(py - self.player_y[:, None]) < 0.5)).any(axis=1)
+            falling = (dt > 0) & ~(self.on_ground & standing)
+            previous_y = self.player_y
+            vy = np.where(falling, self.player_vy + self.gravity * dt, self.player_vy)
+            y = np.where(falling, self.player_y + vy * dt, self.player_y)
+            crossed = over & (py >= previous_y[:, None]) & (py <= y[:, None]) & (vy > 0)[:, None]
+            landed = falling & crossed.any(axis=1)
+            landing_y = np.where(crossed, py, np.iinfo(np.int64).max).min(axis=1)
+            self.player_y = np.where(landed, landing_y, y)
+            self.player_vy = np.where(landed, 0.0, vy)
+            self.on_ground = np.where(falling, landed, self.on_ground)
+
+            # 몬스터 이동 (발판 끝에서 방향 전환)
+            self.monster_x += self.monster_dir * self.monster_speed * dt[:, None]
+            turn = (self.monster_x < self.monster_low) | (self.monster_x > self.monster_high)
+            self.monster_dir = np.where(turn, -self.monster_dir, self.monster_dir)
+            self.monster_x = np.clip(self.monster_x, self.monster_low, self.monster_high)
+
+    def _sub_step(self, actions):
+        """서브 스텝 1회 (행동 실행 + 대기 + 보상), 월드별 보상 반환"""
+        r = self.rules
+        roles = r['roles'][actions]
+        hold = r['hold'][actions]
+        prev_x, prev_y = self.player_x.copy(), self.player_y.copy()
+
+        # 키 입력 순간 효과 (방향 전환, 공격, 텔레포트, 점프)
+        left, right = roles == ROLE_IDS['left'], roles == ROLE_IDS['right']
+        self.facing = np.where(left, -1, np.where(right, 1, self.facing))
+        attack_range = np.where(roles == ROLE_IDS['attack'], self.attack_range,
+                                np.where(roles == ROLE_IDS['skill'], self.skill_range, 0.0))
+        killed = self._attack(attack_range)
+
+        teleport = roles == ROLE_IDS['teleport']
+        self.player_x = np.where(teleport, np.clip(self.player_x + self.facing * self.teleport_distance,
+                                                   self.wall_left, self.wall_right), self.player_x)
+        self.on_ground &= ~teleport  # 발판 밖이면 떨어짐
+        jump = (roles == ROLE_IDS['jump']) & self.on_ground
+        self.player_vy = np.where(jump, -self.jump_speed, self.player_vy)
+        self.on_ground &= ~jump
+
+        self._advance(hold + SUB_STEP_DELAY, hold, right.astype(np.float64) - left)
+        self._respawn_monsters(self._arange)
+        self.episode_kills += killed
+
+        # 보상 (환경의 화면 변화 판정 → 캐릭터 이동/처치 여부)
+        dx = np.abs(self.player_x - prev_x)
+        changed = (dx > 1e-6) | (np.abs(self.player_y - prev_y) > 1e-6) | (killed > 0)
+        reward = np.where(killed > 0, r['exp'], 0.0)
+
+        stuck = r['stuck_actions'][actions] & ~changed
+        self.stuck_count = np.where(stuck, self.stuck_count + 1, np.maximum(self.stuck_count - 1, 0))
+        penalty, extra, threshold = r['stuck']
+        reward += stuck * penalty + (stuck & (self.stuck_count > threshold)) * extra
+
+        reward += (r['hit_actions'][actions] & (killed > 0)) * r['hit']
+        reward += (r['teleport_actions'][actions] & (dx > 1e-6)) * r['teleport']
+        reward += (~changed & ~r['static_exempt'][actions]) * r['static']
+
+        has_history = self.history_len >= 2
+        prev_action = self.history[:, -1]
+        reward += np.where(has_history, r['combo'][np.maximum(prev_action, 0), actions], 0.0)
+        same = ((self.history == actions[:, None]) | (self.history < 0)).all(axis=1)
+        reward += (has_history & same) * r['monotony']
+        reward += r['action'][actions]
+
+        self.history[:, :-1] = self.history[:, 1:]
+        self.history[:, -1] = actions
+        self.history_len += 1
+        return reward
+
+    # ---------------------------------------------------------------- 렌더링
+
+    def _draw_boxes(self, frame, x, y, visible, size, cam, value):
+        """(N, K) 스프라이트 (x 중앙, y 발 위치)를 사각형으로 그리기"""
+        w, h = size
+        rows = y.astype(np.int64)[..., None, None] + (np.arange(h) - h)[:, None]
+        cols = (x.astype(np.int64) - cam[:, None])[..., None, None] + (np.arange(w) - w // 2)
+        rows, cols = np.broadcast_arrays(rows, cols)
+        valid = (visible[..., None, None] & (rows >= 0) & (rows < self.height)
+                 & (cols >= 0) & (cols < self.width))
+        env = np.broadcast_to(self._arange.reshape((-1,) + (1,) * (rows.ndim - 1)), rows.shape)
+        frame[env[valid], rows[valid], cols[valid]] = value
+
+    def _render(self):
+        """모든 월드의 현재 화면 (N, H, W) uint8 그레이스케일"""
+        w = self.width
+        cam = np.clip(self.player_x - w / 2, 0, self.map_width - w).astype(np.int64)
+        frame = self._background_windows[self._arange, :, cam]
+
+        # 발판 (두께 1픽셀)
+        screen = np.arange(w)
+        for p in range(self.n_platforms):
+            x0, x1, y = (self.platforms[:, p, i] for i in range(3))
+            on = (screen >= (x0 - cam)[:, None]) & (screen < (x1 - cam)[:, None])
+            frame[self._arange, y] = np.where(on, GRAY_PLATFORM, frame[self._arange, y])
+
+        self._draw_boxes(frame, self.monster_x, self.monster_y, self.monster_alive, self.monster_size, cam, GRAY_MONSTER)
+        self._draw_boxes(frame, self.player_x[:, None], self.player_y[:, None],
+                         np.ones((self.num_envs, 1), dtype=bool), self.player_size, cam, GRAY_PLAYER)
+
+        # 경험치 바 (HUD, 카메라와 무관)
+        x, y, bw, bh = self.exp_roi
+        filled = np.round(self.exp * bw)[:, None] > np.arange(bw)
+        frame[:, y:y + bh, x:x + bw] = np.where(filled[:, None, :], GRAY_EXP, GRAY_EXP_EMPTY)
+        return frame
+
+    # ---------------------------------------------------------------- VecEnv
+
+    def reset(self):
+        # seed()로 예약된 시드가 있으면 난수 재설정
+        if any(seed is not None for seed in self._seeds):
+            self._rng = np.random.default_rng([seed for seed in self._seeds if seed is not None])
+        self._reset_seeds()
+        self._reset_worlds(self._arange)
+        self.reset_infos = [{} for _ in range(self.num_envs)]
+        return self.obs.copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        # 프레임 스택 갱신: 이전 프레임을 앞으로 밀고 서브 스텝 프레임을 순서대로 추가
+        # (frame_skip > frame_stack이면 스택에 남는 마지막 프레임만 렌더링)
+        n_new = min(self.frame_skip, self.frame_stack)
+        keep = self.frame_stack - n_new
+        if keep > 0:
+            self.obs[:, :keep] = self.obs[:, -keep:]
+
+        rewards = np.zeros(self.num_envs)
+        for k in range(self.frame_skip):
+            rewards += self._sub_step(self._actions)
+            slot = keep + k - (self.frame_skip - n_new)
+            if slot >= keep:
+                self.obs[:, slot] = self._render()
+
+        self.step_count += self.frame_skip
+        self.episode_reward += rewards
+        dones = self.step_count >= self.max_steps
+        obs = self.obs.copy()
+
+        infos = [{'step': step, 'episode_reward': episode_reward}
+                 for step, episode_reward in zip(self.step_count.tolist(), self.episode_reward.tolist())]
+        done_idx = np.flatnonzero(dones)
+        if len(done_idx):
+            for i in done_idx:
+                infos[i]['terminal_observation'] = obs[i]
+                infos[i]['TimeLimit.truncated'] = False
+                infos[i]['sim'] = {'kills': int(self.episode_kills[i]), 'exp': float(self.exp[i])}
+            self._reset_episodes(done_idx)
+            obs[done_idx] = self.obs[done_idx]
+
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return [getattr(self, method_name)(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -0,0 +1,450 @@
+"""
+실시간 세션 전이 로그 (메모리 맵 청크 저장소)
+모든 env 스텝을 디스크에 기록해 오프라인 학습/보상 리라벨링/벤치마크에 재사용
+
+세션 디렉토리 구조 (datasets/transitions/<GAME>_<시각>/):
+    meta.json              세션 정보 (프레임 크기, 스택, 보상 항목, 개수 등)
+    frames_00000.npy       (chunk_size, H, W) uint8 전처리 프레임 (프레임당 1번만 저장)
+    frame_info_00000.npy   프레임별 시각/화면 변화량/경험치 픽셀/보상 항목
+    steps_00000.npy        스텝별 행동/보상/종료/쿨타임/프레임 범위
+
+관측(프레임 스택)은 steps의 frame_end에서 frame_stack개를 거슬러 올라가 재구성
+(에피소드 시작 이전 프레임은 첫 프레임으로 채움 = reset() 동작과 동일)
+
+- TransitionWriter: 백그라운드 스레드가 디스크 기록 (스텝 루프는 큐에 넣기만 함)
+  meta.json 개수는 새 청크를 열 때와 meta_interval초마다 갱신 (비정상 종료 시에도 그때까지 기록은 읽힘)
+- TransitionLogWrapper: 환경에 씌우면 모든 스텝 자동 기록
+- TransitionStore: 여러 세션을 열어 무작위 접근 샘플링
+"""
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import gymnasium as gym
+import numpy as np
+
+from src.utils.clock import REAL_CLOCK, clock_of
+
+
+FORMAT_VERSION = 1
+
+
+def _frame_info_dtype(term_names):
+    fields = [('timestamp', '<f8'), ('step', '<i8'), ('change_score', '<f4'),
+              ('exp_pixels', '<i4'), ('reward', '<f4')]
+    fields += [(f'term_{name}', '<f4') for name in term_names]
+    return np.dtype(fields)
+
+
+def _step_dtype(n_cooldowns):
+    return np.dtype([
+        ('timestamp', '<f8'), ('action', '<i2'), ('reward', '<f4'),
+        ('terminated', '?'), ('truncated', '?'), ('episode', '<i4'),
+        ('episode_frame_start', '<i8'), ('frame_begin', '<i8'), ('frame_end', '<i8'),
+        ('cooldowns', '<f4', (n_cooldowns,)),
+    ])
+
+
+def write_json_atomic(path, data):
+    """JSON 저장 (임시 파일에 쓴 뒤 교체 → 읽는 쪽은 항상 완전한 파일만 봄)"""
+    path = Path(path)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class _ChunkedTable:
+    """고정 크기 청크(.npy 메모리 맵)로 나뉜 추가 전용 테이블"""
+
+    def __init__(self, directory, name, dtype, row_shape, chunk_size):
+        self.directory = Path(directory)
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self.row_shape = tuple(row_shape)
+        self.chunk_size = chunk_size
+        self.count = 0
+        self._chunk_index = -1
+        self._chunk = None
+
+    def chunk_path(self, index):
+        return self.directory / f"{self.name}_{index:05d}.npy"
+
+    def _open_chunk(self, index):
+        if self._chunk is not None:
+            self._chunk.flush()
+        self._chunk = np.lib.format.open_memmap(
+            self.chunk_path(index), mode='w+', dtype=self.dtype,
+            shape=(self.chunk_size,) + self.row_shape)
+        self._chunk_index = index
+
+    def append(self, rows):
+        """행 추가 (청크 경계를 넘으면 다음 청크 생성)
+
+        Returns:
+            새 청크가 열렸는지 여부
+        """
+        opened = False
+        offset = 0
+        while offset < len(rows):
+            index, row = divmod(self.count, self.chunk_size)
+            if index != self._chunk_index:
+                self._open_chunk(index)
+                opened = True
+            n = min(len(rows) - offset, self.chunk_size - row)
+            self._chunk[row:row + n] = rows[offset:offset + n]
+            offset += n
+            self.count += n
+        return opened
+
+    def flush(self):
+        if self._chunk is not None:
+            self._chunk.flush()
+
+    def close(self):
+        self.flush()
+        self._chunk = None
+
+
+class TransitionWriter:
+    """세션 전이 기록기 (디스크 기록은 백그라운드 스레드)"""
+
+    def __init__(self, root, game, frame_shape, frame_stack, frame_skip,
+                 term_names=(), cooldown_actions=(), chunk_size=4096, clock=None, meta_interval=5.0):
+        """
+        Args:
+            root: 세션 디렉토리들을 만들 상위 경로
+            game: 게임 이름
+            frame_shape: 전처리 프레임 크기 (H, W)
+            frame_stack / frame_skip: 환경 설정 (관측 재구성에 사용)
+            term_names: 보상 항목 이름
+            cooldown_actions: 쿨타임을 기록할 행동 번호
+            chunk_size: 청크당 행 수
+            clock: 타임스탬프 시계 (None이면 실제 시계, 가상 시계 환경은 환경 시각 기록)
+            meta_interval: meta.json 개수 갱신 주기 (초, 실제 시간)
+        """
+        if frame_skip > frame_stack:
+            # 스텝당 새 프레임이 스택보다 많으면 관측에서 밀려난 프레임은 기록할 수 없음
+            raise ValueError(f"frame_skip({frame_skip})이 frame_stack({frame_stack})보다 크면 "
+                             f"전이를 기록할 수 없습니다")
+        self.meta_interval = meta_interval
+        self.clock = clock if clock is not None else REAL_CLOCK
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.session_dir = Path(root) / f"{game}_{timestamp}"
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+
+        self.term_names = tuple(term_names)
+        self.frame_info_dtype = _frame_info_dtype(self.term_names)
+        self.step_dtype = _step_dtype(len(cooldown_actions))
+
+        self.meta = {
+            'version': FORMAT_VERSION,
+            'game': game,
+            'created_at': timestamp,
+            'frame_shape': list(frame_shape),
+            'frame_stack': frame_stack,
+            'frame_skip': frame_skip,
+            'chunk_size': chunk_size,
+            'reward_terms': list(self.term_names),
+            'cooldown_actions': list(cooldown_actions),
+            'num_frames': 0,
+            'num_steps': 0,
+            'num_episodes': 0,
+            'closed': False,
+        }
+
+        self._frames = _ChunkedTable(self.session_dir, 'frames', np.uint8, frame_shape, chunk_size)
+        self._frame_info = _ChunkedTable(self.session_dir, 'frame_info', self.frame_info_dtype, (), chunk_size)
+        self._steps = _ChunkedTable(self.session_dir, 'steps', self.step_dtype, (), chunk_size)
+
+        # 호출 스레드에서 관리하는 인덱스 (디스크 기록 완료와 무관하게 즉시 확정)
+        self._frame_count = 0
+        self._step_count = 0
+        self._episode = -1
+        self._episode_frame_start = 0
+        self._last_frame_end = 0
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="transition-writer", daemon=True)
+        self._thread.start()
+        self._write_meta()
+
+        print(f"💾 전이 로그 기록: {self.session_dir}")
+
+    def _frame_rows(self, step, infos, n):
+        rows = np.zeros(n, dtype=self.frame_info_dtype)
+        rows['step'] = step
+        # 기록이 프레임 수보다 적으면 뒤쪽(최신) 프레임에 맞춰 정렬
+        recent = infos[-n:]
+        for i, info in enumerate(recent, start=n - len(recent)):
+            rows[i]['timestamp'] = info.get('timestamp', 0.0)
+            rows[i]['change_score'] = info.get('change_score', 0.0)
+            rows[i]['exp_pixels'] = info.get('exp_pixels', -1)
+            terms = info.get('terms', {})
+            rows[i]['reward'] = sum(terms.values())
+            for name in self.term_names:
+                rows[i][f'term_{name}'] = terms.get(name, 0.0)
+        return rows
+
+    def add_reset(self, frame):
+        """에피소드 시작 프레임 기록"""
+        self._episode += 1
+        self._episode_frame_start = self._frame_count
+        rows = self._frame_rows(-1, [{'timestamp': self.clock.time()}], 1)
+        self._queue.put(('frames', np.asarray(frame, dtype=np.uint8)[None].copy(), rows))
+        self._frame_count += 1
+        self._last_frame_end = self._frame_count
+
+    def add_step(self, frames, frame_infos, action, reward, terminated, truncated, cooldowns=None):
+        """스텝 기록
+
+        Args:
+            frames: 이번 스텝에 새로 추가된 전처리 프레임 (k, H, W)
+            frame_infos: 서브 스텝별 보상 기록 (BaseRealtimeEnv.reward_terms_history)
+            cooldowns: 버프 행동별 남은 쿨타임
+        """
+        if self._episode < 0:
+            raise RuntimeError("add_reset()을 먼저 호출해야 합니다")
+
+        frames = np.asarray(frames, dtype=np.uint8).copy()
+        frame_rows = self._frame_rows(self._step_count, list(frame_infos), len(frames))
+
+        step_row = np.zeros(1, dtype=self.step_dtype)
+        step_row['timestamp'] = self.clock.time()
+        step_row['action'] = action
+        step_row['reward'] = reward
+        step_row['terminated'] = terminated
+        step_row['truncated'] = truncated
+        step_row['episode'] = self._episode
+        step_row['episode_frame_start'] = self._episode_frame_start
+        step_row['frame_begin'] = self._last_frame_end
+        step_row['frame_end'] = self._frame_count + len(frames)
+        if cooldowns is not None and len(cooldowns):
+            step_row['cooldowns'] = cooldowns
+
+        self._queue.put(('frames', frames, frame_rows))
+        self._queue.put(('step', step_row))
+        self._frame_count += len(frames)
+        self._step_count += 1
+        self._last_frame_end = self._frame_count
+
+    def _run(self):
+        """백그라운드 기록 루프"""
+        last_meta = time.monotonic()
+        pending = False  # meta.json에 아직 반영하지 않은 행이 있는지
+        while True:
+            try:
+                item = self._queue.get(timeout=self.meta_interval)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            opened = False
+            if item and item[0] == 'frames':
+                opened = self._frames.append(item[1])
+                opened |= self._frame_info.append(item[2])
+            elif item:
+                opened = self._steps.append(item[1])
+            pending |= bool(item)
+            if opened or (pending and time.monotonic() - last_meta >= self.meta_interval):
+                self._flush()
+                last_meta = time.monotonic()
+                pending = False
+
+    def _flush(self):
+        """기록된 행을 디스크에 반영한 뒤 meta.json 개수 갱신"""
+        for table in (self._frames, self._frame_info, self._steps):
+            table.flush()
+        self._write_meta()
+
+    def _write_meta(self):
+        self.meta['num_frames'] = self._frames.count
+        self.meta['num_steps'] = self._steps.count
+        self.meta['num_episodes'] = self._episode + 1
+        write_json_atomic(self.session_dir / 'meta.json', self.meta)
+
+    @property
+    def backlog(self):
+        """아직 디스크에 기록되지 않은 항목 수"""
+        return self._queue.qsize()
+
+    def close(self):
+        """남은 항목을 모두 기록하고 세션 종료"""
+        self._queue.put(None)
+        self._thread.join()
+        for table in (self._frames, self._frame_info, self._steps):
+            table.close()
+        self.meta['closed'] = True
+        self._write_meta()
+        print(f"💾 전이 로그 저장 완료: {self.meta['num_steps']} 스텝, {self.meta['num_frames']} 프레임")
+
+
+class TransitionLogWrapper(gym.Wrapper):
+    """모든 스텝을 TransitionWriter로 기록하는 래퍼"""
+
+    def __init__(self, env, root="datasets/transitions", chunk_size=4096):
+        super().__init__(env)
+        base = env.unwrapped
+        self.writer = TransitionWriter(
+            root, base.game,
+            frame_shape=(base.frame_height, base.frame_width),
+            frame_stack=base.frame_stack,
+            frame_skip=base.frame_skip,
+            term_names=getattr(base, 'REWARD_TERMS', ()),
+            cooldown_actions=sorted(getattr(base, 'buff_cooldowns', {})),
+            chunk_size=chunk_size,
+            clock=clock_of(env),
+        )
+
+    def reset(self, seed=None, options=None):
+        obs, info = self.env.reset(seed=seed, options=options)
+        self.writer.add_reset(obs[-1])
+        return obs, info
+
+    def step(self, action):
+        base = self.env.unwrapped
+        steps_before = base.step_count
+        obs, reward, terminated, truncated, info = self.env.step(action)
+
+        # 이번 스텝에 프레임 버퍼에 새로 들어간 프레임 수
+        new_frames = max(1, min(base.step_count - steps_before, base.frame_stack))
+        history = getattr(base, 'reward_terms_history', ())
+        cooldowns = base.buff_cooldown_state() if hasattr(base, 'buff_cooldown_state') else None
+
+        self.writer.add_step(obs[-new_frames:], history, int(action), float(reward),
+                             bool(terminated), bool(truncated), cooldowns)
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        try:
+            self.env.close()
+        finally:
+            self.writer.close()
+
+
+class TransitionSession:
+    """기록된 세션 하나 (읽기 전용 메모리 맵)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.chunk_size = self.meta['chunk_size']
+        self.frame_stack = self.meta['frame_stack']
+        self.num_frames = self.meta['num_frames']
+        self.num_steps = self.meta['num_steps']
+
+        self._frame_chunks = self._open_chunks('frames', self.num_frames)
+        self.frame_info = self._load_table('frame_info', self.num_frames)
+        self.steps = self._load_table('steps', self.num_steps)
+
+    def _open_chunks(self, name, count):
+        n_chunks = (count + self.chunk_size - 1) // self.chunk_size
+        return [np.load(self.path / f"{name}_{i:05d}.npy", mmap_mode='r') for i in range(n_chunks)]
+
+    def _load_table(self, name, count):
+        """작은 테이블은 메모리에 이어붙여 로드"""
+        chunks = self._open_chunks(name, count)
+        if not chunks:
+            return np.zeros(0)
+        return np.concatenate(chunks)[:count]
+
+    def update_table(self, name, columns):
+        """테이블 열을 청크 파일에 직접 덮어쓰기 (보상 리라벨링용)
+
+        Args:
+            name: 'frame_info' 또는 'steps'
+            columns: {열 이름: 전체 행 배열}
+        """
+        table = getattr(self, name)
+        n_chunks = (len(table) + self.chunk_size - 1) // self.chunk_size
+        for i in range(n_chunks):
+            chunk = np.load(self.path / f"{name}_{i:05d}.npy", mmap_mode='r+')
+            lo = i * self.chunk_size
+            hi = min(lo + self.chunk_size, len(table))
+            for column, values in columns.items():
+                chunk[column][:hi - lo] = values[lo:hi]
+            chunk.flush()
+            del chunk
+        for column, values in columns.items():
+            table[column] = values
+
+    def frames(self, indices):
+        """전역 프레임 인덱스 배열 → 프레임 (indices.shape + (H, W))"""
+        indices = np.asarray(indices)
+        flat = indices.ravel()
+        chunk_ids, rows = np.divmod(flat, self.chunk_size)
+        out = np.empty((len(flat),) + self._frame_chunks[0].shape[1:], dtype=np.uint8)
+        for chunk_id in np.unique(chunk_ids):
+            mask = chunk_ids == chunk_id
+            out[mask] = self._frame_chunks[chunk_id][rows[mask]]
+        return out.reshape(indices.shape + out.shape[1:])
+
+    def stack_indices(self, frame_end, episode_frame_start):
+        """frame_end 직전 frame_stack개 프레임 인덱스 (에피소드 시작에서 클램프)"""
+        offsets = np.arange(-self.frame_stack, 0)
+        idx = np.asarray(frame_end)[..., None] + offsets
+        return np.maximum(idx, np.asarray(episode_frame_start)[..., None])
+
+    def observations(self, step_indices, next_obs=False):
+        """스텝 인덱스 → 관측 (B, stack, H, W)"""
+        steps = self.steps[np.asarray(step_indices)]
+        end = steps['frame_end'] if next_obs else steps['frame_begin']
+        return self.frames(self.stack_indices(end, steps['episode_frame_start']))
+
+
+class TransitionStore:
+    """여러 세션에 걸친 무작위 접근 샘플링"""
+
+    def __init__(self, root="datasets/transitions", sessions=None):
+        """
+        Args:
+            root: 세션 디렉토리들의 상위 경로
+            sessions: 세션 경로 리스트 (지정 시 root 무시)
+        """
+        if sessions is None:
+            sessions = sorted(p for p in Path(root).iterdir() if (p / 'meta.json').exists())
+        self.sessions = [TransitionSession(p) for p in sessions]
+        self.sessions = [s for s in self.sessions if s.num_steps > 0]
+        self._offsets = np.cumsum([0] + [s.num_steps for s in self.sessions])
+
+    @property
+    def num_steps(self):
+        return int(self._offsets[-1])
+
+    def sample(self, batch_size, rng=None):
+        """전체 세션에서 균등하게 스텝 샘플링
+
+        Returns:
+            dict(obs, action, reward, next_obs, done)
+        """
+        if self.num_steps == 0:
+            raise ValueError("기록된 스텝이 없습니다")
+        rng = rng if rng is not None else np.random.default_rng()
+        global_idx = rng.integers(0, self.num_steps, size=batch_size)
+        session_ids = np.searchsorted(self._offsets, global_idx, side='right') - 1
+
+        first = self.sessions[0]
+        h, w = first.meta['frame_shape']
+        batch = {
+            'obs': np.empty((batch_size, first.frame_stack, h, w), dtype=np.uint8),
+            'next_obs': np.empty((batch_size, first.frame_stack, h, w), dtype=np.uint8),
+            'action': np.empty(batch_size, dtype=np.int64),
+            'reward': np.empty(batch_size, dtype=np.float32),
+            'done': np.empty(batch_size, dtype=bool),
+        }
+        for sid in np.unique(session_ids):
+            mask = session_ids == sid
+            session = self.sessions[sid]
+            local = global_idx[mask] - self._offsets[sid]
+            steps = session.steps[local]
+            batch['obs'][mask] = session.observations(local)
+            batch['next_obs'][mask] = session.observations(local, next_obs=True)
+            batch['action'][mask] = steps['action']
+            batch['reward'][mask] = steps['reward']
+            batch['done'][mask] = steps['terminated'] | steps['truncated']
+        return batch
@@ -0,0 +1,91 @@
+"""
+시계 유틸리티
+게임 타이밍(키 홀드, 버프 쿨타임, 위험 감지 간격, 패턴 재생 딜레이)을 시계 객체로 주입
+
+- RealClock: 실제 시간 (time.time / time.sleep, sleep_until은 마지막 몇 ms를 바쁜 대기로 정밀하게)
+- VirtualClock: 가상 시간 (sleep은 대기 없이 시각만 진행 → 녹화/시뮬레이션을 실제보다 빠르게 같은 동작으로 재현)
+
+사용법:
+    env = MLRealtimeEnv(clock=VirtualClock())
+    player = HumanlikePatternPlayer(pattern_file, clock=VirtualClock())
+"""
+import threading
+import time
+
+
+# 가상 시각 기본 시작점 (버프 쿨타임/위험 감지의 "사용 안 함" 초기값 0과 겹치지 않도록 충분히 큰 값)
+VIRTUAL_EPOCH = 1_000_000.0
+
+# sleep_until: 마감 직전 이 시간(초)은 OS sleep 대신 바쁜 대기 (sleep 해상도/스케줄링 지연 보정)
+SPIN_MARGIN = 0.002
+
+
+class RealClock:
+    """실제 시계"""
+
+    def time(self):
+        """현재 시각 (초, epoch 기준)"""
+        return time.time()
+
+    def perf_counter(self):
+        """구간 측정용 단조 시각 (초)"""
+        return time.perf_counter()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def sleep_until(self, deadline, spin=SPIN_MARGIN):
+        """perf_counter 기준 deadline까지 대기 (이미 지났으면 즉시 반환)"""
+        remaining = deadline - time.perf_counter()
+        if remaining > spin:
+            time.sleep(remaining - spin)
+        while time.perf_counter() < deadline:
+            pass
+
+
+class VirtualClock:
+    """가상 시계 (sleep = 즉시 시각 진행)"""
+
+    def __init__(self, start=VIRTUAL_EPOCH, on_advance=None):
+        """
+        Args:
+            start: 시작 시각 (초)
+            on_advance: 시각이 진행될 때 호출할 함수 (진행한 초를 인자로, 예: 시뮬레이터 월드 진행)
+        """
+        self._now = float(start)
+        self.on_advance = on_advance
+        self._lock = threading.Lock()
+
+    def time(self):
+        return self._now
+
+    def perf_counter(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.advance(seconds)
+
+    def advance(self, seconds):
+        """시각을 seconds만큼 진행 (on_advance 포함, 여러 스레드에서 호출해도 순서대로)"""
+        with self._lock:
+            self._now += seconds
+            if self.on_advance is not None:
+                self.on_advance(seconds)
+
+    def advance_to(self, timestamp):
+        """시각을 timestamp까지 진행 (이미 지났으면 그대로, 녹화 시각 재현용)"""
+        if timestamp > self._now:
+            self.advance(timestamp - self._now)
+
+    def sleep_until(self, deadline, spin=SPIN_MARGIN):
+        self.advance_to(deadline)
+
+
+REAL_CLOCK = RealClock()
+
+
+def clock_of(env):
+    """환경(래퍼 포함)이 쓰는 시계 (없으면 실제 시계)"""
+    return getattr(getattr(env, 'unwrapped', env), 'clock', REAL_CLOCK)
@@ -2,14 +2,26 @@
 
 - 기본 설정(config.yaml)에 게임별 오버레이(configs/<GAME>.yaml)를 재귀 병합하여 반환
 - main.py, 툴 스크립트 등에서 재사용 가능
+- 병합 결과는 (경로, 게임, 파일 수정 시각) 기준으로 캐시 → 환경/툴을 여러 번 만들어도 YAML은 바뀐 경우에만 다시 읽음
+- load_game_config(): 병합 설정 + ROI(configs/roi_settings.json)를 검증된 frozen dataclass(GameConfig)로 변환
+  (기본값은 여기 한 곳에서 정의, 실행 중 코드는 dict 조회 대신 속성 접근)
+- 보상 계수: 게임 기본값(DEFAULT_REWARD_COEFFS) + 설정 파일 reward 섹션 (바꿀 항목만 적으면 됨)
 """
 from __future__ import annotations
+import copy
+import json
+import logging
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 import yaml
 
 
-def _deep_merge(base: Dict[str, Any], override: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+ROI_SETTINGS_PATH = Path("configs/roi_settings.json")
+
+
+def deep_merge(base: Dict[str, Any], override: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """dict 재귀 병합 (override가 base 값을 덮어씀)
 
     Args:
@@ -23,26 +35,14 @@ def _deep_merge(base: Dict[str, Any], override: Optional[Dict[str, Any]]) -> Dic
         return result
     for k, v in override.items():
         if isinstance(v, dict) and isinstance(result.get(k), dict):
-            result[k] = _deep_merge(result[k], v)  # type: ignore[arg-type]
+            result[k] = deep_merge(result[k], v)  # type: ignore[arg-type]
         else:
             result[k] = v
     return result
 
 
-def load_config(base_config_path: str | Path = "config.yaml", game: Optional[str] = None) -> Dict[str, Any]:
-    """설정 파일 로드 (+게임별 오버레이 적용)
-
-    Args:
-        base_config_path: 기본 설정 파일 경로
-        game: 'MP' 또는 'ML' (없으면 기본 설정만 사용)
-
-    Returns:
-        병합된 설정 딕셔너리
-    """
-    base_path = Path(base_config_path)
-    if not base_path.exists():
-        raise FileNotFoundError(f"기본 설정 파일을 찾을 수 없습니다: {base_path}")
-
+def _read_config(base_path: Path, game: Optional[str]) -> Dict[str, Any]:
+    """설정 파일 읽기 + 병합 (캐시 없이)"""
     with open(base_path, "r", encoding="utf-8") as f:
         base = yaml.safe_load(f) or {}
 
@@ -51,7 +51,387 @@ def load_config(base_config_path: str | Path = "config.yaml", game: Optional[str
         if overlay_path.exists():
             with open(overlay_path, "r", encoding="utf-8") as f:
                 overlay = yaml.safe_load(f) or {}
-            return _deep_merge(base, overlay)
+            return deep_merge(base, overlay)
         else:
             print(f"[경고] 게임 오버레이 설정이 없습니다: {overlay_path} (기본 설정만 사용)")
     return base
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+# (기본 설정 경로, 게임) → (파일 수정 시각들, 병합 dict, GameConfig 또는 None)
+_CACHE: Dict[Tuple[str, Optional[str]], list] = {}
+
+
+def _cached_entry(base_config_path: str | Path, game: Optional[str]) -> list:
+    """캐시 항목 (관련 파일 중 하나라도 바뀌었으면 다시 읽음)"""
+    base_path = Path(base_config_path)
+    stamp = (_mtime_ns(base_path),
+             _mtime_ns(Path("configs") / f"{game}.yaml") if game else None,
+             _mtime_ns(ROI_SETTINGS_PATH))
+    if stamp[0] is None:
+        raise FileNotFoundError(f"기본 설정 파일을 찾을 수 없습니다: {base_path}")
+
+    key = (str(base_path.resolve()), game)
+    entry = _CACHE.get(key)
+    if entry is None or entry[0] != stamp:
+        entry = [stamp, _read_config(base_path, game), None]
+        _CACHE[key] = entry
+    return entry
+
+
+def load_config(base_config_path: str | Path = "config.yaml", game: Optional[str] = None) -> Dict[str, Any]:
+    """설정 파일 로드 (+게임별 오버레이 적용)
+
+    Args:
+        base_config_path: 기본 설정 파일 경로
+        game: 'MP' 또는 'ML' (없으면 기본 설정만 사용)
+
+    Returns:
+        병합된 설정 딕셔너리 (캐시의 복사본이라 수정해도 됨)
+    """
+    return copy.deepcopy(_cached_entry(base_config_path, game)[1])
+
+
+# ---------------------------------------------------------------------------
+# 보상 계수 (실시간 환경 / 배치 시뮬레이터 / 오프라인 리라벨링이 모두 이 값을 사용)
+# ---------------------------------------------------------------------------
+
+DEFAULT_REWARD_COEFFS: Dict[str, Dict[str, Any]] = {
+    'ML': {
+        'exp': {'large_pixels': 10, 'large': 2.0, 'small_pixels': 5, 'small': 0.5},
+        'stuck': {'actions': [1, 2, 3], 'threshold': 0.03, 'penalty': -0.8,
+                  'repeat_after': 2, 'repeat_penalty': -1.2},
+        'hit': {'actions': [4], 'threshold': 0.1, 'bonus': 0.4},
+        'teleport': {'actions': [3], 'threshold': 0.2, 'bonus': 0.3},
+        'static': {'threshold': 0.05, 'exempt_actions': [4], 'penalty': -0.1},
+        'combo': [  # 앞 규칙 우선 (하나만 적용)
+            {'prev': [3], 'next': [4], 'bonus': 0.8},        # 텔포→공격
+            {'prev': [1, 2], 'next': [4], 'bonus': 0.3},     # 이동→공격
+            {'prev': [4], 'next': [1, 2, 3], 'bonus': 0.2},  # 공격→이동/텔포
+        ],
+        'monotony': {'window': 5, 'penalty': -0.15},
+        'action': {4: 0.6, 3: 0.2, 1: 0.08, 2: 0.08, 0: -0.3},
+    },
+    'MP': {
+        'exp': {'large_pixels': 10, 'large': 2.0, 'small_pixels': 5, 'small': 0.5},
+        'stuck': {'actions': [1, 2], 'threshold': 0.03, 'penalty': -0.5,
+                  'repeat_after': 3, 'repeat_penalty': -0.8},
+        'hit': {'actions': [5, 6], 'threshold': 0.1, 'bonus': 0.3},
+        'teleport': {'actions': [], 'threshold': 0.2, 'bonus': 0.0},
+        'static': {'threshold': 0.05, 'exempt_actions': [5, 6], 'penalty': -0.08},
+        'combo': [
+            {'prev': [1, 2], 'next': [5, 6], 'bonus': 0.4},  # 이동→공격/스킬
+            {'prev': [5, 6], 'next': [1, 2], 'bonus': 0.2},  # 공격→이동
+        ],
+        'monotony': {'window': 5, 'penalty': -0.12},
+        'action': {5: 0.5, 6: 0.5, 1: 0.1, 2: 0.1, 7: 0.05, 0: -0.25},
+    },
+}
+
+
+# ---------------------------------------------------------------------------
+# 타입 있는 설정 (frozen dataclass)
+# ---------------------------------------------------------------------------
+
+_BOOL_STRINGS = {'true': True, 'false': False, 'yes': True, 'no': False, 'on': True, 'off': False}
+
+
+def _to_bool(value: Any) -> bool:
+    """bool만 허용 (따옴표로 감싼 'true'/'false' 등은 허용, bool('false') == True 같은 변환 없음)"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in _BOOL_STRINGS:
+        return _BOOL_STRINGS[value.strip().lower()]
+    raise ValueError(value)
+
+
+_CONVERTERS = {'int': int, 'float': float, 'str': str, 'bool': _to_bool}
+
+
+def _build_section(cls, data: Any, section: str, errors: list):
+    """dict → dataclass (없는 항목은 기본값, 타입 변환 실패/모르는 항목은 errors에 기록)"""
+    if data is None:
+        data = {}
+    if not isinstance(data, dict):
+        errors.append(f"{section}: 딕셔너리가 아닙니다 ({data!r})")
+        return cls()
+    known = {f.name: f for f in fields(cls)}
+    values = {}
+    for name, value in data.items():
+        if name not in known:
+            errors.append(f"{section}.{name}: 알 수 없는 항목")
+            continue
+        try:
+            values[name] = _CONVERTERS[known[name].type](value)
+        except (TypeError, ValueError):
+            errors.append(f"{section}.{name}: {known[name].type} 값이 아닙니다 ({value!r})")
+    return cls(**values)
+
+
+@dataclass(frozen=True)
+class TimerConfig:
+    """버프/설치기 주기 (초)"""
+    buff_base: float = 1800
+    buff_variance: float = 120
+    skill_base: float = 60
+    skill_variance: float = 5
+
+
+@dataclass(frozen=True)
+class ScreenConfig:
+    """화면 캡처"""
+    monitor: int = 1
+    capture_fps: int = 10
+
+
+@dataclass(frozen=True)
+class YoloConfig:
+    """객체 탐지 모델"""
+    model_path: str = 'models/best.pt'
+    confidence_threshold: float = 0.5
+    use_gpu: bool = True
+
+
+@dataclass(frozen=True)
+class ActionConfig:
+    """행동 딜레이 범위 (초)"""
+    mouse_move_duration_min: float = 0.1
+    mouse_move_duration_max: float = 0.3
+    skill_cast_delay_min: float = 0.1
+    skill_cast_delay_max: float = 0.2
+
+
+@dataclass(frozen=True)
+class LoggingConfig:
+    level: str = 'INFO'
+    file: str = 'logs/perceptive_ai.log'
+
+
+@dataclass(frozen=True)
+class RoiRect:
+    """화면 영역 (픽셀)"""
+    x: int = 0
+    y: int = 0
+    w: int = 0
+    h: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'x': self.x, 'y': self.y, 'w': self.w, 'h': self.h}
+
+
+@dataclass(frozen=True)
+class Keybindings:
+    """키 설정 (설정하지 않은 항목은 None → 행동별 기본 키는 각 환경의 ACTION_BINDINGS)"""
+    buff_key: Optional[str] = None
+    skill_key: Optional[str] = None
+    move_up: Optional[str] = None
+    move_down: Optional[str] = None
+    move_left: Optional[str] = None
+    move_right: Optional[str] = None
+    attack: Optional[str] = None
+    teleport: Optional[str] = None
+    jump: Optional[str] = None
+    buff_holy: Optional[str] = None
+    buff_bless: Optional[str] = None
+    buff_invin: Optional[str] = None
+    summon_dragon: Optional[str] = None
+    potion_hp: Optional[str] = None
+    potion_mp: Optional[str] = None
+    extra: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))  # 그 밖의 키 항목
+
+    @classmethod
+    def from_dict(cls, data: Optional[Mapping[str, Any]], errors: Optional[list] = None) -> "Keybindings":
+        errors = errors if errors is not None else []
+        names = {f.name for f in fields(cls)} - {'extra'}
+        values, extra = {}, {}
+        for name, key in (data or {}).items():
+            if not isinstance(key, (str, int)) or str(key) == '':
+                errors.append(f"keybindings.{name}: 키 이름이 아닙니다 ({key!r})")
+                continue
+            (values if name in names else extra)[name] = str(key)
+        return cls(**values, extra=MappingProxyType(extra))
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """dict.get과 같은 방식 (설정 안 된 항목은 default)"""
+        value = getattr(self, name, None) if name != 'extra' else None
+        if value is None:
+            value = self.extra.get(name)
+        return default if value is None else value
+
+    def as_dict(self) -> Dict[str, str]:
+        """설정된 항목만 dict로 (세션 메타데이터 저장용)"""
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'extra'}
+        data = {name: key for name, key in data.items() if key is not None}
+        data.update(self.extra)
+        return data
+
+
+@dataclass(frozen=True)
+class GameConfig:
+    """검증된 게임 설정 (frozen, 같은 파일이면 같은 객체를 공유)"""
+    game: Optional[str] = None
+    keybindings: Keybindings = field(default_factory=Keybindings)
+    timers: TimerConfig = field(default_factory=TimerConfig)
+    screen: ScreenConfig = field(default_factory=ScreenConfig)
+    yolo: YoloConfig = field(default_factory=YoloConfig)
+    action: ActionConfig = field(default_factory=ActionConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    roi: Mapping[str, RoiRect] = field(default_factory=lambda: MappingProxyType({}))
+    clients: Tuple[Mapping[str, Any], ...] = ()
+    reward: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))  # 보상 계수
+
+    def roi_settings(self) -> Optional[Dict[str, Dict[str, int]]]:
+        """기존 ROI dict 형식 ({이름: {'x', 'y', 'w', 'h'}}, 없으면 None)"""
+        return {name: rect.as_dict() for name, rect in self.roi.items()} or None
+
+
+def _validate(config: GameConfig, errors: list) -> None:
+    timers = config.timers
+    for name in ('buff_base', 'buff_variance', 'skill_base', 'skill_variance'):
+        if getattr(timers, name) < 0:
+            errors.append(f"timers.{name}: 음수일 수 없습니다")
+    if timers.buff_variance > timers.buff_base:
+        errors.append("timers.buff_variance: buff_base보다 클 수 없습니다")
+    if timers.skill_variance > timers.skill_base:
+        errors.append("timers.skill_variance: skill_base보다 클 수 없습니다")
+
+    if config.screen.monitor < 1:
+        errors.append("screen.monitor: 1 이상이어야 합니다")
+    if config.screen.capture_fps <= 0:
+        errors.append("screen.capture_fps: 0보다 커야 합니다")
+    if not 0.0 <= config.yolo.confidence_threshold <= 1.0:
+        errors.append("yolo.confidence_threshold: 0~1 범위여야 합니다")
+
+    action = config.action
+    for low, high in (('mouse_move_duration_min', 'mouse_move_duration_max'),
+                      ('skill_cast_delay_min', 'skill_cast_delay_max')):
+        if not 0 <= getattr(action, low) <= getattr(action, high):
+            errors.append(f"action.{low}/{high}: 0 <= 최소 <= 최대여야 합니다")
+
+    if not isinstance(logging.getLevelName(config.logging.level.upper()), int):
+        errors.append(f"logging.level: 알 수 없는 로그 레벨 ({config.logging.level})")
+
+    for name, rect in config.roi.items():
+        if rect.x < 0 or rect.y < 0 or rect.w <= 0 or rect.h <= 0:
+            errors.append(f"roi.{name}: 위치는 0 이상, 크기는 0보다 커야 합니다 ({rect.as_dict()})")
+
+
+def _load_roi(errors: list) -> Mapping[str, RoiRect]:
+    if not ROI_SETTINGS_PATH.exists():
+        return MappingProxyType({})
+    with open(ROI_SETTINGS_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f) or {}
+    return MappingProxyType({name: _build_section(RoiRect, spec, f"roi.{name}", errors)
+                             for name, spec in data.items()})
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_reward(default: Any, value: Any, path: str, errors: list) -> None:
+    """보상 계수 오버레이 항목을 기본값과 같은 모양인지 재귀 검증 (틀린 항목은 errors에 기록)
+
+    - 딕셔너리: 기본값에 있는 항목만 (행동 번호 → 값 표는 0 이상 정수 키 + 숫자 값)
+    - 목록: 행동 번호 목록은 정수만, 콤보 규칙 목록은 규칙마다 기본 규칙과 같은 항목
+    - 숫자: 기본값이 정수면 정수, 실수면 정수/실수
+    """
+    if isinstance(default, dict):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: 딕셔너리가 아닙니다 ({value!r})")
+            return
+        if default and all(isinstance(k, int) for k in default):  # 행동 번호 → 값 표
+            for key, item in value.items():
+                if not isinstance(key, int) or isinstance(key, bool) or key < 0:
+                    errors.append(f"{path}.{key}: 행동 번호(0 이상 정수)가 아닙니다")
+                elif not _is_number(item):
+                    errors.append(f"{path}.{key}: 숫자가 아닙니다 ({item!r})")
+            return
+        for key, item in value.items():
+            if key not in default:
+                errors.append(f"{path}.{key}: 알 수 없는 항목")
+            else:
+                _check_reward(default[key], item, f"{path}.{key}", errors)
+    elif isinstance(default, list):
+        if not isinstance(value, list):
+            errors.append(f"{path}: 목록이 아닙니다 ({value!r})")
+            return
+        if default and isinstance(default[0], dict):  # 콤보 규칙 목록
+            for i, rule in enumerate(value):
+                if isinstance(rule, dict) and set(rule) != set(default[0]):
+                    errors.append(f"{path}[{i}]: 항목이 {sorted(default[0])}이어야 합니다 ({sorted(rule)})")
+                else:
+                    _check_reward(default[0], rule, f"{path}[{i}]", errors)
+            return
+        for item in value:
+            if not isinstance(item, int) or isinstance(item, bool) or item < 0:
+                errors.append(f"{path}: 행동 번호(0 이상 정수) 목록이어야 합니다 ({value!r})")
+                return
+    elif isinstance(default, int):
+        if not isinstance(value, int) or isinstance(value, bool):
+            errors.append(f"{path}: 정수가 아닙니다 ({value!r})")
+    elif not _is_number(value):
+        errors.append(f"{path}: 숫자가 아닙니다 ({value!r})")
+
+
+def _build_reward(game: Optional[str], data: Any, errors: list) -> Mapping[str, Any]:
+    """게임 기본 보상 계수 + reward 섹션 (항목 단위 재귀 병합, combo 목록은 통째로 교체)
+
+    하위 항목까지 기본값과 같은 모양인지 검증 → 핫 리로드로 실행 중 환경에 잘못된 값이 들어가지 않음
+    결과는 기본값과 객체를 공유하지 않는 복사본 (수정해도 DEFAULT_REWARD_COEFFS는 그대로)
+    """
+    defaults = DEFAULT_REWARD_COEFFS.get(game, {})
+    if data is None:
+        data = {}
+    _check_reward(defaults, data, 'reward', errors)
+    if not isinstance(data, dict):
+        data = {}
+    merged = deep_merge(defaults, {k: v for k, v in data.items() if k in defaults})
+    return MappingProxyType(copy.deepcopy(merged))
+
+
+def compile_config(config: Dict[str, Any], game: Optional[str] = None,
+                   roi: Optional[Mapping[str, RoiRect]] = None) -> GameConfig:
+    """병합된 설정 dict → GameConfig (검증 실패 시 ValueError, 문제 항목 전부 표시)
+
+    Args:
+        config: load_config() 결과
+        game: 게임 이름
+        roi: ROI 설정 (None이면 configs/roi_settings.json)
+    """
+    errors: list = []
+    compiled = GameConfig(
+        game=game,
+        keybindings=Keybindings.from_dict(config.get('keybindings'), errors),
+        timers=_build_section(TimerConfig, config.get('timers'), 'timers', errors),
+        screen=_build_section(ScreenConfig, config.get('screen'), 'screen', errors),
+        yolo=_build_section(YoloConfig, config.get('yolo'), 'yolo', errors),
+        action=_build_section(ActionConfig, config.get('action'), 'action', errors),
+        logging=_build_section(LoggingConfig, config.get('logging'), 'logging', errors),
+        roi=_load_roi(errors) if roi is None else MappingProxyType(dict(roi)),
+        clients=tuple(MappingProxyType(dict(c)) for c in config.get('clients') or ()),
+        reward=_build_reward(game, config.get('reward'), errors),
+    )
+    _validate(compiled, errors)
+    if errors:
+        raise ValueError("설정 오류:\n  " + "\n  ".join(errors))
+    return compiled
+
+
+def load_game_config(base_config_path: str | Path = "config.yaml", game: Optional[str] = None) -> GameConfig:
+    """검증된 GameConfig (파일이 안 바뀌었으면 캐시된 같은 객체)
+
+    Args:
+        base_config_path: 기본 설정 파일 경로
+        game: 'MP' 또는 'ML' (없으면 기본 설정만 사용)
+    """
+    entry = _cached_entry(base_config_path, game)
+    if entry[2] is None:
+        entry[2] = compile_config(entry[1], game)
+    return entry[2]
@@ -0,0 +1,68 @@
+"""설정 핫 리로드 감시기
+
+- 백그라운드 스레드가 interval초마다 config.yaml / configs/<GAME>.yaml / configs/roi_settings.json 수정 시각 확인
+  (load_game_config 캐시가 수정 시각을 비교하므로 안 바뀌었으면 stat만 함)
+- 바뀌었고 검증을 통과한 설정만 (버전, 설정) 튜플 하나로 교체 → 환경은 스텝 경계에서 버전만 비교해 적용
+- 검증 실패/파싱 오류는 경고만 출력하고 기존 설정 유지 (학습 중단 없음)
+- 튜플 통째 교체라 잠금 없이 여러 환경(멀티 클라이언트)이 감시기 하나를 공유 가능
+"""
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+import yaml
+
+from src.utils.config_loader import GameConfig, load_game_config
+
+
+class ConfigWatcher:
+    """설정 파일 변경 감시 (mtime 폴링)"""
+
+    def __init__(self, game: Optional[str] = None, base_config_path: str | Path = "config.yaml",
+                 interval: float = 1.0, start: bool = True):
+        """
+        Args:
+            game: 'MP' 또는 'ML'
+            base_config_path: 기본 설정 파일 경로
+            interval: 확인 주기 (초)
+            start: 백그라운드 스레드 바로 시작 (False면 check()를 직접 호출)
+        """
+        self.game = game
+        self.base_config_path = base_config_path
+        self.interval = interval
+        self.state: Tuple[int, GameConfig] = (0, load_game_config(base_config_path, game))
+        self._error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        """변경 확인 (새 설정이 검증을 통과했으면 state 교체 후 True)"""
+        try:
+            config = load_game_config(self.base_config_path, self.game)
+        except (ValueError, OSError, yaml.YAMLError) as e:
+            message = str(e)
+            if message != self._error:  # 같은 오류는 한 번만 출력
+                self._error = message
+                print(f"⚠️  설정 다시 읽기 실패 (기존 설정 유지): {message}")
+            return False
+        self._error = None
+
+        version, current = self.state
+        if config is current:
+            return False
+        self.state = (version + 1, config)
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,173 @@
+"""단계별 지연 시간 계측
+스텝 안의 각 단계(캡처, 색 변환, 전처리, 보상, 위험 감지, 행동/키 홀드, 대기)를 ns 단위로 재서 고정 크기 히스토그램에 누적
+
+- LatencyHistogram: 로그 간격 고정 버킷 (1µs ~ 10s, 옥타브당 4개 → 백분위 오차 ±10% 이내), 샘플마다 리스트가 늘지 않음
+- StageTimer: 단계별 히스토그램 + 이번 스텝 누적 시간, span()은 단계마다 미리 만든 객체를 재사용 (with 블록마다 객체 생성 없음)
+- TimingAggregator: 학습 콜백에서 info['timing']을 모아 p50/p95/p99를 TensorBoard에 기록
+- 측정 비용은 span 하나에 수 µs 미만 → 항상 켜 둠
+- 타임라인 추적(tracing.start_tracing)이 켜져 있으면 같은 측정값을 구간 이벤트로도 기록
+
+사용법:
+    timer = StageTimer(('capture', 'reward'))
+    with timer.span('capture'):
+        frame = capture.grab()
+    info['timing'] = timer.end_step()   # {단계: ms}
+"""
+from bisect import bisect_right
+from time import perf_counter_ns
+
+from src.utils import tracing
+
+
+# 환경 스텝 단계 (BaseRealtimeEnv 계열 공통, 'step' = 스텝 전체)
+ENV_STAGES = ('action', 'sleep', 'capture', 'convert', 'danger', 'reward', 'preprocess', 'step')
+
+
+class LatencyHistogram:
+    """로그 간격 고정 버킷 지연 히스토그램 (ns)"""
+
+    def __init__(self, min_ns=1_000, max_ns=10_000_000_000, buckets_per_octave=4):
+        edges = []
+        edge, i = min_ns, 0
+        while edge < max_ns:
+            edge = int(min_ns * 2 ** (i / buckets_per_octave))
+            edges.append(edge)
+            i += 1
+        self.edges = edges
+        self.counts = [0] * (len(edges) + 1)  # 0번: min_ns 미만, 마지막: max_ns 이상
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        """샘플 하나 추가 (버킷 카운트만 증가)"""
+        self.counts[bisect_right(self.edges, ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q):
+        """q(0~100) 백분위 (ns, 버킷의 기하 중앙값, 최대 관측값을 넘지 않음)"""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                break
+        low = self.edges[bucket - 1] if bucket > 0 else 0
+        high = self.edges[bucket] if bucket < len(self.edges) else self.max_ns
+        return float(min((low * high) ** 0.5 if low else high / 2, self.max_ns))
+
+    def summary(self):
+        """{'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}"""
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ns / self.count / 1e6 if self.count else 0.0,
+            'p50_ms': self.percentile(50) / 1e6,
+            'p95_ms': self.percentile(95) / 1e6,
+            'p99_ms': self.percentile(99) / 1e6,
+            'max_ms': self.max_ns / 1e6,
+        }
+
+    def reset(self):
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class _Span:
+    """with 블록 시간 측정 (단계마다 하나, 재사용)"""
+    __slots__ = ('timer', 'stage', 'start')
+
+    def __init__(self, timer, stage):
+        self.timer = timer
+        self.stage = stage
+        self.start = 0
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.stage, perf_counter_ns() - self.start, self.start)
+        return False
+
+
+class StageTimer:
+    """단계별 시간 측정기"""
+
+    def __init__(self, stages=ENV_STAGES):
+        self.stages = tuple(stages)
+        self.histograms = {stage: LatencyHistogram() for stage in self.stages}
+        self.step_ns = dict.fromkeys(self.stages, 0)
+        self._spans = {stage: _Span(self, stage) for stage in self.stages}
+
+    def span(self, stage):
+        """with 블록으로 stage 시간 측정"""
+        return self._spans[stage]
+
+    def add(self, stage, ns, start=None):
+        """측정값 추가 (히스토그램 + 이번 스텝 누적, start(ns)를 주면 타임라인에도 기록)"""
+        self.histograms[stage].record(ns)
+        self.step_ns[stage] += ns
+        tracer = tracing._active
+        if tracer is not None and start is not None:
+            tracer.complete(stage, 'env', start, ns)
+
+    def end_step(self):
+        """이번 스텝 단계별 시간 {단계: ms} 반환 후 스텝 누적 초기화"""
+        step_ns = self.step_ns
+        breakdown = {stage: ns / 1e6 for stage, ns in step_ns.items()}
+        for stage in self.stages:
+            step_ns[stage] = 0
+        return breakdown
+
+    def summary(self, reset=False):
+        """단계별 누적 통계 {단계: LatencyHistogram.summary()}"""
+        result = {stage: hist.summary() for stage, hist in self.histograms.items() if hist.count}
+        if reset:
+            for hist in self.histograms.values():
+                hist.reset()
+        return result
+
+
+class TimingAggregator:
+    """여러 환경의 info['timing']을 모아 단계별 백분위 기록 (학습 콜백용)"""
+
+    def __init__(self, prefix="timing"):
+        self.prefix = prefix
+        self.histograms = {}
+
+    def add_infos(self, infos):
+        """스텝 info 리스트에서 'timing' 수집 (없는 환경은 건너뜀)"""
+        for info in infos:
+            timing = info.get('timing') if info else None
+            if not timing:
+                continue
+            for stage, ms in timing.items():
+                hist = self.histograms.get(stage)
+                if hist is None:
+                    hist = self.histograms[stage] = LatencyHistogram()
+                hist.record(int(ms * 1e6))
+
+    def record(self, logger, reset=True):
+        """logger(SB3)에 <prefix>/<단계>_p50_ms / _p95_ms / _p99_ms 기록
+
+        Returns:
+            기록한 단계별 통계
+        """
+        stats = {}
+        for stage, hist in self.histograms.items():
+            if not hist.count:
+                continue
+            stats[stage] = summary = hist.summary()
+            for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+                logger.record(f"{self.prefix}/{stage}_{key}", summary[key])
+            if reset:
+                hist.reset()
+        return stats
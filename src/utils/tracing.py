@@ -0,0 +1,235 @@
+"""Chrome Trace Event 타임라인 기록 (opt-in)
+캡처/전처리/정책 추론/키 입력/위험 감지/긴급 회피/PPO 업데이트를 스레드별 타임라인으로 저장 → Perfetto(ui.perfetto.dev)나 chrome://tracing에서 열기
+
+- 기록은 링 버퍼(deque, 고정 크기)에 튜플만 추가 → 가득 차면 가장 오래된 이벤트부터 버림 (학습 루프는 절대 막히지 않음)
+- 백그라운드 스레드가 flush_interval초마다 버퍼를 비워 JSON 배열 형식으로 파일 끝에 추가
+  (Trace Event 배열 형식은 닫는 ']'가 없어도 읽히므로 중간에 죽어도 그때까지의 기록은 남음)
+- 시각은 perf_counter_ns 기준 (instrumentation.StageTimer와 같은 시계) → 스레드 간 겹침/대기를 그대로 비교 가능
+- 꺼져 있으면 get_tracer()가 None, trace_span()은 미리 만든 빈 객체 → 비용 거의 없음
+
+사용법:
+    start_tracing("logs/trace.json")
+    with trace_span('predict', 'policy'):
+        action, _ = model.predict(obs)
+    trace_instant('key_down', 'input', {'key': 'left'})
+    stop_tracing()
+"""
+from collections import deque
+import json
+import os
+import threading
+from pathlib import Path
+from time import perf_counter_ns
+
+
+TRACE_CAPACITY = 1 << 16     # 링 버퍼 이벤트 수 (flush 사이에 이보다 많으면 오래된 것부터 버림)
+FLUSH_INTERVAL = 1.0         # 파일 기록 주기 (초)
+
+_active = None               # 현재 추적기 (꺼져 있으면 None)
+
+
+class ChromeTracer:
+    """Trace Event JSON 기록기 (링 버퍼 + 백그라운드 flush)"""
+
+    def __init__(self, path, capacity=TRACE_CAPACITY, flush_interval=FLUSH_INTERVAL):
+        """
+        Args:
+            path: 저장 경로 (.json)
+            capacity: 링 버퍼 크기 (이벤트 수)
+            flush_interval: 파일 기록 주기 (초)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.pid = os.getpid()
+        self.origin_ns = perf_counter_ns()
+        self.written = 0
+        self.dropped = 0
+
+        # (ph, name, cat, 시작 ns, 길이 ns, tid, args) - 버퍼에는 튜플만, JSON 변환은 flush 스레드가
+        self._buffer = deque(maxlen=capacity)
+        self._thread_names = {}
+        self._phase = None
+
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write('[\n')
+        self._first = True
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def _emit(self, ph, name, cat, start_ns, dur_ns=0, args=None):
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+            self._buffer.append(('M', 'thread_name', '', start_ns, 0, tid, {'name': self._thread_names[tid]}))
+        if len(self._buffer) == self.capacity:
+            self.dropped += 1
+        self._buffer.append((ph, name, cat, start_ns, dur_ns, tid, args))
+
+    def complete(self, name, cat, start_ns, dur_ns, args=None):
+        """구간 이벤트 (이미 잰 시작 시각/길이, ns)"""
+        self._emit('X', name, cat, start_ns, dur_ns, args)
+
+    def instant(self, name, cat, args=None):
+        """순간 이벤트 (키 입력 등)"""
+        self._emit('i', name, cat, perf_counter_ns(), 0, args)
+
+    def begin(self, name, cat, args=None):
+        """구간 시작 (같은 스레드에서 end()로 닫음)"""
+        self._emit('B', name, cat, perf_counter_ns(), 0, args)
+
+    def end(self, name, cat):
+        self._emit('E', name, cat, perf_counter_ns())
+
+    def phase(self, name, cat='learn'):
+        """학습 단계 전환 (이전 단계를 닫고 name 시작, None이면 닫기만)"""
+        if self._phase is not None:
+            self.end(*self._phase)
+        self._phase = (name, cat) if name is not None else None
+        if name is not None:
+            self.begin(name, cat)
+
+    def _event_json(self, event):
+        ph, name, cat, start_ns, dur_ns, tid, args = event
+        record = {'ph': ph, 'name': name, 'pid': self.pid, 'tid': tid,
+                  'ts': (start_ns - self.origin_ns) / 1000}
+        if cat:
+            record['cat'] = cat
+        if ph == 'X':
+            record['dur'] = dur_ns / 1000
+        elif ph == 'i':
+            record['s'] = 't'
+        if args:
+            record['args'] = args
+        return json.dumps(record, ensure_ascii=False)
+
+    def flush(self):
+        """버퍼에 쌓인 이벤트를 파일에 추가"""
+        lines = []
+        buffer = self._buffer
+        while True:
+            try:
+                lines.append(self._event_json(buffer.popleft()))
+            except IndexError:
+                break
+        if not lines:
+            return
+        if not self._first:
+            self._file.write(',\n')
+        self._file.write(',\n'.join(lines))
+        self._file.flush()
+        self._first = False
+        self.written += len(lines)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """열린 학습 단계를 닫고 남은 이벤트를 모두 기록"""
+        self.phase(None)
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+        self._file.write('\n]\n')
+        self._file.close()
+
+
+class _NullSpan:
+    """추적이 꺼져 있을 때 쓰는 빈 with 블록"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _TraceSpan:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.cat, self.start, perf_counter_ns() - self.start, self.args)
+        return False
+
+
+def start_tracing(path, capacity=TRACE_CAPACITY, flush_interval=FLUSH_INTERVAL):
+    """추적 시작 (이미 켜져 있으면 기존 것을 닫고 새로 시작)"""
+    global _active
+    stop_tracing()
+    _active = ChromeTracer(path, capacity, flush_interval)
+    print(f"🧭 타임라인 추적 ON: {_active.path}")
+    return _active
+
+
+def stop_tracing():
+    """추적 종료 (파일 닫기)"""
+    global _active
+    tracer, _active = _active, None
+    if tracer is None:
+        return
+    tracer.close()
+    dropped = f", 버림 {tracer.dropped}개 (버퍼 부족)" if tracer.dropped else ""
+    print(f"🧭 타임라인 저장: {tracer.path} (이벤트 {tracer.written}개{dropped})")
+
+
+def get_tracer():
+    """현재 추적기 (꺼져 있으면 None)"""
+    return _active
+
+
+def trace_span(name, cat='env', args=None):
+    """with 블록을 구간 이벤트로 기록 (꺼져 있으면 아무것도 안 함)"""
+    tracer = _active
+    if tracer is None:
+        return _NULL_SPAN
+    return _TraceSpan(tracer, name, cat, args)
+
+
+def trace_instant(name, cat='env', args=None):
+    tracer = _active
+    if tracer is not None:
+        tracer.instant(name, cat, args)
+
+
+def trace_phase(name, cat='learn'):
+    """학습 단계 전환 기록 (rollout / ppo_update 등, None이면 현재 단계 닫기)"""
+    tracer = _active
+    if tracer is not None:
+        tracer.phase(name, cat)
+
+
+def trace_module(module, name, cat='policy'):
+    """torch 모듈 forward를 구간 이벤트로 기록 (forward 훅)
+
+    Returns:
+        훅 핸들 목록 (handle.remove()로 해제)
+    """
+    starts = {}
+
+    def before(_module, _inputs):
+        starts[threading.get_ident()] = perf_counter_ns()
+
+    def after(_module, _inputs, _output):
+        tracer = _active
+        start = starts.pop(threading.get_ident(), None)
+        if tracer is not None and start is not None:
+            tracer.complete(name, cat, start, perf_counter_ns() - start)
+
+    return [module.register_forward_pre_hook(before), module.register_forward_hook(after)]
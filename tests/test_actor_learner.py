@@ -0,0 +1,89 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import multiprocessing as mp
+import queue
+from pathlib import Path
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stable_baselines3 import PPO
+from src.actor_learner import ActorLearnerTrainer, SpaceOnlyEnv, _actor_main
+
+
+class BoundedQueue(queue.Queue):
+    """스레드 큐 + multiprocessing.Queue의 cancel_join_thread"""
+
+    def cancel_join_thread(self):
+        pass
+
+
+class CountingEnv(gym.Env):
+    """관측 = 스텝 번호, drain_at 스텝에서 러너가 큐를 비운 것처럼 동작, stop_at 스텝 후 종료"""
+    observation_space = spaces.Box(0, 1000, shape=(1,), dtype=np.float32)
+    action_space = spaces.Discrete(2)
+
+    def __init__(self, transition_queue, received, stop_event, drain_at, stop_at):
+        self.transition_queue = transition_queue
+        self.received = received
+        self.stop_event = stop_event
+        self.drain_at = drain_at
+        self.stop_at = stop_at
+        self.t = 0
+
+    def reset(self, seed=None, options=None):
+        return np.array([self.t], dtype=np.float32), {}
+
+    def step(self, action):
+        if self.t == self.drain_at:
+            while not self.transition_queue.empty():
+                self.received.append(self.transition_queue.get_nowait())
+        self.t += 1
+        if self.t == self.stop_at:
+            self.stop_event.set()
+        return np.array([self.t], dtype=np.float32), 1.0, False, False, {}
+
+
+class TestActorQueueDrops(unittest.TestCase):
+    def test_learner_sees_boundary_after_dropped_transitions(self):
+        # 큐 3칸: 0~2 전송, 3~5 큐 가득 → 폐기, 6 스텝에서 러너가 비움 → 6~8 전송
+        transition_queue = BoundedQueue(maxsize=3)
+        weight_queue = BoundedQueue()
+        stop_event = mp.Event()
+        stats = {'steps': mp.Value('l', 0), 'dropped': mp.Value('l', 0)}
+        received = []
+        env = CountingEnv(transition_queue, received, stop_event, drain_at=6, stop_at=9)
+
+        model = PPO("MlpPolicy", SpaceOnlyEnv(env.observation_space, env.action_space),
+                    n_steps=5, batch_size=5, gamma=0.9, gae_lambda=1.0, device="cpu")
+        weight_queue.put((0, model.policy.state_dict()))
+        _actor_main(lambda: env, model.policy_class, model.policy_kwargs, transition_queue, weight_queue,
+                    stop_event, stats, 1)
+        while not transition_queue.empty():
+            received.append(transition_queue.get_nowait())
+
+        self.assertEqual(stats['dropped'].value, 3)
+        self.assertEqual([int(t[0][0]) for t in received], [0, 1, 2, 6, 7, 8])
+        self.assertEqual([t[4] for t in received], [True, False, False, True, False, False])
+
+        # 러너: 빈 구간(2 → 6)에서 GAE가 끊겨야 함
+        trainer = ActorLearnerTrainer(model, env_factory=None)
+        trainer.actor = MagicMock(is_alive=MagicMock(return_value=True))
+        trainer.transition_queue = BoundedQueue()
+        for transition in received:
+            trainer.transition_queue.put(transition)
+        trainer.collect_rollout()
+
+        buffer = model.rollout_buffer
+        np.testing.assert_array_equal(buffer.episode_starts[:, 0], [1, 0, 0, 1, 0])
+        # 2번 전이는 다음 가치로 부트스트랩하지 않음 → 리턴 = 보상 1
+        self.assertAlmostEqual(buffer.returns[2, 0], 1.0, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
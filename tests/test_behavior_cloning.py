@@ -0,0 +1,70 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import json
+import tempfile
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from src.behavior_cloning import DemonstrationDataset, label_frames
+
+# MP 기본 키: left=1, right=2, ctrl(공격)=5, alt(점프)=7
+KEY_MAP = {'left': (1, True), 'right': (2, True), 'ctrl': (5, False), 'alt': (7, False)}
+
+
+def event(t, key, kind):
+    return {'time': t, 'key': key, 'type': kind}
+
+
+class TestBehaviorCloning(unittest.TestCase):
+    def test_label_priority(self):
+        pattern = [
+            event(0.05, 'right', 'down'),
+            event(0.50, 'ctrl', 'down'),   # 이동 중 공격
+            event(0.70, 'ctrl', 'up'),
+            event(1.00, 'right', 'up'),
+            event(1.45, 'left', 'down'),   # 짧게 탭
+            event(1.50, 'left', 'up'),
+            event(1.60, 'f12', 'down'),    # 매핑 안 된 키
+        ]
+        timestamps = np.array([0.0, 0.4, 0.6, 1.2, 1.6])
+        labels = label_frames(pattern, timestamps, KEY_MAP, window=0.4)
+        # 이동 유지 → 공격 우선 → 이동 유지 → 탭 이동 → idle
+        self.assertEqual(labels.tolist(), [2, 5, 2, 1, 0])
+
+    def test_dataset_stacks_and_split(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pattern_path = Path(tmp) / "demo_20250101_000000.json"
+            n = 20
+            timestamps = np.arange(n) * 0.1
+            frames = np.stack([np.full((84, 84), i, dtype=np.uint8) for i in range(n)])
+            np.savez_compressed(Path(tmp) / "demo_20250101_000000_frames.npz", frames=frames, timestamps=timestamps)
+            data = {
+                'metadata': {'name': 'demo', 'frames': {'file': 'demo_20250101_000000_frames.npz'}},
+                'pattern': [event(0.55, 'alt', 'down'), event(0.6, 'alt', 'up')],
+            }
+            pattern_path.write_text(json.dumps(data), encoding='utf-8')
+
+            with unittest.mock.patch('src.behavior_cloning.key_action_map', return_value=KEY_MAP):
+                dataset = DemonstrationDataset([pattern_path], "MP", window=0.2)
+
+        # 라벨 창이 녹화 끝을 넘는 마지막 프레임 제외
+        self.assertEqual(len(dataset), 18)
+        obs = dataset.observations(np.array([0, 6]))
+        self.assertEqual(obs[:, :, 0, 0].tolist(), [[0, 0, 0, 0], [3, 4, 5, 6]])
+        # 0.4, 0.5 시점 프레임이 점프 라벨
+        self.assertEqual(np.flatnonzero(dataset.labels == 7).tolist(), [4, 5])
+
+        train, val = dataset.split(0.1)
+        self.assertEqual(len(train) + len(val), 18)
+        self.assertTrue(train.max() < val.min())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from benchmarks.baseline import baseline_path, compare, load_baseline, measure, save_baseline
+from benchmarks import e2e_latency, hotpath
+from benchmarks.hotpath import RESOLUTIONS
+import torch
+
+
+class TestBaseline(unittest.TestCase):
+    def test_save_load_and_regression_threshold(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = baseline_path("hotpath", "box-1", tmp)
+            self.assertIsNone(load_baseline(path))
+            save_baseline(path, {'a': {'median_us': 100.0}, 'b': {'median_us': 100.0}})
+            baseline = load_baseline(path)
+
+        current = {'a': {'median_us': 120.0}, 'b': {'median_us': 150.0}, 'new': {'median_us': 1.0}}
+        regressions = compare(current, baseline, threshold=0.25)
+        self.assertEqual([(name, ratio) for name, _, _, ratio in regressions], [('b', 1.5)])
+        self.assertEqual(compare(current, None), [])
+
+        result = measure(lambda: None, repeat=10, warmup=0, max_time=0)
+        self.assertEqual(result['samples'], 5)  # 시간 초과 시 최소 표본 수에서 멈춤
+
+
+class TestHotpath(unittest.TestCase):
+    def test_cases_run_headless(self):
+        cases = hotpath.env_cases((320, 180))
+        self.assertEqual(set(cases), {'preprocess_frame', 'get_observation', 'calculate_reward',
+                                      'detect_exp_gain', 'check_danger_monster'})
+        self.assertEqual(cases['preprocess_frame']().shape, (84, 84))
+
+        results = hotpath.run(resolutions=(), repeat=3, pattern_events=200)
+        self.assertEqual(set(results), {'config/load_config', 'config/load_config_cold',
+                                        'config/load_game_config', 'pattern/load_pat', 'pattern/load_json'})
+        self.assertTrue(all(r['median_us'] > 0 for r in results.values()))
+
+
+class TestEndToEnd(unittest.TestCase):
+    def test_loop_reports_latency_and_throughput(self):
+        threads = torch.get_num_threads()
+        self.addCleanup(torch.set_num_threads, threads)
+        # seed=0 고정 → 정책 샘플링이 재현되어 측정 구간에 키를 누르는 행동이 반드시 나옴
+        result = e2e_latency.run_config(RESOLUTIONS["1080p"], 84, 2, 1, 1, steps=8, warmup=2, virtual_clock=True,
+                                        seed=0)
+
+        self.assertEqual(result['config']['capture'], "1920x1080")
+        self.assertEqual(result['predict']['count'], 8)
+        self.assertGreater(result['steps_per_sec'], 0)
+        self.assertIn('step', result['stages'])
+        self.assertGreater(result['e2e']['count'], 0)
+        self.assertGreater(result['e2e']['p50_ms'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
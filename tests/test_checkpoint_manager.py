@@ -0,0 +1,59 @@
+
+import unittest
+import sys
+import json
+import tempfile
+from pathlib import Path
+import numpy as np
+from gymnasium import spaces
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stable_baselines3 import PPO
+from src.actor_learner import SpaceOnlyEnv
+from src.checkpoint_manager import CheckpointManager
+
+
+class TestCheckpointManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        env = SpaceOnlyEnv(spaces.Box(-1, 1, shape=(4,), dtype=np.float32), spaces.Discrete(3))
+        self.model = PPO("MlpPolicy", env, n_steps=8, batch_size=8, device="cpu")
+
+    def test_retention_and_manifest(self):
+        manager = CheckpointManager(self.tmp.name, "TEST_ppo", keep_last=2, keep_best=1)
+        for steps, reward in [(100, 5.0), (200, 1.0), (300, 2.0), (400, None)]:
+            self.model.num_timesteps = steps
+            manager.save_async(self.model, eval_reward=reward)
+        manager.close()
+
+        files = sorted(p.name for p in Path(self.tmp.name).glob("*.pt.gz"))
+        # 최근 2개 (300, 400) + 보상 최고 (100)
+        self.assertEqual(files, ["TEST_ppo_100_steps.pt.gz", "TEST_ppo_300_steps.pt.gz", "TEST_ppo_400_steps.pt.gz"])
+        manifest = json.loads((Path(self.tmp.name) / "TEST_ppo_manifest.json").read_text(encoding='utf-8'))
+        self.assertEqual(manifest['latest'], "TEST_ppo_400_steps.pt.gz")
+        self.assertEqual(manifest['best'], "TEST_ppo_100_steps.pt.gz")
+        self.assertFalse(list(Path(self.tmp.name).glob("*.tmp")))
+
+    def test_restore_latest(self):
+        manager = CheckpointManager(self.tmp.name, "TEST_ppo")
+        self.model.num_timesteps = 1234
+        expected = {k: v.clone() for k, v in self.model.policy.state_dict().items()}
+        manager.save_async(self.model)
+        manager.close()
+
+        # 새 모델에 manifest로 복원
+        env = SpaceOnlyEnv(spaces.Box(-1, 1, shape=(4,), dtype=np.float32), spaces.Discrete(3))
+        fresh = PPO("MlpPolicy", env, n_steps=8, batch_size=8, device="cpu")
+        entry = CheckpointManager(self.tmp.name, "TEST_ppo").restore(fresh)
+
+        self.assertEqual(entry['timesteps'], 1234)
+        self.assertEqual(fresh.num_timesteps, 1234)
+        for key, value in fresh.policy.state_dict().items():
+            self.assertTrue(value.equal(expected[key]), key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import json
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['keyboard'] = MagicMock()
+
+import src.pattern_player_mp as pattern_player_mp
+from src.pattern_player_mp import HumanlikePatternPlayer
+from src.utils.clock import RealClock, VirtualClock
+
+
+class TestVirtualClock(unittest.TestCase):
+    def test_sleep_advances_without_waiting(self):
+        advanced = []
+        clock = VirtualClock(start=10.0, on_advance=advanced.append)
+        wall_start = time.perf_counter()
+        clock.sleep(3600)
+        clock.sleep(0)
+        clock.sleep(-1)  # 음수/0은 무시
+        self.assertLess(time.perf_counter() - wall_start, 1.0)
+        self.assertEqual(clock.time(), 3610.0)
+        self.assertEqual(advanced, [3600])
+
+    def test_pattern_player_replays_on_virtual_time(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pattern_path = Path(tmp) / "demo.json"
+            pattern = [
+                {'time': 0.5, 'key': 'right', 'type': 'down'},
+                {'time': 2.0, 'key': 'right', 'type': 'up'},
+                {'time': 2.25, 'key': 'ctrl', 'type': 'down'},
+                {'time': 2.5, 'key': 'ctrl', 'type': 'up'},
+            ]
+            metadata = {'name': 'demo', 'duration': 2.5, 'total_actions': len(pattern)}
+            pattern_path.write_text(json.dumps({'metadata': metadata, 'pattern': pattern}), encoding='utf-8')
+
+            clock = VirtualClock(start=0.0)
+            player = HumanlikePatternPlayer(pattern_path, humanlike_level=0.0, clock=clock)
+
+        keyboard = pattern_player_mp.keyboard
+        keyboard.reset_mock()
+        keyboard.is_pressed.return_value = False
+        # 건너뛰기/노이즈 없이 원본 타이밍 그대로
+        player.skip_prob = player.noise_prob = 0.0
+        player._play_once()
+
+        self.assertAlmostEqual(clock.time(), 2.5)
+        self.assertEqual([c.args[0] for c in keyboard.press.call_args_list], ['right', 'ctrl'])
+
+
+class TestDeadlinePlayback(unittest.TestCase):
+    def _player(self, pattern, humanlike_level, clock):
+        with tempfile.TemporaryDirectory() as tmp:
+            pattern_path = Path(tmp) / "demo.json"
+            metadata = {'name': 'demo', 'duration': pattern[-1]['time'], 'total_actions': len(pattern)}
+            pattern_path.write_text(json.dumps({'metadata': metadata, 'pattern': pattern}), encoding='utf-8')
+            player = HumanlikePatternPlayer(pattern_path, humanlike_level=humanlike_level, clock=clock)
+        player.skip_prob = player.noise_prob = 0.0
+        return player
+
+    def test_slow_dispatch_does_not_drift(self):
+        pattern = [{'time': round(0.01 * (i + 1), 3), 'key': 'right', 'type': 'down' if i % 2 == 0 else 'up'}
+                   for i in range(40)]
+        player = self._player(pattern, 0.0, RealClock())
+
+        keyboard = pattern_player_mp.keyboard
+        keyboard.reset_mock()
+        keyboard.is_pressed.return_value = False
+        keyboard.press.side_effect = lambda key: time.sleep(0.004)  # 느린 입력
+        try:
+            start = time.perf_counter()
+            timing = player._play_once()
+            elapsed = time.perf_counter() - start
+        finally:
+            keyboard.press.side_effect = None
+
+        # 상대 딜레이 방식이면 0.4초 + 20 x 4ms 이상 걸림
+        self.assertLess(elapsed, 0.4 + 0.04)
+        self.assertEqual(timing['events'], 40)
+        self.assertLess(timing['p50_ms'], 2.0)
+
+    def test_jitter_keeps_event_order(self):
+        pattern = [{'time': t, 'key': k, 'type': ty} for t, k, ty in [
+            (0.5, 'right', 'down'), (0.6, 'right', 'up'), (0.62, 'ctrl', 'down'),
+            (1.4, 'ctrl', 'up'), (3.0, 'alt', 'down'), (3.1, 'alt', 'up')]]
+        clock = VirtualClock(start=0.0)
+        player = self._player(pattern, 1.0, clock)
+
+        keyboard = pattern_player_mp.keyboard
+        keyboard.reset_mock()
+        keyboard.is_pressed.return_value = False
+        times = []
+        keyboard.press.side_effect = lambda key: times.append(clock.time())
+        keyboard.release.side_effect = lambda key: times.append(clock.time())
+        try:
+            player._play_once()
+        finally:
+            keyboard.press.side_effect = keyboard.release.side_effect = None
+
+        self.assertEqual(len(times), len(pattern))
+        self.assertEqual(times, sorted(times))
+        for t, event in zip(times, pattern):
+            self.assertLessEqual(abs(t - event['time']), 0.8 / 2 + 1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import tempfile
+import io
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+import src.utils.config_loader as config_loader
+from src.utils.config_loader import load_config, load_game_config
+from src.utils.config_watcher import ConfigWatcher
+from src.sim_game import SimMLEnv
+
+
+BASE = """
+timers: {buff_base: 1800, buff_variance: 120, skill_base: 60, skill_variance: 5}
+keybindings: {buff_key: '='}
+screen: {monitor: 1, capture_fps: 10}
+"""
+
+
+class TestGameConfig(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cwd = os.getcwd()
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        Path("configs").mkdir()
+        Path("config.yaml").write_text(BASE, encoding="utf-8")
+        Path("configs/ML.yaml").write_text("keybindings: {attack: 'a', potion_hp: 'delete'}\n", encoding="utf-8")
+        Path("configs/roi_settings.json").write_text('{"exp_bar": {"x": 10, "y": 20, "w": 30, "h": 4}}')
+
+    def test_memoized_until_files_change(self):
+        with patch.object(config_loader, '_read_config', wraps=config_loader._read_config) as read:
+            config = load_game_config(game="ML")
+            self.assertIs(load_game_config(game="ML"), config)
+            load_config(game="ML")["keybindings"]["attack"] = "x"  # 복사본 수정은 캐시에 영향 없음
+            self.assertEqual(read.call_count, 1)
+
+            self.assertEqual(config.keybindings.attack, 'a')
+            self.assertEqual(config.keybindings.get('potion_hp'), 'delete')
+            self.assertEqual(config.keybindings.get('teleport', 'v'), 'v')
+            self.assertEqual(config.timers.buff_base, 1800.0)
+            self.assertEqual(config.roi['exp_bar'].w, 30)
+            quoted = config_loader.compile_config({'yolo': {'use_gpu': 'false'}}, roi={})
+            self.assertIs(quoted.yolo.use_gpu, False)
+            with self.assertRaises(AttributeError):
+                config.timers.buff_base = 1
+
+            # 오버레이가 바뀌면 다시 읽음
+            overlay = Path("configs/ML.yaml")
+            overlay.write_text("keybindings: {attack: 'ctrl'}\n", encoding="utf-8")
+            stat = overlay.stat()
+            os.utime(overlay, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            reloaded = load_game_config(game="ML")
+            self.assertEqual(read.call_count, 2)
+            self.assertEqual(reloaded.keybindings.attack, 'ctrl')
+
+    def test_validation_reports_every_problem(self):
+        Path("config.yaml").write_text(BASE + "yolo: {confidence_threshold: 1.5, use_gpu: 1, typo: 1}\n"
+                                       "timers: {buff_base: 10, buff_variance: 20}\n"
+                                       "screen: {capture_fps: fast}\n", encoding="utf-8")
+        Path("configs/MP.yaml").write_text("reward: {exp: {large: lots, bogus: 1}, exp_typo: 1, stuck: {penalty: null},\n"
+                                           "         hit: {actions: [1.5]}, action: {0: x}}\n", encoding="utf-8")
+        with self.assertRaises(ValueError) as ctx:
+            load_game_config(game="MP")
+        message = str(ctx.exception)
+        for problem in ("yolo.confidence_threshold", "yolo.typo", "yolo.use_gpu", "timers.buff_variance", "screen.capture_fps",
+                        "reward.exp_typo", "reward.exp.large", "reward.exp.bogus", "reward.stuck.penalty",
+                        "reward.hit.actions", "reward.action.0"):
+            self.assertIn(problem, message)
+
+
+    def _touch(self, path, text):
+        # 같은 초 안에 다시 써도 수정 시각이 바뀌도록
+        path = Path(path)
+        before = path.stat().st_mtime_ns
+        path.write_text(text, encoding="utf-8")
+        os.utime(path, ns=(before + 10**9, before + 10**9))
+
+    def test_hot_reload_applies_at_step_boundary(self):
+        env = SimMLEnv(seed=0, frame_skip=1)
+        env.reset(seed=0)
+        watcher = env.watch_config(ConfigWatcher("ML", start=False))
+        old_slice = env.exp_slice
+
+        self._touch("configs/ML.yaml", "keybindings: {attack: 'ctrl'}\n")
+        self._touch("configs/roi_settings.json", '{"exp_bar": {"x": 100, "y": 200, "w": 300, "h": 8}}')
+        self.assertTrue(watcher.check())
+        self.assertEqual(env.action_map[4], 'a')  # 스텝 경계 전에는 그대로
+        env.step(0)
+        self.assertEqual(env.action_map[4], 'ctrl')
+        self.assertEqual(env.world.key_roles['ctrl'], 'attack')
+        self.assertNotEqual(env.exp_slice, old_slice)
+
+        # 보상 계수는 바로 교체, 환경이 쓰지 않는 섹션은 다시 시작하라고 알림
+        self._touch("configs/ML.yaml", "keybindings: {attack: 'ctrl'}\n"
+                                       "reward: {action: {0: -2.0}}\nscreen: {capture_fps: 30}\n")
+        self.assertTrue(watcher.check())
+        output = io.StringIO()
+        with redirect_stdout(output):
+            env.step(0)
+        self.assertEqual(env.reward_terms['action'], -2.0)
+        self.assertEqual(env.reward_coeffs['action'][4], 0.6)  # 적지 않은 항목은 기본값
+        self.assertIsNot(env.reward_coeffs['exp'], config_loader.DEFAULT_REWARD_COEFFS['ML']['exp'])  # 복사본
+        self.assertIn("다시 시작해야 적용되는 설정 (이 환경은 사용하지 않음): screen", output.getvalue())
+
+        # 검증 실패한 설정은 적용하지 않음
+        self._touch("configs/ML.yaml", "screen: {capture_fps: 0}\n")
+        self.assertFalse(watcher.check())
+        env.step(0)
+        self.assertEqual(env.config.keybindings.attack, 'ctrl')
+
+
+if __name__ == '__main__':
+    unittest.main()
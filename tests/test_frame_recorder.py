@@ -0,0 +1,76 @@
+
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from src.frame_recorder import FrameRecorder, frame_stream_paths, load_frames
+from src.pattern_checkpoints import load_checkpoints
+
+
+class FakeCapture:
+    """프레임 번호만큼 밝아지는 가짜 화면"""
+
+    def __init__(self, monitor=None):
+        self.index = 0
+
+    def grab(self):
+        self.index += 1
+        return np.full((120, 160, 3), self.index % 256, dtype=np.uint8)
+
+    def close(self):
+        pass
+
+
+class TestFrameRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.pattern_path = Path(self.tmp.name) / "route.pat"
+
+    def record(self, recorder, seconds):
+        with patch('src.capture.ScreenCapture', FakeCapture):
+            recorder.start(time.time(), self.pattern_path)
+            time.sleep(seconds)
+
+    def test_frames_streamed_to_disk_while_recording(self):
+        recorder = FrameRecorder(fps=100, flush_interval=0.05)
+        self.addCleanup(recorder.stop)
+        self.record(recorder, 0.3)
+
+        # 녹화 중 (메타데이터 없음 = 중간에 끊긴 패턴): 마지막 flush까지 읽힘
+        frames, timestamps = load_frames(self.pattern_path, {})
+        self.assertGreater(len(frames), 0)
+        self.assertLessEqual(len(frames), recorder.count)
+        self.assertEqual(frames.shape[1:], (84, 84))
+        self.assertIsInstance(frames, np.memmap)
+        self.assertIsNotNone(load_checkpoints(self.pattern_path, {}))
+        del frames
+
+        recorder.stop()
+        info = recorder.save(self.pattern_path)
+        frames, timestamps = load_frames(self.pattern_path, {'frames': info})
+        self.assertEqual(len(frames), info['count'])
+        self.assertEqual(len(timestamps), info['count'])
+        self.assertTrue(np.all(np.diff(timestamps) > 0))
+        np.testing.assert_array_equal(frames[:, 0, 0], np.arange(1, len(frames) + 1) % 256)
+
+    def test_empty_recording_leaves_no_files(self):
+        recorder = FrameRecorder(fps=10)
+        with patch.object(FrameRecorder, '_loop', lambda self: None):  # 한 장도 캡처하기 전에 중지
+            recorder.start(time.time(), self.pattern_path)
+            recorder.stop()
+        self.assertIsNone(recorder.save(self.pattern_path))
+        self.assertFalse(any(path.exists() for path in frame_stream_paths(self.pattern_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+
+import unittest
+import sys
+from pathlib import Path
+import numpy as np
+from gymnasium import spaces
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.frame_replay_buffer import FrameStackReplayBuffer
+
+
+class TestFrameStackReplayBuffer(unittest.TestCase):
+    def _fill(self, buffer, n_steps, episode_len, stack=4):
+        """스텝 단위 스택 관측(프레임 값 = 에피소드*10 + 스텝)으로 버퍼 채우기"""
+        expected = []
+        for t in range(n_steps):
+            episode, step = divmod(t, episode_len)
+            ids = [episode * 10 + max(0, step - stack + 1 + k) for k in range(stack)]
+            obs = np.stack([np.full((2, 2), i, dtype=np.uint8) for i in ids])
+            next_obs = np.concatenate([obs[1:], np.full((1, 2, 2), episode * 10 + step + 1, dtype=np.uint8)])
+            done = step == episode_len - 1
+            infos = [{'TimeLimit.truncated': done and episode % 2 == 0}]
+            buffer.add(obs[None], next_obs[None], np.array([t % 3]), np.array([float(t)]),
+                       np.array([done]), infos)
+            expected.append((obs, next_obs, t % 3, float(t), done and episode % 2 == 1))
+        return expected
+
+    def test_stacks_rebuilt_from_single_frames(self):
+        space = spaces.Box(0, 255, shape=(4, 2, 2), dtype=np.uint8)
+        buffer = FrameStackReplayBuffer(20, space, spaces.Discrete(3), device="cpu")
+        expected = self._fill(buffer, 15, episode_len=6)
+
+        # 에피소드 시작 3번 x (스택 4장) + 나머지 스텝 1장씩
+        self.assertEqual(buffer.frame_count, 15 + 3 * 4)
+
+        samples = buffer._get_samples(np.arange(15))
+        for t, (obs, next_obs, action, reward, done) in enumerate(expected):
+            np.testing.assert_array_equal(samples.observations[t].numpy(), obs)
+            np.testing.assert_array_equal(samples.next_observations[t].numpy(), next_obs)
+            self.assertEqual(int(samples.actions[t, 0]), action)
+            self.assertEqual(float(samples.rewards[t, 0]), reward)
+            # 시간 제한 종료는 done=0
+            self.assertEqual(float(samples.dones[t, 0]), float(done))
+
+    def test_wraparound_samples_only_valid_stacks(self):
+        space = spaces.Box(0, 255, shape=(4, 2, 2), dtype=np.uint8)
+        buffer = FrameStackReplayBuffer(8, space, spaces.Discrete(3), device="cpu")
+        self._fill(buffer, 50, episode_len=3)
+
+        np.random.seed(0)
+        samples = buffer.sample(64)
+        obs = samples.observations.numpy()[:, :, 0, 0]
+        next_obs = samples.next_observations.numpy()[:, :, 0, 0]
+        # 스택이 덮어쓰이지 않았으면 다음 관측은 관측을 한 칸 민 것
+        np.testing.assert_array_equal(next_obs[:, :-1], obs[:, 1:])
+        self.assertTrue(np.all(np.diff(obs, axis=1) >= 0))
+
+    def test_sample_fails_clearly_when_no_valid_stack(self):
+        space = spaces.Box(0, 255, shape=(4, 2, 2), dtype=np.uint8)
+        buffer = FrameStackReplayBuffer(8, space, spaces.Discrete(3), device="cpu")
+        self._fill(buffer, 8, episode_len=3)
+        # 기록된 모든 전이의 프레임이 링에서 밀려난 상태
+        buffer.frame_count += buffer.frame_capacity
+
+        np.random.seed(0)
+        with self.assertRaisesRegex(RuntimeError, "샘플링할 수 있는 전이가 없습니다"):
+            buffer.sample(4)
+
+
+if __name__ == '__main__':
+    unittest.main()
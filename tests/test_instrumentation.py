@@ -0,0 +1,55 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from src.utils.instrumentation import ENV_STAGES, LatencyHistogram, TimingAggregator
+from src.sim_game import SimMLEnv
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles_within_bucket_error(self):
+        hist = LatencyHistogram()
+        buckets = len(hist.counts)
+        for ms in range(1, 101):
+            hist.record(ms * 1_000_000)
+        self.assertEqual(len(hist.counts), buckets)  # 샘플 수와 무관한 고정 크기
+        for q in (50, 95, 99):
+            self.assertAlmostEqual(hist.percentile(q) / 1e6, q, delta=q * 0.1)
+        self.assertEqual(hist.summary()['max_ms'], 100.0)
+
+        hist.reset()
+        self.assertEqual(hist.count, 0)
+        self.assertEqual(hist.percentile(50), 0.0)
+
+
+class TestStepTiming(unittest.TestCase):
+    def test_step_info_timing_logged_by_aggregator(self):
+        env = SimMLEnv(seed=0, frame_skip=2)
+        env.reset(seed=0)
+        infos = [env.step(0)[4] for _ in range(5)]
+        env.close()
+
+        timing = infos[-1]['timing']
+        self.assertEqual(set(timing), set(ENV_STAGES))
+        self.assertEqual(timing['convert'], 0.0)  # 시뮬레이터는 BGRA 변환 없음
+        self.assertGreater(timing['step'], 0.0)
+        self.assertGreaterEqual(timing['step'], timing['capture'] + timing['reward'])
+
+        logger = MagicMock()
+        aggregator = TimingAggregator()
+        aggregator.add_infos(infos + [{}])
+        stats = aggregator.record(logger)
+        self.assertEqual(stats['step']['count'], 5)
+        logger.record.assert_any_call("timing/step_p99_ms", stats['step']['p99_ms'])
+        self.assertFalse(aggregator.record(MagicMock()))  # 기록 후 초기화
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+sys.modules['keyboard'] = MagicMock()
+sys.modules['pyautogui'] = MagicMock()
+
+from src.capture import SharedScreenCapture
+from src.rl_vec_env_realtime import resolve_clients
+
+
+class TestSharedScreenCapture(unittest.TestCase):
+    def setUp(self):
+        self.capture = SharedScreenCapture([
+            {'left': 0, 'top': 0, 'width': 4, 'height': 2},
+            {'left': 10, 'top': 5, 'width': 3, 'height': 3},
+        ])
+        self.capture.sct.grab = MagicMock(side_effect=self.grab)
+
+    @staticmethod
+    def grab(monitor):
+        # 전체 영역 픽셀 = x 좌표 (BGRA)
+        frame = np.zeros((monitor['height'], monitor['width'], 4), dtype=np.uint8)
+        frame[..., 0] = np.arange(monitor['width'])[None, :]
+        return frame
+
+    def test_union_region(self):
+        self.assertEqual(self.capture.monitor, {'left': 0, 'top': 0, 'width': 13, 'height': 8})
+
+    def test_one_grab_per_tick(self):
+        """모든 클라이언트가 한 번씩 받아가면 캡처는 한 번"""
+        a = self.capture.view(0).grab()
+        b = self.capture.view(1).grab()
+        self.assertEqual(self.capture.grab_count, 1)
+        self.assertEqual(a.shape, (2, 4, 3))
+        self.assertEqual(b.shape, (3, 3, 3))
+        self.assertEqual(b[0, 0, 0], 10)
+
+        # 같은 클라이언트가 다시 요청하면 새로 캡처
+        self.capture.view(0).grab()
+        self.assertEqual(self.capture.grab_count, 2)
+
+    def test_mss_created_in_grabbing_thread(self):
+        """mss 인스턴스는 grab하는 스레드에서 생성 (VecEnv 클라이언트 스레드)"""
+        owners = []
+
+        def make_mss():
+            sct = MagicMock()
+            sct.grab.side_effect = lambda monitor: (owners.append((sct, threading.get_ident())),
+                                                    self.grab(monitor))[1]
+            sct.created_in = threading.get_ident()
+            return sct
+
+        with patch('src.capture.mss.mss', side_effect=make_mss):
+            capture = SharedScreenCapture(self.capture.regions)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                frames = list(pool.map(lambda i: capture.view(i).grab(), [0, 1, 0, 1]))
+
+        self.assertEqual(frames[1].shape, (3, 3, 3))
+        self.assertTrue(owners)
+        for sct, thread_id in owners:
+            self.assertEqual(sct.created_in, thread_id)
+            self.assertNotEqual(thread_id, threading.get_ident())
+        instances = {id(sct): sct for sct, _ in owners}.values()
+        capture.close()
+        for sct in instances:
+            sct.close.assert_called_once()
+
+
+class TestResolveClients(unittest.TestCase):
+    def test_region_only_client_clicks_inside_its_region(self):
+        regions, inputs = resolve_clients([{'region': {'x': 1920, 'y': 40, 'w': 1366, 'h': 768}}])
+        self.assertEqual(regions, [{'left': 1920, 'top': 40, 'width': 1366, 'height': 768}])
+        pyautogui = sys.modules['pyautogui']
+        pyautogui.click.reset_mock()
+        inputs[0].click(100, 50)
+        pyautogui.click.assert_called_once_with(2020, 90)
+
+
+if __name__ == '__main__':
+    unittest.main()
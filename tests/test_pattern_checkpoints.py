@@ -0,0 +1,90 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import json
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['keyboard'] = MagicMock()
+
+import src.pattern_player_mp as pattern_player_mp
+from src.pattern_checkpoints import CheckpointSet, fingerprint, load_checkpoints
+from src.pattern_player_mp import HumanlikePatternPlayer
+from src.utils.clock import VirtualClock
+
+
+class ScriptedView:
+    """검증할 때마다 정해진 지문을 돌려주는 가짜 화면"""
+
+    def __init__(self, prints):
+        self.prints = list(prints)
+
+    @property
+    def latest(self):
+        return self.prints.pop(0)
+
+
+class TestPatternCheckpoints(unittest.TestCase):
+    def test_build_save_verify(self):
+        rng = np.random.default_rng(0)
+        scenes = rng.integers(0, 256, size=(5, 84, 84), dtype=np.uint8)
+        frames = np.repeat(scenes, 20, axis=0)           # 장면당 2초 (10fps)
+        timestamps = np.arange(len(frames)) / 10.0
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pattern_path = Path(tmp) / "route.pat"
+            info = CheckpointSet.build(frames, timestamps, interval=2.0).save(pattern_path)
+            checkpoints = load_checkpoints(pattern_path, {'checkpoints': info})
+        np.testing.assert_allclose(checkpoints.times, [0.0, 2.0, 4.0, 6.0, 8.0])
+
+        # 밝기가 바뀌고 잡음이 섞여도 같은 장면, 다른 장면이면 그 체크포인트, 단색 화면이면 None
+        noisy = np.clip(scenes[1].astype(np.int16) + 30 + rng.integers(-10, 10, (84, 84)), 0, 255).astype(np.uint8)
+        self.assertEqual(checkpoints.verify(1, fingerprint(noisy)), 1)
+        self.assertEqual(checkpoints.verify(1, fingerprint(scenes[3])), 3)
+        self.assertIsNone(checkpoints.verify(1, fingerprint(np.zeros((84, 84), np.uint8))))
+
+        # 재생 루프 안에서의 검증 비용 (1ms 미만)
+        live = fingerprint(scenes[2])
+        started = time.perf_counter()
+        for _ in range(1000):
+            checkpoints.verify(2, live)
+        self.assertLess((time.perf_counter() - started) / 1000, 1e-3)
+
+    def test_player_seeks_and_pauses_on_divergence(self):
+        pattern = [{'time': round(0.25 + 0.5 * i, 3), 'key': 'right', 'type': 'down' if i % 2 == 0 else 'up'}
+                   for i in range(20)]
+        rng = np.random.default_rng(1)
+        prints = rng.normal(size=(5, 144)).astype(np.float32)
+        prints /= np.linalg.norm(prints, axis=1, keepdims=True)
+        blank = np.zeros(144, np.float32)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pattern_path = Path(tmp) / "route.json"
+            info = CheckpointSet([0.0, 2.0, 4.0, 6.0, 8.0], prints).save(pattern_path)
+            metadata = {'name': 'route', 'duration': 9.75, 'total_actions': 20, 'checkpoints': info}
+            pattern_path.write_text(json.dumps({'metadata': metadata, 'pattern': pattern}), encoding='utf-8')
+            clock = VirtualClock(start=0.0)
+            player = HumanlikePatternPlayer(pattern_path, humanlike_level=0.0, clock=clock)
+        player.skip_prob = player.noise_prob = 0.0
+
+        keyboard = pattern_player_mp.keyboard
+        keyboard.reset_mock()
+        keyboard.is_pressed.return_value = False
+        # 체크포인트 2에서 1번 장면 → 2초 전으로 이동, 그다음 체크포인트 2에서 암전 → 일시정지 후 복구
+        player.live_view = ScriptedView([prints[0], prints[1], prints[1], blank, blank, prints[2],
+                                         prints[3], prints[4]])
+        timing = player._play_once()
+
+        self.assertEqual(timing['sync'], {'checks': 6, 'seeks': 1, 'pauses': 1})
+        self.assertEqual(keyboard.press.call_count, 10 + 2)       # 2~4초 구간 다시 재생
+        self.assertAlmostEqual(clock.time(), 9.75 + 2.0 + 2 * pattern_player_mp.PAUSE_POLL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+
+import unittest
+import sys
+import json
+import io
+from contextlib import redirect_stdout
+import tempfile
+import threading
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.pattern_format import (STREAM_HEADER_SIZE, PatternFile, PatternStreamWriter, convert_pattern, load_pattern,
+                                save_pattern)
+
+
+class TestPatternFormat(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        keys = ['left', 'right', 'ctrl', 'alt', '1']
+        self.pattern = []
+        for i in range(200):
+            key = keys[i % len(keys)]
+            self.pattern.append({'time': round(i * 0.137, 3), 'key': key, 'type': 'down'})
+            self.pattern.append({'time': round(i * 0.137 + 0.05, 3), 'key': key, 'type': 'up'})
+        self.metadata = {
+            'name': '사냥루틴', 'recorded_at': '20250101_120000',
+            'duration': self.pattern[-1]['time'], 'total_actions': len(self.pattern),
+            'keys_used': keys,
+            'frames': {'file': 'x_frames.npz', 'fps': 10, 'count': 3, 'width': 84, 'height': 84, 'missed': 0},
+        }
+
+    def test_json_binary_roundtrip_is_lossless(self):
+        json_path = Path(self.tmp.name) / "routine.json"
+        save_pattern(json_path, self.metadata, self.pattern)
+
+        pat_path = convert_pattern(json_path)
+        self.assertEqual(pat_path.suffix, '.pat')
+        self.assertLess(pat_path.stat().st_size, json_path.stat().st_size / 4)
+
+        pattern = load_pattern(pat_path)
+        self.assertIsInstance(pattern.events, np.memmap)
+        self.assertEqual(len(pattern), len(self.pattern))
+
+        back_path = convert_pattern(pat_path, Path(self.tmp.name) / "back.json")
+        original = json.loads(json_path.read_text(encoding='utf-8'))
+        self.assertEqual(json.loads(back_path.read_text(encoding='utf-8')), original)
+
+    def test_streaming_iteration(self):
+        pat_path = Path(self.tmp.name) / "routine.pat"
+        save_pattern(pat_path, self.metadata, self.pattern)
+        pattern = PatternFile.open(pat_path)
+
+        streamed = list(pattern.iter_events(chunk_size=7))
+        expected = [(e['time'], e['key'], e['type']) for e in self.pattern]
+        self.assertEqual(streamed, expected)
+
+        # 이벤트 없는 패턴
+        empty_path = Path(self.tmp.name) / "empty.pat"
+        save_pattern(empty_path, {'name': 'empty'}, [])
+        self.assertEqual(list(load_pattern(empty_path).iter_events()), [])
+
+        with self.assertRaises(ValueError):
+            save_pattern(pat_path, self.metadata, [{'time': 0.0, 'key': 'a', 'type': 'down', 'extra': 1}])
+
+
+class TestPatternStreamWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "stream.pat"
+        self.events = [(round(i * 0.1, 3), ['left', 'ctrl', 'z'][i // 2 % 3], ('down', 'up')[i % 2])
+                       for i in range(300)]
+
+    def test_stream_readable_during_and_after_recording(self):
+        writer = PatternStreamWriter(self.path, {'name': 'stream'}, fsync_interval=0.01)
+        for event in self.events[:100]:
+            writer.add(*event)
+        writer.add(*self.events[100])
+        writer._queue.put(None)  # 기록 스레드만 멈춰 녹화 중 상태 재현
+        writer._thread.join()
+
+        # 녹화 중 파일 + 끝에 잘린 레코드 → 완성된 레코드만 읽힘
+        with open(self.path, 'ab') as f:
+            f.write(b'\x00' * 5)
+        partial = PatternFile.open(self.path)
+        self.assertEqual(list(partial.iter_events()), self.events[:101])
+        del partial
+
+        writer._file.truncate(writer._file.tell())
+        writer._thread = threading.Thread(target=writer._run, daemon=True)
+        writer._thread.start()
+        for event in self.events[101:]:
+            writer.add(*event)
+        metadata = writer.close({'frames': {'count': 0}})
+
+        pattern = load_pattern(self.path)
+        self.assertEqual(list(pattern.iter_events()), self.events)
+        self.assertEqual(metadata['total_actions'], 300)
+        self.assertEqual(pattern.metadata['duration'], 29.9)
+        self.assertEqual(pattern.metadata['frames'], {'count': 0})
+        self.assertEqual(writer.down_counts, {'left': 50, 'ctrl': 50, 'z': 50})
+
+    def test_large_metadata_grows_reserved_header(self):
+        writer = PatternStreamWriter(self.path, {'name': 'stream'})
+        for event in self.events:
+            writer.add(*event)
+        with redirect_stdout(io.StringIO()):
+            writer.close({'notes': 'x' * 10000})
+
+        pattern = load_pattern(self.path)
+        self.assertEqual(pattern.metadata['notes'], 'x' * 10000)
+        self.assertEqual(list(pattern.iter_events()), self.events)
+
+    def test_many_long_keys_grow_header_while_recording(self):
+        events = [(i * 0.1, f"macro_key_with_a_long_name_{i:03d}", 'down') for i in range(300)]
+        writer = PatternStreamWriter(self.path, {'name': 'stream'}, fsync_interval=0.01)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            for event in events[:200]:
+                writer.add(*event)
+            writer._queue.put(None)  # 녹화 중 상태에서 파일 확인
+            writer._thread.join()
+            partial = PatternFile.open(self.path)
+            self.assertEqual(list(partial.iter_events()), events[:200])
+            del partial
+
+            writer._thread = threading.Thread(target=writer._run, daemon=True)
+            writer._thread.start()
+            for event in events[200:]:
+                writer.add(*event)
+            writer.close()
+
+        self.assertIn("예약 영역", output.getvalue())
+        self.assertGreater(writer.header_size, STREAM_HEADER_SIZE)
+        pattern = load_pattern(self.path)
+        self.assertEqual(pattern.keys, [key for _, key, _ in events])
+        self.assertEqual(list(pattern.iter_events()), events)
+
+
+if __name__ == '__main__':
+    unittest.main()
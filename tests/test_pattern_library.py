@@ -0,0 +1,71 @@
+
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.pattern_format import save_pattern
+from src.pattern_library import PatternLibrary
+
+
+def _events(keys, n, step):
+    events = []
+    for i in range(n):
+        key = keys[i % len(keys)]
+        events.append({'time': round(i * step, 3), 'key': key, 'type': 'down'})
+        events.append({'time': round(i * step + step / 2, 3), 'key': key, 'type': 'up'})
+    return events
+
+
+class TestPatternLibrary(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+        specs = [('short', ['left', 'ctrl'], 10, 0.5, '.json'),
+                 ('long', ['right', 'ctrl', 'alt'], 300, 1.0, '.pat'),
+                 ('mid', ['left', 'alt'], 60, 1.0, '.pat')]
+        for i, (name, keys, n, step, suffix) in enumerate(specs):
+            events = _events(keys, n, step)
+            metadata = {'name': name, 'recorded_at': f'2025010{i + 1}_120000',
+                        'duration': events[-1]['time'], 'total_actions': len(events), 'keys_used': keys}
+            path = self.dir / f"{name}{suffix}"
+            save_pattern(path, metadata, events)
+            os.utime(path, ns=(i * 10**9, (i + 1) * 10**9))  # short < long < mid
+
+    def test_queries(self):
+        with PatternLibrary(self.dir) as library:
+            self.assertEqual([e['name'] for e in library.query()], ['mid', 'long', 'short'])
+            self.assertEqual(library.latest()['name'], 'mid')
+            self.assertEqual([e['name'] for e in library.query(keys=['ctrl'])], ['long', 'short'])
+            self.assertEqual([e['name'] for e in library.query(keys=['left', 'alt'])], ['mid'])
+            self.assertEqual([e['name'] for e in library.query(min_duration=30, max_duration=100)], ['mid'])
+
+            long = library.latest(keys=['alt', 'ctrl'])
+            self.assertEqual(long['keys'], {'right': 100, 'ctrl': 100, 'alt': 100})
+            self.assertEqual(long['format'], 'pat')
+
+            library.tag(long['path'], '사냥')
+            self.assertEqual([e['name'] for e in library.query(tag='사냥')], ['long'])
+
+    def test_incremental_refresh_keeps_tags_across_rename(self):
+        with PatternLibrary(self.dir) as library:
+            library.tag(self.dir / "short.json", 'warmup')
+
+        (self.dir / "short.json").rename(self.dir / "renamed.json")
+        save_pattern(self.dir / "mid.pat", {'name': 'mid2', 'duration': 1.0}, _events(['up'], 2, 0.5))
+
+        with PatternLibrary(self.dir, refresh=False) as library:
+            stats = library.refresh()
+            self.assertEqual(stats, {'added': 1, 'updated': 1, 'removed': 1, 'unchanged': 1})
+            self.assertEqual(library.query(tag='warmup')[0]['path'].name, 'renamed.json')
+            self.assertEqual(library.query(keys=['up'])[0]['name'], 'mid2')
+            self.assertEqual(library.refresh()['unchanged'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+
+import unittest
+import sys
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.pattern_format import PatternFile
+from src.pattern_schedule import KIND_NOISE, KIND_PATTERN, compile_schedule
+
+
+class TestPatternSchedule(unittest.TestCase):
+    def setUp(self):
+        events = []
+        for i in range(500):
+            key = ['left', 'ctrl', 'alt'][i % 3]
+            events.append({'time': round(i * 0.3, 3), 'key': key, 'type': 'down'})
+            events.append({'time': round(i * 0.3 + 0.12, 3), 'key': key, 'type': 'up'})
+        self.pattern = PatternFile.from_events({'name': 'test'}, events)
+
+    def test_seeded_and_ordered(self):
+        a = compile_schedule(self.pattern, 0.3, seed=7, loop_index=2)
+        b = compile_schedule(self.pattern, 0.3, seed=7, loop_index=2)
+        c = compile_schedule(self.pattern, 0.3, seed=7, loop_index=3)
+        self.assertEqual(a.events.tobytes(), b.events.tobytes())
+        self.assertNotEqual(a.events.tobytes(), c.events.tobytes())
+
+        self.assertTrue(np.all(np.diff(a.events['time']) >= 0))
+        self.assertEqual(len(a), len(self.pattern) - a.skipped + 2 * a.noise)
+        self.assertGreater(a.skipped, 0)
+        self.assertGreater(a.noise, 0)
+
+        # 원래 이벤트끼리는 순서 유지
+        pattern_events = a.events[a.events['kind'] == KIND_PATTERN]
+        self.assertTrue(np.all(np.diff(pattern_events['time']) > 0))
+
+    def test_noise_is_merged_as_press_release(self):
+        schedule = compile_schedule(self.pattern, 0.0, seed=1, skip_prob=0.0, noise_prob=0.5)
+        events = list(schedule.iter_events())
+        noise = [e for e in events if e[3] == KIND_NOISE]
+        self.assertEqual(len(noise), 2 * schedule.noise)
+        self.assertEqual(schedule.skipped, 0)
+        for key in {'left', 'right', 'space'}:
+            types = [e[2] for e in noise if e[1] == key]
+            self.assertEqual(types, ['down', 'up'] * (len(types) // 2))
+
+        # 변형 없음 = 원본 그대로
+        plain = compile_schedule(self.pattern, 0.0, seed=1, skip_prob=0.0, noise_prob=0.0)
+        self.assertEqual([e[:3] for e in plain.iter_events()], list(self.pattern.iter_events()))
+
+
+if __name__ == '__main__':
+    unittest.main()
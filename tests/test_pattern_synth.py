@@ -0,0 +1,80 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import itertools
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['keyboard'] = MagicMock()
+
+import src.pattern_player_mp as pattern_player_mp
+from src.pattern_format import PatternFile
+from src.pattern_synth import PatternSynthesizer
+from src.utils.clock import VirtualClock
+
+
+SEQUENCE = ['right', 'ctrl', 'ctrl', 'alt', 'left', 'ctrl']
+
+
+def _pattern(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    events, t = [], 0.0
+    for i in range(n):
+        key = SEQUENCE[i % len(SEQUENCE)]
+        hold = 0.05 + rng.random() * 0.1
+        events.append({'time': round(t, 3), 'key': key, 'type': 'down'})
+        events.append({'time': round(t + hold, 3), 'key': key, 'type': 'up'})
+        t += 0.2 + rng.random() * 0.2
+    events.sort(key=lambda e: e['time'])
+    return PatternFile.from_events({'name': 'cycle'}, events)
+
+
+class TestPatternSynthesizer(unittest.TestCase):
+    def test_stream_is_valid_and_follows_ngrams(self):
+        synth = PatternSynthesizer.fit([_pattern()], order=3)
+        events = list(itertools.islice(synth.stream(seed=1), 4000))
+        self.assertEqual(events, list(itertools.islice(synth.stream(seed=1), 4000)))
+
+        times = [e[0] for e in events]
+        self.assertEqual(times, sorted(times))
+
+        held = set()
+        for _, key, event_type in events:
+            if event_type == 'down':
+                self.assertNotIn(key, held)
+                held.add(key)
+            else:
+                self.assertIn(key, held)
+                held.remove(key)
+
+        # 2개 키 문맥이면 녹화 순환을 그대로 따름 (처음 두 누름 이후)
+        presses = [key for _, key, t in events if t == 'down']
+        cycle = SEQUENCE * 2
+        observed = {tuple(cycle[i:i + 3]) for i in range(len(SEQUENCE))}
+        self.assertTrue(all(tuple(presses[i:i + 3]) in observed for i in range(2, len(presses) - 2)))
+
+        # 간격은 녹화 분포 범위 안
+        gaps = np.diff([t for t, _, ty in events if ty == 'down'])
+        self.assertGreaterEqual(gaps.min(), 0.2 - 1e-6)
+        self.assertLessEqual(gaps.max(), 0.4 + 0.15 + 1e-6)
+
+    def test_endless_stream_playback(self):
+        synth = PatternSynthesizer.fit([_pattern()], order=2)
+        clock = VirtualClock(start=0.0)
+        keyboard = pattern_player_mp.keyboard
+        keyboard.reset_mock()
+        keyboard.is_pressed.return_value = False
+
+        played = pattern_player_mp.play_event_stream(synth.stream(seed=3), clock=clock, max_events=1001)
+        self.assertEqual(played, 1001)
+        # 끝에서 누르고 있던 키까지 모두 해제
+        self.assertEqual(keyboard.press.call_count, keyboard.release.call_count)
+        self.assertGreater(clock.time(), 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import threading
+import time
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Mock dependencies before importing rl_env_realtime
+sys.modules['mss'] = MagicMock()
+sys.modules['keyboard'] = MagicMock()
+sys.modules['win32gui'] = MagicMock()
+sys.modules['win32con'] = MagicMock()
+sys.modules['pyautogui'] = MagicMock()
+
+from src.rl_env_realtime import RealtimeGameEnv
+from src.rl_env_pipeline import PipelinedRealtimeEnv
+from src.rl_env_ml import MLRealtimeEnv
+from src.rl_env_mp import MPRealtimeEnv
+
+
+class TestPipelinedEnv(unittest.TestCase):
+    def setUp(self):
+        with patch('src.rl_env_realtime.load_config') as mock_load:
+            mock_load.return_value = {}
+            with patch('cv2.imread', return_value=None):
+                self.base = RealtimeGameEnv(game="TEST", frame_skip=2)
+
+        self.base._check_danger_monster = MagicMock()
+        self.base._calculate_reward = MagicMock(return_value=1.0)
+        self.base._capture_frame = MagicMock(return_value=np.zeros((100, 100, 3), dtype=np.uint8))
+
+    def _make_slow_action(self, hold):
+        """hold초 동안 실행되는 가짜 행동 (실행 구간 기록)"""
+        self.action_running = threading.Event()
+
+        def execute(action):
+            self.action_running.set()
+            time.sleep(hold)
+            self.action_running.clear()
+
+        self.base._execute_action = MagicMock(side_effect=execute)
+
+    def test_capture_overlaps_action(self):
+        """action_delay=1이면 행동 실행 중에 캡처가 일어나야 함"""
+        self._make_slow_action(0.05)
+        captured_while_running = []
+        frame = np.zeros((100, 100, 3), dtype=np.uint8)
+
+        def capture():
+            captured_while_running.append(self.action_running.is_set())
+            return frame
+
+        self.base._capture_frame = MagicMock(side_effect=capture)
+        env = PipelinedRealtimeEnv(self.base, action_delay=1, frame_interval=0.0)
+        env.reset()
+        captured_while_running.clear()
+
+        obs, reward, done, truncated, info = env.step(4)
+
+        self.assertTrue(any(captured_while_running))
+        self.assertEqual(reward, 2.0)
+        self.assertEqual(info['applied_action'], 4)
+        env.close()
+        self.assertEqual(self.base._execute_action.call_count, 2)
+
+    def test_zero_delay_is_synchronous(self):
+        """action_delay=0이면 행동이 끝난 뒤에만 캡처"""
+        self._make_slow_action(0.01)
+        env = PipelinedRealtimeEnv(self.base, action_delay=0, frame_interval=0.0)
+        env.reset()
+
+        env.step(1)
+
+        self.assertEqual(self.base._execute_action.call_count, 2)
+        self.assertEqual(len(env._pending), 0)
+        env.close()
+
+    def test_applied_action_is_oldest_running(self):
+        """action_delay=2면 보상 기준 행동은 아직 실행 중인 이전 행동"""
+        self._make_slow_action(0.05)
+        rewarded = []
+        self.base._calculate_reward = MagicMock(side_effect=lambda action, frame: rewarded.append(action) or 0.0)
+        env = PipelinedRealtimeEnv(self.base, action_delay=2, frame_interval=0.0)
+        env.reset()
+
+        env.step(1)
+        rewarded.clear()
+        obs, reward, done, truncated, info = env.step(2)
+
+        self.assertEqual(rewarded[0], 1)
+        self.assertEqual(info['applied_action'], rewarded[-1])
+        env.close()
+
+
+class FakeCapture:
+    def __init__(self, frame):
+        self.frame = frame
+        self.monitor = {'left': 0, 'top': 0, 'width': frame.shape[1], 'height': frame.shape[0]}
+
+    def grab(self):
+        return self.frame.copy()
+
+    def close(self):
+        pass
+
+
+class TestPipelinedGameEnvs(unittest.TestCase):
+    """ML / MP 환경 래핑 (환경 공통 서브 스텝 루프 재사용)"""
+
+    def _make_env(self, env_class):
+        frame = np.random.default_rng(0).integers(0, 256, (200, 200, 3), dtype=np.uint8)
+        base = env_class(frame_skip=2, capture=FakeCapture(frame), input_backend=MagicMock())
+        base._calculate_reward = MagicMock(return_value=1.0)
+        base._apply_pending_config = MagicMock()
+        return base, frame
+
+    def test_ml_and_mp_step_timing_and_config(self):
+        for env_class in (MLRealtimeEnv, MPRealtimeEnv):
+            with self.subTest(env=env_class.__name__):
+                base, _ = self._make_env(env_class)
+                env = PipelinedRealtimeEnv(base, action_delay=1, frame_interval=0.0)
+                env.reset()
+                for _ in range(2):
+                    obs, reward, done, truncated, info = env.step(0)
+                env.close()
+
+                self.assertEqual(obs.shape, (4, 84, 84))
+                self.assertEqual(reward, 2.0)
+                self.assertEqual(base._apply_pending_config.call_count, 2)
+                self.assertGreater(info['timing']['step'], 0.0)
+                # 스텝마다 초기화되므로 한 스텝 시간보다 클 수 없음
+                self.assertLessEqual(info['timing']['capture'], info['timing']['step'])
+
+    def test_emergency_escape_waits_for_held_keys(self):
+        base, frame = self._make_env(MLRealtimeEnv)
+        base.danger_monster_template = frame[50:90, 50:90].copy()
+        base.danger_check_interval = 0
+        base.danger_detection_count = 1  # 이번 감지로 회피 확정
+
+        holding = threading.Event()
+        overlaps = []
+
+        def execute(action):
+            holding.set()
+            time.sleep(0.05)
+            holding.clear()
+
+        base._execute_action = MagicMock(side_effect=execute)
+        base._emergency_escape = MagicMock(side_effect=lambda f: overlaps.append(holding.is_set()))
+        env = PipelinedRealtimeEnv(base, action_delay=1, frame_interval=0.0)
+        env.reset()
+        env.step(4)
+        env.close()
+
+        self.assertEqual(overlaps, [False])
+
+
+if __name__ == '__main__':
+    unittest.main()
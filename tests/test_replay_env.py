@@ -0,0 +1,72 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from src.replay_env import SessionRecorder, replay_session
+from src.rl_env_mp import MPRealtimeEnv
+from src.sim_game import SimMPEnv
+
+
+class TestReplayEnv(unittest.TestCase):
+    def record(self, root, episodes, max_episode_steps=1000):
+        sim = SimMPEnv(seed=5)
+        sim.max_episode_steps = max_episode_steps
+        env = SessionRecorder(sim, root=root)
+        actions = [2, 2, 5, 1, 5, 6, 0, 7, 2, 5, 5, 3]
+        for length in episodes:
+            env.reset()
+            for i in range(length):
+                env.step(actions[i % len(actions)])
+        env.close()
+        return env.writer.session_dir
+
+    def test_replay_matches_recorded_rewards(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            session = self.record(tmp, episodes=[12, 5])
+            # 녹화는 시뮬레이터, 재생은 실제 MP 환경 코드 (캡처/입력/시계만 교체)
+            report = replay_session(session, env_class=MPRealtimeEnv, preload=True)
+
+        self.assertEqual(report['episodes'], 2)
+        self.assertEqual(report['steps'], 17)
+        self.assertFalse(report['exhausted'])
+        self.assertEqual(report['frames_used'], report['frames_recorded'])
+        self.assertEqual(report['mismatched_steps'], [])
+        self.assertAlmostEqual(report['replayed_total'], report['recorded_total'])
+        self.assertEqual(report['stages']['capture']['count'], report['frames_recorded'])
+        self.assertEqual(report['stages']['reward']['count'], 17 * 4)
+
+    def test_term_totals_count_only_substeps_that_ran(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # 서브 스텝 6개에서 종료 → 에피소드마다 두 번째 스텝은 서브 스텝 2개만 실행
+            session = self.record(tmp, episodes=[2, 2], max_episode_steps=6)
+            report = replay_session(session, env_class=MPRealtimeEnv, preload=True)
+
+        self.assertEqual(report['mismatched_steps'], [])
+        self.assertEqual(report['stages']['reward']['count'], 2 * 6)
+        self.assertAlmostEqual(sum(report['term_totals'].values()), report['replayed_total'])
+
+    def test_reward_change_is_reported(self):
+        class NoIdlePenaltyEnv(MPRealtimeEnv):
+            def _calculate_reward(self, action, current_frame):
+                reward = super()._calculate_reward(action, current_frame)
+                return reward + (0.25 if action == 0 else 0.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            session = self.record(tmp, episodes=[12])
+            report = replay_session(session, env_class=NoIdlePenaltyEnv, preload=True)
+
+        # 7번째 스텝(idle)만 차이 (서브 스텝 4회 x 0.25)
+        self.assertEqual(report['mismatched_steps'], [6])
+        self.assertAlmostEqual(report['replayed_total'] - report['recorded_total'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from src.reward_relabel import (config_reward_coeffs, compute_reward_terms, load_reward_coeffs, relabel_session,
+                                session_substeps)
+from src.sim_game import SimMLEnv
+from src.transition_store import TransitionLogWrapper, TransitionSession, TransitionStore
+from src.utils.config_loader import DEFAULT_REWARD_COEFFS, compile_config, deep_merge
+
+
+class TestRewardRelabel(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        env = TransitionLogWrapper(SimMLEnv(seed=3), root=self.tmp.name, chunk_size=64)
+        rng = np.random.default_rng(0)
+        for _ in range(2):
+            env.reset()
+            action = 1
+            for _ in range(40):
+                if rng.random() < 0.4:
+                    action = int(rng.integers(env.action_space.n))
+                env.step(action)
+        env.close()
+        self.session_dir = env.writer.session_dir
+
+    def test_default_coeffs_reproduce_env_rewards(self):
+        session = TransitionSession(self.session_dir)
+        sub = session_substeps(session)
+        terms = compute_reward_terms(sub['actions'], sub['change_score'], sub['exp_pixels'],
+                                     sub['episode_start'], config_reward_coeffs('ML'))
+        for name, values in terms.items():
+            recorded = session.frame_info[f'term_{name}'][sub['frame_index']]
+            np.testing.assert_allclose(values, recorded, atol=1e-5, err_msg=name)
+
+    def test_relabel_writes_in_place(self):
+        coeffs = deep_merge(config_reward_coeffs('ML'), {'action': {0: -1.0}})
+        old = TransitionSession(self.session_dir).steps['reward'].copy()
+        report = relabel_session(self.session_dir, coeffs)
+
+        session = TransitionSession(self.session_dir)
+        idle = np.bincount(session.frame_info['step'][session.frame_info['step'] >= 0],
+                           minlength=session.num_steps) * (session.steps['action'] == 0)
+        self.assertTrue(idle.any())
+        np.testing.assert_allclose(session.steps['reward'], old - 0.7 * idle, atol=1e-4)
+        self.assertAlmostEqual(report['new_total'], float(session.steps['reward'].sum()), places=3)
+        self.assertEqual(len(session.meta['relabels']), 1)
+
+        batch = TransitionStore(self.tmp.name).sample(8, rng=np.random.default_rng(0))
+        self.assertTrue(np.isin(batch['reward'], session.steps['reward']).all())
+
+    def test_base_coeffs_follow_config_reward_section(self):
+        # 설정 reward 섹션을 바꾼 환경과 같은 계수로 리라벨링 (모듈 기본값이 아님)
+        config = compile_config({'reward': {'action': {0: -1.0}}}, 'ML', roi={})
+        with patch('src.reward_relabel.load_game_config', return_value=config):
+            base = load_reward_coeffs('ML')
+            default_report = relabel_session(self.session_dir, dry_run=True)
+        self.assertEqual(base['action'][0], -1.0)
+        explicit_report = relabel_session(self.session_dir, base, dry_run=True)
+        self.assertAlmostEqual(default_report['new_total'], explicit_report['new_total'], places=4)
+
+        base['exp']['large'] = 100.0  # 복사본 수정은 설정/기본값에 영향 없음
+        self.assertEqual(config.reward['exp']['large'], DEFAULT_REWARD_COEFFS['ML']['exp']['large'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import io
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from src.sim_game import SimMLEnv, SimMPEnv
+
+
+def rollout(env, actions):
+    obs, _ = env.reset()
+    observations, rewards = [obs], []
+    for action in actions:
+        obs, reward, terminated, truncated, info = env.step(action)
+        observations.append(obs)
+        rewards.append(reward)
+    return np.stack(observations), np.array(rewards), info
+
+
+class TestSimGame(unittest.TestCase):
+    def test_spaces_match_realtime_env(self):
+        ml = SimMLEnv(seed=0)
+        mp = SimMPEnv(seed=0)
+        self.assertEqual(ml.observation_space.shape, (4, 84, 84))
+        self.assertEqual(ml.action_space.n, 11)
+        self.assertEqual(mp.action_space.n, 8)
+        obs, _ = ml.reset()
+        self.assertTrue(ml.observation_space.contains(obs))
+
+    def test_same_seed_is_deterministic(self):
+        actions = np.random.default_rng(1).integers(0, 8, size=40).tolist()
+        obs_a, rewards_a, info_a = rollout(SimMPEnv(seed=7), actions)
+        obs_b, rewards_b, info_b = rollout(SimMPEnv(seed=7), actions)
+        np.testing.assert_array_equal(obs_a, obs_b)
+        np.testing.assert_array_equal(rewards_a, rewards_b)
+        self.assertEqual(info_a['sim'], info_b['sim'])
+        # 가상 시간만 진행 (서브 스텝 대기 포함)
+        self.assertGreater(info_a['sim']['time'], 0)
+
+    def test_throughput_with_danger_roi(self):
+        # frame_skip=4 기준 초당 1000스텝 이상 (= 4000프레임) 목표, 부하가 있는 머신도 통과하도록 여유를 둔 하한
+        min_steps_per_sec = 500
+        actions = np.random.default_rng(1).integers(0, 8, size=400).tolist()
+        for env_class in (SimMLEnv, SimMPEnv):
+            with self.subTest(env=env_class.__name__), redirect_stdout(io.StringIO()):
+                env = env_class(seed=7)
+                env.reset()
+                start = time.perf_counter()
+                for action in actions:
+                    _, _, _, _, info = env.step(action)
+                steps_per_sec = len(actions) / (time.perf_counter() - start)
+                self.assertGreater(steps_per_sec, min_steps_per_sec)
+                if env_class is SimMLEnv:
+                    # 위험 감지는 배너 ROI만 매칭해도 회피까지 동작
+                    self.assertIsNotNone(env.danger_slice)
+                    self.assertGreaterEqual(info['sim']['escapes'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
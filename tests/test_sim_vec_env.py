@@ -0,0 +1,80 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from src.sim_vec_env import BatchedSimVecEnv
+from src.sim_game import SimMPEnv
+from src.utils.config_loader import DEFAULT_REWARD_COEFFS, deep_merge
+
+
+class TestBatchedSimVecEnv(unittest.TestCase):
+    def test_deterministic_and_auto_reset(self):
+        results = []
+        for _ in range(2):
+            env = BatchedSimVecEnv("MP", num_envs=8, seed=3, max_steps=40)
+            obs = env.reset()
+            self.assertEqual(obs.shape, (8, 4, 84, 84))
+            rng = np.random.default_rng(0)
+            trace = []
+            for _ in range(10):
+                env.step_async(rng.integers(0, 8, 8))
+                obs, rewards, dones, infos = env.step_wait()
+                trace.append((obs, rewards))
+            results.append((trace, dones, infos))
+
+        (trace_a, dones, infos), (trace_b, _, _) = results
+        for (obs_a, rew_a), (obs_b, rew_b) in zip(trace_a, trace_b):
+            np.testing.assert_array_equal(obs_a, obs_b)
+            np.testing.assert_array_equal(rew_a, rew_b)
+
+        # 40 서브 스텝 = 10 스텝에서 모든 월드 종료 → 종료 관측 보관 후 에피소드만 초기화
+        self.assertTrue(dones.all())
+        self.assertEqual(infos[0]['terminal_observation'].shape, (4, 84, 84))
+        self.assertEqual(infos[0]['step'], 40)
+        # 새 에피소드 첫 관측은 현재 화면 반복
+        np.testing.assert_array_equal(trace_a[-1][0][:, 0], trace_a[-1][0][:, 3])
+
+    def test_attack_kills_monster_in_front(self):
+        env = BatchedSimVecEnv("MP", num_envs=2, seed=0, n_monsters=1)
+        env.reset()
+        # 월드 0: 바로 앞 몬스터, 월드 1: 멀리 있는 몬스터
+        env.monster_x[:, 0] = env.player_x + np.array([3.0, 60.0])
+        env.monster_y[:, 0] = env.player_y
+        env.monster_low[:] = env.monster_high[:] = env.monster_x
+        env.step_async(np.array([5, 5]))
+        _, rewards, _, _ = env.step_wait()
+
+        self.assertEqual(env.kills.tolist(), [1, 0])
+        self.assertGreater(rewards[0] - rewards[1], 2.0)  # 경험치 + 타격 보상
+        self.assertAlmostEqual(env.exp[0], env.exp_per_kill)
+
+    def test_reward_coeffs_shared_with_env(self):
+        # 같은 계수 형식 하나로 환경과 배치 시뮬레이터 보상이 함께 바뀜
+        coeffs = deep_merge(DEFAULT_REWARD_COEFFS['MP'], {'action': {0: -5.0}})
+        idle = np.zeros(2, dtype=np.int64)
+        rewards = []
+        for reward_coeffs in (None, coeffs):
+            env = BatchedSimVecEnv("MP", num_envs=2, seed=0, reward_coeffs=reward_coeffs)
+            env.reset()
+            env.step_async(idle)
+            rewards.append(env.step_wait()[1])
+        np.testing.assert_allclose(rewards[1] - rewards[0], (-5.0 + 0.25) * env.frame_skip, rtol=1e-5)
+
+        sim = SimMPEnv(seed=0)
+        self.assertEqual(dict(sim.reward_coeffs), DEFAULT_REWARD_COEFFS['MP'])
+        sim.reset()
+        sim.reward_coeffs = coeffs
+        sim.step(0)
+        self.assertEqual(sim.reward_terms['action'], -5.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+sys.modules['mss'] = MagicMock()
+
+from src.utils.tracing import ChromeTracer, start_tracing, stop_tracing, trace_span
+from src.sim_game import SimMLEnv
+
+
+class TestChromeTracer(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "trace.json"
+
+    def test_threads_phases_and_ring_buffer(self):
+        tracer = ChromeTracer(self.path, capacity=8, flush_interval=60)
+        worker = threading.Thread(target=lambda: tracer.instant('key_down', 'input', {'key': 'left'}),
+                                  name="client-0")
+        worker.start()
+        worker.join()
+        tracer.phase('rollout')
+        tracer.phase('ppo_update')
+        tracer.close()
+
+        events = json.loads(self.path.read_text(encoding='utf-8'))
+        names = {e['args']['name'] for e in events if e['ph'] == 'M'}
+        self.assertEqual(names, {"client-0", threading.current_thread().name})
+        self.assertEqual([(e['ph'], e['name']) for e in events if e['ph'] in 'BE'],
+                         [('B', 'rollout'), ('E', 'rollout'), ('B', 'ppo_update'), ('E', 'ppo_update')])
+
+        # 버퍼가 넘치면 오래된 이벤트부터 버리고 파일은 그대로 유효
+        tracer = ChromeTracer(self.path, capacity=8, flush_interval=60)
+        for _ in range(20):
+            tracer.instant('tick', 'test')
+        tracer.close()
+        self.assertEqual(len(json.loads(self.path.read_text(encoding='utf-8'))), 8)
+        self.assertGreater(tracer.dropped, 0)
+
+    def test_env_step_stages_and_keys_traced(self):
+        start_tracing(self.path)
+        try:
+            env = SimMLEnv(seed=0, frame_skip=1)
+            env.reset(seed=0)
+            for action in (0, 1, 4):
+                env.step(action)
+            env.close()
+            with trace_span('predict', 'policy'):
+                pass
+        finally:
+            stop_tracing()
+        with trace_span('ignored'):  # 꺼진 뒤에는 기록 안 함
+            pass
+
+        events = json.loads(self.path.read_text(encoding='utf-8'))
+        spans = [e['name'] for e in events if e['ph'] == 'X']
+        self.assertEqual(spans.count('step'), 3)
+        for stage in ('capture', 'preprocess', 'danger', 'reward', 'predict'):
+            self.assertIn(stage, spans)
+        self.assertNotIn('ignored', spans)
+        keys = [(e['name'], e['args']['key']) for e in events if e['name'] in ('key_down', 'key_up')]
+        self.assertEqual(keys[:2], [('key_down', 'left'), ('key_up', 'left')])
+
+
+if __name__ == '__main__':
+    unittest.main()
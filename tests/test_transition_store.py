@@ -0,0 +1,86 @@
+
+import unittest
+import sys
+import json
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.transition_store import TransitionWriter, TransitionStore
+
+
+class TestTransitionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _record(self, n_steps=10, frame_skip=2, stack=4):
+        """프레임 값 = 전역 프레임 번호인 세션 기록"""
+        writer = TransitionWriter(self.tmp.name, "TEST", (3, 3), stack, frame_skip,
+                                  term_names=('exp',), cooldown_actions=(5,), chunk_size=4)
+        frame_id = 0
+        writer.add_reset(np.full((3, 3), frame_id, dtype=np.uint8))
+        frame_id += 1
+        for step in range(n_steps):
+            frames = np.stack([np.full((3, 3), frame_id + i, dtype=np.uint8) for i in range(frame_skip)])
+            frame_id += frame_skip
+            infos = [{'terms': {'exp': 1.0}, 'change_score': 0.5, 'exp_pixels': 7}] * frame_skip
+            writer.add_step(frames, infos, action=step % 3, reward=float(step),
+                            terminated=False, truncated=False, cooldowns=np.array([1.5]))
+        writer.close()
+        return writer.session_dir
+
+    def test_roundtrip_and_stack_reconstruction(self):
+        session_dir = self._record()
+        store = TransitionStore(self.tmp.name)
+        session = store.sessions[0]
+
+        self.assertEqual(store.num_steps, 10)
+        self.assertEqual(session.num_frames, 21)
+        self.assertEqual(session.steps['action'].tolist(), [i % 3 for i in range(10)])
+        self.assertTrue(np.allclose(session.frame_info['term_exp'][1:], 1.0))
+
+        # 첫 스텝 관측 = reset 프레임 4장 (에피소드 시작에서 클램프)
+        obs = session.observations([0])
+        self.assertEqual(obs[0, :, 0, 0].tolist(), [0, 0, 0, 0])
+        # 3번 스텝 다음 관측 = 프레임 5..8
+        next_obs = session.observations([3], next_obs=True)
+        self.assertEqual(next_obs[0, :, 0, 0].tolist(), [5, 6, 7, 8])
+
+    def test_sample(self):
+        self._record()
+        store = TransitionStore(self.tmp.name)
+        batch = store.sample(16, rng=np.random.default_rng(0))
+        self.assertEqual(batch['obs'].shape, (16, 4, 3, 3))
+        # 다음 관측의 마지막 프레임 = 관측의 마지막 프레임 + frame_skip
+        self.assertTrue(np.all(batch['next_obs'][:, -1, 0, 0] == batch['obs'][:, -1, 0, 0] + 2))
+
+    def test_meta_counts_refreshed_while_recording(self):
+        writer = TransitionWriter(self.tmp.name, "TEST", (3, 3), 4, 2, chunk_size=64, meta_interval=0.05)
+        self.addCleanup(writer.close)
+        writer.add_reset(np.zeros((3, 3), dtype=np.uint8))
+        for step in range(5):
+            writer.add_step(np.zeros((2, 3, 3), dtype=np.uint8), [], action=0, reward=0.0,
+                            terminated=False, truncated=False)
+
+        # 청크(64행)를 채우지 않아도 주기적으로 개수 갱신
+        deadline = time.monotonic() + 5
+        while True:
+            meta = json.loads((writer.session_dir / 'meta.json').read_text(encoding='utf-8'))
+            if meta['num_steps'] == 5 or time.monotonic() > deadline:
+                break
+            time.sleep(0.01)
+        self.assertEqual((meta['num_steps'], meta['num_frames']), (5, 11))
+        self.assertFalse(meta['closed'])
+
+    def test_rejects_frame_skip_larger_than_stack(self):
+        with self.assertRaises(ValueError):
+            TransitionWriter(self.tmp.name, "TEST", (3, 3), frame_stack=2, frame_skip=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+패턴 파일 포맷 변환 도구 (JSON ↔ 바이너리 .pat)
+기존 JSON 패턴을 바이너리로 바꾸거나, 바이너리 패턴을 사람이 읽을 수 있는 JSON으로 내보냄
+
+사용법: python tools/convert_pattern.py datasets/mp_patterns/*.json --verify
+        python tools/convert_pattern.py datasets/mp_patterns/pattern_20250101_120000.pat
+"""
+import argparse
+import glob
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.pattern_format import convert_pattern, load_pattern
+
+
+def main():
+    parser = argparse.ArgumentParser(description="패턴 파일 포맷 변환 (JSON ↔ .pat)")
+    parser.add_argument("patterns", nargs="+", help="변환할 패턴 경로 (glob 가능, 확장자 반대 포맷으로 저장)")
+    parser.add_argument("--verify", action="store_true", help="변환 결과를 다시 읽어 원본과 같은지 확인")
+    args = parser.parse_args()
+
+    paths = sorted({Path(p) for pattern in args.patterns for p in glob.glob(pattern)})
+    paths = [p for p in paths if p.suffix in ('.json', '.pat')]
+    if not paths:
+        print("❌ 변환할 패턴 파일이 없습니다!")
+        return
+
+    print("=" * 60)
+    print("🔄 패턴 포맷 변환")
+    print("=" * 60)
+
+    failed = 0
+    for src in paths:
+        dst = convert_pattern(src)
+        src_kb = src.stat().st_size / 1024
+        dst_kb = dst.stat().st_size / 1024
+        print(f"✅ {src.name} ({src_kb:.1f} KB) → {dst.name} ({dst_kb:.1f} KB)")
+
+        if args.verify:
+            start = time.perf_counter()
+            original = load_pattern(src).to_dict()
+            src_s = time.perf_counter() - start
+            start = time.perf_counter()
+            converted = load_pattern(dst).to_dict()
+            dst_s = time.perf_counter() - start
+            if original == converted:
+                print(f"   🔍 동일 ({len(original['pattern']):,}개 이벤트, "
+                      f"로드 {src_s * 1000:.1f}ms → {dst_s * 1000:.1f}ms)")
+            else:
+                failed += 1
+                print("   ❌ 원본과 다릅니다!")
+
+    print("=" * 60)
+    if failed:
+        print(f"❌ 검증 실패: {failed}개")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
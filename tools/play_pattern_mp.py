@@ -10,28 +10,33 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.pattern_player_mp import HumanlikePatternPlayer, load_latest_pattern
+from src.pattern_format import load_pattern
+from src.pattern_library import PatternLibrary
+from src.pattern_player_mp import HumanlikePatternPlayer, load_latest_pattern, play_event_stream
+from src.pattern_synth import PatternSynthesizer
+from src.utils.clock import RealClock
 
 
-def list_patterns():
-    """저장된 패턴 목록 출력"""
-    pattern_dir = Path("datasets/mp_patterns")
-    if not pattern_dir.exists() or not list(pattern_dir.glob("*.json")):
-        print("❌ 저장된 패턴이 없습니다!")
+def list_patterns(**filters):
+    """저장된 패턴 목록 출력 (패턴 라이브러리 인덱스 조회, 파일은 열지 않음)"""
+    with PatternLibrary("datasets/mp_patterns") as library:
+        entries = library.query(**filters)
+    if not entries:
+        print("❌ 조건에 맞는 패턴이 없습니다!" if any(v for v in filters.values()) else "❌ 저장된 패턴이 없습니다!")
         print("   먼저 'python tools/record_pattern_mp.py'로 녹화하세요")
         return []
     
-    pattern_files = sorted(pattern_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-    
     print("\n📁 저장된 패턴 목록:")
     print("=" * 60)
-    for i, pfile in enumerate(pattern_files, 1):
-        # 파일 크기
-        size_kb = pfile.stat().st_size / 1024
-        print(f"{i}. {pfile.name} ({size_kb:.1f} KB)")
+    for i, entry in enumerate(entries, 1):
+        size_kb = entry['size'] / 1024
+        top_keys = ', '.join(f"{k}×{n}" for k, n in list(entry['keys'].items())[:4])
+        tags = f" [{', '.join(entry['tags'])}]" if entry['tags'] else ""
+        print(f"{i}. {entry['path'].name} ({size_kb:.1f} KB){tags}")
+        print(f"   ⏱️  {entry['duration']:.0f}초, 🎯 {entry['total_actions']}개, 🎹 {top_keys}")
     print("=" * 60)
     
-    return pattern_files
+    return [entry['path'] for entry in entries]
 
 
 def select_pattern_interactive(pattern_files):
@@ -55,14 +60,48 @@ def select_pattern_interactive(pattern_files):
             print("❌ 숫자를 입력하세요")
 
 
+def play_synthesized(filters, order=3, seed=None):
+    """조건에 맞는 모든 패턴으로 합성기를 학습해 끝없이 재생 (반복 사이 대기 없음)"""
+    with PatternLibrary("datasets/mp_patterns") as library:
+        entries = library.query(**filters)
+    if not entries:
+        print("❌ 학습할 패턴이 없습니다!")
+        return
+    
+    synth = PatternSynthesizer.fit([load_pattern(e['path']) for e in entries], order=order)
+    print(f"🧬 합성기 학습: 패턴 {len(entries)}개, 키 {len(synth.keys)}종, 문맥 {len(synth.ngrams)}개 ({order}-gram)")
+    
+    input("\n게임 창으로 이동 후 엔터를 누르세요... ")
+    clock = RealClock()
+    print("\n⏰ 3초 후 재생 시작... (ESC로 중지)")
+    for i in range(3, 0, -1):
+        print(f"   {i}...")
+        clock.sleep(1)
+    
+    print("\n▶️  합성 재생 중...\n")
+    played = play_event_stream(synth.stream(seed=seed), clock=clock)
+    print(f"\n✅ 재생 완료! ({played:,}개 이벤트)")
+
+
 def main():
     parser = argparse.ArgumentParser(description="MP 게임 패턴 실행")
     parser.add_argument("--pattern", "-p", help="패턴 파일 경로")
     parser.add_argument("--humanlike", "-h", type=float, default=0.15, 
                         help="휴먼라이크 변형 강도 (0.0~1.0, 기본 0.15)")
     parser.add_argument("--loop", "-l", action="store_true", help="반복 재생 (ESC로 중지)")
+    parser.add_argument("--seed", type=int, help="변형 난수 시드 (같은 시드 = 같은 재생)")
     parser.add_argument("--list", "-ls", action="store_true", help="패턴 목록만 출력")
+    parser.add_argument("--tag", help="이 태그가 붙은 패턴만")
+    parser.add_argument("--min-duration", type=float, help="최소 길이 (초)")
+    parser.add_argument("--max-duration", type=float, help="최대 길이 (초)")
+    parser.add_argument("--keys", nargs="+", help="이 키들을 모두 사용한 패턴만")
+    parser.add_argument("--add-tag", nargs="+", help="선택한 패턴에 태그 추가")
+    parser.add_argument("--synth", action="store_true",
+                        help="조건에 맞는 패턴 전체로 새 키 순서를 합성해 끝없이 재생 (반복 없음)")
+    parser.add_argument("--order", type=int, default=3, help="합성 n-gram 차수 (--synth 사용 시)")
+    parser.add_argument("--no-visual-sync", action="store_true", help="시각 체크포인트 무시 (기존처럼 그대로 재생)")
     args = parser.parse_args()
+    filters = dict(tag=args.tag, min_duration=args.min_duration, max_duration=args.max_duration, keys=args.keys)
     
     print("=" * 60)
     print("🎮 MP 게임 패턴 플레이어")
@@ -70,7 +109,11 @@ def main():
     
     # 패턴 목록만 출력
     if args.list:
-        list_patterns()
+        list_patterns(**filters)
+        return
+    
+    if args.synth:
+        play_synthesized(filters, order=args.order, seed=args.seed)
         return
     
     # 패턴 파일 결정
@@ -81,7 +124,7 @@ def main():
             return
     else:
         # 대화형 선택
-        pattern_files = list_patterns()
+        pattern_files = list_patterns(**filters)
         if not pattern_files:
             return
         
@@ -91,13 +134,18 @@ def main():
             return
     
     print(f"\n✅ 선택된 패턴: {pattern_file.name}")
+    if args.add_tag:
+        with PatternLibrary(pattern_file.parent) as library:
+            library.tag(pattern_file, *args.add_tag)
+        print(f"🏷️  태그 추가: {', '.join(args.add_tag)}")
     print(f"🎭 휴먼라이크 레벨: {args.humanlike * 100:.0f}%")
     if args.loop:
         print("🔁 반복 모드 활성화")
     
     # 패턴 재생
     try:
-        player = HumanlikePatternPlayer(pattern_file, humanlike_level=args.humanlike)
+        player = HumanlikePatternPlayer(pattern_file, humanlike_level=args.humanlike, seed=args.seed,
+                                        visual_sync=not args.no_visual_sync)
         player.play_pattern(loop=args.loop)
     except Exception as e:
         print(f"\n❌ 오류 발생: {e}")
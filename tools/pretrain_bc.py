@@ -0,0 +1,111 @@
+"""
+행동 복제(behavior cloning) 사전학습 스크립트
+프레임과 함께 녹화한 패턴으로 PPO CnnPolicy를 사람 플레이에 맞게 미리 학습
+
+1. 녹화: python tools/record_pattern_mp.py --frames --fps 10
+2. 사전학습: python tools/pretrain_bc.py --game MP --patterns datasets/mp_patterns/*.pat
+3. 실시간 학습: python tools/train_mp.py --load-model models/realtime/MP/MP_ppo_bc.zip
+"""
+import argparse
+import glob
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gymnasium import spaces
+import numpy as np
+from stable_baselines3 import PPO
+from src.actor_learner import SpaceOnlyEnv
+from src.behavior_cloning import DemonstrationDataset, class_weights, pretrain_policy
+
+
+# 게임별 행동 수 (환경 클래스 참고)
+ACTION_COUNTS = {'ML': 11, 'MP': 8}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="행동 복제 사전학습")
+    parser.add_argument("--game", default="MP", choices=sorted(ACTION_COUNTS), help="게임 이름 (행동 공간)")
+    parser.add_argument("--patterns", nargs="+", default=["datasets/mp_patterns/*.pat", "datasets/mp_patterns/*.json"],
+                        help="패턴 경로 (.pat/.json, glob 가능, 프레임 없는 패턴은 건너뜀)")
+    parser.add_argument("--epochs", type=int, default=10, help="에폭 수")
+    parser.add_argument("--batch-size", type=int, default=64, help="배치 크기")
+    parser.add_argument("--learning-rate", type=float, default=0.0001, help="학습률")
+    parser.add_argument("--window", type=float, default=0.4, help="라벨 창 길이 (초, 환경 한 스텝 정도)")
+    parser.add_argument("--frame-width", type=int, default=84, help="프레임 너비")
+    parser.add_argument("--frame-height", type=int, default=84, help="프레임 높이")
+    parser.add_argument("--frame-stack", type=int, default=4, help="프레임 스택")
+    parser.add_argument("--balance", action="store_true", help="행동 빈도 역수로 손실 가중 (idle 쏠림 완화)")
+    parser.add_argument("--load-model", type=str, help="기존 PPO 모델에서 시작")
+    parser.add_argument("--output", type=str, help="저장 경로 (기본: models/realtime/<GAME>/<GAME>_ppo_bc.zip)")
+    args = parser.parse_args()
+
+    pattern_paths = sorted({p for pattern in args.patterns for p in glob.glob(pattern)})
+    if not pattern_paths:
+        print("❌ 패턴 파일이 없습니다!")
+        print("   먼저 'python tools/record_pattern_mp.py --frames' 로 녹화하세요")
+        return
+
+    print("=" * 60)
+    print(f"🎓 행동 복제 사전학습 ({args.game})")
+    print("=" * 60)
+
+    dataset = DemonstrationDataset(
+        pattern_paths, args.game,
+        frame_stack=args.frame_stack,
+        frame_size=(args.frame_width, args.frame_height),
+        window=args.window,
+    )
+    n_actions = ACTION_COUNTS[args.game]
+    counts = dataset.action_counts(n_actions)
+    print(f"\n📊 샘플 {len(dataset):,}개")
+    for action, count in enumerate(counts):
+        if count:
+            print(f"   행동 {action}: {count}개 ({count / len(dataset) * 100:.1f}%)")
+
+    observation_space = spaces.Box(
+        low=0, high=255,
+        shape=(args.frame_stack, args.frame_height, args.frame_width),
+        dtype=np.uint8
+    )
+    space_env = SpaceOnlyEnv(observation_space, spaces.Discrete(n_actions))
+
+    if args.load_model:
+        print(f"\n📂 기존 모델 로드: {args.load_model}")
+        model = PPO.load(args.load_model, env=space_env)
+    else:
+        # 실시간 학습 스크립트와 같은 정책 구조 (--load-model로 이어서 학습)
+        policy_kwargs = dict(
+            features_extractor_kwargs=dict(features_dim=512),
+            net_arch=[512, 512]
+        )
+        model = PPO("CnnPolicy", space_env, policy_kwargs=policy_kwargs, verbose=0)
+
+    weights = class_weights(counts) if args.balance else None
+
+    print("\n🚀 사전학습 시작!")
+    history = pretrain_policy(
+        model.policy, dataset,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        weights=weights,
+    )
+
+    output = Path(args.output) if args.output else Path(f"models/realtime/{args.game}/{args.game}_ppo_bc.zip")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    model.save(str(output))
+
+    print("\n" + "=" * 60)
+    print("✅ 사전학습 완료!")
+    print(f"💾 모델 저장: {output}")
+    if history:
+        print(f"🎯 검증 정확도: {history[-1]['val_acc']:.3f}")
+    print("=" * 60)
+    print("\n💡 다음 단계:")
+    print(f"   py tools/train_{args.game.lower()}.py --load-model {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import keyboard
 import time
-import json
 import threading
 from pathlib import Path
 from datetime import datetime
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.frame_recorder import FrameRecorder, load_frames
+from src.pattern_checkpoints import CheckpointSet
+from src.pattern_format import PatternStreamWriter
+
+
+STATUS_HZ = 4  # 녹화 중 화면 갱신 횟수 (초당)
 
 
 class PatternRecorderGUI:
@@ -25,9 +34,13 @@ class PatternRecorderGUI:
         
         # 상태 변수
         self.recording = False
-        self.pattern_data = []
+        self.writer = None
+        self.output_path = None
+        self.down_count = 0
+        self.recent_keys = []
         self.start_time = None
         self.record_thread = None
+        self.frame_recorder = None
         
         # 모든 키 모니터링 (키보드 전체)
         self.key_states = {}
@@ -97,6 +110,28 @@ class PatternRecorderGUI:
         )
         unlimited_check.pack(side=tk.RIGHT)
         
+        # 화면 프레임 녹화 (행동 복제 사전학습용)
+        frames_frame = tk.Frame(settings_frame)
+        frames_frame.pack(fill=tk.X, pady=5)
+        
+        self.frames_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            frames_frame,
+            text="화면 프레임 녹화",
+            variable=self.frames_var,
+            font=("맑은 고딕", 10)
+        ).pack(side=tk.LEFT)
+        self.fps_var = tk.StringVar(value="10")
+        tk.Spinbox(
+            frames_frame,
+            from_=1,
+            to=30,
+            textvariable=self.fps_var,
+            width=5,
+            font=("맑은 고딕", 10)
+        ).pack(side=tk.LEFT, padx=10)
+        tk.Label(frames_frame, text="FPS", font=("맑은 고딕", 10)).pack(side=tk.LEFT)
+        
         # 상태 표시
         status_frame = tk.LabelFrame(main_frame, text="녹화 상태", font=("맑은 고딕", 10, "bold"), padx=10, pady=10)
         status_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -214,9 +249,18 @@ class PatternRecorderGUI:
             messagebox.showerror("오류", "패턴 이름을 입력하세요!")
             return
         
+        # 저장 경로 (녹화하면서 바로 기록)
+        output_dir = Path("datasets/mp_patterns")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.output_path = output_dir / f"{filename}_{timestamp}.pat"
+        self.writer = PatternStreamWriter(self.output_path, {'name': filename, 'recorded_at': timestamp})
+        
         self.recording = True
-        self.pattern_data = []
+        self.down_count = 0
+        self.recent_keys = []
         self.key_states = {}
+        self.frame_recorder = FrameRecorder(fps=int(self.fps_var.get())) if self.frames_var.get() else None
         
         # UI 업데이트
         self.start_button.config(state=tk.DISABLED)
@@ -235,6 +279,8 @@ class PatternRecorderGUI:
             return
         
         self.recording = False
+        if self.frame_recorder:
+            self.frame_recorder.stop()
         
         # UI 업데이트
         self.start_button.config(state=tk.NORMAL)
@@ -243,17 +289,16 @@ class PatternRecorderGUI:
         self._log("⏹️ 녹화 중지!", "blue")
         
         # 저장
-        if self.pattern_data:
-            self._save_pattern()
-        else:
-            messagebox.showwarning("경고", "녹화된 데이터가 없습니다!")
+        self._save_pattern()
     
     def _recording_loop(self):
         """녹화 루프 (별도 쓰레드)"""
         self.start_time = time.time()
         duration = None if self.unlimited_var.get() else int(self.duration_var.get())
+        if self.frame_recorder:
+            self.frame_recorder.start(self.start_time, self.output_path)
         
-        # 키 이벤트 훅 (모든 키보드 입력)
+        # 키 이벤트 훅 (모든 키보드 입력, 기록 스레드 큐에 넣기만 하고 화면 갱신 없음)
         def on_key_event(event):
             if not self.recording:
                 return
@@ -265,92 +310,75 @@ class PatternRecorderGUI:
                 # 중복 방지
                 if not self.key_states.get(key_name, False):
                     self.key_states[key_name] = True
-                    action = {
-                        'time': round(current_time, 3),
-                        'key': key_name,
-                        'type': 'down'
-                    }
-                    self.pattern_data.append(action)
-                    self._log(f"⬇️ [{current_time:.2f}s] {key_name} 눌림")
-                    self.root.after(0, self._update_action_count)
+                    self.writer.add(round(current_time, 3), key_name, 'down')
+                    self.down_count += 1
+                    self.recent_keys.append(key_name)
             
             elif event.event_type == 'up':
                 if self.key_states.get(key_name, False):
                     self.key_states[key_name] = False
-                    action = {
-                        'time': round(current_time, 3),
-                        'key': key_name,
-                        'type': 'up'
-                    }
-                    self.pattern_data.append(action)
-                    self._log(f"⬆️ [{current_time:.2f}s] {key_name} 뗌")
-                    self.root.after(0, self._update_action_count)
+                    self.writer.add(round(current_time, 3), key_name, 'up')
         
         keyboard.hook(on_key_event)
         
-        # 타이머 업데이트
+        # 화면 갱신 (이벤트마다가 아니라 초당 STATUS_HZ회, 한 번에 묶어서)
         while self.recording:
             elapsed = time.time() - self.start_time
             minutes = int(elapsed // 60)
             seconds = int(elapsed % 60)
-            self.root.after(0, self._update_timer, f"{minutes:02d}:{seconds:02d}")
+            recent, self.recent_keys = self.recent_keys, []
+            self.root.after(0, self._refresh_status, f"{minutes:02d}:{seconds:02d}",
+                            self.down_count, elapsed, recent)
             
             # 시간 제한 체크
             if duration and elapsed >= duration:
                 self.root.after(0, self._stop_recording)
                 break
             
-            time.sleep(0.1)
+            time.sleep(1.0 / STATUS_HZ)
         
         keyboard.unhook_all()
         self._setup_hotkeys()  # 핫키 재등록
     
-    def _update_timer(self, time_str):
-        """타이머 업데이트"""
+    def _refresh_status(self, time_str, count, elapsed, recent):
+        """타이머/행동 카운트/최근 입력 한 번에 갱신"""
         self.timer_label.config(text=time_str)
-    
-    def _update_action_count(self):
-        """행동 카운트 업데이트"""
-        count = len([a for a in self.pattern_data if a['type'] == 'down'])
         self.action_count_label.config(text=f"행동: {count}개")
+        if recent:
+            self._log(f"⌨️ [{elapsed:.1f}s] {' '.join(recent)}")
     
     def _save_pattern(self):
-        """패턴 저장"""
-        output_dir = Path("datasets/mp_patterns")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.filename_var.get()}_{timestamp}.json"
-        output_path = output_dir / filename
-        
-        # 메타데이터
-        pattern_file = {
-            'metadata': {
-                'name': self.filename_var.get(),
-                'recorded_at': timestamp,
-                'duration': round(self.pattern_data[-1]['time'], 2) if self.pattern_data else 0,
-                'total_actions': len(self.pattern_data),
-                'keys_used': list(set([a['key'] for a in self.pattern_data]))
-            },
-            'pattern': self.pattern_data
-        }
-        
-        # 저장
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(pattern_file, f, indent=2, ensure_ascii=False)
+        """녹화 마무리 (남은 이벤트 기록 + 최종 메타데이터)"""
+        if self.writer is None:
+            return
         
-        # 통계
-        key_counts = {}
-        for action in self.pattern_data:
-            if action['type'] == 'down':
-                key_counts[action['key']] = key_counts.get(action['key'], 0) + 1
+        # 화면 프레임 저장 (키 타임라인과 같은 시간 기준)
+        extra = {}
+        if self.frame_recorder:
+            frames_info = self.frame_recorder.save(self.output_path)
+            if frames_info:
+                extra['frames'] = frames_info
+                # 재생 중 경로 이탈 감지용 시각 체크포인트
+                checkpoints = CheckpointSet.build(*load_frames(self.output_path, extra))
+                checkpoints_info = checkpoints.save(self.output_path)
+                if checkpoints_info:
+                    extra['checkpoints'] = checkpoints_info
+        
+        writer, self.writer = self.writer, None
+        metadata = writer.close(extra)
+        if not metadata['total_actions']:
+            self.output_path.unlink()
+            messagebox.showwarning("경고", "녹화된 데이터가 없습니다!")
+            return
+        key_counts = dict(writer.down_counts)
         
         # 결과 메시지
         result_msg = f"""✅ 패턴 저장 완료!
 
-📁 파일: {filename}
-⏱️  녹화 시간: {pattern_file['metadata']['duration']}초
-🎯 총 행동: {pattern_file['metadata']['total_actions']}개
+📁 파일: {self.output_path.name}
+⏱️  녹화 시간: {metadata['duration']}초
+🎯 총 행동: {metadata['total_actions']}개
+🎞️  프레임: {metadata.get('frames', {}).get('count', 0)}장
 
 📊 자주 사용된 키:
 """
@@ -359,7 +387,7 @@ class PatternRecorderGUI:
         
         messagebox.showinfo("저장 완료", result_msg)
         self._log("=" * 50)
-        self._log(f"✅ 패턴 저장: {output_path}")
+        self._log(f"✅ 패턴 저장: {self.output_path}")
     
     def _on_closing(self):
         """창 닫기"""
@@ -368,6 +396,8 @@ class PatternRecorderGUI:
                 self.recording = False
                 time.sleep(0.5)
                 keyboard.unhook_all()
+                if self.writer:
+                    self.writer.close()  # 여기까지 녹화한 내용은 파일로 남김
                 self.root.destroy()
         else:
             keyboard.unhook_all()
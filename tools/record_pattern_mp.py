@@ -1,25 +1,41 @@
 """
 MP 게임 플레이 패턴 녹화 도구
 사용자의 키보드 입력을 실시간으로 기록하여 패턴 파일로 저장
+(녹화 중 이벤트는 백그라운드 스레드가 바로 디스크에 기록 → 오래 녹화해도 메모리 일정, 중간에 꺼져도 보존)
 
 사용법: python tools/record_pattern_mp.py --duration 300 --output my_pattern
 """
 import argparse
 import keyboard
 import time
-import json
 from pathlib import Path
 from datetime import datetime
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.frame_recorder import FrameRecorder, load_frames
+from src.pattern_checkpoints import CheckpointSet
+from src.pattern_format import PatternStreamWriter, convert_pattern
 
 
 class PatternRecorder:
     """키보드 입력 패턴 녹화"""
     
-    def __init__(self, output_name="pattern"):
+    def __init__(self, output_name="pattern", frame_fps=None, file_format="pat"):
+        """
+        Args:
+            output_name: 출력 파일명
+            frame_fps: 화면 프레임도 함께 녹화할 때 초당 캡처 수 (None이면 키만 녹화)
+            file_format: 'pat' (바이너리, 기본) 또는 'json'
+        """
         self.output_name = output_name
-        self.pattern_data = []
+        self.file_format = file_format
+        self.output_path = None
+        self.writer = None
         self.start_time = None
         self.recording = False
+        self.frame_recorder = FrameRecorder(fps=frame_fps) if frame_fps else None
         
         # 녹화할 키 목록 (메이플스토리 기본 키)
         self.monitored_keys = [
@@ -34,6 +50,8 @@ class PatternRecorder:
         
         print("✅ 패턴 녹화기 초기화 완료")
         print(f"📝 모니터링 키: {', '.join(self.monitored_keys)}")
+        if self.frame_recorder:
+            print(f"🎞️  화면 프레임 녹화: {frame_fps} FPS")
     
     def on_key_event(self, event):
         """키 이벤트 핸들러"""
@@ -45,29 +63,17 @@ class PatternRecorder:
         
         current_time = time.time() - self.start_time
         
-        # 키 다운 이벤트만 기록 (중복 방지)
+        # 키 다운 이벤트만 기록 (중복 방지), 기록 스레드 큐에 넣기만 함
         if event.event_type == 'down':
             if not self.key_states[event.name]:
                 self.key_states[event.name] = True
-                action = {
-                    'time': round(current_time, 3),
-                    'key': event.name,
-                    'type': 'down'
-                }
-                self.pattern_data.append(action)
-                print(f"⬇️  [{current_time:.2f}s] {event.name} 눌림")
+                self.writer.add(round(current_time, 3), event.name, 'down')
         
         # 키 업 이벤트 기록
         elif event.event_type == 'up':
             if self.key_states[event.name]:
                 self.key_states[event.name] = False
-                action = {
-                    'time': round(current_time, 3),
-                    'key': event.name,
-                    'type': 'up'
-                }
-                self.pattern_data.append(action)
-                print(f"⬆️  [{current_time:.2f}s] {event.name} 뗌")
+                self.writer.add(round(current_time, 3), event.name, 'up')
     
     def start_recording(self, duration=None):
         """녹화 시작"""
@@ -88,75 +94,87 @@ class PatternRecorder:
         
         print("\n🔴 녹화 중... 평소처럼 플레이하세요!\n")
         
+        # 저장 경로 (녹화하면서 바로 기록)
+        output_dir = Path("datasets/mp_patterns")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.output_path = output_dir / f"{self.output_name}_{timestamp}.pat"
+        self.writer = PatternStreamWriter(self.output_path, {'name': self.output_name, 'recorded_at': timestamp})
+        
         self.recording = True
         self.start_time = time.time()
+        if self.frame_recorder:
+            self.frame_recorder.start(self.start_time, self.output_path)
         
         # 키보드 훅 등록
         keyboard.hook(self.on_key_event)
         
         # 녹화 시간만큼 대기 (또는 ESC까지)
         try:
-            if duration:
-                start = time.time()
-                while time.time() - start < duration:
-                    if keyboard.is_pressed('esc'):
-                        print("\n⏹️  ESC 감지 - 녹화 중지")
-                        break
-                    time.sleep(0.1)
-            else:
-                keyboard.wait('esc')
-                print("\n⏹️  ESC 감지 - 녹화 중지")
+            # 진행 상황은 이벤트마다가 아니라 0.5초마다 한 줄로 갱신
+            start = time.time()
+            last_status = 0.0
+            while not duration or time.time() - start < duration:
+                if keyboard.is_pressed('esc'):
+                    print("\n⏹️  ESC 감지 - 녹화 중지")
+                    break
+                if time.time() - last_status >= 0.5:
+                    last_status = time.time()
+                    elapsed = int(last_status - start)
+                    print(f"\r🔴 {elapsed // 60:02d}:{elapsed % 60:02d} | 기록 {self.writer.count:,}개", end="", flush=True)
+                time.sleep(0.1)
         except KeyboardInterrupt:
             print("\n⏹️  Ctrl+C 감지 - 녹화 중지")
         finally:
             self.recording = False
             keyboard.unhook_all()
+            if self.frame_recorder:
+                self.frame_recorder.stop()
     
     def save_pattern(self):
-        """패턴 데이터 저장"""
-        if not self.pattern_data:
-            print("\n❌ 녹화된 데이터가 없습니다!")
+        """녹화 마무리 (남은 이벤트 기록 + 최종 메타데이터)"""
+        if self.writer is None:
             return
         
-        # 저장 경로 생성
-        output_dir = Path("datasets/mp_patterns")
-        output_dir.mkdir(parents=True, exist_ok=True)
+        # 화면 프레임 저장 (키 타임라인과 같은 시간 기준)
+        extra = {}
+        if self.frame_recorder:
+            frames_info = self.frame_recorder.save(self.output_path)
+            if frames_info:
+                extra['frames'] = frames_info
+                # 재생 중 경로 이탈 감지용 시각 체크포인트
+                checkpoints = CheckpointSet.build(*load_frames(self.output_path, extra))
+                checkpoints_info = checkpoints.save(self.output_path)
+                if checkpoints_info:
+                    extra['checkpoints'] = checkpoints_info
+        
+        metadata = self.writer.close(extra)
+        key_counts = dict(self.writer.down_counts)
+        output_path = self.output_path
+        if not metadata['total_actions']:
+            output_path.unlink()
+            print("\n❌ 녹화된 데이터가 없습니다!")
+            return
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.output_name}_{timestamp}.json"
-        output_path = output_dir / filename
-        
-        # 메타데이터 추가
-        pattern_file = {
-            'metadata': {
-                'name': self.output_name,
-                'recorded_at': timestamp,
-                'duration': round(self.pattern_data[-1]['time'], 2) if self.pattern_data else 0,
-                'total_actions': len(self.pattern_data),
-                'keys_used': list(set([a['key'] for a in self.pattern_data]))
-            },
-            'pattern': self.pattern_data
-        }
-        
-        # JSON 저장
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(pattern_file, f, indent=2, ensure_ascii=False)
+        if self.file_format == "json":
+            output_path = convert_pattern(self.output_path)
+            self.output_path.unlink()
         
         print("\n" + "=" * 60)
         print("✅ 패턴 저장 완료!")
         print("=" * 60)
         print(f"📁 파일: {output_path}")
-        print(f"⏱️  녹화 시간: {pattern_file['metadata']['duration']}초")
-        print(f"🎯 총 행동: {pattern_file['metadata']['total_actions']}개")
-        print(f"🎹 사용된 키: {', '.join(pattern_file['metadata']['keys_used'])}")
+        print(f"⏱️  녹화 시간: {metadata['duration']}초")
+        print(f"🎯 총 행동: {metadata['total_actions']}개")
+        print(f"🎹 사용된 키: {', '.join(metadata['keys_used'])}")
+        if 'frames' in metadata:
+            frames_info = metadata['frames']
+            print(f"🎞️  프레임: {frames_info['count']}장 ({frames_info['file']}, 누락 주기 {frames_info['missed']})")
+        if 'checkpoints' in metadata:
+            print(f"👁️  시각 체크포인트: {metadata['checkpoints']['count']}개")
         print("=" * 60)
         
         # 통계 출력
-        key_counts = {}
-        for action in self.pattern_data:
-            if action['type'] == 'down':
-                key_counts[action['key']] = key_counts.get(action['key'], 0) + 1
-        
         print("\n📊 키 사용 통계:")
         for key, count in sorted(key_counts.items(), key=lambda x: x[1], reverse=True)[:10]:
             print(f"   {key}: {count}회")
@@ -166,6 +184,9 @@ def main():
     parser = argparse.ArgumentParser(description="MP 게임 플레이 패턴 녹화")
     parser.add_argument("--output", "-o", default="pattern", help="출력 파일명 (기본: pattern)")
     parser.add_argument("--duration", "-d", type=int, help="녹화 시간 (초, 지정 안하면 ESC까지)")
+    parser.add_argument("--frames", action="store_true", help="화면 프레임도 함께 녹화 (행동 복제 사전학습용)")
+    parser.add_argument("--fps", type=int, default=10, help="프레임 녹화 FPS (--frames 사용 시)")
+    parser.add_argument("--json", action="store_true", help="JSON으로 저장 (기본: 바이너리 .pat)")
     args = parser.parse_args()
     
     print("=" * 60)
@@ -185,12 +206,15 @@ def main():
     print("  4. ESC로 언제든 중지 가능")
     print()
     
-    recorder = PatternRecorder(output_name=args.output)
+    recorder = PatternRecorder(output_name=args.output, frame_fps=args.fps if args.frames else None,
+                               file_format="json" if args.json else "pat")
     recorder.start_recording(duration=args.duration)
     recorder.save_pattern()
     
     print("\n💡 다음 단계:")
-    print("   python tools/play_pattern_mp.py --pattern datasets/mp_patterns/[파일명].json")
+    print("   python tools/play_pattern_mp.py --pattern datasets/mp_patterns/[파일명].pat")
+    if args.frames:
+        print("   python tools/pretrain_bc.py --game MP --patterns datasets/mp_patterns/[파일명].pat")
 
 
 if __name__ == "__main__":
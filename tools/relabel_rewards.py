@@ -0,0 +1,71 @@
+"""
+전이 로그 보상 리라벨링 도구
+보상 계수를 바꾼 뒤 기존 세션들의 보상 열을 새 정의로 다시 계산 (오프라인/오프폴리시 학습 재사용)
+
+계수 파일은 바꿀 항목만 적으면 됨 (나머지는 src/reward_relabel.py의 기본값):
+    combo:
+      - {prev: [3], next: [4], bonus: 1.2}
+    stuck: {penalty: -0.5}
+
+사용법: py tools/relabel_rewards.py --game ML --coeffs configs/reward_ML_v2.yaml
+        py tools/relabel_rewards.py --game ML --coeffs configs/reward_ML_v2.yaml --dry-run
+"""
+import argparse
+from pathlib import Path
+import sys
+import json
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.reward_relabel import load_reward_coeffs, relabel_session
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전이 로그 보상 리라벨링")
+    parser.add_argument("--root", default="datasets/transitions", help="세션 디렉토리들의 상위 경로")
+    parser.add_argument("--sessions", nargs="*", help="리라벨링할 세션 경로 (지정 안하면 root의 전체 세션)")
+    parser.add_argument("--game", default="ML", choices=["ML", "MP"], help="게임 (다른 게임 세션은 건너뜀)")
+    parser.add_argument("--coeffs", help="보상 계수 YAML (지정 안하면 환경 기본 계수)")
+    parser.add_argument("--dry-run", action="store_true", help="계산만 하고 저장 안 함")
+    args = parser.parse_args()
+
+    if args.sessions:
+        sessions = [Path(p) for p in args.sessions]
+    else:
+        root = Path(args.root)
+        sessions = sorted(p for p in root.iterdir() if (p / 'meta.json').exists()) if root.exists() else []
+
+    coeffs = load_reward_coeffs(args.game, args.coeffs)
+
+    print("=" * 60)
+    print(f"🏷️  보상 리라벨링 ({args.game}){' - 저장 안 함' if args.dry_run else ''}")
+    print("=" * 60)
+
+    total_steps = 0
+    total_seconds = 0.0
+    for session in sessions:
+        with open(session / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['game'] != args.game:
+            continue
+        try:
+            report = relabel_session(session, coeffs, dry_run=args.dry_run)
+        except ValueError as e:
+            print(f"⏭️  {session.name}: {e}")
+            continue
+        total_steps += report['steps']
+        total_seconds += report['seconds']
+        per_step = max(report['steps'], 1)
+        print(f"✅ {session.name}: {report['steps']:,} 스텝, "
+              f"평균 보상 {report['old_total'] / per_step:+.3f} → {report['new_total'] / per_step:+.3f} "
+              f"({report['seconds']:.2f}초)")
+
+    if total_steps == 0:
+        print("❌ 리라벨링할 세션이 없습니다!")
+        return
+    print("=" * 60)
+    print(f"⚡ {total_steps:,} 스텝 / {total_seconds:.2f}초 ({total_steps / max(total_seconds, 1e-9):,.0f} 스텝/초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+녹화 세션 재생 도구
+녹화된 실제 화면/행동을 현재 환경 코드로 다시 실행해 보상 차이와 단계별 처리 시간 출력
+
+녹화: py tools/train_ml.py --record-session  (또는 train_mp.py)
+사용법: py tools/replay_session.py --session datasets/replays/ML_20250101_120000 --preload
+"""
+import argparse
+import contextlib
+import io
+import json
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.replay_env import replay_session
+
+
+def latest_session(root="datasets/replays"):
+    """가장 최근 녹화 세션 디렉토리"""
+    root = Path(root)
+    if not root.exists():
+        return None
+    sessions = sorted((p for p in root.iterdir() if (p / "events.jsonl").exists()),
+                      key=lambda p: p.stat().st_mtime, reverse=True)
+    return sessions[0] if sessions else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화 세션 재생 (보상 코드 비교/처리 속도 측정)")
+    parser.add_argument("--session", help="세션 디렉토리 (지정 안하면 최신 세션)")
+    parser.add_argument("--preload", action="store_true", help="프레임을 미리 디코딩 (PNG 디코딩 시간 제외)")
+    parser.add_argument("--verbose", action="store_true", help="환경 로그 출력 (기본: 숨김)")
+    parser.add_argument("--out", help="보고서 JSON 저장 경로 (스텝별 보상 포함)")
+    args = parser.parse_args()
+
+    session = Path(args.session) if args.session else latest_session()
+    if session is None:
+        print("❌ 녹화 세션이 없습니다!")
+        print("   먼저 'py tools/train_ml.py --record-session' 으로 녹화하세요")
+        return
+
+    print("=" * 60)
+    print("🔁 녹화 세션 재생")
+    print("=" * 60)
+    print(f"세션: {session}")
+
+    # 환경의 보상/감지 로그는 처리 속도에 영향을 주므로 기본 숨김
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        report = replay_session(session, preload=args.preload)
+
+    print(f"환경: {report['env_class']}")
+    print(f"에피소드: {report['episodes']}개, 스텝: {report['steps']:,}")
+    print(f"프레임: {report['frames_used']:,} / {report['frames_recorded']:,} 사용")
+    if report['exhausted']:
+        print("⚠️  녹화 프레임 부족 - 재생 코드가 녹화보다 많이 캡처했습니다 (회피 동작 등)")
+    print("-" * 60)
+    print(f"보상 합계: 녹화 {report['recorded_total']:.2f} → 재생 {report['replayed_total']:.2f}")
+    print(f"스텝 평균 |차이|: {report['mean_abs_diff']:.4f}")
+    print(f"불일치 스텝: {len(report['mismatched_steps']):,}개")
+    print("보상 항목 합계:")
+    for name, total in report['term_totals'].items():
+        print(f"  {name:10s}: {total:9.2f}")
+    print("-" * 60)
+    print(f"⚡ 처리 속도: {report['steps_per_s']:.1f} 스텝/초 ({report['wall_s']:.2f}초)")
+    print("단계별 시간:")
+    for name, stats in report['stages'].items():
+        print(f"  {name:10s}: 평균 {stats['mean_ms']:7.2f}ms, p95 {stats['p95_ms']:7.2f}ms, "
+              f"합계 {stats['mean_ms'] * stats['count'] / 1000:6.2f}초 ({stats['count']:,}회)")
+    print("=" * 60)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 보고서 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,14 +18,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from stable_baselines3 import PPO, DQN, A2C
 from src.utils.config_loader import load_config
+from src.utils.clock import RealClock
 import keyboard
 
 
 class SimpleActionController:
     """간단한 행동 제어 (실제 플레이 패턴 기반)"""
     
-    def __init__(self, keybindings):
+    def __init__(self, keybindings, clock=None):
         self.keybindings = keybindings
+        self.clock = clock if clock is not None else RealClock()  # 키 홀드/버프 쿨타임
         self.last_action = None
         self.currently_pressed = set()
         
@@ -79,7 +81,7 @@ class SimpleActionController:
         try:
             # 버프 쿨타임 체크
             if is_buff:
-                current_time = time.time()
+                current_time = self.clock.time()
                 cooldown = self.buff_cooldowns[action]
                 last_time = self.last_buff_time[action]
                 
@@ -106,12 +108,12 @@ class SimpleActionController:
                 elif is_attack:
                     # 공격은 0.3초간 꾹 누르기 (몬스터 처치까지)
                     keyboard.press(key)
-                    time.sleep(self.attack_duration)
+                    self.clock.sleep(self.attack_duration)
                     keyboard.release(key)
                 else:
                     # 텔포/버프는 탭 (누르고 바로 떼기)
                     keyboard.press(key)
-                    time.sleep(0.05)
+                    self.clock.sleep(0.05)
                     keyboard.release(key)
             elif action == 0:  # idle
                 # 모든 키 해제
@@ -151,6 +153,7 @@ class AgentTestGUI:
         # 통계
         self.frame_count = 0
         self.start_time = None
+        self.clock = RealClock()
         self.action_counts = {i: 0 for i in range(11)}
         self.action_names = [
             "💤 대기",           # 0: Idle
@@ -379,7 +382,7 @@ class AgentTestGUI:
         
         # 통계 초기화
         self.frame_count = 0
-        self.start_time = time.time()
+        self.start_time = self.clock.time()
         self.action_counts = {i: 0 for i in range(11)}
         
         # 버튼 상태 변경
@@ -429,7 +432,7 @@ class AgentTestGUI:
                 'skill2': 'd',
                 'potion': 'p'
             })
-            controller = SimpleActionController(keybindings)
+            controller = SimpleActionController(keybindings, clock=self.clock)
             
             # 화면 캡처 초기화
             sct = mss.mss()
@@ -453,10 +456,10 @@ class AgentTestGUI:
             self.root.after(0, self.log_status, "📹 화면 캡처 시작")
             self.root.after(0, self.log_status, f"🎯 타겟 FPS: {fps}")
             
-            last_log_time = time.time()
+            last_log_time = self.clock.time()
             
             while self.is_running:
-                loop_start = time.time()
+                loop_start = self.clock.time()
                 
                 # 화면 캡처
                 screenshot = sct.grab(monitor)
@@ -486,7 +489,7 @@ class AgentTestGUI:
                 self.root.after(0, self.update_current_action, action)
                 
                 # 5초마다 진행 상황 로그
-                current_time = time.time()
+                current_time = self.clock.time()
                 if current_time - last_log_time >= 5.0:
                     elapsed_total = current_time - self.start_time
                     actual_fps = self.frame_count / elapsed_total if elapsed_total > 0 else 0
@@ -495,16 +498,16 @@ class AgentTestGUI:
                     last_log_time = current_time
                 
                 # FPS 유지
-                elapsed = time.time() - loop_start
+                elapsed = self.clock.time() - loop_start
                 if elapsed < frame_delay:
-                    time.sleep(frame_delay - elapsed)
+                    self.clock.sleep(frame_delay - elapsed)
             
             # 종료 시 모든 키 해제
             controller.release_all()
             sct.close()
             
             # 최종 통계 로그
-            elapsed_total = time.time() - self.start_time
+            elapsed_total = self.clock.time() - self.start_time
             avg_fps = self.frame_count / elapsed_total if elapsed_total > 0 else 0
             self.root.after(0, self.log_status, f"✅ 종료: {self.frame_count}개 프레임 ({elapsed_total:.1f}초, 평균 {avg_fps:.1f} FPS)")
             
@@ -525,7 +528,7 @@ class AgentTestGUI:
         
         # 시간 및 프레임
         if self.start_time:
-            elapsed = time.time() - self.start_time
+            elapsed = self.clock.time() - self.start_time
             self.time_label.config(text=f"{elapsed:.1f}초")
             
             if self.frame_count > 0:
@@ -5,7 +5,6 @@
 import argparse
 from pathlib import Path
 import sys
-import time
 import cv2
 import numpy as np
 import mss
@@ -14,6 +13,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from stable_baselines3 import PPO, DQN, A2C
 from src.utils.config_loader import load_config
+from src.utils.clock import RealClock
 from collections import deque
 import keyboard
 
@@ -21,8 +21,9 @@ import keyboard
 class SimpleActionController:
     """간단한 행동 제어 (실제 플레이 패턴 기반)"""
     
-    def __init__(self, keybindings):
+    def __init__(self, keybindings, clock=None):
         self.keybindings = keybindings
+        self.clock = clock if clock is not None else RealClock()  # 키 홀드/버프 쿨타임
         self.currently_pressed = set()
         
         # 버프 쿨타임 관리 (초)
@@ -58,7 +59,7 @@ class SimpleActionController:
         try:
             # 버프 쿨타임 체크
             if is_buff:
-                current_time = time.time()
+                current_time = self.clock.time()
                 cooldown = self.buff_cooldowns[action]
                 last_time = self.last_buff_time[action]
                 
@@ -81,11 +82,11 @@ class SimpleActionController:
                 elif is_attack:
                     # 공격은 꾹 누르기
                     keyboard.press(key)
-                    time.sleep(self.attack_duration)
+                    self.clock.sleep(self.attack_duration)
                     keyboard.release(key)
                 else:
                     keyboard.press(key)
-                    time.sleep(0.05)
+                    self.clock.sleep(0.05)
                     keyboard.release(key)
             elif action == 0:
                 for pressed_key in list(self.currently_pressed):
@@ -177,7 +178,8 @@ def main():
         'potion': 'p'
     })
     
-    action_controller = SimpleActionController(keybindings)
+    clock = RealClock()
+    action_controller = SimpleActionController(keybindings, clock=clock)
     
     # 화면 캡처 초기화
     sct = mss.mss()
@@ -198,7 +200,7 @@ def main():
     
     for i in range(3, 0, -1):
         print(f"   {i}...")
-        time.sleep(1)
+        clock.sleep(1)
     
     print()
     print("🚀 에이전트 실행 시작!")
@@ -225,13 +227,13 @@ def main():
     
     # 실행
     frame_delay = 1.0 / args.fps
-    start_time = time.time()
+    start_time = clock.time()
     frame_count = 0
     action_counts = {i: 0 for i in range(11)}
     
     try:
         while True:
-            loop_start = time.time()
+            loop_start = clock.time()
             
             # 화면 캡처
             screenshot = sct.grab(monitor)
@@ -258,7 +260,7 @@ def main():
             
             # 1초마다 상태 출력
             if frame_count % args.fps == 0:
-                elapsed = time.time() - start_time
+                elapsed = clock.time() - start_time
                 print(f"⏱️  {elapsed:.1f}초 | 프레임: {frame_count} | 마지막 행동: {action_names[action]}")
             
             # 미리보기
@@ -283,14 +285,14 @@ def main():
                     break
             
             # 시간 제한
-            if args.duration > 0 and (time.time() - start_time) >= args.duration:
+            if args.duration > 0 and (clock.time() - start_time) >= args.duration:
                 print(f"\n⏱️  {args.duration}초 경과 - 자동 종료")
                 break
             
             # FPS 유지
-            elapsed = time.time() - loop_start
+            elapsed = clock.time() - loop_start
             if elapsed < frame_delay:
-                time.sleep(frame_delay - elapsed)
+                clock.sleep(frame_delay - elapsed)
     
     except KeyboardInterrupt:
         print("\n\n⚠️  중단됨")
@@ -305,7 +307,7 @@ def main():
         print("=" * 60)
         print("📊 실행 통계")
         print("=" * 60)
-        elapsed = time.time() - start_time
+        elapsed = clock.time() - start_time
         print(f"⏱️  총 시간: {elapsed:.1f}초")
         print(f"🎞️  총 프레임: {frame_count}개")
         print(f"📈 평균 FPS: {frame_count / elapsed:.1f}")
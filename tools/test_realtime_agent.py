@@ -12,10 +12,17 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from stable_baselines3 import PPO
 from src.rl_env_realtime import RealtimeGameEnv
+from src.rl_env_pipeline import PipelinedRealtimeEnv
+import keyboard
 
 
-def test_agent(model_path, num_episodes=5, max_steps_per_episode=1000):
-    """학습된 에이전트 테스트"""
+def test_agent(model_path, num_episodes=5, max_steps_per_episode=1000, pipeline=False, action_delay=1):
+    """학습된 에이전트 테스트
+
+    Args:
+        pipeline: True면 행동 실행과 캡처/추론을 겹쳐 실행 (PipelinedRealtimeEnv)
+        action_delay: 파이프라인 모드의 행동 지연 스텝 수
+    """
     
     print("=" * 60)
     print("🤖 실시간 RL 에이전트 테스ト")
@@ -23,10 +30,14 @@ def test_agent(model_path, num_episodes=5, max_steps_per_episode=1000):
     print(f"모델: {model_path}")
     print(f"테스트 에피소드: {num_episodes}")
     print(f"최대 스텝/에피소드: {max_steps_per_episode}")
+    if pipeline:
+        print(f"파이프라인: ON (action_delay={action_delay})")
     print("=" * 60)
     
     # 환경 생성
     env = RealtimeGameEnv(game="ML")
+    if pipeline:
+        env = PipelinedRealtimeEnv(env, action_delay=action_delay)
     
     # 모델 로드
     print("\n📦 모델 로딩 중...")
@@ -159,7 +170,18 @@ if __name__ == "__main__":
         default=1000,
         help="에피소드당 최대 스텝 수"
     )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="행동 실행 중 다음 관측 캡처/추론 (제어 주기 단축)"
+    )
+    parser.add_argument(
+        "--action-delay",
+        type=int,
+        default=1,
+        help="파이프라인 행동 지연 스텝 수 (0 = 동기 실행)"
+    )
     
     args = parser.parse_args()
     
-    test_agent(args.model, args.episodes, args.steps)
+    test_agent(args.model, args.episodes, args.steps, args.pipeline, args.action_delay)
@@ -0,0 +1,133 @@
+"""
+액터-러너 분리 실시간 강화학습 스크립트
+액터 프로세스가 게임을 계속 플레이하는 동안 러너가 PPO 업데이트 수행
+(PPO 업데이트 중 캐릭터가 멈추거나 키가 눌린 채로 남지 않음)
+
+사용법: py tools/train_actor_learner.py --game ML --timesteps 50000 --max-policy-lag 2
+"""
+import argparse
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gymnasium import spaces
+import numpy as np
+from stable_baselines3 import PPO
+from src.actor_learner import ActorLearnerTrainer, SpaceOnlyEnv, game_env_factory
+from src.env_registry import GAME_ENVS
+import keyboard
+
+
+# 게임별 행동 수 (환경 클래스 참고)
+ACTION_COUNTS = {'ML': 11, 'MP': 8}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="액터-러너 분리 실시간 RL 학습")
+    parser.add_argument("--game", default="ML", choices=sorted(GAME_ENVS), help="게임 이름")
+    parser.add_argument("--timesteps", type=int, default=50000, help="학습 타임스텝")
+    parser.add_argument("--learning-rate", type=float, default=0.0003, help="학습률")
+    parser.add_argument("--frame-width", type=int, default=84, help="프레임 너비")
+    parser.add_argument("--frame-height", type=int, default=84, help="프레임 높이")
+    parser.add_argument("--frame-stack", type=int, default=4, help="프레임 스택")
+    parser.add_argument("--frame-skip", type=int, default=4, help="프레임 스킵 (행동 반복)")
+    parser.add_argument("--max-policy-lag", type=int, default=2, help="허용 정책 지연 (업데이트 횟수, 초과 전이는 폐기)")
+    parser.add_argument("--queue-size", type=int, default=8192, help="전이 큐 크기")
+    parser.add_argument("--load-model", type=str, help="기존 모델 로드 (계속 학습)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🎮 액터-러너 실시간 강화학습")
+    print("=" * 60)
+    print(f"게임: {args.game}")
+    print(f"타임스텝: {args.timesteps:,}")
+    print(f"학습률: {args.learning_rate}")
+    print(f"최대 정책 지연: {args.max_policy_lag}")
+    print("=" * 60)
+
+    roi_path = Path("configs/roi_settings.json")
+    if not roi_path.exists():
+        print("❌ ROI 설정이 없습니다!")
+        print("   먼저 'py tools/setup_roi.py' 를 실행하세요")
+        return
+
+    input("준비되면 엔터를 누르세요... ")
+
+    print("\n⏰ 5초 후 학습 시작...")
+    for i in range(5, 0, -1):
+        print(f"   {i}초...")
+        time.sleep(1)
+
+    # 러너 쪽은 실제 게임 없이 공간 정보만 사용
+    observation_space = spaces.Box(
+        low=0, high=255,
+        shape=(args.frame_stack, args.frame_height, args.frame_width),
+        dtype=np.uint8
+    )
+    action_space = spaces.Discrete(ACTION_COUNTS[args.game])
+    space_env = SpaceOnlyEnv(observation_space, action_space)
+
+    if args.load_model:
+        print(f"\n📂 기존 모델 로드: {args.load_model}")
+        model = PPO.load(args.load_model, env=space_env)
+    else:
+        policy_kwargs = dict(
+            features_extractor_kwargs=dict(features_dim=512),
+            net_arch=[512, 512]
+        )
+        model = PPO(
+            "CnnPolicy",
+            space_env,
+            learning_rate=args.learning_rate,
+            n_steps=2048,
+            batch_size=64,
+            n_epochs=10,
+            gamma=0.99,
+            gae_lambda=0.95,
+            clip_range=0.2,
+            ent_coef=0.05,
+            vf_coef=0.5,
+            max_grad_norm=0.5,
+            policy_kwargs=policy_kwargs,
+            verbose=1,
+            tensorboard_log=f"logs/realtime/{args.game}"
+        )
+
+    env_factory = game_env_factory(
+        args.game,
+        frame_width=args.frame_width,
+        frame_height=args.frame_height,
+        frame_stack=args.frame_stack,
+        frame_skip=args.frame_skip
+    )
+    trainer = ActorLearnerTrainer(model, env_factory, max_policy_lag=args.max_policy_lag, queue_size=args.queue_size)
+
+    print("\n🚀 학습 시작! (ESC로 중지)")
+    print(f"📊 tensorboard --logdir logs/realtime/{args.game}")
+
+    try:
+        trainer.learn(args.timesteps, should_stop=lambda: keyboard.is_pressed('esc'))
+    except KeyboardInterrupt:
+        print("\n⏹️  학습 중단됨 (Ctrl+C)")
+    finally:
+        trainer.stop()
+
+        final_model_dir = Path(f"models/realtime/{args.game}")
+        final_model_dir.mkdir(parents=True, exist_ok=True)
+        final_model_path = final_model_dir / f"{args.game}_ppo_actor_learner_final.zip"
+        model.save(str(final_model_path))
+
+        print("\n" + "=" * 60)
+        print("✅ 학습 완료!")
+        print(f"💾 모델 저장: {final_model_path}")
+        summary = trainer.lag_summary()
+        if summary:
+            print(f"⏱️  정책 지연: 평균 {summary['mean']:.2f}, 최대 {summary['max']}")
+            print(f"🗑️  폐기 전이: 지연 초과 {summary['stale_dropped']}, 큐 초과 {summary['queue_dropped']}")
+        print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,17 @@ import time
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import BaseCallback, CheckpointCallback
+from stable_baselines3.common.callbacks import BaseCallback
+from src.checkpoint_manager import AsyncCheckpointCallback, CheckpointManager, recent_mean_reward
 from src.rl_env_mp import MPRealtimeEnv
+from src.rl_vec_env_realtime import make_multi_client_vec_env
+from src.replay_env import SessionRecorder
+from src.sim_game import SimMPEnv
+from src.transition_store import TransitionLogWrapper
+from src.utils.config_loader import load_config
+from src.utils.config_watcher import ConfigWatcher
+from src.utils.instrumentation import TimingAggregator
+from src.utils.tracing import get_tracer, start_tracing, stop_tracing, trace_module, trace_phase
 import torch
 import keyboard
 
@@ -21,43 +30,70 @@ import keyboard
 class RealtimeTrainingCallback(BaseCallback):
     """실시간 학습 콜백"""
     
-    def __init__(self, verbose=0):
+    def __init__(self, verbose=0, check_esc=True):
         super().__init__(verbose)
+        self.check_esc = check_esc  # 시뮬레이터 학습은 키보드 훅 없이
         self.episode_rewards = []
         self.episode_lengths = []
-        self.current_episode_reward = 0
-        self.current_episode_length = 0
+        # 클라이언트(서브 환경)별 진행 중 에피소드
+        self.current_episode_rewards = []
+        self.current_episode_lengths = []
+        # 단계별 지연 시간 (롤아웃마다 p50/p95/p99를 TensorBoard timing/에 기록)
+        self.timing = TimingAggregator()
         
     def _on_step(self):
         """매 스텝마다 호출"""
         # ESC로 중지
-        if keyboard.is_pressed('esc'):
+        if self.check_esc and keyboard.is_pressed('esc'):
             print("\n⏹️  ESC 감지 - 학습 중지")
             return False
         
-        # 통계 수집
-        self.current_episode_reward += self.locals['rewards'][0]
-        self.current_episode_length += 1
+        # 통계 수집 (클라이언트별)
+        rewards = self.locals['rewards']
+        dones = self.locals['dones']
+        self.timing.add_infos(self.locals.get('infos', ()))
+        if len(self.current_episode_rewards) != len(rewards):
+            self.current_episode_rewards = [0.0] * len(rewards)
+            self.current_episode_lengths = [0] * len(rewards)
         
-        # 에피소드 종료 시
-        if self.locals['dones'][0]:
-            self.episode_rewards.append(self.current_episode_reward)
-            self.episode_lengths.append(self.current_episode_length)
+        for i in range(len(rewards)):
+            self.current_episode_rewards[i] += rewards[i]
+            self.current_episode_lengths[i] += 1
             
-            # 최근 10 에피소드 평균
-            if len(self.episode_rewards) >= 10:
-                avg_reward = sum(self.episode_rewards[-10:]) / 10
-                avg_length = sum(self.episode_lengths[-10:]) / 10
+            # 에피소드 종료 시
+            if dones[i]:
+                self.episode_rewards.append(self.current_episode_rewards[i])
+                self.episode_lengths.append(self.current_episode_lengths[i])
                 
-                print(f"\n📊 에피소드 {len(self.episode_rewards)}")
-                print(f"   보상: {self.current_episode_reward:.2f}")
-                print(f"   길이: {self.current_episode_length} 스텝")
-                print(f"   평균 (최근 10): {avg_reward:.2f} 보상, {avg_length:.0f} 스텝")
-            
-            self.current_episode_reward = 0
-            self.current_episode_length = 0
+                # 최근 10 에피소드 평균
+                if len(self.episode_rewards) >= 10:
+                    avg_reward = sum(self.episode_rewards[-10:]) / 10
+                    avg_length = sum(self.episode_lengths[-10:]) / 10
+                    
+                    print(f"\n📊 에피소드 {len(self.episode_rewards)} (클라이언트 {i})")
+                    print(f"   보상: {self.current_episode_rewards[i]:.2f}")
+                    print(f"   길이: {self.current_episode_lengths[i]} 스텝")
+                    print(f"   평균 (최근 10): {avg_reward:.2f} 보상, {avg_length:.0f} 스텝")
+                
+                self.current_episode_rewards[i] = 0.0
+                self.current_episode_lengths[i] = 0
         
         return True
+    
+    def _on_training_start(self):
+        # 추적 중이면 롤아웃 중 정책 추론(forward)도 타임라인에 기록
+        if get_tracer() is not None:
+            trace_module(self.model.policy, 'policy_forward')
+    
+    def _on_rollout_start(self):
+        trace_phase('rollout')
+    
+    def _on_rollout_end(self):
+        self.timing.record(self.logger)
+        trace_phase('ppo_update')
+    
+    def _on_training_end(self):
+        trace_phase(None)
 
 
 def main():
@@ -69,7 +105,30 @@ def main():
     parser.add_argument("--frame-stack", type=int, default=4, help="프레임 스택")
     parser.add_argument("--frame-skip", type=int, default=4, help="프레임 스킵")
     parser.add_argument("--load-model", type=str, help="기존 모델 로드")
+    parser.add_argument("--resume", action="store_true", help="체크포인트 manifest의 최신 체크포인트에서 재개")
+    parser.add_argument("--keep-checkpoints", type=int, default=5, help="보관할 최근 체크포인트 수")
+    parser.add_argument("--log-transitions", action="store_true",
+                        help="모든 스텝을 datasets/transitions에 기록 (오프라인 학습/리라벨링용)")
+    parser.add_argument("--record-session", action="store_true",
+                        help="원본 화면/행동을 datasets/replays에 녹화 (보상 코드 재생 비교용, tools/replay_session.py)")
+    parser.add_argument("--multi-client", action="store_true",
+                        help="configs/MP.yaml의 clients에 정의된 모든 게임 창에서 동시 학습")
+    parser.add_argument("--sim", action="store_true", help="실제 게임 대신 헤드리스 시뮬레이터로 학습 (벤치마크/회귀 테스트)")
+    parser.add_argument("--seed", type=int, default=0, help="시뮬레이터 시드")
+    parser.add_argument("--hot-reload", action="store_true",
+                        help="학습 중 config/ROI 파일이 바뀌면 다음 스텝부터 적용 (재시작 불필요)")
+    parser.add_argument("--trace", type=str, default=None,
+                        help="타임라인(Chrome Trace JSON) 저장 경로 (Perfetto에서 열기, 예: logs/trace.json)")
     args = parser.parse_args()
+    if args.multi_client:
+        # 멀티 클라이언트 VecEnv는 실제 게임 창 전용이고 세션 녹화/전이 로그 래퍼를 지원하지 않음
+        unsupported = [flag for flag, on in (("--sim", args.sim), ("--record-session", args.record_session),
+                                             ("--log-transitions", args.log_transitions)) if on]
+        if unsupported:
+            parser.error(f"--multi-client와 함께 쓸 수 없는 옵션: {', '.join(unsupported)}")
+    
+    # 시뮬레이터 학습은 실제 게임 모델/로그와 분리
+    run_dir = "sim" if args.sim else "realtime"
     
     print("=" * 60)
     print("🎮 MP 게임 실시간 강화학습 (메이플스토리)")
@@ -80,41 +139,68 @@ def main():
     print(f"프레임 스킵: {args.frame_skip}")
     print("=" * 60)
     
-    # 준비 확인
-    print("\n⚠️  실시간 학습 주의사항:")
-    print("  1. 메이플스토리가 실행 중이어야 합니다")
-    print("  2. 캐릭터가 안전한 사냥터에 있어야 합니다")
-    print("  3. 마우스/키보드를 건드리지 마세요")
-    print("  4. ROI 설정이 되어있어야 합니다 (py tools/setup_roi.py)")
-    print("  5. ESC로 언제든 중지 가능")
-    print()
-    
-    # ROI 설정 확인
-    roi_path = Path("configs/roi_settings.json")
-    if not roi_path.exists():
-        print("❌ ROI 설정이 없습니다!")
-        print("   먼저 'py tools/setup_roi.py' 를 실행하세요")
-        return
-    
-    input("준비되면 엔터를 누르세요... ")
-    
-    print("\n⏰ 5초 후 학습 시작...")
-    for i in range(5, 0, -1):
-        print(f"   {i}초...")
-        time.sleep(1)
+    if args.sim:
+        print("\n🧪 시뮬레이터 모드 (실제 게임 없이 가상 시간으로 학습)")
+    else:
+        # 준비 확인
+        print("\n⚠️  실시간 학습 주의사항:")
+        print("  1. 메이플스토리가 실행 중이어야 합니다")
+        print("  2. 캐릭터가 안전한 사냥터에 있어야 합니다")
+        print("  3. 마우스/키보드를 건드리지 마세요")
+        print("  4. ROI 설정이 되어있어야 합니다 (py tools/setup_roi.py)")
+        print("  5. ESC로 언제든 중지 가능")
+        print()
+    
+        # ROI 설정 확인
+        roi_path = Path("configs/roi_settings.json")
+        if not roi_path.exists():
+            print("❌ ROI 설정이 없습니다!")
+            print("   먼저 'py tools/setup_roi.py' 를 실행하세요")
+            return
+    
+        input("준비되면 엔터를 누르세요... ")
+    
+        print("\n⏰ 5초 후 학습 시작...")
+        for i in range(5, 0, -1):
+            print(f"   {i}초...")
+            time.sleep(1)
     
     # MP 환경 생성
     print("\n📊 MP 환경 생성 중...")
-    env = MPRealtimeEnv(
+    # 타임라인 추적은 환경 생성 전에 켜야 키 입력도 기록됨
+    if args.trace:
+        start_tracing(args.trace)
+    
+    env_kwargs = dict(
         frame_width=args.frame_width,
         frame_height=args.frame_height,
         frame_stack=args.frame_stack,
         frame_skip=args.frame_skip
     )
+    if args.multi_client:
+        clients = load_config(game="MP").get('clients')
+        if not clients:
+            print("❌ configs/MP.yaml에 clients 설정이 없습니다!")
+            return
+        env = make_multi_client_vec_env("MP", clients, **env_kwargs)
+        if args.hot_reload:
+            watcher = ConfigWatcher("MP")  # 클라이언트 전체가 감시기 하나 공유
+            for sub_env in env.envs:
+                sub_env.unwrapped.watch_config(watcher)
+    else:
+        env = SimMPEnv(seed=args.seed, **env_kwargs) if args.sim else MPRealtimeEnv(**env_kwargs)
+        if args.hot_reload:
+            env.watch_config()
+        if args.record_session:
+            env = SessionRecorder(env)
+        if args.log_transitions:
+            env = TransitionLogWrapper(env)
     
     print(f"✅ 환경 생성 완료")
     print(f"   관측 공간: {env.observation_space.shape}")
     print(f"   행동 공간: {env.action_space.n}개")
+    if args.multi_client:
+        print(f"   클라이언트: {env.num_envs}개")
     
     # 모델 생성 또는 로드
     if args.load_model:
@@ -144,26 +230,35 @@ def main():
             max_grad_norm=0.5,
             policy_kwargs=policy_kwargs,
             verbose=1,
-            tensorboard_log="logs/realtime/MP"
+            tensorboard_log=f"logs/{run_dir}/MP"
         )
         print("✅ 모델 생성 완료")
     
     # 콜백 설정
-    checkpoint_dir = Path("models/realtime/MP/checkpoints")
+    checkpoint_dir = Path(f"models/{run_dir}/MP/checkpoints")
     checkpoint_dir.mkdir(parents=True, exist_ok=True)
     
-    checkpoint_callback = CheckpointCallback(
+    # 비동기 체크포인트 (스냅샷만 학습 스레드, 압축/쓰기는 백그라운드)
+    checkpoint_manager = CheckpointManager(checkpoint_dir, "MP_ppo_realtime", keep_last=args.keep_checkpoints)
+    if args.resume:
+        entry = checkpoint_manager.restore(model)
+        if entry:
+            print(f"📂 체크포인트에서 재개: {entry['file']} ({entry['timesteps']:,} 스텝)")
+        else:
+            print("⚠️  재개할 체크포인트가 없습니다 - 처음부터 학습")
+    
+    training_callback = RealtimeTrainingCallback(verbose=1, check_esc=not args.sim)
+    checkpoint_callback = AsyncCheckpointCallback(
+        checkpoint_manager,
         save_freq=5000,
-        save_path=str(checkpoint_dir),
-        name_prefix="MP_ppo_realtime"
+        reward_fn=lambda: recent_mean_reward(training_callback.episode_rewards),
+        verbose=1
     )
     
-    training_callback = RealtimeTrainingCallback(verbose=1)
-    
     # 학습 시작
     print("\n🚀 학습 시작!")
     print("📊 TensorBoard 모니터링:")
-    print("   tensorboard --logdir logs/realtime/MP")
+    print(f"   tensorboard --logdir logs/{run_dir}/MP")
     print("\n⏹️  ESC 키를 눌러 안전하게 중지")
     print("=" * 60)
     
@@ -171,7 +266,8 @@ def main():
         model.learn(
             total_timesteps=args.timesteps,
             callback=[checkpoint_callback, training_callback],
-            progress_bar=True
+            progress_bar=True,
+            reset_num_timesteps=not args.resume
         )
     except KeyboardInterrupt:
         print("\n⏹️  학습 중단됨 (Ctrl+C)")
@@ -179,12 +275,18 @@ def main():
         print(f"\n❌ 에러 발생: {e}")
     finally:
         # 최종 모델 저장
-        final_model_dir = Path("models/realtime/MP")
+        final_model_dir = Path(f"models/{run_dir}/MP")
         final_model_dir.mkdir(parents=True, exist_ok=True)
         final_model_path = final_model_dir / "MP_ppo_realtime_final.zip"
         
-        model.save(str(final_model_path))
+        # 키 해제 먼저 (저장하는 동안 키가 눌린 채로 남지 않도록)
         env.close()
+        checkpoint_manager.save_async(
+            model, eval_reward=recent_mean_reward(training_callback.episode_rewards), tag="final"
+        )
+        checkpoint_manager.save_model_async(model, final_model_path)
+        checkpoint_manager.close()
+        stop_tracing()
         
         print("\n" + "=" * 60)
         print("✅ 학습 완료!")
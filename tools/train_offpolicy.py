@@ -0,0 +1,223 @@
+"""
+오프폴리시 실시간 강화학습 스크립트 (DQN / QR-DQN)
+실제 게임 플레이로 얻은 전이를 리플레이 버퍼에 모아 여러 번 재사용
+
+- 리플레이 버퍼는 84x84 uint8 프레임을 한 번씩만 저장 (src/frame_replay_buffer.py)
+- --replay-ratio: 환경 스텝당 그래디언트 업데이트 수 (데이터 재사용 비율)
+    * 1 이상: 매 스텝 round(ratio)회 업데이트
+    * 1 미만: round(1/ratio) 스텝마다 1회 업데이트
+
+사용법: py tools/train_offpolicy.py --game ML --algo dqn --timesteps 200000 --replay-ratio 2
+"""
+import argparse
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stable_baselines3 import DQN
+from stable_baselines3.common.callbacks import BaseCallback
+from src.checkpoint_manager import AsyncCheckpointCallback, CheckpointManager, recent_mean_reward
+from src.frame_replay_buffer import FrameStackReplayBuffer, StepFrameStack
+from src.env_registry import GAME_ENVS
+from src.transition_store import TransitionLogWrapper
+import keyboard
+
+
+def get_algorithm(name):
+    """알고리즘 이름 → SB3 클래스 (QR-DQN은 sb3_contrib 필요)"""
+    if name == "dqn":
+        return DQN
+    try:
+        from sb3_contrib import QRDQN
+    except ImportError:
+        raise SystemExit("❌ QR-DQN은 sb3_contrib가 필요합니다: pip install sb3-contrib")
+    return QRDQN
+
+
+def replay_schedule(replay_ratio):
+    """데이터 재사용 비율 → (train_freq, gradient_steps)"""
+    if replay_ratio <= 0:
+        raise ValueError("replay-ratio는 0보다 커야 합니다")
+    if replay_ratio >= 1:
+        return 1, int(round(replay_ratio))
+    return int(round(1 / replay_ratio)), 1
+
+
+class OffPolicyTrainingCallback(BaseCallback):
+    """ESC 중지 + 에피소드 통계"""
+
+    def __init__(self, verbose=0):
+        super().__init__(verbose)
+        self.episode_rewards = []
+        self.current_episode_reward = 0.0
+        self.current_episode_length = 0
+
+    def _on_step(self):
+        if keyboard.is_pressed('esc'):
+            print("\n⏹️  ESC 감지 - 학습 중지")
+            return False
+
+        self.current_episode_reward += float(self.locals['rewards'][0])
+        self.current_episode_length += 1
+
+        if self.locals['dones'][0]:
+            self.episode_rewards.append(self.current_episode_reward)
+            print(f"\n📊 에피소드 {len(self.episode_rewards)}: "
+                  f"보상 {self.current_episode_reward:.2f}, 길이 {self.current_episode_length} 스텝, "
+                  f"버퍼 {self.model.replay_buffer.size():,}, ε={self.model.exploration_rate:.3f}")
+            self.current_episode_reward = 0.0
+            self.current_episode_length = 0
+
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프폴리시 실시간 RL 학습 (DQN / QR-DQN)")
+    parser.add_argument("--game", default="ML", choices=sorted(GAME_ENVS), help="게임 이름")
+    parser.add_argument("--algo", default="dqn", choices=["dqn", "qrdqn"], help="알고리즘")
+    parser.add_argument("--timesteps", type=int, default=200000, help="학습 타임스텝")
+    parser.add_argument("--learning-rate", type=float, default=0.0001, help="학습률")
+    parser.add_argument("--buffer-size", type=int, default=1000000, help="리플레이 버퍼 크기 (전이 수)")
+    parser.add_argument("--replay-ratio", type=float, default=1.0, help="환경 스텝당 업데이트 수")
+    parser.add_argument("--learning-starts", type=int, default=5000, help="학습 시작 전 수집 스텝")
+    parser.add_argument("--batch-size", type=int, default=32, help="배치 크기")
+    parser.add_argument("--frame-width", type=int, default=84, help="프레임 너비")
+    parser.add_argument("--frame-height", type=int, default=84, help="프레임 높이")
+    parser.add_argument("--frame-stack", type=int, default=4, help="프레임 스택")
+    parser.add_argument("--frame-skip", type=int, default=4, help="프레임 스킵")
+    parser.add_argument("--sub-step-stack", action="store_true",
+                        help="환경 기본 서브 스텝 프레임 스택 사용 (스텝당 여러 프레임 저장)")
+    parser.add_argument("--load-model", type=str, help="기존 모델 로드")
+    parser.add_argument("--resume", action="store_true", help="체크포인트 manifest의 최신 체크포인트에서 재개")
+    parser.add_argument("--keep-checkpoints", type=int, default=5, help="보관할 최근 체크포인트 수")
+    parser.add_argument("--log-transitions", action="store_true",
+                        help="모든 스텝을 datasets/transitions에 기록 (오프라인 학습/리라벨링용)")
+    args = parser.parse_args()
+
+    train_freq, gradient_steps = replay_schedule(args.replay_ratio)
+    algo_class = get_algorithm(args.algo)
+    algo_name = args.algo
+
+    print("=" * 60)
+    print(f"🎮 오프폴리시 실시간 강화학습 ({algo_name.upper()})")
+    print("=" * 60)
+    print(f"게임: {args.game}")
+    print(f"타임스텝: {args.timesteps:,}")
+    print(f"리플레이 버퍼: {args.buffer_size:,} 전이")
+    print(f"재사용 비율: {args.replay_ratio} (train_freq={train_freq}, gradient_steps={gradient_steps})")
+    print("=" * 60)
+
+    roi_path = Path("configs/roi_settings.json")
+    if not roi_path.exists():
+        print("❌ ROI 설정이 없습니다!")
+        print("   먼저 'py tools/setup_roi.py' 를 실행하세요")
+        return
+
+    input("준비되면 엔터를 누르세요... ")
+
+    print("\n⏰ 5초 후 학습 시작...")
+    for i in range(5, 0, -1):
+        print(f"   {i}초...")
+        time.sleep(1)
+
+    print(f"\n📊 {args.game} 환경 생성 중...")
+    env = GAME_ENVS[args.game](
+        frame_width=args.frame_width,
+        frame_height=args.frame_height,
+        frame_stack=args.frame_stack,
+        frame_skip=args.frame_skip
+    )
+    if args.log_transitions:
+        env = TransitionLogWrapper(env)
+    if args.sub_step_stack:
+        frames_per_step = min(args.frame_skip, args.frame_stack)
+    else:
+        env = StepFrameStack(env)
+        frames_per_step = 1
+
+    replay_buffer_kwargs = dict(frames_per_step=frames_per_step)
+
+    if args.load_model:
+        print(f"\n📂 기존 모델 로드: {args.load_model}")
+        model = algo_class.load(
+            args.load_model, env=env,
+            buffer_size=args.buffer_size,
+            train_freq=train_freq,
+            gradient_steps=gradient_steps,
+            replay_buffer_class=FrameStackReplayBuffer,
+            replay_buffer_kwargs=replay_buffer_kwargs,
+        )
+    else:
+        model = algo_class(
+            "CnnPolicy",
+            env,
+            learning_rate=args.learning_rate,
+            buffer_size=args.buffer_size,
+            learning_starts=args.learning_starts,
+            batch_size=args.batch_size,
+            gamma=0.99,
+            train_freq=train_freq,
+            gradient_steps=gradient_steps,
+            target_update_interval=1000,
+            exploration_fraction=0.1,
+            exploration_final_eps=0.02,
+            replay_buffer_class=FrameStackReplayBuffer,
+            replay_buffer_kwargs=replay_buffer_kwargs,
+            verbose=1,
+            tensorboard_log=f"logs/realtime/{args.game}"
+        )
+
+    checkpoint_dir = Path(f"models/realtime/{args.game}/checkpoints")
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_manager = CheckpointManager(checkpoint_dir, f"{args.game}_{algo_name}_realtime",
+                                           keep_last=args.keep_checkpoints)
+    if args.resume:
+        entry = checkpoint_manager.restore(model)
+        if entry:
+            print(f"📂 체크포인트에서 재개: {entry['file']} ({entry['timesteps']:,} 스텝, 리플레이 버퍼는 새로 수집)")
+    training_callback = OffPolicyTrainingCallback(verbose=1)
+    checkpoint_callback = AsyncCheckpointCallback(
+        checkpoint_manager,
+        save_freq=5000,
+        reward_fn=lambda: recent_mean_reward(training_callback.episode_rewards),
+        verbose=1
+    )
+
+    print("\n🚀 학습 시작! (ESC로 중지)")
+    print(f"📊 tensorboard --logdir logs/realtime/{args.game}")
+
+    try:
+        model.learn(
+            total_timesteps=args.timesteps,
+            callback=[checkpoint_callback, training_callback],
+            tb_log_name=f"{algo_name.upper()}_realtime",
+            reset_num_timesteps=not args.resume,
+        )
+    except KeyboardInterrupt:
+        print("\n⏹️  학습 중단됨 (Ctrl+C)")
+    finally:
+        final_model_dir = Path(f"models/realtime/{args.game}")
+        final_model_dir.mkdir(parents=True, exist_ok=True)
+        final_model_path = final_model_dir / f"{args.game}_{algo_name}_realtime_final.zip"
+
+        # 키 해제 먼저 (저장하는 동안 키가 눌린 채로 남지 않도록)
+        env.close()
+        checkpoint_manager.save_async(
+            model, eval_reward=recent_mean_reward(training_callback.episode_rewards), tag="final"
+        )
+        checkpoint_manager.save_model_async(model, final_model_path)
+        checkpoint_manager.close()
+
+        print("\n" + "=" * 60)
+        print("✅ 학습 완료!")
+        print(f"💾 모델 저장: {final_model_path}")
+        if training_callback.episode_rewards:
+            rewards = training_callback.episode_rewards
+            print(f"📈 에피소드 {len(rewards)}개, 평균 보상 {sum(rewards) / len(rewards):.2f}")
+        print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,16 @@ import time
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import BaseCallback, CheckpointCallback
+from stable_baselines3.common.callbacks import BaseCallback
+from stable_baselines3.common.vec_env import VecMonitor
+from src.checkpoint_manager import AsyncCheckpointCallback, CheckpointManager, recent_mean_reward
 from src.rl_env_realtime import RealtimeGameEnv
+from src.rl_env_pipeline import PipelinedRealtimeEnv
+from src.rl_vec_env_realtime import make_multi_client_vec_env
+from src.sim_vec_env import BatchedSimVecEnv
+from src.transition_store import TransitionLogWrapper
+from src.utils.config_loader import load_config
+from src.utils.instrumentation import TimingAggregator
 import torch
 import keyboard
 
@@ -21,43 +29,58 @@ import keyboard
 class RealtimeTrainingCallback(BaseCallback):
     """실시간 학습 콜백"""
     
-    def __init__(self, verbose=0):
+    def __init__(self, verbose=0, check_esc=True):
         super().__init__(verbose)
+        self.check_esc = check_esc  # 시뮬레이터 학습은 키보드 훅 없이
         self.episode_rewards = []
         self.episode_lengths = []
-        self.current_episode_reward = 0
-        self.current_episode_length = 0
+        # 클라이언트(서브 환경)별 진행 중 에피소드
+        self.current_episode_rewards = []
+        self.current_episode_lengths = []
+        # 단계별 지연 시간 (롤아웃마다 p50/p95/p99를 TensorBoard timing/에 기록, 시뮬레이터 VecEnv는 없음)
+        self.timing = TimingAggregator()
         
     def _on_step(self):
         """매 스텝마다 호출"""
         # ESC로 중지
-        if 
+        if self.check_esc and keyboard.is_pressed('esc'):
             print("\n⏹️  ESC 감지 - 학습 중지")
             return False
         
-        # 통계 수집
-        self.current_episode_reward += self.locals['rewards'][0]
-        self.current_episode_length += 1
+        # 통계 수집 (클라이언트별)
+        rewards = self.locals['rewards']
+        dones = self.locals['dones']
+        self.timing.add_infos(self.locals.get('infos', ()))
+        if len(self.current_episode_rewards) != len(rewards):
+            self.current_episode_rewards = [0.0] * len(rewards)
+            self.current_episode_lengths = [0] * len(rewards)
         
-        # 에피소드 종료 시
-        if self.locals['dones'][0]:
-            self.episode_rewards.append(self.current_episode_reward)
-            self.episode_lengths.append(self.current_episode_length)
+        for i in range(len(rewards)):
+            self.current_episode_rewards[i] += rewards[i]
+            self.current_episode_lengths[i] += 1
             
-            # 최근 10 에피소드 평균
-            if len(self.episode_rewards) >= 10:
-                avg_reward = sum(self.episode_rewards[-10:]) / 10
-                avg_length = sum(self.episode_lengths[-10:]) / 10
+            # 에피소드 종료 시
+            if dones[i]:
+                self.episode_rewards.append(self.current_episode_rewards[i])
+                self.episode_lengths.append(self.current_episode_lengths[i])
                 
-                print(f"\n📊 에피소드 {len(self.episode_rewards)}")
-                print(f"   보상: {self.current_episode_reward:.2f}")
-                print(f"   길이: {self.current_episode_length} 스텝")
-                print(f"   평균 (최근 10): {avg_reward:.2f} 보상, {avg_length:.0f} 스텝")
-            
-            self.current_episode_reward = 0
-            self.current_episode_length = 0
+                # 최근 10 에피소드 평균
+                if self.verbose >= 1 and len(self.episode_rewards) >= 10:
+                    avg_reward = sum(self.episode_rewards[-10:]) / 10
+                    avg_length = sum(self.episode_lengths[-10:]) / 10
+                    
+                    print(f"\n📊 에피소드 {len(self.episode_rewards)} (클라이언트 {i})")
+                    print(f"   보상: {self.current_episode_rewards[i]:.2f}")
+                    print(f"   길이: {self.current_episode_lengths[i]} 스텝")
+                    print(f"   평균 (최근 10): {avg_reward:.2f} 보상, {avg_length:.0f} 스텝")
+                
+                self.current_episode_rewards[i] = 0.0
+                self.current_episode_lengths[i] = 0
         
         return True
+    
+    def _on_rollout_end(self):
+        self.timing.record(self.logger)
 
 
 def main():
@@ -70,7 +93,32 @@ def main():
     parser.add_argument("--frame-stack", type=int, default=4, help="프레임 스택")
     parser.add_argument("--frame-skip", type=int, default=4, help="프레임 스킵 (행동 반복)")
     parser.add_argument("--load-model", type=str, help="기존 모델 로드 (계속 학습)")
+    parser.add_argument("--resume", action="store_true", help="체크포인트 manifest의 최신 체크포인트에서 재개")
+    parser.add_argument("--keep-checkpoints", type=int, default=5, help="보관할 최근 체크포인트 수")
+    parser.add_argument("--pipeline", action="store_true", help="행동 실행과 캡처/추론 겹치기")
+    parser.add_argument("--action-delay", type=int, default=1, help="파이프라인 행동 지연 스텝 수 (0 = 동기)")
+    parser.add_argument("--log-transitions", action="store_true",
+                        help="모든 스텝을 datasets/transitions에 기록 (오프라인 학습/리라벨링용)")
+    parser.add_argument("--multi-client", action="store_true",
+                        help="configs/<GAME>.yaml의 clients에 정의된 모든 게임 창에서 동시 학습 (ML/MP)")
+    parser.add_argument("--sim-envs", type=int, default=0,
+                        help="실제 게임 대신 배치 시뮬레이터 월드 N개로 학습 (ML/MP, 하이퍼파라미터 탐색용)")
+    parser.add_argument("--seed", type=int, default=0, help="시뮬레이터 시드")
+    parser.add_argument("--n-steps", type=int, default=2048, help="PPO 롤아웃 길이 (환경당 스텝)")
+    parser.add_argument("--batch-size", type=int, default=64, help="PPO 미니배치 크기")
     args = parser.parse_args()
+    if args.multi_client or args.sim_envs > 0:
+        # VecEnv 모드는 단일 환경 래퍼(파이프라인/전이 로그)를 지원하지 않음
+        mode = "--multi-client" if args.multi_client else "--sim-envs"
+        unsupported = [flag for flag, on in (("--sim-envs", args.multi_client and args.sim_envs > 0),
+                                             ("--pipeline", args.pipeline),
+                                             ("--log-transitions", args.log_transitions)) if on]
+        if unsupported:
+            parser.error(f"{mode}와 함께 쓸 수 없는 옵션: {', '.join(unsupported)}")
+    
+    # 시뮬레이터 학습은 실제 게임 모델/로그와 분리
+    sim = args.sim_envs > 0
+    run_dir = "sim" if sim else "realtime"
     
     print("=" * 60)
     print("🎮 실시간 강화학습")
@@ -80,44 +128,64 @@ def main():
     print(f"학습률: {args.learning_rate}")
     print(f"프레임 크기: {args.frame_width}x{args.frame_height}")
     print(f"프레임 스킵: {args.frame_skip}")
+    if args.pipeline:
+        print(f"파이프라인: ON (action_delay={args.action_delay})")
     print("=" * 60)
     
-    # 준비 확인
-    print("\n⚠️  실시간 학습 주의사항:")
-    print("  1. 게임이 실행 중이어야 합니다")
-    print("  2. 캐릭터가 안전한 맵에 있어야 합니다")
-    print("  3. 마우스/키보드를 건드리지 마세요")
-    print("  4. ROI 설정이 되어있어야 합니다 (py tools/setup_roi.py)")
-    print("  5. ESC로 언제든 중지 가능")
-    print()
-    
-    # ROI 설정 확인
-    roi_path = Path("configs/roi_settings.json")
-    if not roi_path.exists():
-        print("❌ ROI 설정이 없습니다!")
-        print("   먼저 'py tools/setup_roi.py' 를 실행하세요")
-        return
-    
-    input("준비되면 엔터를 누르세요... ")
-    
-    print("\n⏰ 5초 후 학습 시작...")
-    for i in range(5, 0, -1):
-        print(f"   {i}초...")
-        time.sleep(1)
+    if sim:
+        print(f"\n🧪 배치 시뮬레이터 모드 (월드 {args.sim_envs}개, 가상 시간)")
+    else:
+        # 준비 확인
+        print("\n⚠️  실시간 학습 주의사항:")
+        print("  1. 게임이 실행 중이어야 합니다")
+        print("  2. 캐릭터가 안전한 맵에 있어야 합니다")
+        print("  3. 마우스/키보드를 건드리지 마세요")
+        print("  4. ROI 설정이 되어있어야 합니다 (py tools/setup_roi.py)")
+        print("  5. ESC로 언제든 중지 가능")
+        print()
+    
+        # ROI 설정 확인
+        roi_path = Path("configs/roi_settings.json")
+        if not roi_path.exists():
+            print("❌ ROI 설정이 없습니다!")
+            print("   먼저 'py tools/setup_roi.py' 를 실행하세요")
+            return
+    
+        input("준비되면 엔터를 누르세요... ")
+    
+        print("\n⏰ 5초 후 학습 시작...")
+        for i in range(5, 0, -1):
+            print(f"   {i}초...")
+            time.sleep(1)
     
     # 환경 생성
     print("\n📊 환경 생성 중...")
-    env = RealtimeGameEnv(
-        game=args.game,
+    env_kwargs = dict(
         frame_width=args.frame_width,
         frame_height=args.frame_height,
         frame_stack=args.frame_stack,
         frame_skip=args.frame_skip
     )
+    if sim:
+        env = VecMonitor(BatchedSimVecEnv(args.game, num_envs=args.sim_envs, seed=args.seed, **env_kwargs))
+    elif args.multi_client:
+        clients = load_config(game=args.game).get('clients')
+        if not clients:
+            print(f"❌ configs/{args.game}.yaml에 clients 설정이 없습니다!")
+            return
+        env = make_multi_client_vec_env(args.game, clients, **env_kwargs)
+    else:
+        env = RealtimeGameEnv(game=args.game, **env_kwargs)
+        if args.pipeline:
+            env = PipelinedRealtimeEnv(env, action_delay=args.action_delay)
+        if args.log_transitions:
+            env = TransitionLogWrapper(env)
     
     print(f"✅ 환경 생성 완료")
     print(f"   관측 공간: {env.observation_space.shape}")
     print(f"   행동 공간: {env.action_space.n}개")
+    if args.multi_client or sim:
+        print(f"   클라이언트: {env.num_envs}개")
     
     # 모델 생성 또는 로드
     if args.load_model:
@@ -136,8 +204,8 @@ def main():
             "CnnPolicy",
             env,
             learning_rate=args.learning_rate,
-            n_steps=2048,  # 프레임 스킵으로 인해 더 많은 스텝 수집 가능
-            batch_size=64,  # 배치 사이즈 증가
+            n_steps=args.n_steps,  # 프레임 스킵으로 인해 더 많은 스텝 수집 가능
+            batch_size=args.batch_size,  # 배치 사이즈 증가
             n_epochs=10,
             gamma=0.99,
             gae_lambda=0.95,
@@ -147,26 +215,35 @@ def main():
             max_grad_norm=0.5,
             policy_kwargs=policy_kwargs,
             verbose=1,
-            tensorboard_log=f"logs/realtime/{args.game}"
+            tensorboard_log=f"logs/{run_dir}/{args.game}"
         )
         print("✅ 모델 생성 완료")
     
     # 콜백 설정
-    checkpoint_dir = Path(f"models/realtime/{args.game}/checkpoints")
+    checkpoint_dir = Path(f"models/{run_dir}/{args.game}/checkpoints")
     checkpoint_dir.mkdir(parents=True, exist_ok=True)
     
-    checkpoint_callback = CheckpointCallback(
+    # 비동기 체크포인트 (스냅샷만 학습 스레드, 압축/쓰기는 백그라운드)
+    checkpoint_manager = CheckpointManager(checkpoint_dir, f"{args.game}_ppo_realtime", keep_last=args.keep_checkpoints)
+    if args.resume:
+        entry = checkpoint_manager.restore(model)
+        if entry:
+            print(f"📂 체크포인트에서 재개: {entry['file']} ({entry['timesteps']:,} 스텝)")
+        else:
+            print("⚠️  재개할 체크포인트가 없습니다 - 처음부터 학습")
+    
+    training_callback = RealtimeTrainingCallback(verbose=0 if sim else 1, check_esc=not sim)
+    checkpoint_callback = AsyncCheckpointCallback(
+        checkpoint_manager,
         save_freq=5000,
-        save_path=str(checkpoint_dir),
-        name_prefix=f"{args.game}_ppo_realtime"
+        reward_fn=lambda: recent_mean_reward(training_callback.episode_rewards),
+        verbose=1
     )
     
-    training_callback = RealtimeTrainingCallback(verbose=1)
-    
     # 학습 시작
     print("\n🚀 학습 시작!")
     print("📊 TensorBoard 모니터링:")
-    print(f"   tensorboard --logdir logs/realtime/{args.game}")
+    print(f"   tensorboard --logdir logs/{run_dir}/{args.game}")
     print("\n⏹️  ESC 키를 눌러 안전하게 중지")
     print("=" * 60)
     
@@ -174,7 +251,8 @@ def main():
         model.learn(
             total_timesteps=args.timesteps,
             callback=[checkpoint_callback, training_callback],
-            progress_bar=True
+            progress_bar=True,
+            reset_num_timesteps=not args.resume
         )
     except KeyboardInterrupt:
         print("\n⏹️  학습 중단됨 (Ctrl+C)")
@@ -182,12 +260,17 @@ def main():
         print(f"\n❌ 에러 발생: {e}")
     finally:
         # 최종 모델 저장
-        final_model_dir = Path(f"models/realtime/{args.game}")
+        final_model_dir = Path(f"models/{run_dir}/{args.game}")
         final_model_dir.mkdir(parents=True, exist_ok=True)
         final_model_path = final_model_dir / f"{args.game}_ppo_realtime_final.zip"
         
-        model.save(str(final_model_path))
+        # 키 해제 먼저 (저장하는 동안 키가 눌린 채로 남지 않도록)
         env.close()
+        checkpoint_manager.save_async(
+            model, eval_reward=recent_mean_reward(training_callback.episode_rewards), tag="final"
+        )
+        checkpoint_manager.save_model_async(model, final_model_path)
+        checkpoint_manager.close()
         
         print("\n" + "=" * 60)
         print("✅ 학습 완료!")